@@ -3,8 +3,10 @@ import hashlib
 import json
 import logging
 import uuid
+from json.encoder import encode_basestring_ascii
 
 from fastapi import HTTPException
+from pydantic import BaseModel
 
 from keep.api.core.config import config
 from keep.api.core.db import (
@@ -28,6 +30,71 @@ from keep.providers.providers_factory import ProvidersFactory
 
 DEFAULT_RULE_UUID = "00000000-0000-0000-0000-000000000000"
 
+# same encoding as json.dumps(value, default=str, sort_keys=True), built once
+_HASH_JSON_ENCODER = json.JSONEncoder(default=str, sort_keys=True)
+
+
+def _build_ignore_tree(ignore_fields: list[str]) -> dict:
+    """
+    Turn dotted ignore fields into a tree, e.g. ["lastReceived", "labels.a.b"] ->
+    {"lastReceived": None, "labels": {"a": {"b": None}}}, where None means "skip this key".
+    """
+    tree = {}
+    for field in ignore_fields:
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:
+                # a parent of this field is already ignored
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _update_hash(hasher, value, ignore_tree: dict | None = None):
+    """
+    Feed the canonical JSON of a value (json.dumps(value, default=str, sort_keys=True))
+    into the hasher, skipping the keys of the ignore tree.
+    """
+    if isinstance(value, BaseModel):
+        value = value.dict()
+    if not ignore_tree or not isinstance(value, dict):
+        # nothing to skip below this point, let the C encoder do the work
+        hasher.update(_HASH_JSON_ENCODER.encode(value).encode())
+        return
+    hasher.update(b"{")
+    first = True
+    for key in sorted(value):
+        if key in ignore_tree and ignore_tree[key] is None:
+            continue
+        if not first:
+            hasher.update(b", ")
+        first = False
+        if not isinstance(key, str):
+            # same conversion the json encoder does for int/float/bool/None keys
+            key = json.dumps(key)
+        hasher.update(encode_basestring_ascii(key).encode())
+        hasher.update(b": ")
+        _update_hash(hasher, value[key], ignore_tree.get(key))
+    hasher.update(b"}")
+
+
+def calculate_alert_hash(alert: AlertDto, ignore_fields: list[str]) -> str:
+    """
+    Calculate the deduplication hash of an alert without the ignored fields.
+
+    The hash is identical to sha256(json.dumps(alert.dict(), default=str, sort_keys=True))
+    of the alert with the ignored fields removed, but it is computed by walking the alert
+    fields once, without copying the alert.
+    """
+    hasher = hashlib.sha256()
+    # AlertDto.dict() iterates the instance __dict__ (fields + extra fields)
+    _update_hash(hasher, alert.__dict__, _build_ignore_tree(ignore_fields))
+    return hasher.hexdigest()
+
 
 class AlertDeduplicator:
 
@@ -57,26 +124,18 @@ class AlertDeduplicator:
         - checking if the hash is already in the database
         - setting the isFullDuplicate or isPartialDuplicate flag
         """
-        # we don't want to remove fields from the original alert
-        alert_copy = copy.deepcopy(alert)
-        # remove the fields that should be ignored
-        for field in rule.ignore_fields:
-            alert_copy = self._remove_field(field, alert_copy)
-
-        # calculate the hash
-        alert_hash = hashlib.sha256(
-            json.dumps(alert_copy.dict(), default=str, sort_keys=True).encode()
-        ).hexdigest()
+        # calculate the hash without the fields that should be ignored
+        alert_hash = calculate_alert_hash(alert, rule.ignore_fields)
         alert.alert_hash = alert_hash
         # Check if the hash is already in the database.
-        # If last_alert_fingerprint_to_hash is provided, use it
+        # If last_alert_fingerprint_to_hash is provided (even empty), use it
         # else, get the hash from the database
-        last_alerts_hash_by_fingerprint = (
-            last_alert_fingerprint_to_hash
-            or get_last_alert_hashes_by_fingerprints(
+        if last_alert_fingerprint_to_hash is not None:
+            last_alerts_hash_by_fingerprint = last_alert_fingerprint_to_hash
+        else:
+            last_alerts_hash_by_fingerprint = get_last_alert_hashes_by_fingerprints(
                 self.tenant_id, [alert.fingerprint]
             )
-        )
         # the hash is the same as the last alert hash by fingerprint - full deduplication
         if (
             last_alerts_hash_by_fingerprint.get(alert.fingerprint)
@@ -177,22 +236,35 @@ class AlertDeduplicator:
 
         return alert
 
-    def _remove_field(self, field, alert: AlertDto) -> AlertDto:
-        alert = copy.deepcopy(alert)
-        field_parts = field.split(".")
-        if len(field_parts) == 1:
-            try:
-                delattr(alert, field)
-            except AttributeError:
-                self.logger.warning(f"Failed to delete attribute {field} from alert")
-        else:
-            alert_attr = field_parts[0]
-            d = copy.deepcopy(getattr(alert, alert_attr))
-            for part in field_parts[1:-1]:
-                d = d[part]
-            del d[field_parts[-1]]
-            setattr(alert, field_parts[0], d)
-        return alert
+    def apply_deduplication_batch(
+        self,
+        alerts: list[AlertDto],
+        rules: list["DeduplicationRuleDto"] | None = None,
+    ) -> list[AlertDto]:
+        """
+        Apply deduplication to a batch of alerts.
+
+        The last alert hashes are fetched once for the whole batch, and if no rules
+        are given, the rules are resolved once per (provider_id, provider_type).
+        """
+        if not alerts:
+            return alerts
+
+        last_alert_fingerprint_to_hash = get_last_alert_hashes_by_fingerprints(
+            self.tenant_id, list({alert.fingerprint for alert in alerts})
+        )
+        rules_by_provider = {}
+        for alert in alerts:
+            alert_rules = rules
+            if not alert_rules:
+                provider_key = (alert.providerId, alert.providerType)
+                if provider_key not in rules_by_provider:
+                    rules_by_provider[provider_key] = self.get_deduplication_rules(
+                        self.tenant_id, alert.providerId, alert.providerType
+                    )
+                alert_rules = rules_by_provider[provider_key]
+            self.apply_deduplication(alert, alert_rules, last_alert_fingerprint_to_hash)
+        return alerts
 
     def get_deduplication_rules(
         self, tenant_id, provider_id, provider_type
@@ -0,0 +1,238 @@
+"""
+Per-tenant in-process cache of the mapping and extraction rules run on every incoming
+alert, so enriching an alert doesn't query the rules from the database.
+
+The extraction rules are cached compiled: their attribute template is tokenized, their
+regex and CEL condition compiled once per rule revision instead of once per event.
+
+The rules of a tenant are invalidated when they are created, updated or deleted through
+the mapping and extraction routes. When Redis is enabled (REDIS=true) the invalidation
+reaches all the processes through a per-tenant version counter, otherwise only the
+current process is invalidated and the others reload the rules after
+KEEP_ENRICHMENT_RULES_CACHE_TTL seconds (which also catches changes made directly in
+the database).
+"""
+
+import logging
+import re
+import threading
+import time
+import typing
+
+import celpy
+import chevron
+
+from keep.api.bl.mapping_rule_index import get_mapping_rule_index_cache
+from keep.api.consts import REDIS
+from keep.api.core.config import config
+from keep.api.models.db.extraction import ExtractionRule
+from keep.api.models.db.mapping import MappingRule
+
+KEEP_ENRICHMENT_RULES_CACHE_ENABLED = config(
+    "KEEP_ENRICHMENT_RULES_CACHE_ENABLED", cast=bool, default=True
+)
+KEEP_ENRICHMENT_RULES_CACHE_TTL = config(
+    "KEEP_ENRICHMENT_RULES_CACHE_TTL", cast=int, default=60
+)
+
+REDIS_KEY_PREFIX = "keep:enrichment_rules"
+
+MAPPING_RULES = "mapping"
+PRE_EXTRACTION_RULES = "extraction:pre"
+POST_EXTRACTION_RULES = "extraction:post"
+
+
+class CompiledExtractionRule(typing.NamedTuple):
+    rule: ExtractionRule
+    # the attribute as tokenized chevron template
+    template: list
+    regex: re.Pattern
+    # the compiled CEL condition, None means the rule applies to every event
+    condition: typing.Any
+
+
+class CachedRules(typing.NamedTuple):
+    version: tuple
+    expires_at: float
+    rules: list
+
+
+def compile_extraction_rule(rule: ExtractionRule) -> CompiledExtractionRule:
+    """
+    Compile the attribute template, the regex and the condition of an extraction rule.
+
+    Raises:
+        re.error: if the regex is invalid
+        celpy.CELParseError: if the condition is invalid
+    """
+    attribute = rule.attribute
+    if attribute.startswith("{{") is False and attribute.endswith("}}") is False:
+        # Wrap the attribute in {{ }} to make it a valid chevron template
+        attribute = f"{{{{ {attribute} }}}}"
+    template = list(chevron.tokenizer.tokenize(attribute))
+
+    condition = None
+    if rule.condition is not None and rule.condition not in ("*", ""):
+        env = celpy.Environment()
+        condition = env.program(env.compile(rule.condition))
+
+    return CompiledExtractionRule(rule, template, re.compile(rule.regex), condition)
+
+
+class EnrichmentRulesCache:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_ENRICHMENT_RULES_CACHE_ENABLED
+            self.ttl = KEEP_ENRICHMENT_RULES_CACHE_TTL
+            # (tenant_id, rules kind) -> CachedRules
+            self.cache: dict[tuple[str, str], CachedRules] = {}
+            # tenant_id -> number of local invalidations, so rules loaded while being
+            # invalidated are not cached
+            self.generations: dict[str, int] = {}
+            self._lock = threading.Lock()
+            self.redis = None
+            if self.enabled and REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
+            self.__initialized = True
+
+    @staticmethod
+    def _redis_key(tenant_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:version"
+
+    def _version(self, tenant_id: str) -> tuple:
+        redis_version = None
+        if self.redis is not None:
+            try:
+                redis_version = self.redis.get(self._redis_key(tenant_id))
+            except Exception:
+                self.logger.exception(
+                    "Failed to get enrichment rules version from Redis",
+                    extra={"tenant_id": tenant_id},
+                )
+        with self._lock:
+            return (redis_version, self.generations.get(tenant_id, 0))
+
+    def _get_rules(
+        self,
+        tenant_id: str,
+        kind: str,
+        load_rules: typing.Callable[[], list],
+        prepare_rules: typing.Callable[[list], list],
+    ) -> list:
+        if not self.enabled:
+            return prepare_rules(load_rules())
+
+        key = (tenant_id, kind)
+        version = self._version(tenant_id)
+        with self._lock:
+            entry = self.cache.get(key)
+        if (
+            entry is not None
+            and entry.version == version
+            and entry.expires_at >= time.monotonic()
+        ):
+            return entry.rules
+
+        rules = prepare_rules(load_rules())
+        with self._lock:
+            # not cached if invalidated meanwhile, the rules may be stale
+            if self.generations.get(tenant_id, 0) == version[1]:
+                self.cache[key] = CachedRules(
+                    version, time.monotonic() + self.ttl, rules
+                )
+        return rules
+
+    def get_mapping_rules(
+        self, tenant_id: str, load_rules: typing.Callable[[], list[MappingRule]]
+    ) -> list[MappingRule]:
+        """
+        Get the active mapping rules of the tenant, ordered by priority.
+
+        Args:
+            tenant_id (str): the tenant id
+            load_rules (Callable): queries the rules from the database
+
+        Returns:
+            list[MappingRule]: rules detached from the session they were loaded with,
+                they must not be modified
+        """
+
+        def copy_rules(rules: list[MappingRule]) -> list[MappingRule]:
+            if not self.enabled:
+                return rules
+            # the loaded rules would be expired by the next commit of their session
+            return [MappingRule(**rule.model_dump()) for rule in rules]
+
+        return self._get_rules(tenant_id, MAPPING_RULES, load_rules, copy_rules)
+
+    def get_extraction_rules(
+        self,
+        tenant_id: str,
+        pre: bool,
+        load_rules: typing.Callable[[], list[ExtractionRule]],
+    ) -> list[CompiledExtractionRule]:
+        """
+        Get the active extraction rules of the tenant, ordered by priority and compiled.
+        Rules that fail to compile are logged and left out.
+
+        Args:
+            tenant_id (str): the tenant id
+            pre (bool): the rules run before or after the event is formatted
+            load_rules (Callable): queries the rules from the database
+
+        Returns:
+            list[CompiledExtractionRule]: the compiled rules
+        """
+
+        def compile_rules(rules: list[ExtractionRule]) -> list[CompiledExtractionRule]:
+            compiled_rules = []
+            for rule in rules:
+                try:
+                    rule = ExtractionRule(**rule.model_dump()) if self.enabled else rule
+                    compiled_rules.append(compile_extraction_rule(rule))
+                except Exception:
+                    self.logger.exception(
+                        "Failed to compile extraction rule, skipping it",
+                        extra={"tenant_id": tenant_id, "rule_id": rule.id},
+                    )
+            return compiled_rules
+
+        kind = PRE_EXTRACTION_RULES if pre else POST_EXTRACTION_RULES
+        return self._get_rules(tenant_id, kind, load_rules, compile_rules)
+
+    def invalidate(self, tenant_id: str):
+        """
+        Drop the rules of the tenant, in all the processes if Redis is enabled.
+        """
+        with self._lock:
+            self.generations[tenant_id] = self.generations.get(tenant_id, 0) + 1
+            for key in [key for key in self.cache if key[0] == tenant_id]:
+                del self.cache[key]
+        get_mapping_rule_index_cache().invalidate(tenant_id)
+        if self.redis is not None:
+            try:
+                self.redis.incr(self._redis_key(tenant_id))
+            except Exception:
+                self.logger.exception(
+                    "Failed to invalidate enrichment rules in Redis",
+                    extra={"tenant_id": tenant_id},
+                )
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+
+
+def get_enrichment_rules_cache() -> EnrichmentRulesCache:
+    return EnrichmentRulesCache()
@@ -15,6 +15,14 @@ from sqlalchemy import func
 from sqlalchemy_utils import UUIDType
 from sqlmodel import Session, select
 
+from keep.api.bl.enrichment_rules_cache import (
+    compile_extraction_rule,
+    get_enrichment_rules_cache,
+)
+from keep.api.bl.mapping_rule_index import (
+    KEEP_MAPPING_RULES_INDEX_ENABLED,
+    get_mapping_rule_index_cache,
+)
 from keep.api.core.config import config
 from keep.api.core.db import batch_enrich
 from keep.api.core.db import enrich_entity as enrich_alert_db
@@ -30,6 +38,7 @@ from keep.api.core.db import (
     is_all_alerts_resolved,
 )
 from keep.api.core.elastic import ElasticClient
+from keep.api.core.enrichment_audit_writer import get_enrichment_audit_writer
 from keep.api.models.action_type import ActionType
 from keep.api.models.alert import AlertDto
 from keep.api.models.db.alert import Alert
@@ -157,16 +166,23 @@ class EnrichmentsBl:
                 "pre": pre,
             },
         )
-        rules: list[ExtractionRule] = rules or (
-            self.db_session.query(ExtractionRule)
-            .filter(ExtractionRule.tenant_id == self.tenant_id)
-            .filter(ExtractionRule.disabled == False)
-            .filter(ExtractionRule.pre == pre)
-            .order_by(ExtractionRule.priority.desc())
-            .all()
-        )
+        if rules:
+            compiled_rules = [compile_extraction_rule(rule) for rule in rules]
+        else:
+            compiled_rules = get_enrichment_rules_cache().get_extraction_rules(
+                self.tenant_id,
+                pre,
+                lambda: (
+                    self.db_session.query(ExtractionRule)
+                    .filter(ExtractionRule.tenant_id == self.tenant_id)
+                    .filter(ExtractionRule.disabled == False)
+                    .filter(ExtractionRule.pre == pre)
+                    .order_by(ExtractionRule.priority.desc())
+                    .all()
+                ),
+            )
 
-        if not rules:
+        if not compiled_rules:
             self._add_enrichment_log(
                 f"No extraction rules found (pre: {pre})",
                 "debug",
@@ -187,15 +203,9 @@ class EnrichmentsBl:
             is_alert_dto = True
             event = json.loads(json.dumps(event.dict(), default=str))
 
-        for rule in rules:
-            attribute = rule.attribute
-            if (
-                attribute.startswith("{{") is False
-                and attribute.endswith("}}") is False
-            ):
-                # Wrap the attribute in {{ }} to make it a valid chevron template
-                attribute = f"{{{{ {attribute} }}}}"
-            attribute_value = chevron.render(attribute, event)
+        for compiled_rule in compiled_rules:
+            rule = compiled_rule.rule
+            attribute_value = chevron.render(compiled_rule.template, event)
             attribute_value = html.unescape(attribute_value)
 
             if not attribute_value:
@@ -213,7 +223,7 @@ class EnrichmentsBl:
                 )
                 continue
 
-            if rule.condition is None or rule.condition == "*" or rule.condition == "":
+            if compiled_rule.condition is None:
                 self._add_enrichment_log(
                     f"No condition specified for rule {rule.name}, enriching...",
                     "info",
@@ -224,11 +234,8 @@ class EnrichmentsBl:
                     },
                 )
             else:
-                env = celpy.Environment()
-                ast = env.compile(rule.condition)
-                prgm = env.program(ast)
                 activation = celpy.json_to_cel(event)
-                relevant = prgm.evaluate(activation)
+                relevant = compiled_rule.condition.evaluate(activation)
                 if not relevant:
                     self._add_enrichment_log(
                         f"Condition did not match, skipping extraction for rule {rule.name} with condition {rule.condition}",
@@ -244,7 +251,7 @@ class EnrichmentsBl:
                     )
                     continue
 
-            match_result = re.search(rule.regex, attribute_value)
+            match_result = compiled_rule.regex.search(attribute_value)
             if match_result:
                 match_dict = match_result.groupdict()
                 # we don't override source
@@ -315,12 +322,15 @@ class EnrichmentsBl:
         )
 
         # Retrieve all active mapping rules for the current tenant, ordered by priority
-        rules: list[MappingRule] = (
-            self.db_session.query(MappingRule)
-            .filter(MappingRule.tenant_id == self.tenant_id)
-            .filter(MappingRule.disabled == False)
-            .order_by(MappingRule.priority.desc())
-            .all()
+        rules: list[MappingRule] = get_enrichment_rules_cache().get_mapping_rules(
+            self.tenant_id,
+            lambda: (
+                self.db_session.query(MappingRule)
+                .filter(MappingRule.tenant_id == self.tenant_id)
+                .filter(MappingRule.disabled == False)
+                .order_by(MappingRule.priority.desc())
+                .all()
+            ),
         )
 
         if not rules:
@@ -421,28 +431,41 @@ class EnrichmentsBl:
                 enrichments.pop("tenant_id", None)
                 enrichments.pop("id", None)
         elif rule.type == "csv":
+            rule_index = (
+                get_mapping_rule_index_cache().get_index(rule)
+                if KEEP_MAPPING_RULES_INDEX_ENABLED
+                else None
+            )
             if not rule.is_multi_level:
-                for row in rule.rows:
-                    if any(
-                        self._check_matcher(alert, row, matcher)
-                        for matcher in rule.matchers
-                    ):
-                        # Extract enrichments from the matched row
-                        enrichments = {}
-                        for key, value in row.items():
-                            if value is not None:
-                                is_matcher = False
-                                for matcher in rule.matchers:
-                                    if key in matcher:
-                                        is_matcher = True
-                                        break
-                                if not is_matcher:
-                                    # If the key has . (dot) in it, it'll be added as is while it needs to be nested.
-                                    # @tb: fix when somebody will be complaining about this.
-                                    if isinstance(value, str):
-                                        value = value.strip()
-                                    enrichments[key.strip()] = value
-                        break
+                if rule_index is not None:
+                    matched_row = rule_index.find_row(alert)
+                else:
+                    matched_row = next(
+                        (
+                            row
+                            for row in rule.rows
+                            if any(
+                                self._check_matcher(alert, row, matcher)
+                                for matcher in rule.matchers
+                            )
+                        ),
+                        None,
+                    )
+                if matched_row is not None:
+                    # Extract enrichments from the matched row
+                    for key, value in matched_row.items():
+                        if value is not None:
+                            is_matcher = False
+                            for matcher in rule.matchers:
+                                if key in matcher:
+                                    is_matcher = True
+                                    break
+                            if not is_matcher:
+                                # If the key has . (dot) in it, it'll be added as is while it needs to be nested.
+                                # @tb: fix when somebody will be complaining about this.
+                                if isinstance(value, str):
+                                    value = value.strip()
+                                enrichments[key.strip()] = value
             else:
                 # Multi-level mapping
                 # We can assume that the matcher is only a single key. i.e., [['customers']]
@@ -457,20 +480,29 @@ class EnrichmentsBl:
                     for matcher in matcher_values:
                         if rule.prefix_to_remove:
                             matcher = matcher.replace(rule.prefix_to_remove, "")
-                        for row in rule.rows:
-                            if self._check_explicit_match(row, key, matcher):
-                                if rule.new_property_name not in enrichments:
-                                    enrichments[rule.new_property_name] = {}
-
-                                if matcher not in enrichments[rule.new_property_name]:
-                                    enrichments[rule.new_property_name][matcher] = {}
-
-                                for enrichment_key, enrichment_value in row.items():
-                                    if enrichment_value is not None:
-                                        enrichments[rule.new_property_name][matcher][
-                                            enrichment_key.strip()
-                                        ] = enrichment_value.strip()
-                                break
+                        if rule_index is not None:
+                            matched_row = rule_index.find_explicit_row(matcher)
+                        else:
+                            matched_row = next(
+                                (
+                                    row
+                                    for row in rule.rows
+                                    if self._check_explicit_match(row, key, matcher)
+                                ),
+                                None,
+                            )
+                        if matched_row is not None:
+                            if rule.new_property_name not in enrichments:
+                                enrichments[rule.new_property_name] = {}
+
+                            if matcher not in enrichments[rule.new_property_name]:
+                                enrichments[rule.new_property_name][matcher] = {}
+
+                            for enrichment_key, enrichment_value in matched_row.items():
+                                if enrichment_value is not None:
+                                    enrichments[rule.new_property_name][matcher][
+                                        enrichment_key.strip()
+                                    ] = enrichment_value.strip()
         if enrichments:
             # Enrich the alert with the matched data from the row
             for key, matcher in enrichments.items():
@@ -914,6 +946,11 @@ class EnrichmentsBl:
             )
             return
 
+        audit_writer = get_enrichment_audit_writer()
+        if not audit_writer.should_store_event(self.tenant_id, status, enrichment_type):
+            self.__logs = []
+            return
+
         try:
             enrichment_event = EnrichmentEvent(
                 tenant_id=self.tenant_id,
@@ -923,6 +960,11 @@ class EnrichmentsBl:
                 alert_id=alert_id,
                 enriched_fields=enriched_fields,
             )
+            if audit_writer.enabled:
+                audit_writer.enqueue(enrichment_event, self.__logs)
+                self.__logs = []
+                self.enrichment_event_id = enrichment_event.id
+                return
             self.db_session.add(enrichment_event)
             self.db_session.flush()
             if self.__logs:
@@ -955,6 +997,8 @@ class EnrichmentsBl:
         """
         try:
             getattr(self.logger, level)(message, extra=details)
+            if not get_enrichment_audit_writer().should_store_log(level):
+                return
             log_entry = EnrichmentLog(
                 tenant_id=self.tenant_id,
                 message=message,
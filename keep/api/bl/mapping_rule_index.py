@@ -0,0 +1,250 @@
+"""
+Compiled indexes of the CSV mapping rules, so matching an alert against a rule doesn't
+evaluate every row of the rule.
+
+A row value is matched against the alert's value with re.search (or equality), so a
+value without regex special characters matches the alert values it is a substring of.
+For each matcher, these literal values of one of its attributes are kept in a hash map,
+which is looked up with the alert value's substrings of the lengths found in the map.
+The rows with a regex, a wildcard or no value for that attribute are kept in a fallback
+list. Only the candidate rows are then checked against the whole matcher, with
+precompiled patterns.
+
+Multi-level rules match the values exactly, so their index is a plain hash map.
+
+The indexes are cached per rule revision: its id and last update time.
+"""
+
+import heapq
+import logging
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Iterable
+
+from keep.api.core.config import config
+from keep.api.models.alert import AlertDto
+from keep.api.models.db.mapping import MappingRule
+
+KEEP_MAPPING_RULES_INDEX_ENABLED = config(
+    "KEEP_MAPPING_RULES_INDEX_ENABLED", cast=bool, default=True
+)
+# max number of mapping rules whose index is kept in memory
+KEEP_MAPPING_RULES_INDEX_CACHE_SIZE = config(
+    "KEEP_MAPPING_RULES_INDEX_CACHE_SIZE", cast=int, default=100
+)
+
+WILDCARD = "*"
+REGEX_SPECIAL_CHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
+logger = logging.getLogger(__name__)
+
+
+def _is_literal(value) -> bool:
+    return (
+        isinstance(value, str)
+        and value != ""
+        and not REGEX_SPECIAL_CHARACTERS.intersection(value)
+    )
+
+
+class _MatcherIndex:
+    def __init__(self, attributes: list[str], rows: list[dict]):
+        self.attributes = attributes
+        # index the attribute with the most literal values, the others are checked
+        self.attribute = max(
+            attributes,
+            key=lambda attribute: sum(
+                1 for row in rows if _is_literal(row.get(attribute))
+            ),
+        )
+        # literal value -> indexes of the rows with this value
+        self.literals: dict[str, list[int]] = defaultdict(list)
+        self.fallback: list[int] = []
+        for row_index, row in enumerate(rows):
+            value = row.get(self.attribute)
+            if _is_literal(value):
+                self.literals[value].append(row_index)
+            elif value is None or isinstance(value, str):
+                self.fallback.append(row_index)
+            # other values never match, re.search raises a TypeError on them
+        self.literals = dict(self.literals)
+        self.lengths = sorted({len(value) for value in self.literals})
+
+    def candidates(self, alert_value) -> Iterable[int]:
+        """
+        The indexes of the rows that may match, in the order of the rows.
+        """
+        if not isinstance(alert_value, str):
+            return self.fallback
+
+        literal_candidates = set()
+        for length in self.lengths:
+            if length > len(alert_value):
+                break
+            for start in range(len(alert_value) - length + 1):
+                row_indexes = self.literals.get(alert_value[start : start + length])
+                if row_indexes:
+                    literal_candidates.update(row_indexes)
+        if not literal_candidates:
+            return self.fallback
+        return heapq.merge(sorted(literal_candidates), self.fallback)
+
+
+class MappingRuleIndex:
+    def __init__(self, rule: MappingRule):
+        self.rows: list[dict] = rule.rows or []
+        self.matchers = [
+            [attribute.strip() for attribute in matcher]
+            for matcher in (rule.matchers or [])
+        ]
+        # compiled on first use, most rows are found by their literal values
+        self.patterns: dict[str, re.Pattern] = {}
+
+        if rule.is_multi_level:
+            self.matcher_indexes = []
+            # row value -> the first row with this value
+            self.explicit_rows: dict = {}
+            key = self.matchers[0][0] if self.matchers and self.matchers[0] else None
+            for row in self.rows:
+                value = row.get(key)
+                try:
+                    self.explicit_rows.setdefault(value, row)
+                except TypeError:
+                    # unhashable, can't be equal to a string anyway
+                    continue
+        else:
+            self.matcher_indexes = [
+                _MatcherIndex(attributes, self.rows) if attributes else None
+                for attributes in self.matchers
+            ]
+            self.explicit_rows = {}
+
+    def _get_pattern(self, value: str) -> re.Pattern:
+        pattern = self.patterns.get(value)
+        if pattern is None:
+            try:
+                pattern = re.compile(value)
+            except re.error:
+                pattern = re.compile(re.escape(value))
+            self.patterns[value] = pattern
+        return pattern
+
+    def _value_matches(self, alert_value, row_value) -> bool:
+        if row_value == WILDCARD:
+            return True
+        if row_value is None or alert_value is None:
+            return alert_value is row_value
+        if not isinstance(alert_value, str) or not isinstance(row_value, str):
+            return False
+        return (
+            alert_value == row_value
+            or self._get_pattern(row_value).search(alert_value) is not None
+        )
+
+    def find_row(self, alert: AlertDto) -> dict | None:
+        """
+        Get the first row that matches the alert by any of the rule's matchers.
+        """
+        # avoid circular import
+        from keep.api.bl.enrichments_bl import get_nested_attribute
+
+        alert_values = {}
+
+        def alert_value(attribute: str):
+            if attribute not in alert_values:
+                alert_values[attribute] = get_nested_attribute(alert, attribute)
+            return alert_values[attribute]
+
+        first_match = None
+        for matcher_index in self.matcher_indexes:
+            if matcher_index is None:
+                # a matcher without attributes matches every row
+                first_match = 0 if self.rows else None
+                break
+            for row_index in matcher_index.candidates(
+                alert_value(matcher_index.attribute)
+            ):
+                if first_match is not None and row_index >= first_match:
+                    break
+                row = self.rows[row_index]
+                if all(
+                    self._value_matches(alert_value(attribute), row.get(attribute))
+                    for attribute in matcher_index.attributes
+                ):
+                    first_match = row_index
+                    break
+        return self.rows[first_match] if first_match is not None else None
+
+    def find_explicit_row(self, value: str) -> dict | None:
+        """
+        Get the first row whose multi-level key equals the value.
+        """
+        return self.explicit_rows.get(value.strip())
+
+
+class MappingRuleIndexCache:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.max_size = KEEP_MAPPING_RULES_INDEX_CACHE_SIZE
+            self.indexes: OrderedDict[tuple, MappingRuleIndex] = OrderedDict()
+            self._lock = threading.Lock()
+            self.__initialized = True
+
+    @staticmethod
+    def _key(rule: MappingRule) -> tuple:
+        return (
+            rule.tenant_id,
+            rule.id,
+            rule.last_updated_at,
+            len(rule.rows or []),
+            str(rule.matchers),
+        )
+
+    def get_index(self, rule: MappingRule) -> MappingRuleIndex:
+        key = self._key(rule)
+        with self._lock:
+            index = self.indexes.get(key)
+            if index is not None:
+                self.indexes.move_to_end(key)
+                return index
+
+        logger.info(
+            "Building mapping rule index",
+            extra={
+                "tenant_id": rule.tenant_id,
+                "rule_id": rule.id,
+                "rows": len(rule.rows or []),
+            },
+        )
+        index = MappingRuleIndex(rule)
+        with self._lock:
+            self.indexes[key] = index
+            while len(self.indexes) > self.max_size:
+                self.indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, tenant_id: str):
+        """
+        Drop the indexes of the tenant's rules, e.g. when a rule changed without its last
+        update time.
+        """
+        with self._lock:
+            for key in [key for key in self.indexes if key[0] == tenant_id]:
+                del self.indexes[key]
+
+    def clear(self):
+        with self._lock:
+            self.indexes.clear()
+
+
+def get_mapping_rule_index_cache() -> MappingRuleIndexCache:
+    return MappingRuleIndexCache()
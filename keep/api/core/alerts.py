@@ -11,13 +11,16 @@ from sqlmodel import Session, text
 from keep.api.core.cel_to_sql.ast_nodes import DataType
 from keep.api.core.cel_to_sql.properties_metadata import (
     FieldMappingConfiguration,
+    JsonFieldMapping,
     PropertiesMetadata,
     PropertyMetadataInfo,
 )
 from keep.api.core.cel_to_sql.sql_providers.get_cel_to_sql_provider_for_dialect import (
     get_cel_to_sql_provider,
 )
+from keep.api.core.config import config
 from keep.api.core.db import engine
+from keep.api.core.facet_options_cache import get_facet_options_cache
 
 # This import is required to create the tables
 from keep.api.core.facets import get_facet_options, get_facets
@@ -39,6 +42,22 @@ logger = logging.getLogger(__name__)
 
 alerts_hard_limit = int(os.environ.get("KEEP_LAST_ALERTS_LIMIT", 50000))
 
+# severity, status and lastReceived are materialized in lastalert columns (see
+# set_last_alert), filter and sort on them instead of extracting them from JSON
+KEEP_LAST_ALERT_PROPERTIES_COLUMNS_ENABLED = config(
+    "KEEP_LAST_ALERT_PROPERTIES_COLUMNS_ENABLED", cast=bool, default=True
+)
+
+
+def _map_to(column: str) -> list[str] | str:
+    if KEEP_LAST_ALERT_PROPERTIES_COLUMNS_ENABLED:
+        return f"lastalert.{column}"
+    return [
+        "JSON(alertenrichment.enrichments).*",
+        "JSON(alert.event).*",
+    ]
+
+
 alert_field_configurations = [
     FieldMappingConfiguration(
         map_from_pattern="id", map_to="lastalert.alert_id", data_type=DataType.UUID
@@ -90,10 +109,7 @@ alert_field_configurations = [
     ),
     FieldMappingConfiguration(
         map_from_pattern="severity",
-        map_to=[
-            "JSON(alertenrichment.enrichments).*",
-            "JSON(alert.event).*",
-        ],
+        map_to=_map_to("severity"),
         enum_values=[
             severity.value
             for severity in sorted(
@@ -105,18 +121,12 @@ alert_field_configurations = [
     ),
     FieldMappingConfiguration(
         map_from_pattern="lastReceived",
-        map_to=[
-            "JSON(alertenrichment.enrichments).*",
-            "JSON(alert.event).*",
-        ],
+        map_to=_map_to("last_received"),
         data_type=DataType.DATETIME,
     ),
     FieldMappingConfiguration(
         map_from_pattern="status",
-        map_to=[
-            "JSON(alertenrichment.enrichments).*",
-            "JSON(alert.event).*",
-        ],
+        map_to=_map_to("status"),
         enum_values=list(reversed([item.value for _, item in enumerate(AlertStatus)])),
         data_type=DataType.STRING,
     ),
@@ -223,6 +233,22 @@ def get_threeshold_query(tenant_id: str):
     )
 
 
+def __involves_alert_data(involved_fields: list[PropertyMetadataInfo]) -> bool:
+    """
+    Whether filtering on the fields needs the alert and alertenrichment tables.
+    """
+    for field in involved_fields:
+        for field_mapping in field.field_mappings:
+            table = (
+                field_mapping.json_prop
+                if isinstance(field_mapping, JsonFieldMapping)
+                else field_mapping.map_to
+            ).split(".")[0]
+            if table in ("alert", "alertenrichment"):
+                return True
+    return False
+
+
 def __build_query_for_filtering(
     tenant_id: str,
     select_args: list,
@@ -249,6 +275,9 @@ def __build_query_for_filtering(
             ),
             False,
         )
+        fetch_alerts_data = fetch_alerts_data or __involves_alert_data(
+            involved_fields
+        )
 
     sql_query = select(*select_args).select_from(LastAlert)
 
@@ -298,7 +327,6 @@ def __build_query_for_filtering(
 
 def build_total_alerts_query(tenant_id, query: QueryDto):
     fetch_incidents = query.cel and "incident." in query.cel
-    fetch_alerts_data = query.cel is not None or query.cel != ""
 
     count_funct = (
         func.count(func.distinct(LastAlert.alert_id))
@@ -310,7 +338,8 @@ def build_total_alerts_query(tenant_id, query: QueryDto):
         cel=query.cel,
         select_args=[count_funct],
         limit=query.limit,
-        fetch_alerts_data=fetch_alerts_data,
+        # joined only when the CEL filters on them
+        fetch_alerts_data=False,
     )
 
     return built_query_result["query"]
@@ -447,12 +476,18 @@ def get_alert_facets_data(
             fetch_incidents=fetch_incidents,
         )["query"]
 
-    return get_facet_options(
-        base_query_factory=base_query_factory,
-        entity_id_column=LastAlert.alert_id,
+    return get_facet_options_cache().get_facet_options(
+        tenant_id=tenant_id,
+        entity_type="alert",
         facets=facets,
         facet_options_query=facet_options_query,
-        properties_metadata=properties_metadata,
+        get_facet_options=lambda: get_facet_options(
+            base_query_factory=base_query_factory,
+            entity_id_column=LastAlert.alert_id,
+            facets=facets,
+            facet_options_query=facet_options_query,
+            properties_metadata=properties_metadata,
+        ),
     )
 
 
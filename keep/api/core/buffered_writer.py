@@ -0,0 +1,122 @@
+"""
+Base of the writers that take work off the request/ingestion path.
+
+Items are enqueued and a background thread writes them in batches of up to batch_size
+items, or whatever was enqueued during flush_interval seconds. The thread is started
+on the first enqueue and stopped at exit, the items still queued are handed to
+_flush_remaining.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Generic, TypeVar
+
+from prometheus_client import Gauge
+
+T = TypeVar("T")
+
+
+class BufferedWriter(Generic[T]):
+    thread_name = "buffered_writer"
+
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        queue_size: int,
+        queue_depth: Gauge,
+    ):
+        self.logger = logging.getLogger(self.__class__.__module__)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue[T] = queue.Queue(maxsize=queue_size)
+        self.queue_depth = queue_depth
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _on_start(self):
+        """
+        Called before the writing thread is started, with self._lock held.
+        """
+
+    def _flush(self, batch: list[T]):
+        raise NotImplementedError
+
+    def _flush_remaining(self, items: list[T]):
+        """
+        Handle the items still queued when the writer is stopped.
+        """
+        self._flush(items)
+
+    def _after_batch(self):
+        """
+        Called by the writing thread after every batch (or flush interval).
+        """
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._on_start()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=self.thread_name, daemon=True
+            )
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """
+        Stop the writing thread, the items still queued are flushed.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join()
+
+        remaining = []
+        while True:
+            try:
+                remaining.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if remaining:
+            self._flush_remaining(remaining)
+        self.queue_depth.set(0)
+
+    def _next_batch(self) -> list[T]:
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        self.queue_depth.set(self.queue.qsize())
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = self._next_batch()
+                if batch:
+                    self._flush(batch)
+                self._after_batch()
+            except Exception:
+                self.logger.exception(
+                    "Buffered writer iteration failed",
+                    extra={"writer": self.thread_name},
+                )
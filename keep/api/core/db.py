@@ -27,6 +27,7 @@ from sqlalchemy import (
     and_,
     case,
     cast,
+    delete,
     desc,
     func,
     literal,
@@ -48,12 +49,15 @@ from sqlmodel import Session, SQLModel, col, or_, select, text
 from keep.api.consts import STATIC_PRESETS
 from keep.api.core.config import config
 from keep.api.core.db_utils import (
+    LAST_ALERT_PROPERTIES_COLUMNS,
     create_db_engine,
     custom_serialize,
     get_json_extract_field,
+    get_last_alert_properties,
     get_or_create,
 )
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.core.last_alert_hash_cache import get_last_alert_hash_cache
 
 # This import is required to create the tables
 from keep.api.models.action_type import ActionType
@@ -315,30 +319,161 @@ def get_timeouted_workflow_exections():
         return timeouted_workflows
 
 
+def _get_last_completed_execution_column(column):
+    """
+    Correlated subquery of a column of the workflow's last completed execution,
+    served by the (workflow_id, execution_number) unique index.
+    """
+    return (
+        select(column)
+        .where(WorkflowExecution.workflow_id == Workflow.id)
+        .where(WorkflowExecution.is_test_run == False)
+        .where(
+            (WorkflowExecution.status == "success")
+            | (WorkflowExecution.status == "error")
+            | (WorkflowExecution.status == "providers_not_configured")
+        )
+        .order_by(WorkflowExecution.execution_number.desc())
+        .limit(1)
+        .correlate(Workflow)
+        .scalar_subquery()
+    )
+
+
+def _get_interval_workflows_schedule(session: Session, current_time: datetime):
+    """
+    Build the expressions used to schedule the interval workflows.
+
+    Returns:
+        tuple: the enabled interval workflows with their last completed execution
+               (subquery with workflow_id, last_started and last_execution_number columns),
+               the seconds since their last completed execution started,
+               and whether they are already being run by a scheduler
+    """
+    last_executions = (
+        select(
+            Workflow.id.label("workflow_id"),
+            _get_last_completed_execution_column(WorkflowExecution.started).label(
+                "last_started"
+            ),
+            _get_last_completed_execution_column(
+                WorkflowExecution.execution_number
+            ).label("last_execution_number"),
+        )
+        .where(Workflow.is_deleted == False)
+        .where(Workflow.is_disabled == False)
+        .where(Workflow.interval != None)
+        .where(Workflow.interval > 0)
+        .subquery()
+    )
+    # executions locked by a scheduler, the timed out ones are relaunched
+    running_execution = exists(
+        select(WorkflowExecution.id)
+        .where(WorkflowExecution.workflow_id == Workflow.id)
+        .where(WorkflowExecution.is_test_run == False)
+        .where(WorkflowExecution.triggered_by == "scheduler")
+        .where(WorkflowExecution.status == "in_progress")
+        .where(
+            WorkflowExecution.started
+            > current_time - INTERVAL_WORKFLOWS_RELAUNCH_TIMEOUT
+        )
+    )
+
+    last_started = last_executions.c.last_started
+    dialect_name = session.bind.dialect.name
+    if dialect_name == "mysql":
+        seconds_since_last_started = func.timestampdiff(
+            text("SECOND"), last_started, current_time
+        )
+    elif dialect_name == "postgresql":
+        seconds_since_last_started = func.extract(
+            "epoch", literal(current_time) - last_started
+        )
+    elif dialect_name == "sqlite":
+        seconds_since_last_started = (
+            func.julianday(current_time) - func.julianday(last_started)
+        ) * 86400
+    else:
+        raise ValueError(f"Unsupported dialect: {dialect_name}")
+
+    return last_executions, seconds_since_last_started, running_execution
+
+
+def get_due_interval_workflows(
+    session: Session, current_time: datetime, look_ahead_seconds: float = 0
+) -> list[tuple[Workflow, int | None, float]]:
+    """
+    Get the interval workflows that should run, in a single query.
+
+    Args:
+        look_ahead_seconds: also get the workflows due in the next look_ahead_seconds
+
+    Returns:
+        list: (workflow, execution number of its last completed execution or None
+               if it never completed, seconds until it is due or 0 if it is already due)
+               for the workflows that never completed or whose last completed
+               execution started more than interval - look_ahead_seconds seconds ago,
+               skipping the ones already being run by the scheduler
+    """
+    last_executions, seconds_since_last_started, running_execution = (
+        _get_interval_workflows_schedule(session, current_time)
+    )
+    due_in = case(
+        (last_executions.c.last_started == None, 0),
+        else_=Workflow.interval - seconds_since_last_started,
+    )
+    query = (
+        select(Workflow, last_executions.c.last_execution_number, due_in)
+        .join(last_executions, last_executions.c.workflow_id == Workflow.id)
+        .where(due_in <= look_ahead_seconds)
+        .where(~running_execution)
+    )
+    return [
+        (workflow, last_execution_number, max(float(workflow_due_in), 0.0))
+        for workflow, last_execution_number, workflow_due_in in session.exec(query)
+    ]
+
+
 def get_workflows_that_should_run():
+    workflows_to_run, _ = get_interval_workflows_to_run()
+    return workflows_to_run
+
+
+def get_interval_workflows_to_run(
+    look_ahead_seconds: float = 0, current_time: datetime | None = None
+) -> tuple[list[dict], float | None]:
+    """
+    Lock an execution of the interval workflows that should run.
+
+    Args:
+        look_ahead_seconds: how far ahead to look for the next due workflow
+
+    Returns:
+        tuple: the workflows to run, and the number of seconds until the next
+               interval workflow is due, or None if none is due in look_ahead_seconds
+    """
     with Session(engine) as session:
         logger.debug("Checking for workflows that should run")
-        workflows_with_interval = []
+        current_time = current_time or datetime.utcnow()
+        due_workflows = []
         try:
-            result = session.exec(
-                select(Workflow)
-                .filter(Workflow.is_deleted == False)
-                .filter(Workflow.is_disabled == False)
-                .filter(Workflow.interval != None)
-                .filter(Workflow.interval > 0)
+            due_workflows = get_due_interval_workflows(
+                session, current_time, look_ahead_seconds
             )
-            workflows_with_interval = result.all() if result else []
         except Exception:
             logger.exception("Failed to get workflows with interval")
 
-        logger.debug(f"Found {len(workflows_with_interval)} workflows with interval")
+        next_due_in = None
         workflows_to_run = []
         # for each workflow:
-        for workflow in workflows_with_interval:
-            current_time = datetime.utcnow()
-            last_execution = get_last_completed_execution(session, workflow.id)
+        for workflow, last_execution_number, due_in in due_workflows:
+            # due in the next look_ahead_seconds, the scheduler sleeps until then
+            if due_in > 0:
+                next_due_in = min(due_in, next_due_in or due_in)
+                continue
+
             # if there no last execution, that's the first time we run the workflow
-            if not last_execution:
+            if last_execution_number is None:
                 try:
                     # try to get the lock
                     workflow_execution_id = create_workflow_execution(
@@ -356,92 +491,184 @@ def get_workflows_that_should_run():
                 # some other thread/instance has already started to work on it
                 except IntegrityError:
                     continue
-            # else, if the last execution was more than interval seconds ago, we need to run it
+                continue
+
+            # else, the last execution was more than interval seconds ago, we need to run it
+            try:
+                # try to get the lock with execution_number + 1
+                workflow_execution_id = create_workflow_execution(
+                    workflow.id,
+                    workflow.revision,
+                    workflow.tenant_id,
+                    "scheduler",
+                    last_execution_number + 1,
+                )
+                # we succeed to get the lock on this execution number :)
+                # let's run it
+                workflows_to_run.append(
+                    {
+                        "tenant_id": workflow.tenant_id,
+                        "workflow_id": workflow.id,
+                        "workflow_execution_id": workflow_execution_id,
+                    }
+                )
+                # continue to the next one
+                continue
+            # some other thread/instance has already started to work on it
+            except IntegrityError:
+                # we need to verify the locking is still valid and not timeouted
+                session.rollback()
+                pass
+            # get the ongoing execution
+            ongoing_execution = session.exec(
+                select(WorkflowExecution)
+                .where(WorkflowExecution.workflow_id == workflow.id)
+                .where(WorkflowExecution.execution_number == last_execution_number + 1)
+                .limit(1)
+            ).first()
+            # this is a WTF exception since if this (workflow_id, execution_number) does not exist,
+            # we would be able to acquire the lock
+            if not ongoing_execution:
+                logger.error(
+                    f"WTF: ongoing execution not found {workflow.id} {last_execution_number + 1}"
+                )
+                continue
+            # if this completed, error, than that's ok - the service who locked the execution is done
+            elif ongoing_execution.status != "in_progress":
+                continue
+            # if the ongoing execution runs more than timeout minutes, relaunch it
             elif (
-                last_execution.started + timedelta(seconds=workflow.interval)
+                ongoing_execution.started + INTERVAL_WORKFLOWS_RELAUNCH_TIMEOUT
                 <= current_time
             ):
+                ongoing_execution.status = "timeout"
+                session.commit()
+                # re-create the execution and try to get the lock
                 try:
-                    # try to get the lock with execution_number + 1
                     workflow_execution_id = create_workflow_execution(
                         workflow.id,
                         workflow.revision,
                         workflow.tenant_id,
                         "scheduler",
-                        last_execution.execution_number + 1,
-                    )
-                    # we succeed to get the lock on this execution number :)
-                    # let's run it
-                    workflows_to_run.append(
-                        {
-                            "tenant_id": workflow.tenant_id,
-                            "workflow_id": workflow.id,
-                            "workflow_execution_id": workflow_execution_id,
-                        }
+                        ongoing_execution.execution_number + 1,
                     )
-                    # continue to the next one
-                    continue
-                # some other thread/instance has already started to work on it
+                # some other thread/instance has already started to work on it and that's ok
                 except IntegrityError:
-                    # we need to verify the locking is still valid and not timeouted
-                    session.rollback()
-                    pass
-                # get the ongoing execution
-                ongoing_execution = session.exec(
-                    select(WorkflowExecution)
-                    .where(WorkflowExecution.workflow_id == workflow.id)
-                    .where(
-                        WorkflowExecution.execution_number
-                        == last_execution.execution_number + 1
-                    )
-                    .limit(1)
-                ).first()
-                # this is a WTF exception since if this (workflow_id, execution_number) does not exist,
-                # we would be able to acquire the lock
-                if not ongoing_execution:
-                    logger.error(
-                        f"WTF: ongoing execution not found {workflow.id} {last_execution.execution_number + 1}"
+                    logger.debug(
+                        f"Failed to create a new execution for workflow {workflow.id} [timeout]. Constraint is met."
                     )
                     continue
-                # if this completed, error, than that's ok - the service who locked the execution is done
-                elif ongoing_execution.status != "in_progress":
-                    continue
-                # if the ongoing execution runs more than timeout minutes, relaunch it
-                elif (
-                    ongoing_execution.started + INTERVAL_WORKFLOWS_RELAUNCH_TIMEOUT
-                    <= current_time
-                ):
-                    ongoing_execution.status = "timeout"
-                    session.commit()
-                    # re-create the execution and try to get the lock
-                    try:
-                        workflow_execution_id = create_workflow_execution(
-                            workflow.id,
-                            workflow.revision,
-                            workflow.tenant_id,
-                            "scheduler",
-                            ongoing_execution.execution_number + 1,
-                        )
-                    # some other thread/instance has already started to work on it and that's ok
-                    except IntegrityError:
-                        logger.debug(
-                            f"Failed to create a new execution for workflow {workflow.id} [timeout]. Constraint is met."
-                        )
-                        continue
-                    # managed to acquire the (workflow_id, execution_number) lock
-                    workflows_to_run.append(
-                        {
-                            "tenant_id": workflow.tenant_id,
-                            "workflow_id": workflow.id,
-                            "workflow_execution_id": workflow_execution_id,
-                        }
-                    )
+                # managed to acquire the (workflow_id, execution_number) lock
+                workflows_to_run.append(
+                    {
+                        "tenant_id": workflow.tenant_id,
+                        "workflow_id": workflow.id,
+                        "workflow_execution_id": workflow_execution_id,
+                    }
+                )
             else:
                 logger.debug(
                     f"Workflow {workflow.id} is already running by someone else"
                 )
 
-        return workflows_to_run
+        logger.debug(f"Found {len(workflows_to_run)} due workflows with interval")
+        return workflows_to_run, next_due_in
+
+
+def enqueue_workflow_execution(
+    tenant_id: str, workflow_id: str, payload: dict, delay_seconds: float = 0
+) -> str:
+    with Session(engine) as session:
+        queued_execution = QueuedWorkflowExecution(
+            id=str(uuid4()),
+            tenant_id=tenant_id,
+            workflow_id=workflow_id,
+            payload=payload,
+            available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+        )
+        session.add(queued_execution)
+        session.commit()
+        return queued_execution.id
+
+
+def lease_queued_workflow_executions(
+    limit: int, visibility_timeout: float
+) -> list[QueuedWorkflowExecution]:
+    """
+    Lease up to limit available queued workflow executions.
+
+    The leased executions are hidden from the other schedulers for visibility_timeout
+    seconds, they must be deleted (or released) with the returned lease_id before that.
+    """
+    with Session(engine) as session:
+        now = datetime.utcnow()
+        available_ids = session.exec(
+            select(QueuedWorkflowExecution.id)
+            .where(QueuedWorkflowExecution.available_at <= now)
+            .order_by(QueuedWorkflowExecution.available_at)
+            .limit(limit)
+        ).all()
+        if not available_ids:
+            return []
+
+        lease_id = str(uuid4())
+        # rows leased by another scheduler in the meantime don't match available_at anymore
+        session.exec(
+            update(QueuedWorkflowExecution)
+            .where(QueuedWorkflowExecution.id.in_(available_ids))
+            .where(QueuedWorkflowExecution.available_at <= now)
+            .values(
+                lease_id=lease_id,
+                available_at=now + timedelta(seconds=visibility_timeout),
+                attempts=QueuedWorkflowExecution.attempts + 1,
+            )
+        )
+        session.commit()
+        return session.exec(
+            select(QueuedWorkflowExecution)
+            .where(QueuedWorkflowExecution.lease_id == lease_id)
+            .order_by(QueuedWorkflowExecution.created_at)
+        ).all()
+
+
+def delete_queued_workflow_execution(queued_execution_id: str, lease_id: str) -> bool:
+    """
+    Delete a leased queued workflow execution, unless its lease expired and it was leased again.
+    """
+    with Session(engine) as session:
+        result = session.exec(
+            delete(QueuedWorkflowExecution)
+            .where(QueuedWorkflowExecution.id == queued_execution_id)
+            .where(QueuedWorkflowExecution.lease_id == lease_id)
+        )
+        session.commit()
+        return result.rowcount > 0
+
+
+def release_queued_workflow_execution(
+    queued_execution_id: str,
+    lease_id: str,
+    payload: dict,
+    delay_seconds: float = 0,
+) -> bool:
+    """
+    Put a leased queued workflow execution back in the queue, available after delay_seconds.
+    """
+    with Session(engine) as session:
+        result = session.exec(
+            update(QueuedWorkflowExecution)
+            .where(QueuedWorkflowExecution.id == queued_execution_id)
+            .where(QueuedWorkflowExecution.lease_id == lease_id)
+            .values(
+                lease_id=None,
+                payload=payload,
+                # it was handled, attempts only count the leases that expired
+                attempts=0,
+                available_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+            )
+        )
+        session.commit()
+        return result.rowcount > 0
 
 
 def update_workflow_by_id(
@@ -943,6 +1170,35 @@ def update_provider_last_pull_time(tenant_id: str, provider_id: str):
     logger.info("Successfully updated provider last pull time", extra=extra)
 
 
+def update_provider_pull_cursors(
+    tenant_id: str, provider_id: str, pull_cursors: dict[str, str]
+):
+    """
+    Update the pull cursors of the given kinds, the cursors of the other kinds are kept.
+    """
+    extra = {
+        "tenant_id": tenant_id,
+        "provider_id": provider_id,
+        "pull_cursors": pull_cursors,
+    }
+    logger.info("Updating provider pull cursors", extra=extra)
+    with Session(engine) as session:
+        provider = session.exec(
+            select(Provider)
+            .where(Provider.tenant_id == tenant_id)
+            .where(Provider.id == provider_id)
+            .with_for_update()
+        ).first()
+        if not provider:
+            logger.warning(
+                "Could not update provider pull cursors since provider does not exist",
+                extra=extra,
+            )
+            return
+        provider.pull_cursors = {**(provider.pull_cursors or {}), **pull_cursors}
+        session.commit()
+
+
 def get_installed_providers(tenant_id: str) -> List[Provider]:
     with Session(engine) as session:
         providers = session.exec(
@@ -1319,6 +1575,8 @@ def _enrich_entity(
             )
             session.add(audit)
         session.commit()
+        if force or _changes_last_alert_properties(enrichments):
+            refresh_last_alerts_properties(tenant_id, [fingerprint], session=session)
         # Refresh the instance to get updated data from the database
         session.refresh(enrichment)
         return enrichment
@@ -1341,6 +1599,10 @@ def _enrich_entity(
                 )
                 session.add(audit)
             session.commit()
+            if _changes_last_alert_properties(enrichments):
+                refresh_last_alerts_properties(
+                    tenant_id, [fingerprint], session=session
+                )
             return alert_enrichment
         except IntegrityError:
             # If we hit a duplicate entry error, rollback and get the existing enrichment
@@ -1444,6 +1706,9 @@ def batch_enrich(
 
         session.commit()
 
+        if _changes_last_alert_properties(enrichments):
+            refresh_last_alerts_properties(tenant_id, fingerprints, session=session)
+
         # Get all updated/created enrichments
         result = session.exec(
             select(AlertEnrichment)
@@ -1454,6 +1719,43 @@ def batch_enrich(
         return result
 
 
+def _changes_last_alert_properties(enrichments: dict) -> bool:
+    return any(
+        property_name in enrichments for property_name in LAST_ALERT_PROPERTIES_COLUMNS
+    )
+
+
+def refresh_last_alerts_properties(
+    tenant_id: str, fingerprints: List[str], session: Optional[Session] = None
+) -> None:
+    """
+    Recompute the materialized properties of the last alerts (status, severity,
+    lastReceived) from their alert's event and enrichments, and commit.
+    """
+    with existed_or_new_session(session) as session:
+        results = session.exec(
+            select(LastAlert, Alert.event, AlertEnrichment.enrichments)
+            .join(Alert, Alert.id == LastAlert.alert_id)
+            .outerjoin(
+                AlertEnrichment,
+                and_(
+                    AlertEnrichment.tenant_id == LastAlert.tenant_id,
+                    AlertEnrichment.alert_fingerprint == LastAlert.fingerprint,
+                ),
+            )
+            .where(LastAlert.tenant_id == tenant_id)
+            .where(LastAlert.fingerprint.in_(fingerprints))
+        ).all()
+        changed = False
+        for last_alert, event, enrichments in results:
+            for column, value in get_last_alert_properties(event, enrichments).items():
+                if getattr(last_alert, column) != value:
+                    setattr(last_alert, column, value)
+                    changed = True
+        if changed:
+            session.commit()
+
+
 def enrich_entity(
     tenant_id,
     fingerprint,
@@ -1556,16 +1858,17 @@ def get_enrichment_with_session(session, tenant_id, fingerprint, refresh=False):
 
 
 def get_enrichments(
-    tenant_id: int, fingerprints: List[str]
+    tenant_id: int, fingerprints: List[str], session: Optional[Session] = None
 ) -> List[Optional[AlertEnrichment]]:
     """
     Get a list of alert enrichments for a list of fingerprints using a single DB query.
 
     :param tenant_id: The tenant ID to filter the alert enrichments by.
     :param fingerprints: A list of fingerprints to get the alert enrichments for.
+    :param session: An optional session to run the query in.
     :return: A list of AlertEnrichment objects or None for each fingerprint.
     """
-    with Session(engine) as session:
+    with existed_or_new_session(session) as session:
         result = session.exec(
             select(AlertEnrichment)
             .where(AlertEnrichment.tenant_id == tenant_id)
@@ -1943,6 +2246,38 @@ def get_alerts_by_fingerprint(
     return alerts
 
 
+def get_latest_alerts_by_fingerprints(
+    tenant_id: str, fingerprints: List[str], session: Optional[Session] = None
+) -> Dict[str, Alert]:
+    """
+    Get the latest alert of each fingerprint, with its enrichment, in a single query.
+
+    Args:
+        tenant_id (str): The tenant_id to filter the alerts by.
+        fingerprints (List[str]): The fingerprints to get the latest alerts for.
+
+    Returns:
+        Dict[str, Alert]: The latest alert by fingerprint, for the fingerprints that have one.
+    """
+    if not fingerprints:
+        return {}
+    with existed_or_new_session(session) as session:
+        alerts = session.exec(
+            select(Alert)
+            .join(
+                LastAlert,
+                and_(
+                    LastAlert.tenant_id == Alert.tenant_id,
+                    LastAlert.alert_id == Alert.id,
+                ),
+            )
+            .where(LastAlert.tenant_id == tenant_id)
+            .where(LastAlert.fingerprint.in_(fingerprints))
+            .options(subqueryload(Alert.alert_enrichment))
+        ).all()
+    return {alert.fingerprint: alert for alert in alerts}
+
+
 def get_all_alerts_by_fingerprints(
     tenant_id: str, fingerprints: List[str], session: Optional[Session] = None
 ) -> List[Alert]:
@@ -2809,21 +3144,33 @@ def get_last_alert_hashes_by_fingerprints(
 ) -> dict[str, str | None]:
     # get the last alert hashes for a list of fingerprints
     # to check deduplication
+    last_alert_hash_cache = get_last_alert_hash_cache()
+    alert_hash_dict = last_alert_hash_cache.get_many(tenant_id, fingerprints)
+    missing_fingerprints = [
+        fingerprint
+        for fingerprint in fingerprints
+        if fingerprint not in alert_hash_dict
+    ]
+    if not missing_fingerprints:
+        return alert_hash_dict
+
     with Session(engine) as session:
         query = (
             select(LastAlert.fingerprint, LastAlert.alert_hash)
             .where(LastAlert.tenant_id == tenant_id)
-            .where(LastAlert.fingerprint.in_(fingerprints))
+            .where(LastAlert.fingerprint.in_(missing_fingerprints))
         )
 
         results = session.execute(query).all()
 
     # Create a dictionary from the results
-    alert_hash_dict = {
+    db_alert_hash_dict = {
         fingerprint: alert_hash
         for fingerprint, alert_hash in results
         if alert_hash is not None
     }
+    last_alert_hash_cache.set_many(tenant_id, db_alert_hash_dict)
+    alert_hash_dict.update(db_alert_hash_dict)
     return alert_hash_dict
 
 
@@ -4445,7 +4792,7 @@ def add_alerts_to_incident(
             else:
                 new_severity = incident.severity
 
-            if not override_count:
+            if override_count:
                 alerts_count = (
                     select(count(LastAlertToIncident.fingerprint)).where(
                         LastAlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
@@ -4454,25 +4801,20 @@ def add_alerts_to_incident(
                     )
                 ).subquery()
             else:
-                alerts_count = alerts_data_for_incident["count"]
+                # the aggregates are maintained from the new alerts only, instead of
+                # scanning all the incident's alerts, see reconcile_incident_aggregates
+                alerts_count = Incident.alerts_count + len(new_fingerprints)
 
             last_received_field = get_json_extract_field(
                 session, Alert.event, "lastReceived"
             )
 
             started_at, last_seen_at = session.exec(
-                select(func.min(last_received_field), func.max(last_received_field))
-                .join(
-                    LastAlertToIncident,
-                    and_(
-                        LastAlertToIncident.tenant_id == Alert.tenant_id,
-                        LastAlertToIncident.fingerprint == Alert.fingerprint,
-                    ),
-                )
-                .where(
-                    LastAlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
-                    LastAlertToIncident.tenant_id == tenant_id,
-                    LastAlertToIncident.incident_id == incident.id,
+                select(
+                    func.min(last_received_field), func.max(last_received_field)
+                ).where(
+                    Alert.tenant_id == tenant_id,
+                    col(Alert.fingerprint).in_(new_fingerprints),
                 )
             ).one()
 
@@ -4482,6 +4824,33 @@ def add_alerts_to_incident(
             if isinstance(last_seen_at, str):
                 last_seen_at = parse(last_seen_at)
 
+            times = {}
+            if not existing_fingerprints:
+                # the new alerts are all the incident's alerts
+                times = {"start_time": started_at, "last_seen_time": last_seen_at}
+            elif started_at is not None:
+                times["start_time"] = case(
+                    (
+                        or_(
+                            Incident.start_time.is_(None),
+                            Incident.start_time > started_at,
+                        ),
+                        started_at,
+                    ),
+                    else_=Incident.start_time,
+                )
+            if existing_fingerprints and last_seen_at is not None:
+                times["last_seen_time"] = case(
+                    (
+                        or_(
+                            Incident.last_seen_time.is_(None),
+                            Incident.last_seen_time < last_seen_at,
+                        ),
+                        last_seen_at,
+                    ),
+                    else_=Incident.last_seen_time,
+                )
+
             incident_id = incident.id
 
             for attempt in range(max_retries):
@@ -4494,11 +4863,10 @@ def add_alerts_to_incident(
                         )
                         .values(
                             alerts_count=alerts_count,
-                            last_seen_time=last_seen_at,
-                            start_time=started_at,
                             affected_services=new_affected_services,
                             severity=new_severity,
                             sources=new_sources,
+                            **times,
                         )
                     )
                     session.commit()
@@ -4518,6 +4886,122 @@ def add_alerts_to_incident(
             return incident
 
 
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if isinstance(value, str):
+        value = parse(value)
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def reconcile_incident_aggregates(
+    tenant_id: str,
+    incident_ids: Optional[List[UUID | str]] = None,
+    session: Optional[Session] = None,
+) -> List[UUID]:
+    """
+    Recompute the alerts count, start time and last seen time of incidents from all
+    their alerts, correcting the drift of the aggregates maintained incrementally by
+    add_alerts_to_incident (e.g. newer alerts of fingerprints already linked to the
+    incident).
+
+    Args:
+        tenant_id (str): The tenant ID
+        incident_ids (Optional[List[UUID | str]]): The incidents to reconcile, all the
+            incidents of the tenant if None
+        session (Optional[Session]): The database session or None
+
+    Returns:
+        List[UUID]: The ids of the incidents whose aggregates were corrected
+    """
+    with existed_or_new_session(session) as session:
+        links_filter = [
+            LastAlertToIncident.deleted_at == NULL_FOR_DELETED_AT,
+            LastAlertToIncident.tenant_id == tenant_id,
+        ]
+        incidents_query = select(
+            Incident.id,
+            Incident.alerts_count,
+            Incident.start_time,
+            Incident.last_seen_time,
+        ).where(Incident.tenant_id == tenant_id)
+        if incident_ids is not None:
+            incident_ids = [UUID(str(incident_id)) for incident_id in incident_ids]
+            links_filter.append(col(LastAlertToIncident.incident_id).in_(incident_ids))
+            incidents_query = incidents_query.where(col(Incident.id).in_(incident_ids))
+
+        alerts_counts = dict(
+            session.exec(
+                select(
+                    LastAlertToIncident.incident_id,
+                    count(LastAlertToIncident.fingerprint),
+                )
+                .where(*links_filter)
+                .group_by(LastAlertToIncident.incident_id)
+            ).all()
+        )
+
+        last_received_field = get_json_extract_field(
+            session, Alert.event, "lastReceived"
+        )
+        times = {
+            incident_id: (started_at, last_seen_at)
+            for incident_id, started_at, last_seen_at in session.exec(
+                select(
+                    LastAlertToIncident.incident_id,
+                    func.min(last_received_field),
+                    func.max(last_received_field),
+                )
+                .select_from(LastAlertToIncident)
+                .join(
+                    Alert,
+                    and_(
+                        LastAlertToIncident.tenant_id == Alert.tenant_id,
+                        LastAlertToIncident.fingerprint == Alert.fingerprint,
+                    ),
+                )
+                .where(*links_filter)
+                .group_by(LastAlertToIncident.incident_id)
+            ).all()
+        }
+
+        reconciled_incident_ids = []
+        for incident_id, alerts_count, start_time, last_seen_time in session.exec(
+            incidents_query
+        ).all():
+            values = {}
+            if alerts_count != alerts_counts.get(incident_id, 0):
+                values["alerts_count"] = alerts_counts.get(incident_id, 0)
+            if incident_id in times:
+                started_at, last_seen_at = (
+                    _as_naive_utc(value) for value in times[incident_id]
+                )
+                if _as_naive_utc(start_time) != started_at:
+                    values["start_time"] = started_at
+                if _as_naive_utc(last_seen_time) != last_seen_at:
+                    values["last_seen_time"] = last_seen_at
+            if not values:
+                continue
+
+            logger.info(
+                "Reconciling incident aggregates",
+                extra={
+                    "tenant_id": tenant_id,
+                    "incident_id": incident_id,
+                    "aggregates": list(values),
+                },
+            )
+            session.exec(
+                update(Incident)
+                .where(Incident.id == incident_id, Incident.tenant_id == tenant_id)
+                .values(**values)
+            )
+            reconciled_incident_ids.append(incident_id)
+
+        session.commit()
+        return reconciled_incident_ids
+
+
 def get_incident_unique_fingerprint_count(
     tenant_id: str, incident_id: str | UUID
 ) -> int:
@@ -5669,6 +6153,15 @@ def get_last_alert_by_fingerprint(
         return session.exec(query).first()
 
 
+def _get_alert_last_alert_properties(
+    session: Session, tenant_id: str, alert: Alert
+) -> dict:
+    enrichment = get_enrichment_with_session(session, tenant_id, alert.fingerprint)
+    return get_last_alert_properties(
+        alert.event, enrichment.enrichments if enrichment else None
+    )
+
+
 def set_last_alert(
     tenant_id: str, alert: Alert, session: Optional[Session] = None, max_retries=3
 ) -> None:
@@ -5707,6 +6200,10 @@ def set_last_alert(
                     last_alert.timestamp = alert.timestamp
                     last_alert.alert_id = alert.id
                     last_alert.alert_hash = alert.alert_hash
+                    for column, value in _get_alert_last_alert_properties(
+                        session, tenant_id, alert
+                    ).items():
+                        setattr(last_alert, column, value)
                     session.add(last_alert)
 
                 elif not last_alert:
@@ -5718,10 +6215,16 @@ def set_last_alert(
                         first_timestamp=alert.timestamp,
                         alert_id=alert.id,
                         alert_hash=alert.alert_hash,
+                        **_get_alert_last_alert_properties(session, tenant_id, alert),
                     )
 
                 session.add(last_alert)
+                # read before the commit expires the attributes, reading it after
+                # would refresh the row with another query
+                last_alert_hash = last_alert.alert_hash
                 session.commit()
+                # write-through, the deduplication reads the last alert hashes from the cache
+                get_last_alert_hash_cache().set(tenant_id, fingerprint, last_alert_hash)
                 break
             except OperationalError as ex:
                 if "no such savepoint" in ex.args[0]:
@@ -5763,6 +6266,139 @@ def set_last_alert(
             break
 
 
+def bulk_insert_alerts(
+    alerts: List[Alert],
+    audits: Optional[List[AlertAudit]] = None,
+    session: Optional[Session] = None,
+) -> None:
+    """
+    Insert alerts and their audits with one multi-row insert each, without committing.
+
+    The ids are generated client-side, so nothing has to be read back and the
+    alerts can be used after the insert (they are not attached to the session).
+    """
+    with existed_or_new_session(session) as session:
+        for model, rows in ((Alert, alerts), (AlertAudit, audits or [])):
+            if not rows:
+                continue
+            # executemany of a core insert, which the drivers send as multi-row inserts
+            session.execute(
+                model.__table__.insert(),
+                [
+                    {
+                        column.name: getattr(row, column.name)
+                        for column in model.__table__.columns
+                    }
+                    for row in rows
+                ],
+            )
+
+
+def bulk_set_last_alerts(
+    tenant_id: str,
+    alerts: List[Alert],
+    session: Optional[Session] = None,
+    chunk_size: int = 1000,
+) -> None:
+    """
+    Upsert the last alerts of a batch of alerts with multi-row upserts and commit.
+
+    Same rules as set_last_alert: the last alert of a fingerprint only moves to a
+    strictly newer alert.
+    """
+    # a row can't be upserted twice by the same statement, keep the newest alert of
+    # each fingerprint (the latest of the batch on ties) and the oldest for first_timestamp
+    last_alerts: Dict[str, dict] = {}
+    for alert in alerts:
+        last_alert = last_alerts.get(alert.fingerprint)
+        if last_alert is None:
+            last_alerts[alert.fingerprint] = {
+                "tenant_id": tenant_id,
+                "fingerprint": alert.fingerprint,
+                "timestamp": alert.timestamp,
+                "first_timestamp": alert.timestamp,
+                "alert_id": alert.id,
+                "alert_hash": alert.alert_hash,
+            }
+            continue
+        timestamp = alert.timestamp.replace(tzinfo=tz.UTC)
+        if last_alert["timestamp"].replace(tzinfo=tz.UTC) <= timestamp:
+            last_alert.update(
+                timestamp=alert.timestamp,
+                alert_id=alert.id,
+                alert_hash=alert.alert_hash,
+            )
+        if timestamp < last_alert["first_timestamp"].replace(tzinfo=tz.UTC):
+            last_alert["first_timestamp"] = alert.timestamp
+
+    # sorted, so concurrent batches lock the rows in the same order
+    data = [last_alerts[fingerprint] for fingerprint in sorted(last_alerts)]
+    with existed_or_new_session(session) as session:
+        if engine.dialect.name not in ("postgresql", "mysql", "sqlite"):
+            for alert in alerts:
+                set_last_alert(tenant_id, alert, session=session)
+            return
+
+        for i in range(0, len(data), chunk_size):
+            chunk = data[i : i + chunk_size]
+            if engine.dialect.name == "mysql":
+                stmt = mysql_insert(LastAlert).values(chunk)
+                newer = LastAlert.timestamp < stmt.inserted.timestamp
+                # assignments are applied in order, timestamp must be the last one
+                stmt = stmt.on_duplicate_key_update(
+                    [
+                        (
+                            "alert_id",
+                            case(
+                                (newer, stmt.inserted.alert_id),
+                                else_=LastAlert.alert_id,
+                            ),
+                        ),
+                        (
+                            "alert_hash",
+                            case(
+                                (newer, stmt.inserted.alert_hash),
+                                else_=LastAlert.alert_hash,
+                            ),
+                        ),
+                        (
+                            "timestamp",
+                            case(
+                                (newer, stmt.inserted.timestamp),
+                                else_=LastAlert.timestamp,
+                            ),
+                        ),
+                    ]
+                )
+            else:
+                insert = (
+                    pg_insert if engine.dialect.name == "postgresql" else sqlite_insert
+                )
+                stmt = insert(LastAlert).values(chunk)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["tenant_id", "fingerprint"],
+                    set_={
+                        "timestamp": stmt.excluded.timestamp,
+                        "alert_id": stmt.excluded.alert_id,
+                        "alert_hash": stmt.excluded.alert_hash,
+                    },
+                    where=LastAlert.timestamp < stmt.excluded.timestamp,
+                )
+            session.execute(stmt)
+        session.commit()
+        refresh_last_alerts_properties(tenant_id, list(last_alerts), session=session)
+
+        # write-through, the deduplication reads the last alert hashes from the cache
+        results = session.execute(
+            select(LastAlert.fingerprint, LastAlert.alert_hash)
+            .where(LastAlert.tenant_id == tenant_id)
+            .where(LastAlert.fingerprint.in_(list(last_alerts)))
+        ).all()
+        get_last_alert_hash_cache().set_many(
+            tenant_id, {fingerprint: alert_hash for fingerprint, alert_hash in results}
+        )
+
+
 def get_provider_logs(
     tenant_id: str, provider_id: str, limit: int = 100
 ) -> List[ProviderExecutionLog]:
@@ -4,12 +4,14 @@ This module contains the database utilities.
 Mainly, it creates the database engine based on the environment variables.
 """
 
+import datetime
 import json
 import logging
 import os
 from enum import Enum
 from typing import Any, Dict, Optional, Tuple, Type, TypeVar
 
+import dateutil.parser
 import pymysql
 from dotenv import find_dotenv, load_dotenv
 from fastapi.encoders import jsonable_encoder
@@ -185,6 +187,52 @@ def get_json_extract_field(session, base_field, key):
         return func.json_extract(base_field, "$.{}".format(key))
 
 
+# alert properties materialized in lastalert columns
+LAST_ALERT_PROPERTIES_COLUMNS = {
+    "status": "status",
+    "severity": "severity",
+    "lastReceived": "last_received",
+}
+
+
+def get_last_alert_properties(
+    event: dict, enrichments: Optional[dict] = None
+) -> Dict[str, Any]:
+    """
+    Get the values of the materialized lastalert columns of an alert, the same way
+    the CEL-to-SQL coalesces them: the enrichments override the event.
+
+    Args:
+        event (dict): The alert's event.
+        enrichments (dict, optional): The alert's enrichments.
+
+    Returns:
+        dict: The lastalert columns and their values.
+    """
+    properties = {}
+    for property_name, column in LAST_ALERT_PROPERTIES_COLUMNS.items():
+        value = (enrichments or {}).get(property_name)
+        if value is None:
+            value = event.get(property_name)
+        if isinstance(value, Enum):
+            value = value.value
+        if column == "last_received":
+            try:
+                value = (
+                    value
+                    if isinstance(value, datetime.datetime)
+                    else dateutil.parser.isoparse(value)
+                )
+            except (TypeError, ValueError):
+                value = None
+            if value is not None and value.tzinfo is not None:
+                value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        elif value is not None:
+            value = str(value)
+        properties[column] = value
+    return properties
+
+
 def get_aggreated_field(session: Session, column_name: str, alias: str):
     if session.bind is None:
         raise ValueError("Session is not bound to a database")
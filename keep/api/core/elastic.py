@@ -1,7 +1,10 @@
+import json
 import logging
 import os
+import threading
+from collections import OrderedDict
 
-from elasticsearch import ApiError, BadRequestError, Elasticsearch
+from elasticsearch import ApiError, BadRequestError, Elasticsearch, NotFoundError
 from elasticsearch.helpers import BulkIndexError, bulk
 
 from keep.api.core.db import get_enrichments
@@ -11,8 +14,14 @@ from keep.api.models.alert import AlertDto, AlertSeverity
 from keep.api.utils.cel_utils import preprocess_cel_expression
 from keep.api.utils.enrichment_helpers import parse_and_enrich_deleted_and_assignees
 
+# max number of SQL where clauses translated to DSL kept in memory
+TRANSLATED_QUERIES_CACHE_SIZE = 1000
+
 
 class ElasticClient:
+    # (index, where clause, params) -> DSL query, shared by all the clients
+    _translated_queries: OrderedDict[str, dict] = OrderedDict()
+    _translated_queries_lock = threading.Lock()
 
     def __init__(
         self,
@@ -200,6 +209,109 @@ class ElasticClient:
             self.logger.error(f"Failed to search alerts in Elastic: {e}")
             raise Exception(f"Failed to search alerts in Elastic: {e}")
 
+    def _translate_where(self, where: str, params: list) -> dict:
+        """
+        Translate an SQL where clause with positional (?) parameters to a DSL query.
+
+        The presets rarely change, so the translations are cached.
+        """
+        if not where:
+            return {"match_all": {}}
+
+        key = json.dumps([self.alerts_index, where, params], default=str)
+        with self._translated_queries_lock:
+            if key in self._translated_queries:
+                self._translated_queries.move_to_end(key)
+                return self._translated_queries[key]
+
+        dsl_query = self._client.sql.translate(
+            body={
+                "query": f'select fingerprint from "{self.alerts_index}" where {where}',
+                "params": params,
+            }
+        )
+        query = dict(dsl_query).get("query", {"match_all": {}})
+
+        with self._translated_queries_lock:
+            self._translated_queries[key] = query
+            while len(self._translated_queries) > TRANSLATED_QUERIES_CACHE_SIZE:
+                self._translated_queries.popitem(last=False)
+        return query
+
+    def count_alerts(
+        self, queries: dict[str, tuple[str, list]]
+    ) -> dict[str, tuple[int, bool]]:
+        """
+        Count the alerts matching each query, and whether any of them is noisy, with
+        a single search request.
+
+        Args:
+            queries (dict[str, tuple[str, list]]): SQL where clauses with positional
+                (?) parameters, and their parameters, by key.
+
+        Returns:
+            dict[str, tuple[int, bool]]: The number of alerts and whether one of them is
+            noisy, by key. Queries that fail to translate are not counted.
+        """
+        if not self.enabled or not queries:
+            return {}
+
+        filters = {}
+        for key, (where, params) in queries.items():
+            try:
+                filters[key] = self._translate_where(where, params)
+            except BadRequestError as e:
+                if "Unknown index" in str(e):
+                    self.logger.warning("Index does not exist yet.")
+                    return {key: (0, False) for key in queries}
+                self.logger.exception(
+                    f"Failed to translate query in Elastic: {e}",
+                    extra={"tenant_id": self.tenant_id, "query_key": key},
+                )
+
+        if not filters:
+            return {}
+
+        try:
+            results = self._client.search(
+                index=self.alerts_index,
+                size=0,
+                aggs={
+                    "queries": {
+                        "filters": {"filters": filters},
+                        "aggs": {
+                            "noisy": {
+                                "filter": {
+                                    "bool": {
+                                        "filter": [
+                                            {"term": {"isNoisy": True}},
+                                            {"term": {"dismissed": False}},
+                                            {"term": {"deleted": False}},
+                                        ]
+                                    }
+                                }
+                            }
+                        },
+                    }
+                },
+            )
+        except NotFoundError:
+            # if no alert was indexed, the index doesn't exist
+            self.logger.warning("Index does not exist yet.")
+            return {key: (0, False) for key in filters}
+        except Exception as e:
+            self.logger.exception(
+                f"Failed to count alerts in Elastic: {e}",
+                extra={"tenant_id": self.tenant_id},
+            )
+            raise Exception(f"Failed to count alerts in Elastic: {e}")
+
+        buckets = results["aggregations"]["queries"]["buckets"]
+        return {
+            key: (bucket["doc_count"], bucket["noisy"]["doc_count"] > 0)
+            for key, bucket in buckets.items()
+        }
+
     def index_alert(self, alert: AlertDto):
         if not self.enabled:
             return
@@ -224,28 +336,42 @@ class ElasticClient:
             self.logger.error(f"Failed to index alert to Elastic: {e}")
             raise Exception(f"Failed to index alert to Elastic: {e}")
 
-    def index_alerts(self, alerts: list[AlertDto]):
-        if not self.enabled:
-            return
-
+    def build_index_actions(self, alerts: list[AlertDto]) -> list[dict]:
         actions = []
         for alert in alerts:
             if hasattr(alert, "incident_dto"):
-                alert.incident_dto = [incident.json() for incident in alert.incident_dto]
+                alert.incident_dto = [
+                    incident.json() for incident in alert.incident_dto
+                ]
 
             action = {
                 "_index": self.alerts_index,
                 "_id": alert.fingerprint,  # use fingerprint as the document ID
                 "_source": alert.dict(),
             }
+            action["_source"]["dismissed"] = bool(action["_source"]["dismissed"])
             # change severity to number so we can sort by it
             action["_source"]["severity"] = AlertSeverity(
                 action["_source"]["severity"].lower()
             ).order
             actions.append(action)
+        return actions
+
+    def bulk_index(self, actions: list[dict]) -> tuple[int, int | list]:
+        """
+        Index the actions with a single bulk request, raises BulkIndexError if some
+        of them failed.
+        """
+        return bulk(self._client, actions, refresh=self.refresh_strategy)
+
+    def index_alerts(self, alerts: list[AlertDto]):
+        if not self.enabled:
+            return
+
+        actions = self.build_index_actions(alerts)
 
         try:
-            success, failed = bulk(self._client, actions, refresh=self.refresh_strategy)
+            success, failed = self.bulk_index(actions)
             self.logger.info(
                 f"Successfully indexed {success} alerts. Failed to index {failed} alerts."
             )
@@ -0,0 +1,282 @@
+"""
+Buffered Elasticsearch indexing, off the ingestion path.
+
+The ingestion enqueues the alerts and returns, a background thread indexes them with
+bulk requests of up to KEEP_ELASTIC_BULK_SIZE alerts, or whatever was enqueued during
+KEEP_ELASTIC_FLUSH_INTERVAL_SECONDS.
+
+When the queue is full, enqueuing waits up to KEEP_ELASTIC_ENQUEUE_TIMEOUT_SECONDS for
+room (backpressure), and then spools the alerts. Batches that fail to index are spooled
+too: they are written to KEEP_ELASTIC_SPOOL_DIR, so they survive restarts, and retried
+with an exponential backoff.
+
+The documents are versioned by their enqueue time, so an older spooled version of an
+alert never overwrites a newer one.
+"""
+
+import json
+import os
+import queue
+import time
+import uuid
+from collections import defaultdict
+
+from elasticsearch.helpers import BulkIndexError
+
+from keep.api.core.buffered_writer import BufferedWriter
+from keep.api.core.config import config
+from keep.api.core.elastic import ElasticClient
+from keep.api.core.metrics import (
+    elastic_indexed_alerts_total,
+    elastic_indexing_failures_total,
+    elastic_indexing_lag_seconds,
+    elastic_indexing_queue_depth,
+    elastic_spooled_batches,
+)
+from keep.api.models.alert import AlertDto
+
+KEEP_ELASTIC_ASYNC_INDEXING = config(
+    "KEEP_ELASTIC_ASYNC_INDEXING", cast=bool, default=False
+)
+KEEP_ELASTIC_BULK_SIZE = config("KEEP_ELASTIC_BULK_SIZE", cast=int, default=500)
+KEEP_ELASTIC_FLUSH_INTERVAL_SECONDS = config(
+    "KEEP_ELASTIC_FLUSH_INTERVAL_SECONDS", cast=float, default=1
+)
+KEEP_ELASTIC_QUEUE_SIZE = config("KEEP_ELASTIC_QUEUE_SIZE", cast=int, default=10000)
+KEEP_ELASTIC_ENQUEUE_TIMEOUT_SECONDS = config(
+    "KEEP_ELASTIC_ENQUEUE_TIMEOUT_SECONDS", cast=float, default=1
+)
+KEEP_ELASTIC_SPOOL_DIR = config("KEEP_ELASTIC_SPOOL_DIR", default="./elastic-spool")
+KEEP_ELASTIC_SPOOL_MAX_BACKOFF_SECONDS = config(
+    "KEEP_ELASTIC_SPOOL_MAX_BACKOFF_SECONDS", cast=int, default=300
+)
+
+SPOOL_FILE_SUFFIX = ".jsonl"
+RETRYING_SPOOL_FILE_SUFFIX = ".retrying"
+# a spool file being retried for longer than this belongs to a process that died
+STALE_RETRYING_SPOOL_FILE_SECONDS = 600
+
+
+# (tenant_id, action, enqueued_at)
+IndexItem = tuple[str, dict, float]
+
+
+class ElasticIndexer(BufferedWriter[IndexItem]):
+    thread_name = "elastic_indexer"
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            super().__init__(
+                batch_size=KEEP_ELASTIC_BULK_SIZE,
+                flush_interval=KEEP_ELASTIC_FLUSH_INTERVAL_SECONDS,
+                queue_size=KEEP_ELASTIC_QUEUE_SIZE,
+                queue_depth=elastic_indexing_queue_depth,
+            )
+            self.enabled = KEEP_ELASTIC_ASYNC_INDEXING
+            self.enqueue_timeout = KEEP_ELASTIC_ENQUEUE_TIMEOUT_SECONDS
+            self.spool_dir = KEEP_ELASTIC_SPOOL_DIR
+            self.clients: dict[str, ElasticClient] = {}
+            self._spool_backoff = 0
+            self._next_spool_retry = 0
+            self.__initialized = True
+
+    def _get_client(self, tenant_id: str) -> ElasticClient:
+        with self._lock:
+            if tenant_id not in self.clients:
+                self.clients[tenant_id] = ElasticClient(tenant_id=tenant_id)
+            return self.clients[tenant_id]
+
+    def _on_start(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def _flush_remaining(self, items: list[IndexItem]):
+        self._spool(items)
+
+    def enqueue(self, tenant_id: str, alerts: list[AlertDto]):
+        """
+        Queue the alerts for indexing.
+
+        Waits for room in the queue when it is full, the alerts that still don't fit
+        are spooled.
+        """
+        if not alerts:
+            return
+        self.start()
+
+        # an older version of the alert, e.g. a spooled one, never overwrites this one
+        enqueued_at = time.time()
+        version = time.time_ns() // 1000
+        actions = self._get_client(tenant_id).build_index_actions(alerts)
+
+        overflow = []
+        for action in actions:
+            action["_version"] = version
+            action["_version_type"] = "external_gte"
+            item = (tenant_id, action, enqueued_at)
+            if overflow:
+                overflow.append(item)
+                continue
+            try:
+                self.queue.put(item, timeout=self.enqueue_timeout)
+            except queue.Full:
+                overflow.append(item)
+
+        elastic_indexing_queue_depth.set(self.queue.qsize())
+        if overflow:
+            self.logger.warning(
+                "Elastic indexing queue is full, spooling alerts",
+                extra={"tenant_id": tenant_id, "num_of_alerts": len(overflow)},
+            )
+            self._spool(overflow)
+
+    def _bulk_index(self, tenant_id: str, actions: list[dict]):
+        try:
+            # bulk pops the metadata out of the actions, they're kept for spooling
+            self._get_client(tenant_id).bulk_index([dict(action) for action in actions])
+        except BulkIndexError as e:
+            # version conflicts mean a newer version of the alert is indexed already
+            errors = [
+                error
+                for error in e.errors
+                if next(iter(error.values()), {}).get("status") != 409
+            ]
+            if errors:
+                raise Exception(f"Failed to index alerts to Elastic: {errors}") from e
+
+    def _flush(self, batch: list[IndexItem]):
+        items_by_tenant = defaultdict(list)
+        for item in batch:
+            items_by_tenant[item[0]].append(item)
+
+        for tenant_id, items in items_by_tenant.items():
+            try:
+                self._bulk_index(tenant_id, [action for _, action, _ in items])
+            except Exception:
+                self.logger.exception(
+                    "Failed to index alerts to Elastic, spooling them",
+                    extra={"tenant_id": tenant_id, "num_of_alerts": len(items)},
+                )
+                elastic_indexing_failures_total.inc()
+                self._spool(items)
+                continue
+
+            elastic_indexed_alerts_total.inc(len(items))
+            indexed_at = time.time()
+            for _, _, enqueued_at in items:
+                elastic_indexing_lag_seconds.observe(indexed_at - enqueued_at)
+
+    def _spool(self, items: list[IndexItem]):
+        """
+        Write the alerts to a spool file, it's written to a temporary file first so a
+        partially written spool file is never retried.
+        """
+        name = f"{time.time_ns()}-{uuid.uuid4().hex}"
+        path = os.path.join(self.spool_dir, name + SPOOL_FILE_SUFFIX)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        with open(path + ".tmp", "w") as spool_file:
+            for tenant_id, action, enqueued_at in items:
+                spool_file.write(
+                    json.dumps(
+                        {
+                            "tenant_id": tenant_id,
+                            "action": action,
+                            "enqueued_at": enqueued_at,
+                        },
+                        default=str,
+                    )
+                    + "\n"
+                )
+            spool_file.flush()
+            os.fsync(spool_file.fileno())
+        os.replace(path + ".tmp", path)
+        elastic_spooled_batches.inc()
+
+    def _list_spool_files(self) -> list[str]:
+        try:
+            file_names = os.listdir(self.spool_dir)
+        except FileNotFoundError:
+            return []
+
+        now = time.time()
+        for file_name in file_names:
+            if not file_name.endswith(RETRYING_SPOOL_FILE_SUFFIX):
+                continue
+            path = os.path.join(self.spool_dir, file_name)
+            try:
+                if now - os.path.getmtime(path) > STALE_RETRYING_SPOOL_FILE_SECONDS:
+                    os.replace(path, path[: -len(RETRYING_SPOOL_FILE_SUFFIX)])
+            except FileNotFoundError:
+                continue
+
+        spool_files = sorted(
+            file_name
+            for file_name in os.listdir(self.spool_dir)
+            if file_name.endswith(SPOOL_FILE_SUFFIX)
+        )
+        elastic_spooled_batches.set(len(spool_files))
+        return spool_files
+
+    def _retry_spool_file(self, file_name: str) -> bool:
+        path = os.path.join(self.spool_dir, file_name)
+        retrying_path = path + RETRYING_SPOOL_FILE_SUFFIX
+        # claim the file, other processes may share the spool directory
+        try:
+            os.replace(path, retrying_path)
+            os.utime(retrying_path)
+        except FileNotFoundError:
+            return True
+
+        with open(retrying_path) as spool_file:
+            items = [json.loads(line) for line in spool_file if line.strip()]
+        actions_by_tenant = defaultdict(list)
+        for item in items:
+            actions_by_tenant[item["tenant_id"]].append(item["action"])
+
+        try:
+            for tenant_id, actions in actions_by_tenant.items():
+                self._bulk_index(tenant_id, actions)
+        except Exception:
+            self.logger.exception(
+                "Failed to index spooled alerts to Elastic",
+                extra={"spool_file": file_name},
+            )
+            os.replace(retrying_path, path)
+            return False
+
+        os.remove(retrying_path)
+        elastic_spooled_batches.dec()
+        elastic_indexed_alerts_total.inc(len(items))
+        indexed_at = time.time()
+        for item in items:
+            elastic_indexing_lag_seconds.observe(indexed_at - item["enqueued_at"])
+        return True
+
+    def retry_spool(self):
+        if time.monotonic() < self._next_spool_retry:
+            return
+
+        for file_name in self._list_spool_files():
+            if self._stop.is_set():
+                return
+            if not self._retry_spool_file(file_name):
+                self._spool_backoff = min(
+                    max(self._spool_backoff * 2, self.flush_interval),
+                    KEEP_ELASTIC_SPOOL_MAX_BACKOFF_SECONDS,
+                )
+                self._next_spool_retry = time.monotonic() + self._spool_backoff
+                return
+        self._spool_backoff = 0
+
+    def _after_batch(self):
+        self.retry_spool()
+
+
+def get_elastic_indexer() -> ElasticIndexer:
+    return ElasticIndexer()
@@ -0,0 +1,163 @@
+"""
+Buffered writes of the enrichment audit trail (EnrichmentEvent and EnrichmentLog rows).
+
+Every alert x mapping/extraction rule produces an enrichment event, so writing them one
+commit at a time generates more commits than the alerts themselves. With
+KEEP_ENRICHMENT_AUDIT_ASYNC=true the events are enqueued and a background thread writes
+them with multi-row inserts of up to KEEP_ENRICHMENT_AUDIT_BATCH_SIZE events (and their
+logs), or whatever was enqueued during KEEP_ENRICHMENT_AUDIT_FLUSH_INTERVAL_SECONDS.
+
+The audit trail is best effort: events that don't fit in the queue or fail to be
+written are dropped and counted.
+
+Regardless of the buffering, what is stored can be filtered:
+- only a KEEP_ENRICHMENT_AUDIT_SKIPPED_SAMPLE_RATE fraction of the SKIPPED events is
+  stored, the others are only counted (per tenant and enrichment type) by the
+  keep_enrichment_audit_skipped_events_aggregated_total metric.
+- the logs below KEEP_ENRICHMENT_AUDIT_LOG_LEVEL are not stored.
+"""
+
+import logging
+import queue
+import random
+
+from sqlalchemy import insert
+
+from keep.api.core.buffered_writer import BufferedWriter
+from keep.api.core.config import config
+from keep.api.core.db import get_session_sync
+from keep.api.core.metrics import (
+    enrichment_audit_dropped_events_total,
+    enrichment_audit_queue_depth,
+    enrichment_audit_skipped_events_aggregated_total,
+    enrichment_audit_written_events_total,
+)
+from keep.api.models.db.enrichment_event import (
+    EnrichmentEvent,
+    EnrichmentLog,
+    EnrichmentStatus,
+    EnrichmentType,
+)
+
+KEEP_ENRICHMENT_AUDIT_ASYNC = config(
+    "KEEP_ENRICHMENT_AUDIT_ASYNC", cast=bool, default=False
+)
+KEEP_ENRICHMENT_AUDIT_BATCH_SIZE = config(
+    "KEEP_ENRICHMENT_AUDIT_BATCH_SIZE", cast=int, default=500
+)
+KEEP_ENRICHMENT_AUDIT_FLUSH_INTERVAL_SECONDS = config(
+    "KEEP_ENRICHMENT_AUDIT_FLUSH_INTERVAL_SECONDS", cast=float, default=1
+)
+KEEP_ENRICHMENT_AUDIT_QUEUE_SIZE = config(
+    "KEEP_ENRICHMENT_AUDIT_QUEUE_SIZE", cast=int, default=10000
+)
+# 1 stores every skipped event, 0 only counts them
+KEEP_ENRICHMENT_AUDIT_SKIPPED_SAMPLE_RATE = config(
+    "KEEP_ENRICHMENT_AUDIT_SKIPPED_SAMPLE_RATE", cast=float, default=1
+)
+KEEP_ENRICHMENT_AUDIT_LOG_LEVEL = config(
+    "KEEP_ENRICHMENT_AUDIT_LOG_LEVEL", default="debug"
+)
+
+
+def _log_level(level: str) -> int:
+    log_level = logging.getLevelName(str(level).upper())
+    return log_level if isinstance(log_level, int) else logging.DEBUG
+
+
+def _row(model, table) -> dict:
+    return {column.name: getattr(model, column.name) for column in table.columns}
+
+
+# (event, its logs)
+AuditItem = tuple[EnrichmentEvent, list[EnrichmentLog]]
+
+
+class EnrichmentAuditWriter(BufferedWriter[AuditItem]):
+    thread_name = "enrichment_audit_writer"
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            super().__init__(
+                batch_size=KEEP_ENRICHMENT_AUDIT_BATCH_SIZE,
+                flush_interval=KEEP_ENRICHMENT_AUDIT_FLUSH_INTERVAL_SECONDS,
+                queue_size=KEEP_ENRICHMENT_AUDIT_QUEUE_SIZE,
+                queue_depth=enrichment_audit_queue_depth,
+            )
+            self.enabled = KEEP_ENRICHMENT_AUDIT_ASYNC
+            self.skipped_sample_rate = KEEP_ENRICHMENT_AUDIT_SKIPPED_SAMPLE_RATE
+            self.log_level = _log_level(KEEP_ENRICHMENT_AUDIT_LOG_LEVEL)
+            self.__initialized = True
+
+    def should_store_event(
+        self,
+        tenant_id: str,
+        status: EnrichmentStatus,
+        enrichment_type: EnrichmentType,
+    ) -> bool:
+        """
+        Whether the event should be stored, the skipped events that are not sampled
+        are counted instead.
+        """
+        if status != EnrichmentStatus.SKIPPED or self.skipped_sample_rate >= 1:
+            return True
+        if self.skipped_sample_rate > 0 and random.random() < self.skipped_sample_rate:
+            return True
+        enrichment_audit_skipped_events_aggregated_total.labels(
+            tenant_id=tenant_id, enrichment_type=enrichment_type.value
+        ).inc()
+        return False
+
+    def should_store_log(self, level: str) -> bool:
+        return _log_level(level) >= self.log_level
+
+    def enqueue(self, enrichment_event: EnrichmentEvent, logs: list[EnrichmentLog]):
+        """
+        Queue the event and its logs for writing, dropped if the queue is full.
+        """
+        self.start()
+        for log in logs:
+            log.enrichment_event_id = enrichment_event.id
+        try:
+            self.queue.put_nowait((enrichment_event, logs))
+        except queue.Full:
+            self.logger.warning(
+                "Enrichment audit queue is full, dropping event",
+                extra={
+                    "tenant_id": enrichment_event.tenant_id,
+                    "rule_id": enrichment_event.rule_id,
+                },
+            )
+            enrichment_audit_dropped_events_total.inc()
+        enrichment_audit_queue_depth.set(self.queue.qsize())
+
+    def _flush(self, batch: list[AuditItem]):
+        events_table = EnrichmentEvent.__table__
+        logs_table = EnrichmentLog.__table__
+        event_rows = [_row(event, events_table) for event, _ in batch]
+        log_rows = [_row(log, logs_table) for _, logs in batch for log in logs]
+        try:
+            with get_session_sync() as session:
+                session.execute(insert(events_table), event_rows)
+                if log_rows:
+                    session.execute(insert(logs_table), log_rows)
+                session.commit()
+        except Exception:
+            self.logger.exception(
+                "Failed to write enrichment events, dropping them",
+                extra={"num_of_events": len(event_rows)},
+            )
+            enrichment_audit_dropped_events_total.inc(len(event_rows))
+            return
+        enrichment_audit_written_events_total.inc(len(event_rows))
+
+
+def get_enrichment_audit_writer() -> EnrichmentAuditWriter:
+    return EnrichmentAuditWriter()
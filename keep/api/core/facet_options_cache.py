@@ -0,0 +1,228 @@
+"""
+Cache of facet options results, so the dashboards refreshing the same facets share
+one facets query.
+
+Entries are keyed by the tenant, the facets, the CEL and the facet queries, and by a
+per-tenant version that the ingestion bumps: new alerts make the cached options stale
+right away, other changes (e.g. enrichments) are picked up when the entries expire
+after KEEP_FACET_OPTIONS_CACHE_TTL seconds.
+
+When Redis is enabled (REDIS=true) the results and the versions are shared by all the
+workers, otherwise they are kept in-process.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from keep.api.consts import REDIS
+from keep.api.core.config import config
+from keep.api.core.facets import FacetOptionsResult
+from keep.api.core.metrics import (
+    facet_options_cache_hits_total,
+    facet_options_cache_misses_total,
+)
+from keep.api.models.facet import FacetDto, FacetOptionDto, FacetOptionsQueryDto
+
+KEEP_FACET_OPTIONS_CACHE_ENABLED = config(
+    "KEEP_FACET_OPTIONS_CACHE_ENABLED", cast=bool, default=True
+)
+KEEP_FACET_OPTIONS_CACHE_TTL = config(
+    "KEEP_FACET_OPTIONS_CACHE_TTL", cast=int, default=10
+)
+# max number of facet options results kept in-process
+KEEP_FACET_OPTIONS_CACHE_SIZE = config(
+    "KEEP_FACET_OPTIONS_CACHE_SIZE", cast=int, default=1000
+)
+
+REDIS_KEY_PREFIX = "keep:facet_options"
+
+
+class FacetOptionsCache:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_FACET_OPTIONS_CACHE_ENABLED
+            self.ttl = KEEP_FACET_OPTIONS_CACHE_TTL
+            self.max_size = KEEP_FACET_OPTIONS_CACHE_SIZE
+            # cache key -> (facet options, expires_at)
+            self.cache: OrderedDict[str, tuple[FacetOptionsResult, float]] = (
+                OrderedDict()
+            )
+            # (tenant_id, entity_type) -> version
+            self.versions: dict[tuple[str, str], int] = {}
+            # cache key -> lock held while the facet options are computed
+            self._computing: dict[str, threading.Lock] = {}
+            self._lock = threading.Lock()
+            self.redis = None
+            if self.enabled and REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
+            self.__initialized = True
+
+    @staticmethod
+    def _version_key(tenant_id: str, entity_type: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:{entity_type}:version"
+
+    def get_version(self, tenant_id: str, entity_type: str) -> int:
+        if self.redis is not None:
+            try:
+                return int(
+                    self.redis.get(self._version_key(tenant_id, entity_type)) or 0
+                )
+            except Exception:
+                self.logger.exception("Failed to get facet options version from Redis")
+                return 0
+        with self._lock:
+            return self.versions.get((tenant_id, entity_type), 0)
+
+    def bump_version(self, tenant_id: str, entity_type: str):
+        """
+        Make the cached facet options of the tenant's entities stale.
+        """
+        if not self.enabled:
+            return
+        if self.redis is not None:
+            try:
+                self.redis.incr(self._version_key(tenant_id, entity_type))
+            except Exception:
+                self.logger.exception("Failed to bump facet options version in Redis")
+            return
+        with self._lock:
+            key = (tenant_id, entity_type)
+            self.versions[key] = self.versions.get(key, 0) + 1
+
+    def _cache_key(
+        self,
+        tenant_id: str,
+        entity_type: str,
+        facets: list[FacetDto],
+        facet_options_query: FacetOptionsQueryDto,
+    ) -> str:
+        query_hash = hashlib.sha1(
+            json.dumps(
+                {
+                    "facets": sorted(facet.id for facet in facets),
+                    "cel": facet_options_query.cel if facet_options_query else None,
+                    "facet_queries": (
+                        facet_options_query.facet_queries
+                        if facet_options_query
+                        else None
+                    ),
+                },
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+        version = self.get_version(tenant_id, entity_type)
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:{entity_type}:{version}:{query_hash}"
+
+    def _get(self, key: str) -> FacetOptionsResult | None:
+        if self.redis is not None:
+            try:
+                value = self.redis.get(key)
+            except Exception:
+                self.logger.exception("Failed to get facet options from Redis")
+                return None
+            if value is None:
+                return None
+            return FacetOptionsResult(
+                {
+                    facet_id: [FacetOptionDto(**option) for option in options]
+                    for facet_id, options in json.loads(value).items()
+                }
+            )
+
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.cache[key]
+                return None
+            self.cache.move_to_end(key)
+            return entry[0]
+
+    def _set(self, key: str, facet_options: FacetOptionsResult):
+        if self.redis is not None:
+            try:
+                self.redis.set(
+                    key,
+                    json.dumps(
+                        {
+                            facet_id: [option.dict() for option in options]
+                            for facet_id, options in facet_options.items()
+                        },
+                        default=str,
+                    ),
+                    ex=self.ttl,
+                )
+            except Exception:
+                self.logger.exception("Failed to set facet options in Redis")
+            return
+
+        with self._lock:
+            self.cache[key] = (facet_options, time.monotonic() + self.ttl)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+
+    def get_facet_options(
+        self,
+        tenant_id: str,
+        entity_type: str,
+        facets: list[FacetDto],
+        facet_options_query: FacetOptionsQueryDto,
+        get_facet_options: Callable[[], FacetOptionsResult],
+    ) -> FacetOptionsResult:
+        """
+        Get the facet options from the cache, or compute them with get_facet_options.
+
+        Concurrent requests for the same facet options in this process wait for the
+        first one to compute them, instead of running the same query.
+        """
+        if not self.enabled:
+            return get_facet_options()
+
+        key = self._cache_key(tenant_id, entity_type, facets, facet_options_query)
+        with self._lock:
+            computing = self._computing.setdefault(key, threading.Lock())
+        try:
+            with computing:
+                facet_options = self._get(key)
+                if facet_options is not None:
+                    facet_options_cache_hits_total.labels(entity_type=entity_type).inc()
+                    return facet_options
+
+                facet_options_cache_misses_total.labels(entity_type=entity_type).inc()
+                facet_options = get_facet_options()
+                # the facets that timed out may finish next time
+                if not facet_options.partial_facet_ids:
+                    self._set(key, facet_options)
+                return facet_options
+        finally:
+            with self._lock:
+                if self._computing.get(key) is computing:
+                    del self._computing[key]
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.versions.clear()
+
+
+def get_facet_options_cache() -> FacetOptionsCache:
+    return FacetOptionsCache()
@@ -1,10 +1,13 @@
 import json
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any
-from sqlalchemy import select
-from sqlalchemy.exc import OperationalError
+from sqlalchemy import literal_column, select, text
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from keep.api.core.cel_to_sql.ast_nodes import DataType
 from keep.api.core.cel_to_sql.properties_metadata import PropertiesMetadata
+from keep.api.core.config import config
 from keep.api.core.facets_query_builder.get_facets_query_builder import (
     get_facets_query_builder,
 )
@@ -22,6 +25,34 @@ logger = logging.getLogger(__name__)
 
 OPTIONS_PER_FACET = 50
 
+# query every facet on its own connection, so a slow facet doesn't hold the others
+KEEP_FACETS_PARALLEL_QUERIES_ENABLED = config(
+    "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", cast=bool, default=False
+)
+# time budget of each facet query when the facets are queried in parallel, counted from
+# when the query starts, not from when it is queued
+KEEP_FACET_QUERY_TIMEOUT_SECONDS = config(
+    "KEEP_FACET_QUERY_TIMEOUT_SECONDS", cast=float, default=5
+)
+KEEP_FACETS_QUERY_WORKERS = config("KEEP_FACETS_QUERY_WORKERS", cast=int, default=4)
+
+facets_query_executor = ThreadPoolExecutor(
+    max_workers=KEEP_FACETS_QUERY_WORKERS, thread_name_prefix="facets_query_worker"
+)
+
+
+class FacetOptionsResult(dict[str, list[FacetOptionDto]]):
+    """
+    Facet options by facet id.
+
+    partial_facet_ids are the facets whose query didn't finish in time, their options
+    are empty.
+    """
+
+    def __init__(self, *args, partial_facet_ids: set[str] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.partial_facet_ids = partial_facet_ids or set()
+
 
 def build_facet_selects(
     properties_metadata: PropertiesMetadata, facets: list[FacetDto]
@@ -60,7 +91,7 @@ def get_facet_options(
     facets: list[FacetDto],
     facet_options_query: FacetOptionsQueryDto,
     properties_metadata: PropertiesMetadata,
-) -> dict[str, list[FacetOptionDto]]:
+) -> FacetOptionsResult:
     """
     Generates facet options based on the provided query and metadata.
     Args:
@@ -69,7 +100,7 @@ def get_facet_options(
         facets (list[FacetDto]): A list of facet definitions.
         properties_metadata (PropertiesMetadata): Metadata about the properties.
     Returns:
-        dict[str, list[FacetOptionDto]]: A dictionary where keys are facet IDs and values are lists of FacetOptionDto objects.
+        FacetOptionsResult: A dictionary where keys are facet IDs and values are lists of FacetOptionDto objects.
     """
 
     invalid_facets = []
@@ -82,108 +113,120 @@ def get_facet_options(
 
         invalid_facets.append(facet)
 
-    result_dict: dict[str, list[FacetOptionDto]] = {}
+    result_dict = FacetOptionsResult()
 
     if valid_facets:
-        with Session(engine) as session:
-            try:
-                db_query = get_facets_query_builder(
-                    properties_metadata
-                ).build_facets_data_query(
-                    base_query_factory=base_query_factory,
-                    entity_id_column=entity_id_column,
-                    facets=valid_facets,
-                    facet_options_query=facet_options_query,
-                )
+        if KEEP_FACETS_PARALLEL_QUERIES_ENABLED:
+            data, partial_facet_keys = _query_facets_data_in_parallel(
+                base_query_factory=base_query_factory,
+                entity_id_column=entity_id_column,
+                facets=valid_facets,
+                facet_options_query=facet_options_query,
+                properties_metadata=properties_metadata,
+            )
+        else:
+            partial_facet_keys = set()
+            with Session(engine) as session:
+                try:
+                    db_query = get_facets_query_builder(
+                        properties_metadata
+                    ).build_facets_data_query(
+                        base_query_factory=base_query_factory,
+                        entity_id_column=entity_id_column,
+                        facets=valid_facets,
+                        facet_options_query=facet_options_query,
+                    )
 
-                data = session.exec(db_query).all()
-            except OperationalError as e:
-                logger.warning(
-                    f"""Failed to execute query for facet options.
-                    Facet options: {json.dumps(facet_options_query.dict())}
-                    Error: {e}
-                    """
-                )
-                return {facet.id: [] for facet in facets}
-
-            grouped_by_id_dict = {}
-
-            for facet_data in data:
-                if facet_data.facet_id not in grouped_by_id_dict:
-                    grouped_by_id_dict[facet_data.facet_id] = []
-
-                # This is to limit the number of options per facet
-                # It's done mostly for sqlite, because in sqlite we can't use limit in the subquery
-                if (
-                    engine.dialect.name == "sqlite"
-                    and len(grouped_by_id_dict[facet_data.facet_id])
-                    >= OPTIONS_PER_FACET
-                ):
-                    continue
-
-                grouped_by_id_dict[facet_data.facet_id].append(facet_data)
-
-            for facet in facets:
-                facet_key = get_facet_key(
-                    facet.property_path,
-                    facet_options_query.cel,
-                    facet_options_query.facet_queries[facet.id],
-                )
-                property_mapping = properties_metadata.get_property_metadata_for_str(
-                    facet.property_path
-                )
-                result_dict.setdefault(facet.id, [])
+                    data = session.exec(db_query).all()
+                except OperationalError as e:
+                    logger.warning(
+                        f"""Failed to execute query for facet options.
+                        Facet options: {json.dumps(facet_options_query.dict())}
+                        Error: {e}
+                        """
+                    )
+                    return FacetOptionsResult({facet.id: [] for facet in facets})
 
-                if facet_key in grouped_by_id_dict:
-                    result_dict[facet.id] = [
-                        FacetOptionDto(
-                            display_name=str(facet_value),
-                            value=map_facet_option_value(
-                                facet_value, property_mapping.data_type
-                            ),
-                            matches_count=0 if matches_count is None else matches_count,
-                        )
-                        for facet_id, facet_value, matches_count in grouped_by_id_dict[
-                            facet_key
+        grouped_by_id_dict = {}
+
+        for facet_data in data:
+            if facet_data.facet_id not in grouped_by_id_dict:
+                grouped_by_id_dict[facet_data.facet_id] = []
+
+            # This is to limit the number of options per facet
+            # It's done mostly for sqlite, because in sqlite we can't use limit in the subquery
+            if (
+                engine.dialect.name == "sqlite"
+                and len(grouped_by_id_dict[facet_data.facet_id]) >= OPTIONS_PER_FACET
+            ):
+                continue
+
+            grouped_by_id_dict[facet_data.facet_id].append(facet_data)
+
+        for facet in facets:
+            facet_key = get_facet_key(
+                facet.property_path,
+                facet_options_query.cel,
+                facet_options_query.facet_queries[facet.id],
+            )
+            property_mapping = properties_metadata.get_property_metadata_for_str(
+                facet.property_path
+            )
+            result_dict.setdefault(facet.id, [])
+
+            if facet_key in partial_facet_keys:
+                result_dict.partial_facet_ids.add(facet.id)
+                continue
+
+            if facet_key in grouped_by_id_dict:
+                result_dict[facet.id] = [
+                    FacetOptionDto(
+                        display_name=str(facet_value),
+                        value=map_facet_option_value(
+                            facet_value, property_mapping.data_type
+                        ),
+                        matches_count=0 if matches_count is None else matches_count,
+                    )
+                    for facet_id, facet_value, matches_count in grouped_by_id_dict[
+                        facet_key
+                    ]
+                ]
+
+            if property_mapping is None:
+                result_dict[facet.id] = []
+                continue
+
+            if property_mapping.enum_values:
+                if facet.id in result_dict:
+                    values_with_zero_matches = [
+                        enum_value
+                        for enum_value in property_mapping.enum_values
+                        if enum_value
+                        not in [
+                            facet_option.value for facet_option in result_dict[facet.id]
                         ]
                     ]
+                else:
+                    result_dict.setdefault(facet.id, [])
+                    values_with_zero_matches = property_mapping.enum_values
 
-                if property_mapping is None:
-                    result_dict[facet.id] = []
-                    continue
-
-                if property_mapping.enum_values:
-                    if facet.id in result_dict:
-                        values_with_zero_matches = [
-                            enum_value
-                            for enum_value in property_mapping.enum_values
-                            if enum_value
-                            not in [
-                                facet_option.value
-                                for facet_option in result_dict[facet.id]
-                            ]
-                        ]
-                    else:
-                        result_dict.setdefault(facet.id, [])
-                        values_with_zero_matches = property_mapping.enum_values
-
-                    for enum_value in values_with_zero_matches:
-                        result_dict[facet.id].append(
-                            FacetOptionDto(
-                                display_name=enum_value,
-                                value=enum_value,
-                                matches_count=0,
-                            )
+                for enum_value in values_with_zero_matches:
+                    result_dict[facet.id].append(
+                        FacetOptionDto(
+                            display_name=enum_value,
+                            value=enum_value,
+                            matches_count=0,
                         )
-                    result_dict[facet.id] = sorted(
-                        result_dict[facet.id],
-                        key=lambda facet_option: (
-                            property_mapping.enum_values.index(facet_option.value)
-                            if facet_option.value in property_mapping.enum_values
-                            else -100  # put unknown values at the end
-                        ),
-                        reverse=True,
                     )
+                result_dict[facet.id] = sorted(
+                    result_dict[facet.id],
+                    key=lambda facet_option: (
+                        property_mapping.enum_values.index(facet_option.value)
+                        if facet_option.value in property_mapping.enum_values
+                        else -100  # put unknown values at the end
+                    ),
+                    reverse=True,
+                )
 
     for invalid_facet in invalid_facets:
         result_dict[invalid_facet.id] = []
@@ -191,6 +234,121 @@ def get_facet_options(
     return result_dict
 
 
+def _set_statement_timeout(session: Session, timeout_seconds: float):
+    """
+    Makes the database cancel the queries of the session that take longer than the
+    timeout, so the facet queries that are given up don't keep running.
+    """
+    timeout_ms = int(timeout_seconds * 1000)
+    if engine.dialect.name == "postgresql":
+        session.exec(text(f"SET LOCAL statement_timeout = {timeout_ms}"))
+    elif engine.dialect.name == "mysql":
+        session.exec(text(f"SET SESSION max_execution_time = {timeout_ms}"))
+
+
+def _query_facet_data(db_query, timeout_seconds: float) -> list:
+    with Session(engine) as session:
+        _set_statement_timeout(session, timeout_seconds)
+        try:
+            return session.exec(db_query).all()
+        finally:
+            if engine.dialect.name == "mysql":
+                # the connection goes back to the pool
+                session.exec(text("SET SESSION max_execution_time = 0"))
+
+
+def _query_facets_data_in_parallel(
+    base_query_factory: lambda facet_property_path, select_statement: Any,
+    entity_id_column: any,
+    facets: list[FacetDto],
+    facet_options_query: FacetOptionsQueryDto,
+    properties_metadata: PropertiesMetadata,
+) -> tuple[list, set[str]]:
+    """
+    Runs the query of every facet concurrently, each one with its own time budget.
+
+    Returns:
+        tuple[list, set[str]]: The facets data rows, and the keys of the facets whose
+        query failed or didn't finish within KEEP_FACET_QUERY_TIMEOUT_SECONDS of
+        starting.
+    """
+    facets_query_builder = get_facets_query_builder(properties_metadata)
+    db_queries = facets_query_builder.build_facets_data_queries(
+        base_query_factory=base_query_factory,
+        entity_id_column=entity_id_column,
+        facets=facets,
+        facet_options_query=facet_options_query,
+    )
+
+    # facet key -> when its query started
+    started_at = {}
+
+    def query_facet_data(facet_key: str, db_query):
+        started_at[facet_key] = time.monotonic()
+        return _query_facet_data(db_query, KEEP_FACET_QUERY_TIMEOUT_SECONDS)
+
+    futures = {
+        facets_query_executor.submit(
+            query_facet_data,
+            facet_key,
+            # the facets are queried separately, so the most frequent options can be
+            # kept in the query on every dialect
+            db_query.order_by(literal_column("matches_count").desc()).limit(
+                OPTIONS_PER_FACET
+            ),
+        ): facet_key
+        for facet_key, db_query in db_queries.items()
+    }
+
+    data = []
+    partial_facet_keys = set()
+    pending = set(futures)
+    while pending:
+        # wait until a query finishes or the earliest started one runs out of time,
+        # the queued queries get their time budget once they start
+        deadlines = [
+            started_at[futures[future]] + KEEP_FACET_QUERY_TIMEOUT_SECONDS
+            for future in pending
+            if futures[future] in started_at
+        ]
+        timeout = (
+            max(min(deadlines) - time.monotonic(), 0)
+            if deadlines
+            else KEEP_FACET_QUERY_TIMEOUT_SECONDS
+        )
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            try:
+                data.extend(future.result())
+            except SQLAlchemyError as e:
+                logger.warning(
+                    f"""Failed to execute query for facet options.
+                    Facet: {futures[future]}
+                    Error: {e}
+                    """
+                )
+                partial_facet_keys.add(futures[future])
+
+        now = time.monotonic()
+        for future in list(pending):
+            facet_key = futures[future]
+            if (
+                facet_key in started_at
+                and started_at[facet_key] + KEEP_FACET_QUERY_TIMEOUT_SECONDS <= now
+            ):
+                # the database cancels the query too (see _set_statement_timeout)
+                pending.discard(future)
+                partial_facet_keys.add(facet_key)
+
+    if partial_facet_keys:
+        logger.warning(
+            "Facet options are partial, some facet queries didn't finish in time",
+            extra={"partial_facet_keys": list(partial_facet_keys)},
+        )
+    return data, partial_facet_keys
+
+
 def create_facet(tenant_id: str, entity_type, facet: CreateFacetDto) -> FacetDto:
     """
     Creates a new facet for a given tenant and returns the created facet's details.
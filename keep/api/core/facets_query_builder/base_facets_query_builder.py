@@ -43,11 +43,40 @@ class BaseFacetsQueryBuilder:
         Returns:
             sqlalchemy.sql.Selectable: A SQLAlchemy selectable object representing the constructed query.
         """
-        # Main Query: JSON Extraction and Counting
-        union_queries = []
+        union_queries = list(
+            self.build_facets_data_queries(
+                base_query_factory=base_query_factory,
+                entity_id_column=entity_id_column,
+                facets=facets,
+                facet_options_query=facet_options_query,
+            ).values()
+        )
+
+        query = None
+
+        if len(union_queries) > 1:
+            query = union_queries[0].union_all(*union_queries[1:])
+        else:
+            query = union_queries[0]
+
+        return query
+
+    def build_facets_data_queries(
+        self,
+        base_query_factory: lambda facet_property_path, involved_fields, select_statement: Any,
+        entity_id_column: any,
+        facets: list[FacetDto],
+        facet_options_query: FacetOptionsQueryDto,
+    ) -> dict[str, Any]:
+        """
+        Builds a SQL query per facet to extract and count its data, so the facets can be
+        queried separately.
 
-        # prevents duplicate queries for the same facet property path and its cel combination
-        visited_facets = set()
+        Returns:
+            dict[str, Any]: The queries by facet key, facets with the same property path
+            and CEL share their query.
+        """
+        queries = {}
 
         for facet in facets:
             facet_cel = facet_options_query.facet_queries.get(facet.id, "")
@@ -56,7 +85,8 @@ class BaseFacetsQueryBuilder:
                 filter_cel=facet_options_query.cel,
                 facet_cel=facet_cel,
             )
-            if facet_key in visited_facets:
+            # prevents duplicate queries for the same facet property path and its cel combination
+            if facet_key in queries:
                 continue
 
             cel_queries = [
@@ -65,7 +95,7 @@ class BaseFacetsQueryBuilder:
             ]
             final_cel = " && ".join(filter(lambda cel: cel, cel_queries))
 
-            facet_sub_query = self.build_facet_subquery(
+            queries[facet_key] = self.build_facet_subquery(
                 facet_key=facet_key,
                 entity_id_column=entity_id_column,
                 base_query_factory=base_query_factory,
@@ -73,17 +103,7 @@ class BaseFacetsQueryBuilder:
                 facet_cel=final_cel,
             )
 
-            union_queries.append(facet_sub_query)
-            visited_facets.add(facet_key)
-
-        query = None
-
-        if len(union_queries) > 1:
-            query = union_queries[0].union_all(*union_queries[1:])
-        else:
-            query = union_queries[0]
-
-        return query
+        return queries
 
     def build_facet_select(self, entity_id_column, facet_key: str, facet_property_path):
         property_metadata = self.properties_metadata.get_property_metadata_for_str(
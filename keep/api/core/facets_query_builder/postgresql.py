@@ -9,13 +9,30 @@ from keep.api.core.cel_to_sql.properties_metadata import (
     JsonFieldMapping,
     PropertyMetadataInfo,
 )
+from keep.api.core.config import config
 from keep.api.core.facets_query_builder.base_facets_query_builder import (
     BaseFacetsQueryBuilder,
 )
 
+# count the rows matching each facet value instead of the distinct entities, which
+# skips sorting the entity ids and only overcounts the entities joined more than once
+KEEP_FACETS_APPROXIMATE_COUNTS = config(
+    "KEEP_FACETS_APPROXIMATE_COUNTS", cast=bool, default=False
+)
+
 
 class PostgreSqlFacetsQueryBuilder(BaseFacetsQueryBuilder):
 
+    def build_facet_select(self, entity_id_column, facet_key: str, facet_property_path):
+        facet_select = super().build_facet_select(
+            entity_id_column=entity_id_column,
+            facet_key=facet_key,
+            facet_property_path=facet_property_path,
+        )
+        if KEEP_FACETS_APPROXIMATE_COUNTS:
+            facet_select[-1] = func.count(entity_id_column).label("matches_count")
+        return facet_select
+
     def _get_select_for_column(self, property_metadata: PropertyMetadataInfo):
         if property_metadata.data_type == DataType.ARRAY:
             return literal_column(
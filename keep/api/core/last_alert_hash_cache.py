@@ -0,0 +1,154 @@
+"""
+Write-through cache of fingerprint -> last alert hash, used by the deduplication.
+
+When Redis is enabled (REDIS=true) the cache is shared by all the workers through
+the Redis connection configured in keep/api/redis_settings.py, and it is enabled by
+default. Otherwise it is a bounded in-process LRU, which is disabled by default: with
+several workers, a hash cached by one of them goes stale when another one ingests the
+same fingerprint, and a changed alert would be deduplicated. Set
+KEEP_LAST_ALERT_HASH_CACHE_ENABLED=true to use it with a single worker.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from keep.api.consts import REDIS
+from keep.api.core.config import config
+from keep.api.core.metrics import (
+    last_alert_hash_cache_hits_total,
+    last_alert_hash_cache_misses_total,
+)
+
+KEEP_LAST_ALERT_HASH_CACHE_ENABLED = config(
+    "KEEP_LAST_ALERT_HASH_CACHE_ENABLED", cast=bool, default=REDIS
+)
+# max number of fingerprints kept in the in-process LRU
+KEEP_LAST_ALERT_HASH_CACHE_SIZE = config(
+    "KEEP_LAST_ALERT_HASH_CACHE_SIZE", cast=int, default=100000
+)
+# entries expire after this many seconds, so that hashes written by other processes
+# (when the cache is explicitly enabled without Redis) are eventually picked up
+KEEP_LAST_ALERT_HASH_CACHE_TTL = config(
+    "KEEP_LAST_ALERT_HASH_CACHE_TTL", cast=int, default=300
+)
+
+REDIS_KEY_PREFIX = "keep:last_alert_hash"
+
+
+class LastAlertHashCache:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_LAST_ALERT_HASH_CACHE_ENABLED
+            self.max_size = KEEP_LAST_ALERT_HASH_CACHE_SIZE
+            self.ttl = KEEP_LAST_ALERT_HASH_CACHE_TTL
+            # (tenant_id, fingerprint) -> (alert_hash, expires_at)
+            self.cache: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+            self._lock = threading.Lock()
+            self.redis = None
+            if self.enabled and REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
+            self.__initialized = True
+
+    @staticmethod
+    def _redis_key(tenant_id: str, fingerprint: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:{fingerprint}"
+
+    def get_many(self, tenant_id: str, fingerprints: list[str]) -> dict[str, str]:
+        """
+        Get the cached last alert hashes of the fingerprints.
+
+        Returns:
+            dict: fingerprint -> alert hash, only for the fingerprints found in the cache
+        """
+        if not self.enabled or not fingerprints:
+            return {}
+
+        if self.redis is not None:
+            try:
+                values = self.redis.mget(
+                    [self._redis_key(tenant_id, fp) for fp in fingerprints]
+                )
+            except Exception:
+                self.logger.exception("Failed to get last alert hashes from Redis")
+                return {}
+            hashes = {
+                fingerprint: value
+                for fingerprint, value in zip(fingerprints, values)
+                if value is not None
+            }
+        else:
+            hashes = {}
+            now = time.monotonic()
+            with self._lock:
+                for fingerprint in fingerprints:
+                    key = (tenant_id, fingerprint)
+                    entry = self.cache.get(key)
+                    if entry is None:
+                        continue
+                    if entry[1] < now:
+                        del self.cache[key]
+                        continue
+                    self.cache.move_to_end(key)
+                    hashes[fingerprint] = entry[0]
+
+        last_alert_hash_cache_hits_total.inc(len(hashes))
+        last_alert_hash_cache_misses_total.inc(len(fingerprints) - len(hashes))
+        return hashes
+
+    def set_many(self, tenant_id: str, fingerprint_to_hash: dict[str, str | None]):
+        """
+        Write the last alert hashes of the fingerprints, a None hash drops the entry.
+        """
+        if not self.enabled or not fingerprint_to_hash:
+            return
+
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline(transaction=False)
+                for fingerprint, alert_hash in fingerprint_to_hash.items():
+                    key = self._redis_key(tenant_id, fingerprint)
+                    if alert_hash is None:
+                        pipeline.delete(key)
+                    else:
+                        # Redis evicts the least recently used keys by its maxmemory policy
+                        pipeline.set(key, alert_hash, ex=self.ttl)
+                pipeline.execute()
+            except Exception:
+                self.logger.exception("Failed to set last alert hashes in Redis")
+            return
+
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for fingerprint, alert_hash in fingerprint_to_hash.items():
+                key = (tenant_id, fingerprint)
+                if alert_hash is None:
+                    self.cache.pop(key, None)
+                    continue
+                self.cache[key] = (alert_hash, expires_at)
+                self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+
+    def set(self, tenant_id: str, fingerprint: str, alert_hash: str | None):
+        self.set_many(tenant_id, {fingerprint: alert_hash})
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+
+
+def get_last_alert_hash_cache() -> LastAlertHashCache:
+    return LastAlertHashCache()
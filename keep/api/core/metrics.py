@@ -89,3 +89,130 @@ workflow_queue_size = Gauge(
     labelnames=["tenant_id"],
     multiprocess_mode="livesum",
 )
+
+# Parsed workflows cache metrics
+workflow_cache_size = Gauge(
+    f"{METRIC_PREFIX}cache_size",
+    "Number of parsed workflows in the cache",
+    multiprocess_mode="livesum",
+)
+
+workflow_cache_hits_total = Counter(
+    f"{METRIC_PREFIX}cache_hits_total",
+    "Total number of workflows served from the parsed workflows cache",
+)
+
+workflow_cache_misses_total = Counter(
+    f"{METRIC_PREFIX}cache_misses_total",
+    "Total number of workflows parsed because of a cache miss",
+)
+
+workflow_cache_parse_seconds_saved_total = Counter(
+    f"{METRIC_PREFIX}cache_parse_seconds_saved_total",
+    "Total time saved by serving parsed workflows from the cache instead of parsing them",
+)
+
+### RULES ENGINE
+METRIC_PREFIX = "keep_rules_"
+
+rules_program_cache_hits_total = Counter(
+    f"{METRIC_PREFIX}program_cache_hits_total",
+    "Total number of compiled CEL rule programs served from cache",
+)
+
+rules_program_cache_misses_total = Counter(
+    f"{METRIC_PREFIX}program_cache_misses_total",
+    "Total number of CEL rule programs compiled because of a cache miss",
+)
+
+### DEDUPLICATION
+METRIC_PREFIX = "keep_deduplication_"
+
+last_alert_hash_cache_hits_total = Counter(
+    f"{METRIC_PREFIX}last_alert_hash_cache_hits_total",
+    "Total number of last alert hashes served from cache",
+)
+
+last_alert_hash_cache_misses_total = Counter(
+    f"{METRIC_PREFIX}last_alert_hash_cache_misses_total",
+    "Total number of last alert hashes looked up in the database",
+)
+
+### PRESETS
+METRIC_PREFIX = "keep_presets_"
+
+preset_counters_seeds_total = Counter(
+    f"{METRIC_PREFIX}counters_seeds_total",
+    "Total number of preset counters seeded from the last alerts",
+)
+
+### FACETS
+METRIC_PREFIX = "keep_facets_"
+
+facet_options_cache_hits_total = Counter(
+    f"{METRIC_PREFIX}options_cache_hits_total",
+    "Total number of facet options served from the cache",
+    labelnames=["entity_type"],
+)
+
+facet_options_cache_misses_total = Counter(
+    f"{METRIC_PREFIX}options_cache_misses_total",
+    "Total number of facet options computed because they were not cached",
+    labelnames=["entity_type"],
+)
+
+### ELASTIC
+METRIC_PREFIX = "keep_elastic_"
+
+elastic_indexing_queue_depth = Gauge(
+    f"{METRIC_PREFIX}indexing_queue_depth",
+    "Number of alerts waiting to be indexed to Elastic",
+    multiprocess_mode="livesum",
+)
+
+elastic_spooled_batches = Gauge(
+    f"{METRIC_PREFIX}spooled_batches",
+    "Number of spooled batches of alerts waiting to be indexed to Elastic again",
+    multiprocess_mode="max",
+)
+
+elastic_indexing_lag_seconds = Histogram(
+    f"{METRIC_PREFIX}indexing_lag_seconds",
+    "Time from enqueuing an alert to indexing it to Elastic",
+    buckets=(0.1, 0.5, 1, 2, 5, 10, 30, 60, 300, 900),
+)
+
+elastic_indexed_alerts_total = Counter(
+    f"{METRIC_PREFIX}indexed_alerts_total",
+    "Total number of alerts indexed to Elastic in bulk",
+)
+
+elastic_indexing_failures_total = Counter(
+    f"{METRIC_PREFIX}indexing_failures_total",
+    "Total number of bulk requests to Elastic that failed and were spooled",
+)
+
+### ENRICHMENTS
+METRIC_PREFIX = "keep_enrichment_"
+
+enrichment_audit_queue_depth = Gauge(
+    f"{METRIC_PREFIX}audit_queue_depth",
+    "Number of enrichment events waiting to be written",
+    multiprocess_mode="livesum",
+)
+
+enrichment_audit_written_events_total = Counter(
+    f"{METRIC_PREFIX}audit_written_events_total",
+    "Total number of enrichment events written in batches",
+)
+
+enrichment_audit_dropped_events_total = Counter(
+    f"{METRIC_PREFIX}audit_dropped_events_total",
+    "Total number of enrichment events dropped because the queue was full or the write failed",
+)
+
+enrichment_audit_skipped_events_aggregated_total = Counter(
+    f"{METRIC_PREFIX}audit_skipped_events_aggregated_total",
+    "Total number of skipped enrichment events counted instead of stored",
+    labelnames=["tenant_id", "enrichment_type"],
+)
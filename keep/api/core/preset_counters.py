@@ -0,0 +1,408 @@
+"""
+Incrementally maintained preset counters, so the presets badges don't re-filter the
+last alerts with every preset's CEL on each refresh.
+
+The alerts matching a preset are seeded from the last alerts in the background on first
+use (the presets are not counted until then), then kept up to date by the ingestion, which evaluates the new alerts against every preset's CEL
+anyway (to tell the clients which presets changed). Seeds expire after
+KEEP_PRESET_COUNTERS_TTL seconds to catch up with the changes that don't go through the
+ingestion (e.g. enrichments and deleted alerts), a preset whose CEL changed is re-seeded
+right away.
+
+When Redis is enabled (REDIS=true) the counters are shared by all the workers and a
+single worker seeds them, otherwise they are kept in-process.
+
+Disabled by default, set KEEP_PRESET_COUNTERS_ENABLED=true to count the presets' alerts
+on GET /preset.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import typing
+
+from keep.api.consts import REDIS
+from keep.api.core.config import config
+from keep.api.core.db import get_last_alerts
+from keep.api.core.metrics import preset_counters_seeds_total
+from keep.api.models.alert import AlertDto, AlertStatus
+from keep.api.models.db.preset import PresetDto
+from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
+from keep.rulesengine.rulesengine import RulesEngine
+
+KEEP_PRESET_COUNTERS_ENABLED = config(
+    "KEEP_PRESET_COUNTERS_ENABLED", cast=bool, default=False
+)
+KEEP_PRESET_COUNTERS_TTL = config("KEEP_PRESET_COUNTERS_TTL", cast=int, default=300)
+# number of last alerts the presets are seeded from
+KEEP_PRESET_COUNTERS_SEED_LIMIT = config(
+    "KEEP_PRESET_COUNTERS_SEED_LIMIT", cast=int, default=10000
+)
+
+REDIS_KEY_PREFIX = "keep:preset_counters"
+
+# the sets of fingerprints kept for each preset
+MEMBERS = "members"
+# firing alerts
+FIRING = "firing"
+# firing alerts that are not deleted or dismissed
+NOISE = "noise"
+# same, for the alerts that are noisy
+NOISY = "noisy"
+SETS = (MEMBERS, FIRING, NOISE, NOISY)
+
+
+class PresetCounter(typing.NamedTuple):
+    alerts_count: int
+    firing_alerts_count: int
+    noise_alerts_count: int
+    noisy_alerts_count: int
+
+
+class PresetCounters:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_PRESET_COUNTERS_ENABLED
+            self.ttl = KEEP_PRESET_COUNTERS_TTL
+            self.seed_limit = KEEP_PRESET_COUNTERS_SEED_LIMIT
+            # preset key -> (expires_at, {set name -> fingerprints})
+            self.presets: dict[str, tuple[float, dict[str, set[str]]]] = {}
+            # tenants being seeded in the background by this process
+            self._seeding: set[str] = set()
+            self._lock = threading.Lock()
+            self.redis = None
+            if self.enabled and REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
+            self.__initialized = True
+
+    @staticmethod
+    def _preset_key(tenant_id: str, preset: PresetDto) -> str:
+        # keyed by the CEL too, so an edited preset is seeded again
+        cel_hash = hashlib.sha1(preset.cel_query.encode()).hexdigest()[:16]
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:{preset.id}:{cel_hash}"
+
+    @staticmethod
+    def _alert_sets(alert: AlertDto) -> list[str]:
+        """
+        The sets of a preset the alert belongs to, when it matches the preset.
+        """
+        alert_sets = [MEMBERS]
+        if alert.status == AlertStatus.FIRING.value:
+            alert_sets.append(FIRING)
+            if not alert.deleted and not alert.dismissed:
+                alert_sets.append(NOISE)
+                if alert.isNoisy:
+                    alert_sets.append(NOISY)
+        return alert_sets
+
+    def get_counters(
+        self, tenant_id: str, presets: list[PresetDto], wait_for_seed: bool = True
+    ) -> dict[str, PresetCounter]:
+        """
+        Get the counters of the presets by preset id, seeding the presets that are not
+        seeded yet (or whose seed expired) from the last alerts.
+
+        Args:
+            tenant_id (str): the tenant id
+            presets (list[PresetDto]): the presets
+            wait_for_seed (bool): seed the missing presets right away, otherwise they are
+                seeded in the background and left out of the counters until then
+
+        Returns:
+            dict[str, PresetCounter]: the counters by preset id
+        """
+        if not self.enabled:
+            return {}
+
+        keys = {
+            str(preset.id): self._preset_key(tenant_id, preset) for preset in presets
+        }
+        counters = self._read(list(keys.values()))
+        missing = [
+            preset for preset in presets if counters.get(keys[str(preset.id)]) is None
+        ]
+        if missing:
+            if wait_for_seed:
+                counters.update(self._seed(tenant_id, missing))
+            else:
+                self._seed_in_background(tenant_id, missing)
+        return {
+            preset_id: counters[key]
+            for preset_id, key in keys.items()
+            if counters.get(key) is not None
+        }
+
+    def _read(self, keys: list[str]) -> dict[str, PresetCounter | None]:
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline(transaction=False)
+                for key in keys:
+                    pipeline.exists(f"{key}:seeded")
+                    for set_name in SETS:
+                        pipeline.scard(f"{key}:{set_name}")
+                results = pipeline.execute()
+            except Exception:
+                self.logger.exception("Failed to read preset counters from Redis")
+                return {}
+            counters = {}
+            for i, key in enumerate(keys):
+                seeded, *counts = results[i * 5 : i * 5 + 5]
+                counters[key] = PresetCounter(*counts) if seeded else None
+            return counters
+
+        now = time.monotonic()
+        counters = {}
+        with self._lock:
+            for key in keys:
+                entry = self.presets.get(key)
+                if entry is None or entry[0] < now:
+                    counters[key] = None
+                    continue
+                counters[key] = PresetCounter(
+                    *(len(entry[1][set_name]) for set_name in SETS)
+                )
+        return counters
+
+    def _seed(
+        self, tenant_id: str, presets: list[PresetDto]
+    ) -> dict[str, PresetCounter]:
+        """
+        Seed the presets from the last alerts, with a single query for all of them.
+        """
+        self.logger.info(
+            "Seeding preset counters",
+            extra={"tenant_id": tenant_id, "presets": len(presets)},
+        )
+        alerts = convert_db_alerts_to_dto_alerts(
+            get_last_alerts(
+                tenant_id=tenant_id, limit=self.seed_limit, with_incidents=True
+            )
+        )
+        rules_engine = RulesEngine(tenant_id=tenant_id)
+        # performance optimization: get the alerts activation once
+        alerts_activation = rules_engine.get_alerts_activation(alerts)
+        counters = {}
+        for preset in presets:
+            preset_sets = {set_name: set() for set_name in SETS}
+            for alert in rules_engine.filter_alerts(
+                alerts, preset.cel_query, alerts_activation
+            ):
+                for set_name in self._alert_sets(alert):
+                    preset_sets[set_name].add(alert.fingerprint)
+            key = self._preset_key(tenant_id, preset)
+            self._write_seed(key, preset_sets)
+            counters[key] = PresetCounter(
+                *(len(preset_sets[set_name]) for set_name in SETS)
+            )
+        preset_counters_seeds_total.inc(len(presets))
+        return counters
+
+    def _seed_in_background(self, tenant_id: str, presets: list[PresetDto]):
+        with self._lock:
+            if tenant_id in self._seeding:
+                return
+            self._seeding.add(tenant_id)
+
+        seeding_key = f"{REDIS_KEY_PREFIX}:{tenant_id}:seeding"
+        if self.redis is not None:
+            # another worker is seeding the tenant already
+            try:
+                acquired = self.redis.set(seeding_key, 1, nx=True, ex=self.ttl)
+            except Exception:
+                self.logger.exception("Failed to lock the preset counters seed")
+                acquired = False
+            if not acquired:
+                with self._lock:
+                    self._seeding.discard(tenant_id)
+                return
+
+        def seed():
+            try:
+                self._seed(tenant_id, presets)
+            except Exception:
+                self.logger.exception(
+                    "Failed to seed preset counters", extra={"tenant_id": tenant_id}
+                )
+            finally:
+                if self.redis is not None:
+                    try:
+                        self.redis.delete(seeding_key)
+                    except Exception:
+                        self.logger.exception(
+                            "Failed to unlock the preset counters seed"
+                        )
+                with self._lock:
+                    self._seeding.discard(tenant_id)
+
+        threading.Thread(
+            target=seed, name=f"preset-counters-seed-{tenant_id}", daemon=True
+        ).start()
+
+    def _write_seed(self, key: str, preset_sets: dict[str, set[str]]):
+        if self.redis is not None:
+            try:
+                pipeline = self.redis.pipeline(transaction=True)
+                for set_name in SETS:
+                    pipeline.delete(f"{key}:{set_name}")
+                    if preset_sets[set_name]:
+                        pipeline.sadd(f"{key}:{set_name}", *preset_sets[set_name])
+                    # the sets of a preset that is not used anymore are dropped eventually
+                    pipeline.expire(f"{key}:{set_name}", self.ttl * 2)
+                pipeline.set(f"{key}:seeded", 1, ex=self.ttl)
+                pipeline.execute()
+            except Exception:
+                self.logger.exception("Failed to write preset counters to Redis")
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            for expired_key in [
+                key for key, entry in self.presets.items() if entry[0] < now
+            ]:
+                del self.presets[expired_key]
+            self.presets[key] = (now + self.ttl, preset_sets)
+
+    def update(
+        self,
+        tenant_id: str,
+        alerts: list[AlertDto],
+        presets_matching_alerts: list[tuple[PresetDto, list[AlertDto]]],
+    ) -> set[str]:
+        """
+        Update the counters of the seeded presets with new (or changed) alerts.
+
+        Args:
+            tenant_id (str): the tenant id
+            alerts (list[AlertDto]): the new alerts
+            presets_matching_alerts (list[tuple[PresetDto, list[AlertDto]]]): the presets
+                with the new alerts that match their CEL
+
+        Returns:
+            set[str]: the ids of the presets whose counters changed
+        """
+        if not self.enabled:
+            return set()
+
+        updates = []
+        for preset, matching_alerts in presets_matching_alerts:
+            matching = {id(alert) for alert in matching_alerts}
+            # the last alert of a fingerprint wins
+            alert_sets = {}
+            for alert in alerts:
+                alert_sets[alert.fingerprint] = (
+                    self._alert_sets(alert) if id(alert) in matching else []
+                )
+            updates.append(
+                (str(preset.id), self._preset_key(tenant_id, preset), alert_sets)
+            )
+
+        if self.redis is not None:
+            return self._update_redis(updates)
+
+        changed = set()
+        with self._lock:
+            for preset_id, key, alert_sets in updates:
+                entry = self.presets.get(key)
+                # not seeded, the seed will count these alerts
+                if entry is None:
+                    continue
+                preset_sets = entry[1]
+                for fingerprint, fingerprint_sets in alert_sets.items():
+                    for set_name in SETS:
+                        if set_name in fingerprint_sets:
+                            if fingerprint not in preset_sets[set_name]:
+                                preset_sets[set_name].add(fingerprint)
+                                changed.add(preset_id)
+                        elif fingerprint in preset_sets[set_name]:
+                            preset_sets[set_name].discard(fingerprint)
+                            changed.add(preset_id)
+        return changed
+
+    def _update_redis(
+        self, updates: list[tuple[str, str, dict[str, list[str]]]]
+    ) -> set[str]:
+        """
+        Update the counters of all the presets with a single pipeline.
+        """
+        try:
+            pipeline = self.redis.pipeline(transaction=False)
+            for _, key, alert_sets in updates:
+                pipeline.exists(f"{key}:seeded")
+                for fingerprint, fingerprint_sets in alert_sets.items():
+                    for set_name in SETS:
+                        if set_name in fingerprint_sets:
+                            pipeline.sadd(f"{key}:{set_name}", fingerprint)
+                        else:
+                            pipeline.srem(f"{key}:{set_name}", fingerprint)
+                # the sets of a preset that is not seeded are overwritten by the seed,
+                # make sure they are dropped if it never comes
+                for set_name in SETS:
+                    pipeline.expire(f"{key}:{set_name}", self.ttl * 2)
+            results = pipeline.execute()
+        except Exception:
+            self.logger.exception("Failed to update preset counters in Redis")
+            return set()
+
+        changed = set()
+        offset = 0
+        for preset_id, _, alert_sets in updates:
+            writes = len(alert_sets) * len(SETS)
+            seeded = results[offset]
+            if seeded and any(results[offset + 1 : offset + 1 + writes]):
+                changed.add(preset_id)
+            offset += 1 + writes + len(SETS)
+        return changed
+
+    def invalidate(self, tenant_id: str):
+        """
+        Drop the counters of all the presets of the tenant, they are seeded again on next use.
+        """
+        if self.redis is not None:
+            try:
+                keys = list(
+                    self.redis.scan_iter(f"{REDIS_KEY_PREFIX}:{tenant_id}:*:seeded")
+                )
+                if keys:
+                    self.redis.delete(*keys)
+            except Exception:
+                self.logger.exception("Failed to invalidate preset counters in Redis")
+            return
+
+        with self._lock:
+            for key in [
+                key
+                for key in self.presets
+                if key.startswith(f"{REDIS_KEY_PREFIX}:{tenant_id}:")
+            ]:
+                del self.presets[key]
+
+    @staticmethod
+    def apply(preset: PresetDto, counter: PresetCounter):
+        """
+        Set the preset's alerts count and whether it should do noise now.
+        """
+        preset.alerts_count = (
+            counter.firing_alerts_count
+            if preset.counter_shows_firing_only
+            else counter.alerts_count
+        )
+        if preset.is_noisy:
+            preset.should_do_noise_now = counter.noise_alerts_count > 0
+        elif not preset.static and counter.noisy_alerts_count:
+            preset.should_do_noise_now = True
+
+
+def get_preset_counters() -> PresetCounters:
+    return PresetCounters()
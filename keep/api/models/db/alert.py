@@ -48,11 +48,19 @@ class LastAlert(SQLModel, table=True):
     timestamp: datetime = Field(nullable=False, index=True)
     first_timestamp: datetime = Field(nullable=False, index=True)
     alert_hash: str | None = Field(nullable=True, index=True)
+    # the most queried properties of the alert (enrichments override the event),
+    # materialized so they are not extracted from JSON when filtering and sorting
+    status: str | None = Field(nullable=True)
+    severity: str | None = Field(nullable=True)
+    last_received: datetime | None = Field(nullable=True)
 
     __table_args__ = (
         # Original indexes from MySQL
         Index("idx_lastalert_tenant_timestamp", "tenant_id", "first_timestamp"),
         Index("idx_lastalert_tenant_timestamp_new", "tenant_id", "timestamp"),
+        Index("idx_lastalert_tenant_status", "tenant_id", "status", "timestamp"),
+        Index("idx_lastalert_tenant_severity", "tenant_id", "severity", "timestamp"),
+        Index("idx_lastalert_tenant_last_received", "tenant_id", "last_received"),
         Index(
             "idx_lastalert_tenant_ordering",
             "tenant_id",
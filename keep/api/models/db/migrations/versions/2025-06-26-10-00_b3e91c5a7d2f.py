@@ -0,0 +1,139 @@
+"""Materialize status, severity and lastReceived in lastalert
+
+Revision ID: b3e91c5a7d2f
+Revises: 4d2f8b1c7e3a
+Create Date: 2025-06-26 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from sqlalchemy import and_, bindparam, select, tuple_
+from sqlmodel import Session
+
+from keep.api.core.db_utils import get_last_alert_properties
+
+# revision identifiers, used by Alembic.
+revision = "b3e91c5a7d2f"
+down_revision = "4d2f8b1c7e3a"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def populate_db():
+    session = Session(op.get_bind())
+
+    lastalert = sa.table(
+        "lastalert",
+        sa.column("tenant_id"),
+        sa.column("fingerprint"),
+        sa.column("alert_id"),
+        sa.column("status"),
+        sa.column("severity"),
+        sa.column("last_received", sa.DateTime),
+    )
+    alert = sa.table("alert", sa.column("id"), sa.column("event", sa.JSON))
+    alertenrichment = sa.table(
+        "alertenrichment",
+        sa.column("tenant_id"),
+        sa.column("alert_fingerprint"),
+        sa.column("enrichments", sa.JSON),
+    )
+    update_statement = (
+        sa.update(lastalert)
+        .where(lastalert.c.tenant_id == bindparam("_tenant_id"))
+        .where(lastalert.c.fingerprint == bindparam("_fingerprint"))
+        .values(
+            status=bindparam("status"),
+            severity=bindparam("severity"),
+            last_received=bindparam("last_received"),
+        )
+    )
+
+    # keyset pagination, so every batch is an index range scan
+    last_key = None
+    while True:
+        query = (
+            select(
+                lastalert.c.tenant_id,
+                lastalert.c.fingerprint,
+                alert.c.event,
+                alertenrichment.c.enrichments,
+            )
+            .select_from(lastalert)
+            .join(alert, alert.c.id == lastalert.c.alert_id)
+            .outerjoin(
+                alertenrichment,
+                and_(
+                    alertenrichment.c.tenant_id == lastalert.c.tenant_id,
+                    alertenrichment.c.alert_fingerprint == lastalert.c.fingerprint,
+                ),
+            )
+            .order_by(lastalert.c.tenant_id, lastalert.c.fingerprint)
+            .limit(BACKFILL_BATCH_SIZE)
+        )
+        if last_key is not None:
+            query = query.where(
+                tuple_(lastalert.c.tenant_id, lastalert.c.fingerprint) > last_key
+            )
+        rows = session.execute(query).all()
+        if not rows:
+            break
+
+        session.execute(
+            update_statement,
+            [
+                {
+                    "_tenant_id": tenant_id,
+                    "_fingerprint": fingerprint,
+                    **get_last_alert_properties(event or {}, enrichments),
+                }
+                for tenant_id, fingerprint, event, enrichments in rows
+            ],
+        )
+        session.commit()
+        last_key = (rows[-1][0], rows[-1][1])
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("lastalert", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("status", sqlmodel.sql.sqltypes.AutoString(), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("severity", sqlmodel.sql.sqltypes.AutoString(), nullable=True)
+        )
+        batch_op.add_column(sa.Column("last_received", sa.DateTime(), nullable=True))
+
+    populate_db()
+
+    # created after the backfill, so the backfill doesn't have to maintain them
+    with op.batch_alter_table("lastalert", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_lastalert_tenant_status",
+            ["tenant_id", "status", "timestamp"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "idx_lastalert_tenant_severity",
+            ["tenant_id", "severity", "timestamp"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "idx_lastalert_tenant_last_received",
+            ["tenant_id", "last_received"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("lastalert", schema=None) as batch_op:
+        batch_op.drop_index("idx_lastalert_tenant_last_received")
+        batch_op.drop_index("idx_lastalert_tenant_severity")
+        batch_op.drop_index("idx_lastalert_tenant_status")
+        batch_op.drop_column("last_received")
+        batch_op.drop_column("severity")
+        batch_op.drop_column("status")
@@ -0,0 +1,26 @@
+"""Add pull_cursors to provider
+
+Revision ID: e5c2a9d41f07
+Revises: b3e91c5a7d2f
+Create Date: 2025-06-28 10:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e5c2a9d41f07"
+down_revision = "b3e91c5a7d2f"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("provider", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("pull_cursors", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("provider", schema=None) as batch_op:
+        batch_op.drop_column("pull_cursors")
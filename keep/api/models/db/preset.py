@@ -89,6 +89,9 @@ class PresetDto(BaseModel, extra="ignore"):
     should_do_noise_now: Optional[bool] = Field(default=False)
     """Meaning is_noisy + at least one alert is doing noise"""
 
+    alerts_count: Optional[int] = None
+    """Number of alerts in the preset (firing alerts only if counter_shows_firing_only)"""
+
     # static presets
     static: Optional[bool] = Field(default=False)
     tags: List[TagDto] = []
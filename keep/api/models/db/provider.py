@@ -22,6 +22,9 @@ class Provider(SQLModel, table=True):
     consumer: bool = False
     pulling_enabled: bool = True
     last_pull_time: Optional[datetime]
+    # the high-water marks of the last incremental pulls by kind ("alerts", "incidents"),
+    # see SUPPORTS_INCREMENTAL_PULL
+    pull_cursors: dict = Field(sa_column=Column(JSON), default_factory=dict)
     provisioned: bool = Field(default=False)
     provider_metadata: dict = Field(
         sa_column=Column(JSON)
@@ -169,6 +169,30 @@ class WorkflowExecution(SQLModel, table=True):
         orm_mode = True
 
 
+class QueuedWorkflowExecution(SQLModel, table=True):
+    """
+    A workflow waiting to be run, shared by all the schedulers.
+
+    A scheduler leases it by pushing available_at by the visibility timeout, and
+    deletes it once the workflow execution is created. If the scheduler dies
+    before that, it becomes available again when the lease expires.
+    """
+
+    __table_args__ = (
+        Index("idx_queuedworkflowexecution_available_at", "available_at"),
+    )
+
+    id: str = Field(default=None, primary_key=True)
+    tenant_id: str = Field(foreign_key="tenant.id")
+    workflow_id: str
+    # the workflow_to_run with its serialized event
+    payload: dict = Field(sa_column=Column(JSON), default={})
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    lease_id: Optional[str] = None
+    attempts: int = Field(default=0)
+
+
 class WorkflowToAlertExecution(SQLModel, table=True):
     __table_args__ = (UniqueConstraint("workflow_execution_id", "alert_fingerprint"),)
 
@@ -5,7 +5,10 @@ This module provides a centralized way to configure Redis connections,
 supporting both direct Redis and Redis Sentinel configurations.
 """
 
+import redis
 from arq.connections import RedisSettings
+from redis.sentinel import Sentinel
+
 from keep.api.core.config import config
 
 
@@ -62,3 +65,41 @@ def get_redis_settings() -> RedisSettings:
             conn_retries=10,
             conn_retry_delay=10,
         )
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    Get a synchronous Redis client built from the same settings as the ARQ pool.
+
+    Used by the in-process caches and coalescers that need to share state across
+    workers when Redis is enabled.
+
+    Returns:
+        redis.Redis: Redis client (the sentinel master when sentinel is enabled)
+    """
+    settings = get_redis_settings()
+    connection_kwargs = {
+        "db": settings.database,
+        "username": settings.username,
+        "password": settings.password,
+        "socket_connect_timeout": settings.conn_timeout,
+        "decode_responses": True,
+    }
+
+    if settings.sentinel:
+        sentinel = Sentinel(
+            settings.host,
+            socket_connect_timeout=settings.conn_timeout,
+            sentinel_kwargs={
+                "username": settings.username,
+                "password": settings.password,
+            },
+        )
+        return sentinel.master_for(settings.sentinel_master, **connection_kwargs)
+
+    return redis.Redis(
+        host=settings.host,
+        port=settings.port,
+        ssl=settings.ssl,
+        **connection_kwargs,
+    )
@@ -12,7 +12,15 @@ from typing import List, Optional
 
 import celpy
 from arq import ArqRedis
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
 from fastapi.responses import JSONResponse
 from pusher import Pusher
 from sqlalchemy_utils import UUIDType
@@ -97,6 +105,7 @@ process_event_executor = ThreadPoolExecutor(
 )
 def fetch_alert_facet_options(
     facet_options_query: FacetOptionsQueryDto,
+    response: Response,
     authenticated_entity: AuthenticatedEntity = Depends(
         IdentityManagerFactory.get_auth_verifier(["read:alert"])
     ),
@@ -130,6 +139,12 @@ def fetch_alert_facet_options(
         },
     )
 
+    if facet_options.partial_facet_ids:
+        # the facets whose query didn't finish in time have no options
+        response.headers["X-Partial-Facets"] = ",".join(
+            sorted(facet_options.partial_facet_ids)
+        )
+
     return facet_options
 
 
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
+from keep.api.bl.enrichment_rules_cache import get_enrichment_rules_cache
 from keep.api.bl.enrichments_bl import EnrichmentsBl
 from keep.api.core.db import get_alert_by_event_id, get_session
 from keep.api.models.db.enrichment_event import EnrichmentEventWithLogs, EnrichmentType
@@ -55,6 +56,7 @@ def create_extraction_rule(
     session.add(new_rule)
     session.commit()
     session.refresh(new_rule)
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     return ExtractionRuleDtoOut(**new_rule.dict())
 
 
@@ -84,6 +86,7 @@ def update_extraction_rule(
     rule.updated_by = authenticated_entity.email
     session.commit()
     session.refresh(rule)
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     return ExtractionRuleDtoOut(**rule.dict())
 
 
@@ -108,6 +111,7 @@ def delete_extraction_rule(
         raise HTTPException(status_code=404, detail="Extraction rule not found")
     session.delete(rule)
     session.commit()
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     return {"message": "Extraction rule deleted successfully"}
 
 
@@ -37,6 +37,7 @@ from keep.api.core.db import (
     get_workflow_executions_for_incident_or_alert,
     merge_incidents_to_id,
     get_enrichment,
+    reconcile_incident_aggregates,
 )
 from keep.api.core.dependencies import extract_generic_body, get_pusher_client
 from keep.api.core.incidents import (
@@ -214,6 +215,7 @@ def get_all_incidents(
 )
 def fetch_inicident_facet_options(
     facet_options_query: FacetOptionsQueryDto,
+    response: Response,
     authenticated_entity: AuthenticatedEntity = Depends(
         IdentityManagerFactory.get_auth_verifier(["read:alert"])
     ),
@@ -250,6 +252,12 @@ def fetch_inicident_facet_options(
         },
     )
 
+    if facet_options.partial_facet_ids:
+        # the facets whose query didn't finish in time have no options
+        response.headers["X-Partial-Facets"] = ",".join(
+            sorted(facet_options.partial_facet_ids)
+        )
+
     return facet_options
 
 
@@ -539,6 +547,32 @@ def merge_incidents(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post(
+    "/reconcile",
+    description="Recompute the alerts count, start and last seen times of incidents from their alerts",
+)
+def reconcile_incidents(
+    incident_ids: List[UUID] = Query(default=None),
+    authenticated_entity: AuthenticatedEntity = Depends(
+        IdentityManagerFactory.get_auth_verifier(["write:incident"])
+    ),
+) -> dict:
+    tenant_id = authenticated_entity.tenant_id
+    logger.info(
+        "Reconciling incidents aggregates",
+        extra={"tenant_id": tenant_id, "incident_ids": incident_ids},
+    )
+    reconciled_incident_ids = reconcile_incident_aggregates(tenant_id, incident_ids)
+    logger.info(
+        "Reconciled incidents aggregates",
+        extra={
+            "tenant_id": tenant_id,
+            "reconciled_incidents": len(reconciled_incident_ids),
+        },
+    )
+    return {"reconciled_incident_ids": reconciled_incident_ids}
+
+
 @router.get(
     "/{incident_id}/alerts",
     description="Get incident alerts by incident incident id",
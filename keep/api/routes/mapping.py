@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 from sqlmodel import Session
 
+from keep.api.bl.enrichment_rules_cache import get_enrichment_rules_cache
 from keep.api.bl.enrichments_bl import EnrichmentsBl
 from keep.api.core.db import get_session
 from keep.api.models.db.enrichment_event import EnrichmentEventWithLogs
@@ -119,6 +120,7 @@ def create_rule(
     session.add(new_rule)
     session.commit()
     session.refresh(new_rule)
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     logger.info("Created a new mapping rule", extra={"rule_id": new_rule.id})
     return new_rule
 
@@ -143,6 +145,7 @@ def delete_rule(
 
     session.delete(rule)
     session.commit()
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     logger.info("Deleted a mapping rule", extra={"rule_id": rule_id})
     return {"message": "Rule deleted successfully"}
 
@@ -178,6 +181,7 @@ def update_rule(
         existing_rule.rows = rule.rows
     session.commit()
     session.refresh(existing_rule)
+    get_enrichment_rules_cache().invalidate(authenticated_entity.tenant_id)
     response = MappingRuleDtoOut(**existing_rule.dict())
     if rule.rows is not None:
         response.attributes = [
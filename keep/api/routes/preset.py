@@ -1,7 +1,6 @@
 import logging
 import os
 import uuid
-from datetime import datetime
 
 from fastapi import (
     APIRouter,
@@ -14,14 +13,11 @@ from fastapi import (
 from pydantic import BaseModel
 from sqlmodel import Session, select
 
-from keep.api.consts import PROVIDER_PULL_INTERVAL_MINUTE, STATIC_PRESETS
+from keep.api.consts import STATIC_PRESETS
 from keep.api.core.db import get_db_preset_by_name
 from keep.api.core.db import get_presets as get_presets_db
-from keep.api.core.db import (
-    get_session,
-    update_preset_options,
-    update_provider_last_pull_time,
-)
+from keep.api.core.db import get_session, update_preset_options
+from keep.api.core.preset_counters import get_preset_counters
 from keep.api.models.alert import AlertDto
 from keep.api.models.db.preset import (
     Preset,
@@ -32,12 +28,9 @@ from keep.api.models.db.preset import (
     TagDto,
 )
 from keep.api.models.time_stamp import TimeStampFilter, _get_time_stamp_filter
-from keep.api.tasks.process_event_task import process_event
-from keep.api.tasks.process_incident_task import process_incident
-from keep.api.tasks.process_topology_task import process_topology
+from keep.api.tasks.pull_providers_task import get_providers_pull_scheduler
 from keep.identitymanager.authenticatedentity import AuthenticatedEntity
 from keep.identitymanager.identitymanagerfactory import IdentityManagerFactory
-from keep.providers.base.base_provider import BaseIncidentProvider, BaseTopologyProvider
 from keep.providers.providers_factory import ProvidersFactory
 from keep.searchengine.searchengine import SearchEngine
 
@@ -73,121 +66,8 @@ def pull_data_from_providers(
         },
     )
 
-    for provider in providers:
-        extra = {
-            "provider_type": provider.type,
-            "provider_id": provider.id,
-            "tenant_id": tenant_id,
-            "trace_id": trace_id,
-        }
-
-        if not provider.pulling_enabled:
-            logger.debug("Pulling is disabled for this provider", extra=extra)
-            continue
-
-        if provider.last_pull_time is not None:
-            now = datetime.now()
-            minutes_passed = (now - provider.last_pull_time).total_seconds() / 60
-            if minutes_passed <= PROVIDER_PULL_INTERVAL_MINUTE:
-                logger.info(
-                    "Skipping provider data pulling since not enough time has passed",
-                    extra={
-                        **extra,
-                        "minutes_passed": minutes_passed,
-                        "provider_last_pull_time": str(provider.last_pull_time),
-                    },
-                )
-                continue
-
-        try:
-            logger.info(
-                f"Pulling alerts from provider {provider.type} ({provider.id})",
-                extra=extra,
-            )
-            # Even if we failed at processing some event, lets save the last pull time to not iterate this process over and over again.
-            update_provider_last_pull_time(tenant_id=tenant_id, provider_id=provider.id)
-
-            provider_class = ProvidersFactory.get_installed_provider(
-                tenant_id=tenant_id,
-                provider_id=provider.id,
-                provider_type=provider.type,
-            )
-            sorted_provider_alerts_by_fingerprint = (
-                provider_class.get_alerts_by_fingerprint(tenant_id=tenant_id)
-            )
-            logger.info(
-                f"Pulling alerts from provider {provider.type} ({provider.id}) completed",
-                extra=extra,
-            )
+    get_providers_pull_scheduler().pull(tenant_id, trace_id, providers)
 
-            # TODO: this should be moved somewhere else (@tb: too much logic in this function, wil handle it another time.)
-            if isinstance(provider_class, BaseIncidentProvider):
-                try:
-                    incidents = provider_class.get_incidents()
-                    process_incident(
-                        {},
-                        tenant_id=tenant_id,
-                        provider_id=provider.id,
-                        provider_type=provider.type,
-                        incidents=incidents,
-                        trace_id=trace_id,
-                    )
-                except NotImplementedError:
-                    logger.debug(
-                        f"Provider {provider.type} ({provider.id}) does not implement pulling incidents",
-                        extra=extra,
-                    )
-                except Exception:
-                    logger.exception(
-                        f"Unknown error pulling incidents from provider {provider.type} ({provider.id})",
-                        extra={**extra, "trace_id": trace_id},
-                    )
-            else:
-                logger.debug(
-                    f"Provider {provider.type} ({provider.id}) does not implement pulling incidents",
-                    extra=extra,
-                )
-
-            try:
-                if isinstance(provider_class, BaseTopologyProvider):
-                    logger.info("Pulling topology data", extra=extra)
-                    topology_data, _ = provider_class.pull_topology()
-                    logger.info(
-                        "Pulling topology data finished, processing",
-                        extra={**extra, "topology_length": len(topology_data)},
-                    )
-                    process_topology(
-                        tenant_id, topology_data, provider.id, provider.type
-                    )
-                    logger.info("Finished processing topology data", extra=extra)
-            except NotImplementedError:
-                logger.debug(
-                    f"Provider {provider.type} ({provider.id}) does not implement pulling topology data",
-                    extra=extra,
-                )
-            except Exception as e:
-                logger.exception(
-                    f"Unknown error pulling topology from provider {provider.type} ({provider.id})",
-                    extra={**extra, "exception": str(e)},
-                )
-
-            for fingerprint, alert in sorted_provider_alerts_by_fingerprint.items():
-                process_event(
-                    {},
-                    tenant_id,
-                    provider.type,
-                    provider.id,
-                    fingerprint,
-                    None,
-                    trace_id,
-                    alert,
-                    notify_client=False,
-                )
-        except Exception as e:
-            logger.exception(
-                f"Unknown error pulling from provider {provider.type} ({provider.id})",
-                extra={**extra, "exception": str(e)},
-            )
     logger.info(
         "Pulling data from providers completed",
         extra={
@@ -230,9 +110,21 @@ def get_presets(
     presets_dto = [PresetDto(**preset.to_dict()) for preset in presets]
     # add static presets (unless allowed_preset_ids is set)
     if not allowed_preset_ids:
-        presets_dto.append(STATIC_PRESETS["feed"])
+        presets_dto.append(STATIC_PRESETS["feed"].copy())
     logger.info("Got all presets")
 
+    # the counters are maintained by the ingestion and seeded in the background, the
+    # presets that are not seeded yet are left uncounted
+    if get_preset_counters().enabled:
+        try:
+            SearchEngine(tenant_id=tenant_id).search_preset_alerts(
+                presets_dto, time_stamp, counters_only=True
+            )
+        except Exception:
+            logger.exception(
+                "Failed to count the presets alerts", extra={"tenant_id": tenant_id}
+            )
+
     return presets_dto
 
 
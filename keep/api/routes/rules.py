@@ -13,6 +13,7 @@ from keep.api.core.db import update_rule as update_rule_db
 from keep.api.models.db.rule import CreateIncidentOn, ResolveOn
 from keep.identitymanager.authenticatedentity import AuthenticatedEntity
 from keep.identitymanager.identitymanagerfactory import IdentityManagerFactory
+from keep.rulesengine.rulesengine import get_rules_program_cache
 
 router = APIRouter()
 
@@ -148,6 +149,7 @@ async def create_rule(
         threshold=threshold,
         assignee=assignee,
     )
+    get_rules_program_cache().invalidate(tenant_id, rule.id)
     logger.info("Rule created")
     return rule
 
@@ -166,6 +168,7 @@ async def delete_rule(
     tenant_id = authenticated_entity.tenant_id
     logger.info(f"Deleting rule {rule_id}")
     if delete_rule_db(tenant_id=tenant_id, rule_id=rule_id):
+        get_rules_program_cache().invalidate(tenant_id, rule_id)
         logger.info(f"Rule {rule_id} deleted")
         return {"message": "Rule deleted"}
     else:
@@ -264,6 +267,7 @@ async def update_rule(
     )
 
     if rule:
+        get_rules_program_cache().invalidate(tenant_id, rule_id)
         logger.info(f"Rule {rule_id} updated")
         return rule
     else:
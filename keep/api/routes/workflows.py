@@ -80,6 +80,7 @@ PLATFORM_URL = config("KEEP_PLATFORM_URL", default="https://platform.keephq.dev"
 )
 def fetch_facet_options(
     facet_options_query: FacetOptionsQueryDto,
+    response: Response,
     authenticated_entity: AuthenticatedEntity = Depends(
         IdentityManagerFactory.get_auth_verifier(["read:workflows"])
     ),
@@ -113,6 +114,12 @@ def fetch_facet_options(
         },
     )
 
+    if facet_options.partial_facet_ids:
+        # the facets whose query didn't finish in time have no options
+        response.headers["X-Partial-Facets"] = ",".join(
+            sorted(facet_options.partial_facet_ids)
+        )
+
     return facet_options
 
 
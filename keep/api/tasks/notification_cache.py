@@ -1,10 +1,29 @@
+"""
+Debouncing of the Pusher events that tell the clients to refetch.
+
+Each tenant gets at most one event of each type per POLLING_INTERVAL seconds. When Redis
+is enabled (REDIS=true) the debounce is shared by all the processes through the Redis
+connection configured in keep/api/redis_settings.py, otherwise it is per process.
+
+The payloads of the suppressed events (e.g. the names of the presets that changed) are
+kept and merged into the next event that goes out.
+"""
+
+import logging
 import os
+import threading
 import time
-from typing import Dict, Tuple
+from typing import Dict, Set, Tuple
+
+from keep.api.consts import REDIS
 
 # Get polling interval from env
 POLLING_INTERVAL = int(os.getenv("PUSHER_POLLING_INTERVAL", "15"))
 
+REDIS_KEY_PREFIX = "keep:notification"
+# the pending payloads of a tenant that stopped getting events are dropped eventually
+PENDING_PAYLOAD_TTL = POLLING_INTERVAL * 4
+
 
 class NotificationCache:
     _instance = None
@@ -17,24 +36,105 @@ class NotificationCache:
 
     def __init__(self):
         if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
             self.cache: Dict[Tuple[str, str], float] = {}
+            # (tenant_id, event_type) -> payload items of the suppressed events
+            self.pending: Dict[Tuple[str, str], Set[str]] = {}
+            self._lock = threading.Lock()
+            self.redis = None
+            if REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
             self.__initialized = True
 
+    @staticmethod
+    def _redis_key(tenant_id: str, event_type: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}:{event_type}"
+
     def should_notify(self, tenant_id: str, event_type: str) -> bool:
+        if self.redis is not None:
+            try:
+                # only the first process in the interval gets to set the key
+                return bool(
+                    self.redis.set(
+                        self._redis_key(tenant_id, event_type),
+                        1,
+                        nx=True,
+                        ex=POLLING_INTERVAL,
+                    )
+                )
+            except Exception:
+                self.logger.exception(
+                    "Failed to debounce notification with Redis, using the local cache"
+                )
+
         cache_key = (tenant_id, event_type)
         current_time = time.time()
 
-        if cache_key not in self.cache:
-            self.cache[cache_key] = current_time
-            return True
+        with self._lock:
+            if cache_key not in self.cache:
+                self.cache[cache_key] = current_time
+                return True
 
-        last_time = self.cache[cache_key]
-        if current_time - last_time >= POLLING_INTERVAL:
-            self.cache[cache_key] = current_time
-            return True
+            last_time = self.cache[cache_key]
+            if current_time - last_time >= POLLING_INTERVAL:
+                self.cache[cache_key] = current_time
+                return True
 
         return False
 
+    def coalesce(
+        self, tenant_id: str, event_type: str, items: list[str]
+    ) -> list[str] | None:
+        """
+        Debounce an event whose payload is a list of items.
+
+        Returns:
+            list[str] | None: None if the event is suppressed, its items are then merged
+                into the next event. Otherwise the items of this event and of the events
+                suppressed since the last one.
+        """
+        if self.redis is not None:
+            try:
+                return self._coalesce_redis(tenant_id, event_type, items)
+            except Exception:
+                self.logger.exception(
+                    "Failed to coalesce notification with Redis, using the local cache"
+                )
+
+        cache_key = (tenant_id, event_type)
+        with self._lock:
+            self.pending.setdefault(cache_key, set()).update(items)
+        if not self.should_notify(tenant_id, event_type):
+            return None
+        with self._lock:
+            return sorted(self.pending.pop(cache_key, set()))
+
+    def _coalesce_redis(
+        self, tenant_id: str, event_type: str, items: list[str]
+    ) -> list[str] | None:
+        key = self._redis_key(tenant_id, event_type)
+        pending_key = f"{key}:pending"
+        if items:
+            pipeline = self.redis.pipeline(transaction=True)
+            pipeline.sadd(pending_key, *items)
+            pipeline.expire(pending_key, PENDING_PAYLOAD_TTL)
+            pipeline.execute()
+        if not self.redis.set(key, 1, nx=True, ex=POLLING_INTERVAL):
+            return None
+        # read and clear the pending items at once, so none added meanwhile is lost
+        pipeline = self.redis.pipeline(transaction=True)
+        pipeline.smembers(pending_key)
+        pipeline.delete(pending_key)
+        pending_items, _ = pipeline.execute()
+        return sorted(pending_items)
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self.pending.clear()
+
 
 # Get singleton instance
 def get_notification_cache() -> NotificationCache:
@@ -14,6 +14,7 @@ import dateutil
 from arq import Retry
 from fastapi.datastructures import FormData
 from opentelemetry import trace
+from pusher import Pusher
 from sqlmodel import Session
 
 # internals
@@ -22,28 +23,35 @@ from keep.api.bl.enrichments_bl import EnrichmentsBl
 from keep.api.bl.incidents_bl import IncidentBl
 from keep.api.bl.maintenance_windows_bl import MaintenanceWindowsBl
 from keep.api.core.db import (
+    bulk_insert_alerts,
+    bulk_set_last_alerts,
     bulk_upsert_alert_fields,
     enrich_alerts_with_incidents,
     get_alerts_by_fingerprint,
     get_all_presets_dtos,
     get_enrichment_with_session,
-    get_last_alert_hashes_by_fingerprints,
+    get_enrichments,
+    get_latest_alerts_by_fingerprints,
     get_session_sync,
     get_started_at_for_alerts,
     set_last_alert,
 )
 from keep.api.core.dependencies import get_pusher_client
 from keep.api.core.elastic import ElasticClient
+from keep.api.core.elastic_indexer import get_elastic_indexer
+from keep.api.core.facet_options_cache import get_facet_options_cache
 from keep.api.core.metrics import (
     events_error_counter,
     events_in_counter,
     events_out_counter,
     processing_time_summary,
 )
+from keep.api.core.preset_counters import PresetCounters, get_preset_counters
 from keep.api.models.action_type import ActionType
 from keep.api.models.alert import AlertDto, AlertStatus
 from keep.api.models.db.alert import Alert, AlertAudit, AlertRaw
 from keep.api.models.db.incident import IncidentStatus
+from keep.api.models.db.preset import PresetDto
 from keep.api.models.incident import IncidentDto
 from keep.api.tasks.notification_cache import get_notification_cache
 from keep.api.utils.alert_utils import sanitize_alert
@@ -54,8 +62,10 @@ from keep.api.utils.enrichment_helpers import (
     convert_db_alerts_to_dto_alerts,
     calculated_unresolved_counter,
 )
+from keep.api.utils.pusher_utils import trigger_in_chunks
 from keep.providers.providers_factory import ProvidersFactory
 from keep.rulesengine.rulesengine import RulesEngine
+from keep.topologies.topology_alert_changes import get_topology_alert_changes
 from keep.workflowmanager.workflowmanager import WorkflowManager
 
 TIMES_TO_RETRY_JOB = 5  # the number of times to retry the job in case of failure
@@ -74,6 +84,14 @@ KEEP_AUDIT_EVENTS_ENABLED = (
 KEEP_CALCULATE_START_FIRING_TIME_ENABLED = (
     os.environ.get("KEEP_CALCULATE_START_FIRING_TIME_ENABLED", "true") == "true"
 )
+# write each batch of alerts with multi-row statements and a single commit
+KEEP_BULK_SAVE_TO_DB_ENABLED = (
+    os.environ.get("KEEP_BULK_SAVE_TO_DB_ENABLED", "false") == "true"
+)
+# send the changed alerts and presets counters to the clients, on top of the poll events
+KEEP_PUSHER_DELTA_EVENTS_ENABLED = (
+    os.environ.get("KEEP_PUSHER_DELTA_EVENTS_ENABLED", "false") == "true"
+)
 
 logger = logging.getLogger(__name__)
 
@@ -126,6 +144,242 @@ def __validate_last_received(event):
             ).isoformat()
 
 
+def __prepare_alert(
+    tenant_id,
+    provider_type,
+    formatted_event: AlertDto,
+    enrichments_bl: EnrichmentsBl,
+    started_at: datetime.datetime | None,
+    previous_alert: list[AlertDto] | None,
+    provider_id: str | None = None,
+    timestamp_forced: datetime.datetime | None = None,
+) -> tuple[AlertDto, Alert]:
+    """
+    Calculate the alert fields that depend on the previous alert, run the extraction
+    rules and build the alert row.
+    """
+    formatted_event.pushed = True
+
+    if started_at:
+        formatted_event.startedAt = str(started_at)
+
+    if KEEP_CALCULATE_START_FIRING_TIME_ENABLED:
+        # calculate startFiring time
+        formatted_event.firingStartTime = calculated_start_firing_time(
+            formatted_event, previous_alert
+        )
+        formatted_event.firingStartTimeSinceLastResolved = (
+            calculate_firing_time_since_last_resolved(formatted_event, previous_alert)
+        )
+
+        # we now need to update the firing and unresolved counters
+        formatted_event.firingCounter = calculated_firing_counter(
+            formatted_event, previous_alert
+        )
+
+        formatted_event.unresolvedCounter = calculated_unresolved_counter(
+            formatted_event, previous_alert
+        )
+
+    # Dispose enrichments that needs to be disposed
+    try:
+        enrichments_bl.dispose_enrichments(formatted_event.fingerprint)
+    except Exception:
+        logger.exception(
+            "Failed to dispose enrichments",
+            extra={
+                "tenant_id": tenant_id,
+                "fingerprint": formatted_event.fingerprint,
+            },
+        )
+
+    # Post format enrichment
+    try:
+        formatted_event = enrichments_bl.run_extraction_rules(formatted_event)
+    except Exception:
+        logger.exception(
+            "Failed to run post-formatting extraction rules",
+            extra={
+                "tenant_id": tenant_id,
+                "fingerprint": formatted_event.fingerprint,
+            },
+        )
+
+    __validate_last_received(formatted_event)
+
+    alert_args = {
+        "tenant_id": tenant_id,
+        "provider_type": (
+            provider_type if provider_type else formatted_event.source[0]
+        ),
+        "event": formatted_event.dict(),
+        "provider_id": provider_id,
+        "fingerprint": formatted_event.fingerprint,
+        "alert_hash": formatted_event.alert_hash,
+    }
+    alert_args = sanitize_alert(alert_args)
+    if timestamp_forced is not None:
+        alert_args["timestamp"] = timestamp_forced
+
+    return formatted_event, Alert(**alert_args)
+
+
+def __alert_audit(tenant_id, formatted_event: AlertDto) -> AlertAudit:
+    return AlertAudit(
+        tenant_id=tenant_id,
+        fingerprint=formatted_event.fingerprint,
+        action=(
+            ActionType.AUTOMATIC_RESOLVE.value
+            if formatted_event.status == AlertStatus.RESOLVED.value
+            else ActionType.TIGGERED.value
+        ),
+        user_id="system",
+        description=f"Alert recieved from provider with status {formatted_event.status}",
+    )
+
+
+def __apply_enrichment(formatted_event: AlertDto, alert_enrichment):
+    if alert_enrichment:
+        for enrichment in alert_enrichment.enrichments:
+            # set the enrichment
+            value = alert_enrichment.enrichments[enrichment]
+            if isinstance(value, str):
+                value = value.strip()
+            setattr(formatted_event, enrichment, value)
+
+
+def __save_alerts(
+    tenant_id,
+    provider_type,
+    session: Session,
+    formatted_events: list[AlertDto],
+    enrichments_bl: EnrichmentsBl,
+    started_at_for_fingerprints: dict,
+    provider_id: str | None = None,
+    timestamp_forced: datetime.datetime | None = None,
+) -> tuple[list[AlertDto], list[Alert]]:
+    enriched_formatted_events = []
+    saved_alerts = []
+    for formatted_event in formatted_events:
+        previous_alert = None
+        if KEEP_CALCULATE_START_FIRING_TIME_ENABLED:
+            previous_alert = get_alerts_by_fingerprint(
+                tenant_id=tenant_id,
+                fingerprint=formatted_event.fingerprint,
+                limit=1,
+            )
+            previous_alert = convert_db_alerts_to_dto_alerts(previous_alert)
+
+        formatted_event, alert = __prepare_alert(
+            tenant_id,
+            provider_type,
+            formatted_event,
+            enrichments_bl,
+            started_at_for_fingerprints.get(formatted_event.fingerprint, None),
+            previous_alert,
+            provider_id=provider_id,
+            timestamp_forced=timestamp_forced,
+        )
+        session.add(alert)
+        session.flush()
+        saved_alerts.append(alert)
+        alert_id = alert.id
+        formatted_event.event_id = str(alert_id)
+
+        if KEEP_AUDIT_EVENTS_ENABLED:
+            session.add(__alert_audit(tenant_id, formatted_event))
+
+        session.commit()
+        session.flush()
+        set_last_alert(tenant_id, alert, session=session)
+
+        # Mapping
+        try:
+            enrichments_bl.run_mapping_rules(formatted_event)
+        except Exception:
+            logger.exception("Failed to run mapping rules")
+
+        alert_enrichment = get_enrichment_with_session(
+            session=session,
+            tenant_id=tenant_id,
+            fingerprint=formatted_event.fingerprint,
+        )
+        __apply_enrichment(formatted_event, alert_enrichment)
+        enriched_formatted_events.append(formatted_event)
+    return enriched_formatted_events, saved_alerts
+
+
+def __bulk_save_alerts(
+    tenant_id,
+    provider_type,
+    session: Session,
+    formatted_events: list[AlertDto],
+    enrichments_bl: EnrichmentsBl,
+    started_at_for_fingerprints: dict,
+    provider_id: str | None = None,
+    timestamp_forced: datetime.datetime | None = None,
+) -> tuple[list[AlertDto], list[Alert]]:
+    """
+    Same as __save_alerts, but the alerts, audits and last alerts of the whole batch
+    are written with one multi-row statement each and a single commit, and the
+    previous alerts and enrichments are read with one query each.
+    """
+    fingerprints = list({event.fingerprint for event in formatted_events})
+    previous_alerts = {}
+    if KEEP_CALCULATE_START_FIRING_TIME_ENABLED:
+        previous_alerts = {
+            fingerprint: convert_db_alerts_to_dto_alerts([alert])
+            for fingerprint, alert in get_latest_alerts_by_fingerprints(
+                tenant_id, fingerprints, session=session
+            ).items()
+        }
+
+    prepared_events = []
+    saved_alerts = []
+    audits = []
+    for formatted_event in formatted_events:
+        formatted_event, alert = __prepare_alert(
+            tenant_id,
+            provider_type,
+            formatted_event,
+            enrichments_bl,
+            started_at_for_fingerprints.get(formatted_event.fingerprint, None),
+            previous_alerts.get(formatted_event.fingerprint),
+            provider_id=provider_id,
+            timestamp_forced=timestamp_forced,
+        )
+        formatted_event.event_id = str(alert.id)
+        # the next alerts of the same fingerprint in this batch follow this one
+        previous_alerts[formatted_event.fingerprint] = [formatted_event]
+        prepared_events.append(formatted_event)
+        saved_alerts.append(alert)
+        if KEEP_AUDIT_EVENTS_ENABLED:
+            audits.append(__alert_audit(tenant_id, formatted_event))
+
+    bulk_insert_alerts(saved_alerts, audits, session=session)
+    # commits the alerts and audits too
+    bulk_set_last_alerts(tenant_id, saved_alerts, session=session)
+
+    # Mapping
+    for formatted_event in prepared_events:
+        try:
+            enrichments_bl.run_mapping_rules(formatted_event)
+        except Exception:
+            logger.exception("Failed to run mapping rules")
+
+    alert_enrichments = {
+        alert_enrichment.alert_fingerprint: alert_enrichment
+        for alert_enrichment in get_enrichments(
+            tenant_id, fingerprints, session=session
+        )
+    }
+    for formatted_event in prepared_events:
+        __apply_enrichment(
+            formatted_event, alert_enrichments.get(formatted_event.fingerprint)
+        )
+    return prepared_events, saved_alerts
+
+
 def __save_to_db(
     tenant_id,
     provider_type,
@@ -176,133 +430,33 @@ def __save_to_db(
                     action_description="Alert lastReceived enriched on deduplication",
                 )
 
-        enriched_formatted_events = []
-        saved_alerts = []
-
         fingerprints = [event.fingerprint for event in formatted_events]
         started_at_for_fingerprints = get_started_at_for_alerts(
             tenant_id, fingerprints, session=session
         )
 
-        for formatted_event in formatted_events:
-            formatted_event.pushed = True
-
-            started_at = started_at_for_fingerprints.get(
-                formatted_event.fingerprint, None
+        if KEEP_BULK_SAVE_TO_DB_ENABLED:
+            enriched_formatted_events, saved_alerts = __bulk_save_alerts(
+                tenant_id,
+                provider_type,
+                session,
+                formatted_events,
+                enrichments_bl,
+                started_at_for_fingerprints,
+                provider_id=provider_id,
+                timestamp_forced=timestamp_forced,
             )
-            if started_at:
-                formatted_event.startedAt = str(started_at)
-
-            if KEEP_CALCULATE_START_FIRING_TIME_ENABLED:
-                # calculate startFiring time
-                previous_alert = get_alerts_by_fingerprint(
-                    tenant_id=tenant_id,
-                    fingerprint=formatted_event.fingerprint,
-                    limit=1,
-                )
-                previous_alert = convert_db_alerts_to_dto_alerts(previous_alert)
-                formatted_event.firingStartTime = calculated_start_firing_time(
-                    formatted_event, previous_alert
-                )
-                formatted_event.firingStartTimeSinceLastResolved = (
-                    calculate_firing_time_since_last_resolved(
-                        formatted_event, previous_alert
-                    )
-                )
-
-                # we now need to update the firing and unresolved counters
-                formatted_event.firingCounter = calculated_firing_counter(
-                    formatted_event, previous_alert
-                )
-
-                formatted_event.unresolvedCounter = calculated_unresolved_counter(
-                    formatted_event, previous_alert
-                )
-
-            # Dispose enrichments that needs to be disposed
-            try:
-                enrichments_bl.dispose_enrichments(formatted_event.fingerprint)
-            except Exception:
-                logger.exception(
-                    "Failed to dispose enrichments",
-                    extra={
-                        "tenant_id": tenant_id,
-                        "fingerprint": formatted_event.fingerprint,
-                    },
-                )
-
-            # Post format enrichment
-            try:
-                formatted_event = enrichments_bl.run_extraction_rules(formatted_event)
-            except Exception:
-                logger.exception(
-                    "Failed to run post-formatting extraction rules",
-                    extra={
-                        "tenant_id": tenant_id,
-                        "fingerprint": formatted_event.fingerprint,
-                    },
-                )
-
-            __validate_last_received(formatted_event)
-
-            alert_args = {
-                "tenant_id": tenant_id,
-                "provider_type": (
-                    provider_type if provider_type else formatted_event.source[0]
-                ),
-                "event": formatted_event.dict(),
-                "provider_id": provider_id,
-                "fingerprint": formatted_event.fingerprint,
-                "alert_hash": formatted_event.alert_hash,
-            }
-            alert_args = sanitize_alert(alert_args)
-            if timestamp_forced is not None:
-                alert_args["timestamp"] = timestamp_forced
-
-            alert = Alert(**alert_args)
-            session.add(alert)
-            session.flush()
-            saved_alerts.append(alert)
-            alert_id = alert.id
-            formatted_event.event_id = str(alert_id)
-
-            if KEEP_AUDIT_EVENTS_ENABLED:
-                audit = AlertAudit(
-                    tenant_id=tenant_id,
-                    fingerprint=formatted_event.fingerprint,
-                    action=(
-                        ActionType.AUTOMATIC_RESOLVE.value
-                        if formatted_event.status == AlertStatus.RESOLVED.value
-                        else ActionType.TIGGERED.value
-                    ),
-                    user_id="system",
-                    description=f"Alert recieved from provider with status {formatted_event.status}",
-                )
-                session.add(audit)
-
-            session.commit()
-            session.flush()
-            set_last_alert(tenant_id, alert, session=session)
-
-            # Mapping
-            try:
-                enrichments_bl.run_mapping_rules(formatted_event)
-            except Exception:
-                logger.exception("Failed to run mapping rules")
-
-            alert_enrichment = get_enrichment_with_session(
-                session=session,
-                tenant_id=tenant_id,
-                fingerprint=formatted_event.fingerprint,
+        else:
+            enriched_formatted_events, saved_alerts = __save_alerts(
+                tenant_id,
+                provider_type,
+                session,
+                formatted_events,
+                enrichments_bl,
+                started_at_for_fingerprints,
+                provider_id=provider_id,
+                timestamp_forced=timestamp_forced,
             )
-            if alert_enrichment:
-                for enrichment in alert_enrichment.enrichments:
-                    # set the enrichment
-                    value = alert_enrichment.enrichments[enrichment]
-                    if isinstance(value, str):
-                        value = value.strip()
-                    setattr(formatted_event, enrichment, value)
-            enriched_formatted_events.append(formatted_event)
 
         logger.info("Checking for incidents to resolve", extra={"tenant_id": tenant_id})
         try:
@@ -357,6 +511,40 @@ def __save_to_db(
         raise
 
 
+def __update_presets(
+    tenant_id, enriched_formatted_events: list[AlertDto]
+) -> list[PresetDto]:
+    """
+    Get the presets the new alerts are related to and update their counters.
+    """
+    presets = get_all_presets_dtos(tenant_id)
+    rules_engine = RulesEngine(tenant_id=tenant_id)
+    preset_counters = get_preset_counters()
+    # performance optimization: get the alerts activation once
+    alerts_activation = rules_engine.get_alerts_activation(enriched_formatted_events)
+    presets_matching_alerts = [
+        # filter the alerts based on the search query
+        (
+            preset_dto,
+            rules_engine.filter_alerts(
+                enriched_formatted_events, preset_dto.cel_query, alerts_activation
+            ),
+        )
+        for preset_dto in presets
+    ]
+    # alerts that stopped matching a preset change its counters too
+    counters_changed = preset_counters.update(
+        tenant_id, enriched_formatted_events, presets_matching_alerts
+    )
+    presets_do_update = [
+        preset_dto
+        for preset_dto, filtered_alerts in presets_matching_alerts
+        # if not related alerts, no need to update
+        if filtered_alerts or str(preset_dto.id) in counters_changed
+    ]
+    return presets_do_update
+
+
 def __handle_formatted_events(
     tenant_id,
     provider_type,
@@ -426,14 +614,10 @@ def __handle_formatted_events(
         deduplication_rules = alert_deduplicator.get_deduplication_rules(
             tenant_id=tenant_id, provider_id=provider_id, provider_type=provider_type
         )
-        last_alerts_fingerprint_to_hash = get_last_alert_hashes_by_fingerprints(
-            tenant_id, [event.fingerprint for event in formatted_events]
+        # apply_deduplication_batch set alert_hash and isDuplicate on the events
+        alert_deduplicator.apply_deduplication_batch(
+            formatted_events, deduplication_rules
         )
-        for event in formatted_events:
-            # apply_deduplication set alert_hash and isDuplicate on event
-            event = alert_deduplicator.apply_deduplication(
-                event, deduplication_rules, last_alerts_fingerprint_to_hash
-            )
 
         # filter out the deduplicated events
         deduplicated_events = list(
@@ -456,6 +640,20 @@ def __handle_formatted_events(
             timestamp_forced,
         )
 
+    if enriched_formatted_events:
+        # the cached facet options don't count the new alerts
+        get_facet_options_cache().bump_version(tenant_id, "alert")
+        topology_alert_changes = get_topology_alert_changes()
+        if topology_alert_changes.enabled:
+            try:
+                # only the applications of these alerts' services are re-evaluated
+                topology_alert_changes.add(tenant_id, enriched_formatted_events)
+            except Exception:
+                logger.exception(
+                    "Failed to record the alert changes for the topology processor",
+                    extra={"tenant_id": tenant_id},
+                )
+
     # let's save all fields to the DB so that we can use them in the future such in deduplication fields suggestions
     # todo: also use it on correlation rules suggestions
     if KEEP_ALERT_FIELDS_ENABLED:
@@ -495,30 +693,28 @@ def __handle_formatted_events(
     # after the alert enriched and mapped, lets send it to the elasticsearch
     with tracer.start_as_current_span("process_event_push_to_elasticsearch"):
         elastic_client = ElasticClient(tenant_id=tenant_id)
-        if elastic_client.enabled:
-            for alert in enriched_formatted_events:
-                try:
-                    logger.debug(
-                        "Pushing alert to elasticsearch",
-                        extra={
-                            "alert_event_id": alert.event_id,
-                            "alert_fingerprint": alert.fingerprint,
-                        },
-                    )
-                    elastic_client.index_alert(
-                        alert=alert,
-                    )
-                except Exception:
-                    logger.exception(
-                        "Failed to push alerts to elasticsearch",
-                        extra={
-                            "provider_type": provider_type,
-                            "num_of_alerts": len(formatted_events),
-                            "provider_id": provider_id,
-                            "tenant_id": tenant_id,
-                        },
-                    )
-                    continue
+        if elastic_client.enabled and enriched_formatted_events:
+            try:
+                logger.debug(
+                    "Pushing alerts to elasticsearch",
+                    extra={"num_of_alerts": len(enriched_formatted_events)},
+                )
+                elastic_indexer = get_elastic_indexer()
+                if elastic_indexer.enabled:
+                    # indexed in bulk by the indexer's thread
+                    elastic_indexer.enqueue(tenant_id, enriched_formatted_events)
+                else:
+                    elastic_client.index_alerts(alerts=enriched_formatted_events)
+            except Exception:
+                logger.exception(
+                    "Failed to push alerts to elasticsearch",
+                    extra={
+                        "provider_type": provider_type,
+                        "num_of_alerts": len(formatted_events),
+                        "provider_id": provider_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
 
     with tracer.start_as_current_span("process_event_push_to_workflows"):
         try:
@@ -561,8 +757,26 @@ def __handle_formatted_events(
                     },
                 )
 
+    pusher_client = get_pusher_client() if notify_client else None
+    presets_do_update = []
+    if pusher_client or get_preset_counters().enabled:
+        with tracer.start_as_current_span("process_event_update_presets"):
+            try:
+                presets_do_update = __update_presets(
+                    tenant_id, enriched_formatted_events
+                )
+            except Exception:
+                logger.exception(
+                    "Failed to update presets",
+                    extra={
+                        "provider_type": provider_type,
+                        "num_of_alerts": len(formatted_events),
+                        "provider_id": provider_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
+
     with tracer.start_as_current_span("process_event_notify_client"):
-        pusher_client = get_pusher_client() if notify_client else None
         if not pusher_client:
             return
         # Get the notification cache
@@ -592,43 +806,93 @@ def __handle_formatted_events(
                 logger.exception("Failed to tell the client to pull incidents")
 
         # Now we need to update the presets
-        # send with pusher
+        # send with pusher, along with the presets updated by the suppressed events
+        presets_to_notify = pusher_cache.coalesce(
+            tenant_id, "poll-presets", [p.name.lower() for p in presets_do_update]
+        )
+        if presets_to_notify is not None:
+            try:
+                pusher_client.trigger(
+                    f"private-{tenant_id}",
+                    "poll-presets",
+                    json.dumps(presets_to_notify, default=str),
+                )
+            except Exception:
+                logger.exception("Failed to send presets via pusher")
+
+        if KEEP_PUSHER_DELTA_EVENTS_ENABLED:
+            __notify_client_delta(
+                pusher_client, tenant_id, enriched_formatted_events, presets_do_update
+            )
+    return enriched_formatted_events
+
 
+def __notify_client_delta(
+    pusher_client: Pusher,
+    tenant_id: str,
+    enriched_formatted_events: list[AlertDto],
+    presets_do_update: list[PresetDto],
+):
+    """
+    Send the fingerprints of the changed alerts and the counters of the updated presets,
+    so the clients can patch their state instead of re-fetching it.
+
+    The deltas are coalesced like poll-presets: at most one of each per tenant per
+    POLLING_INTERVAL, with the fingerprints and presets of the suppressed ones.
+    """
+    channel = f"private-{tenant_id}"
+    pusher_cache = get_notification_cache()
+    fingerprints = pusher_cache.coalesce(
+        tenant_id,
+        "alerts-delta",
+        list(dict.fromkeys(alert.fingerprint for alert in enriched_formatted_events)),
+    )
+    if fingerprints:
         try:
-            presets = get_all_presets_dtos(tenant_id)
-            rules_engine = RulesEngine(tenant_id=tenant_id)
-            presets_do_update = []
-            for preset_dto in presets:
-                # filter the alerts based on the search query
-                filtered_alerts = rules_engine.filter_alerts(
-                    enriched_formatted_events, preset_dto.cel_query
-                )
-                # if not related alerts, no need to update
-                if not filtered_alerts:
-                    continue
-                presets_do_update.append(preset_dto)
-            if pusher_cache.should_notify(tenant_id, "poll-presets"):
-                try:
-                    pusher_client.trigger(
-                        f"private-{tenant_id}",
-                        "poll-presets",
-                        json.dumps(
-                            [p.name.lower() for p in presets_do_update], default=str
-                        ),
-                    )
-                except Exception:
-                    logger.exception("Failed to send presets via pusher")
+            trigger_in_chunks(
+                pusher_client, channel, "alerts-delta", "fingerprints", fingerprints
+            )
         except Exception:
-            logger.exception(
-                "Failed to send presets via pusher",
-                extra={
-                    "provider_type": provider_type,
-                    "num_of_alerts": len(formatted_events),
-                    "provider_id": provider_id,
-                    "tenant_id": tenant_id,
-                },
+            logger.exception("Failed to send alerts delta via pusher")
+
+    preset_ids = pusher_cache.coalesce(
+        tenant_id, "presets-delta", [str(preset.id) for preset in presets_do_update]
+    )
+    if not preset_ids:
+        return
+    try:
+        # the presets updated by the suppressed events are sent with their current counters
+        presets_to_notify = [
+            # static presets are shared, don't set their counters in place
+            preset.copy()
+            for preset in get_all_presets_dtos(tenant_id)
+            if str(preset.id) in preset_ids
+        ]
+        # the ingestion doesn't wait for the presets to be seeded
+        counters = get_preset_counters().get_counters(
+            tenant_id, presets_to_notify, wait_for_seed=False
+        )
+        presets = []
+        for preset in presets_to_notify:
+            counter = counters.get(str(preset.id))
+            # without counters, the clients re-fetch the preset on poll-presets
+            if counter is None:
+                continue
+            PresetCounters.apply(preset, counter)
+            presets.append(
+                {
+                    "id": str(preset.id),
+                    "name": preset.name.lower(),
+                    "alerts_count": preset.alerts_count,
+                    "should_do_noise_now": preset.should_do_noise_now,
+                }
             )
-    return enriched_formatted_events
+        if presets:
+            trigger_in_chunks(
+                pusher_client, channel, "presets-delta", "presets", presets
+            )
+    except Exception:
+        logger.exception("Failed to send presets delta via pusher")
 
 
 @processing_time_summary.time()
@@ -0,0 +1,312 @@
+"""
+Pulling alerts, incidents and topology from the providers that support pulling.
+
+The providers are pulled concurrently by a bounded pool of workers, so a slow provider
+API only holds its own worker. A provider whose pull takes longer than
+KEEP_PROVIDER_PULL_TIMEOUT_SECONDS is given up on and its results are dropped, it will
+be pulled again on the next interval.
+
+Each provider is pulled every PROVIDER_PULL_INTERVAL_MINUTE minutes, stretched by up to
+KEEP_PROVIDER_PULL_JITTER of the interval (a stable fraction per provider), so the
+providers installed together are not all pulled together.
+
+Providers that support incremental pulls get the cursor of their last pull and fetch
+only what changed since, the new cursor is saved once the pulled data is processed.
+Alerts and incidents have their own cursor.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from keep.api.consts import PROVIDER_PULL_INTERVAL_MINUTE
+from keep.api.core.config import config
+from keep.api.core.db import (
+    update_provider_last_pull_time,
+    update_provider_pull_cursors,
+)
+from keep.api.tasks.process_event_task import process_event
+from keep.api.tasks.process_incident_task import process_incident
+from keep.api.tasks.process_topology_task import process_topology
+from keep.providers.base.base_provider import (
+    BaseIncidentProvider,
+    BaseProvider,
+    BaseTopologyProvider,
+)
+from keep.providers.providers_factory import ProvidersFactory
+
+KEEP_PULL_WORKERS = config("KEEP_PULL_WORKERS", cast=int, default=4)
+KEEP_PROVIDER_PULL_TIMEOUT_SECONDS = config(
+    "KEEP_PROVIDER_PULL_TIMEOUT_SECONDS", cast=int, default=300
+)
+KEEP_PROVIDER_PULL_JITTER = config("KEEP_PROVIDER_PULL_JITTER", cast=float, default=0.1)
+
+logger = logging.getLogger(__name__)
+
+
+class ProvidersPullScheduler:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.timeout = KEEP_PROVIDER_PULL_TIMEOUT_SECONDS
+            self.executor = ThreadPoolExecutor(
+                max_workers=KEEP_PULL_WORKERS, thread_name_prefix="provider_pull_worker"
+            )
+            # (tenant_id, provider_id) of the providers being pulled
+            self._in_flight: set[tuple[str, str]] = set()
+            self._lock = threading.Lock()
+            self.__initialized = True
+
+    @staticmethod
+    def get_pull_interval_minutes(provider_id: str) -> float:
+        jitter = (
+            int(hashlib.sha1(provider_id.encode()).hexdigest(), 16) % 1000 / 1000
+        ) * KEEP_PROVIDER_PULL_JITTER
+        return PROVIDER_PULL_INTERVAL_MINUTE * (1 + jitter)
+
+    def is_due(self, provider) -> bool:
+        if provider.last_pull_time is None:
+            return True
+        minutes_passed = (datetime.now() - provider.last_pull_time).total_seconds() / 60
+        return minutes_passed > self.get_pull_interval_minutes(provider.id)
+
+    def pull(self, tenant_id: str, trace_id: str, providers: list):
+        """
+        Pull the providers that are due, and wait until they are processed or given up on.
+        """
+        # future -> (provider, started, timed_out)
+        pulls: dict[Future, tuple] = {}
+        for provider in providers:
+            extra = {
+                "provider_type": provider.type,
+                "provider_id": provider.id,
+                "tenant_id": tenant_id,
+                "trace_id": trace_id,
+            }
+            if not provider.pulling_enabled:
+                logger.debug("Pulling is disabled for this provider", extra=extra)
+                continue
+            if not self.is_due(provider):
+                logger.info(
+                    "Skipping provider data pulling since not enough time has passed",
+                    extra={
+                        **extra,
+                        "provider_last_pull_time": str(provider.last_pull_time),
+                    },
+                )
+                continue
+            with self._lock:
+                if (tenant_id, provider.id) in self._in_flight:
+                    logger.info("Provider is being pulled already", extra=extra)
+                    continue
+                self._in_flight.add((tenant_id, provider.id))
+
+            started, timed_out = {}, threading.Event()
+            future = self.executor.submit(
+                self._pull_provider, tenant_id, trace_id, provider, started, timed_out
+            )
+            pulls[future] = (provider, started, timed_out)
+
+        pending = set(pulls)
+        while pending:
+            _, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in list(pending):
+                provider, started, timed_out = pulls[future]
+                # the timeout counts from when a worker picked the provider up
+                if "at" in started and time.monotonic() - started["at"] > self.timeout:
+                    logger.warning(
+                        f"Pulling from provider {provider.type} ({provider.id}) timed out",
+                        extra={
+                            "provider_type": provider.type,
+                            "provider_id": provider.id,
+                            "tenant_id": tenant_id,
+                            "trace_id": trace_id,
+                            "timeout": self.timeout,
+                        },
+                    )
+                    timed_out.set()
+                    pending.remove(future)
+
+    def _pull_provider(
+        self,
+        tenant_id: str,
+        trace_id: str,
+        provider,
+        started: dict,
+        timed_out: threading.Event,
+    ):
+        started["at"] = time.monotonic()
+        try:
+            pull_data_from_provider(tenant_id, trace_id, provider, timed_out)
+        finally:
+            with self._lock:
+                self._in_flight.discard((tenant_id, provider.id))
+
+
+def pull_data_from_provider(
+    tenant_id: str,
+    trace_id: str,
+    provider,
+    timed_out: threading.Event = None,
+):
+    """
+    Pull the alerts, incidents and topology of a provider and process them.
+
+    The provider APIs are called first, and their results are processed unless the
+    pull timed out meanwhile.
+    """
+    timed_out = timed_out or threading.Event()
+    extra = {
+        "provider_type": provider.type,
+        "provider_id": provider.id,
+        "tenant_id": tenant_id,
+        "trace_id": trace_id,
+    }
+
+    try:
+        logger.info(
+            f"Pulling alerts from provider {provider.type} ({provider.id})",
+            extra=extra,
+        )
+        # Even if we failed at processing some event, lets save the last pull time to not iterate this process over and over again.
+        update_provider_last_pull_time(tenant_id=tenant_id, provider_id=provider.id)
+
+        provider_class = ProvidersFactory.get_installed_provider(
+            tenant_id=tenant_id,
+            provider_id=provider.id,
+            provider_type=provider.type,
+        )
+        pull_cursors = provider.pull_cursors or {}
+        sorted_provider_alerts_by_fingerprint = (
+            provider_class.get_alerts_by_fingerprint(
+                tenant_id=tenant_id,
+                cursor=pull_cursors.get(BaseProvider.PULL_CURSOR_ALERTS),
+            )
+        )
+        logger.info(
+            f"Pulling alerts from provider {provider.type} ({provider.id}) completed",
+            extra=extra,
+        )
+
+        incidents = None
+        if isinstance(provider_class, BaseIncidentProvider):
+            try:
+                incidents = provider_class.get_incidents(
+                    cursor=pull_cursors.get(BaseProvider.PULL_CURSOR_INCIDENTS)
+                )
+            except NotImplementedError:
+                logger.debug(
+                    f"Provider {provider.type} ({provider.id}) does not implement pulling incidents",
+                    extra=extra,
+                )
+            except Exception:
+                logger.exception(
+                    f"Unknown error pulling incidents from provider {provider.type} ({provider.id})",
+                    extra=extra,
+                )
+        else:
+            logger.debug(
+                f"Provider {provider.type} ({provider.id}) does not implement pulling incidents",
+                extra=extra,
+            )
+
+        topology_data = None
+        try:
+            if isinstance(provider_class, BaseTopologyProvider):
+                logger.info("Pulling topology data", extra=extra)
+                topology_data, _ = provider_class.pull_topology()
+        except NotImplementedError:
+            logger.debug(
+                f"Provider {provider.type} ({provider.id}) does not implement pulling topology data",
+                extra=extra,
+            )
+        except Exception as e:
+            logger.exception(
+                f"Unknown error pulling topology from provider {provider.type} ({provider.id})",
+                extra={**extra, "exception": str(e)},
+            )
+
+        if timed_out.is_set():
+            logger.warning(
+                f"Dropping the data pulled from provider {provider.type} ({provider.id}) since the pull timed out",
+                extra=extra,
+            )
+            return
+
+        # a cursor only moves forward once what it was pulled with is processed
+        next_pull_cursors = dict(provider_class.next_pull_cursors)
+        if incidents is not None:
+            try:
+                process_incident(
+                    {},
+                    tenant_id=tenant_id,
+                    provider_id=provider.id,
+                    provider_type=provider.type,
+                    incidents=incidents,
+                    trace_id=trace_id,
+                )
+            except Exception:
+                logger.exception(
+                    f"Unknown error processing incidents from provider {provider.type} ({provider.id})",
+                    extra=extra,
+                )
+                next_pull_cursors.pop(BaseProvider.PULL_CURSOR_INCIDENTS, None)
+
+        if topology_data is not None:
+            try:
+                logger.info(
+                    "Pulling topology data finished, processing",
+                    extra={**extra, "topology_length": len(topology_data)},
+                )
+                process_topology(tenant_id, topology_data, provider.id, provider.type)
+                logger.info("Finished processing topology data", extra=extra)
+            except Exception as e:
+                logger.exception(
+                    f"Unknown error processing topology from provider {provider.type} ({provider.id})",
+                    extra={**extra, "exception": str(e)},
+                )
+
+        # the alerts of each fingerprint are sorted by lastReceived, so they are
+        # processed in order within the batch
+        alerts = [
+            alert
+            for fingerprint_alerts in sorted_provider_alerts_by_fingerprint.values()
+            for alert in fingerprint_alerts
+        ]
+        if alerts:
+            process_event(
+                {},
+                tenant_id,
+                provider.type,
+                provider.id,
+                None,
+                None,
+                trace_id,
+                alerts,
+                notify_client=False,
+            )
+        if next_pull_cursors:
+            update_provider_pull_cursors(
+                tenant_id=tenant_id,
+                provider_id=provider.id,
+                pull_cursors=next_pull_cursors,
+            )
+    except Exception as e:
+        logger.exception(
+            f"Unknown error pulling from provider {provider.type} ({provider.id})",
+            extra={**extra, "exception": str(e)},
+        )
+
+
+def get_providers_pull_scheduler() -> ProvidersPullScheduler:
+    return ProvidersPullScheduler()
@@ -0,0 +1,51 @@
+import json
+
+from pusher import Pusher
+
+from keep.api.core.config import config
+
+# Pusher rejects events whose data is larger than 10KB
+KEEP_PUSHER_MAX_PAYLOAD_BYTES = config(
+    "KEEP_PUSHER_MAX_PAYLOAD_BYTES", cast=int, default=9000
+)
+
+
+def chunk_payload(
+    key: str, items: list, max_bytes: int = KEEP_PUSHER_MAX_PAYLOAD_BYTES
+) -> list[str]:
+    """
+    Split the items into as few JSON payloads ({key: [...items]}) as possible, each
+    up to max_bytes long.
+
+    Args:
+        key (str): The key of the items in the payload.
+        items (list): The JSON serializable items.
+        max_bytes (int): The max size of a payload.
+
+    Returns:
+        list[str]: The payloads, in the order of the items.
+    """
+    payload_overhead = len(json.dumps({key: []}))
+    chunks, chunk, chunk_size = [], [], payload_overhead
+    for item in items:
+        # the item and the separator before it
+        item_size = len(json.dumps(item, default=str).encode()) + (2 if chunk else 0)
+        if chunk and chunk_size + item_size > max_bytes:
+            chunks.append(chunk)
+            chunk, chunk_size = [], payload_overhead
+            item_size -= 2
+        chunk.append(item)
+        chunk_size += item_size
+    if chunk:
+        chunks.append(chunk)
+    return [json.dumps({key: chunk}, default=str) for chunk in chunks]
+
+
+def trigger_in_chunks(
+    pusher_client: Pusher, channel: str, event_name: str, key: str, items: list
+):
+    """
+    Send the items with as many events as needed to stay under Pusher's payload limit.
+    """
+    for payload in chunk_payload(key, items):
+        pusher_client.trigger(channel, event_name, payload)
@@ -78,6 +78,15 @@ class BaseProvider(metaclass=abc.ABCMeta):
         ]
     ] = []
     WEBHOOK_INSTALLATION_REQUIRED = False  # webhook installation is required for this provider, making it required in the UI
+    # if True, _get_alerts (and _get_incidents) accept the cursor of the last pull, fetch
+    # only what changed since then, and set next_pull_cursor for the next pull. Alerts
+    # and incidents have their own cursor, get_alerts and get_incidents keep it in
+    # next_pull_cursors under PULL_CURSOR_ALERTS and PULL_CURSOR_INCIDENTS
+    SUPPORTS_INCREMENTAL_PULL = False
+    PULL_CURSOR_ALERTS = "alerts"
+    PULL_CURSOR_INCIDENTS = "incidents"
+    # the pull window starts this long before the cursor, for late arriving events
+    INCREMENTAL_PULL_OVERLAP_SECONDS = 60
 
     def __init__(
         self,
@@ -131,6 +140,8 @@ class BaseProvider(metaclass=abc.ABCMeta):
         # tb: we can have this overriden by customer configuration, when initializing the provider
         self.fingerprint_fields = self.FINGERPRINT_FIELDS
         self.step_id = None
+        self.next_pull_cursor = None
+        self.next_pull_cursors: dict[str, str] = {}
 
     def _extract_type(self):
         """
@@ -550,33 +561,79 @@ class BaseProvider(metaclass=abc.ABCMeta):
         """
         raise NotImplementedError("deploy_alert() method not implemented")
 
-    def _get_alerts(self) -> list[AlertDto]:
+    def _get_alerts(self, cursor: str | None = None) -> list[AlertDto]:
         """
         Get alerts from the provider.
+
+        Args:
+            cursor (str | None): The cursor of the last pull, if SUPPORTS_INCREMENTAL_PULL.
         """
         raise NotImplementedError("get_alerts() method not implemented")
 
-    def get_alerts(self) -> list[AlertDto]:
+    def _get_incremental_pull_start(
+        self, cursor: str | None, default_start: datetime.datetime
+    ) -> datetime.datetime:
+        """
+        Get the start of the pull window of an incremental pull.
+
+        Args:
+            cursor (str | None): The cursor of the last pull, an epoch timestamp in seconds.
+            default_start (datetime.datetime): The start of the window of a full pull.
+
+        Returns:
+            datetime.datetime: Shortly before the cursor, but not before default_start.
+        """
+        if not cursor:
+            return default_start
+        try:
+            start = datetime.datetime.fromtimestamp(
+                int(cursor) - self.INCREMENTAL_PULL_OVERLAP_SECONDS
+            )
+        except ValueError:
+            self.logger.warning(
+                "Invalid pull cursor, pulling everything", extra={"cursor": cursor}
+            )
+            return default_start
+        return max(start, default_start)
+
+    def get_alerts(self, cursor: str | None = None) -> list[AlertDto]:
         """
         Get alerts from the provider.
+
+        Args:
+            cursor (str | None): The cursor of the last pull, used by providers that support incremental pulls.
         """
         with tracer.start_as_current_span(f"{self.__class__.__name__}-get_alerts"):
-            alerts = self._get_alerts()
+            if self.SUPPORTS_INCREMENTAL_PULL:
+                self.next_pull_cursor = None
+                alerts = self._get_alerts(cursor=cursor)
+                if self.next_pull_cursor is not None:
+                    self.next_pull_cursors[self.PULL_CURSOR_ALERTS] = (
+                        self.next_pull_cursor
+                    )
+            else:
+                alerts = self._get_alerts()
             # enrich alerts with provider id
             for alert in alerts:
                 alert.providerId = self.provider_id
                 alert.providerType = self.provider_type
             return alerts
 
-    def get_alerts_by_fingerprint(self, tenant_id: str) -> dict[str, list[AlertDto]]:
+    def get_alerts_by_fingerprint(
+        self, tenant_id: str, cursor: str | None = None
+    ) -> dict[str, list[AlertDto]]:
         """
         Get alerts from the provider grouped by fingerprint, sorted by lastReceived.
 
+        Args:
+            tenant_id (str): The tenant id.
+            cursor (str | None): The cursor of the last pull, used by providers that support incremental pulls.
+
         Returns:
             dict[str, list[AlertDto]]: A dict of alerts grouped by fingerprint, sorted by lastReceived.
         """
         try:
-            alerts = self.get_alerts()
+            alerts = self.get_alerts(cursor=cursor)
         except NotImplementedError:
             return {}
 
@@ -867,10 +924,18 @@ class BaseTopologyProvider(BaseProvider):
 
 
 class BaseIncidentProvider(BaseProvider):
-    def _get_incidents(self) -> list[IncidentDto]:
+    def _get_incidents(self, cursor: str | None = None) -> list[IncidentDto]:
         raise NotImplementedError("_get_incidents() in not implemented")
 
-    def get_incidents(self) -> list[IncidentDto]:
+    def get_incidents(self, cursor: str | None = None) -> list[IncidentDto]:
+        if self.SUPPORTS_INCREMENTAL_PULL:
+            self.next_pull_cursor = None
+            incidents = self._get_incidents(cursor=cursor)
+            if self.next_pull_cursor is not None:
+                self.next_pull_cursors[self.PULL_CURSOR_INCIDENTS] = (
+                    self.next_pull_cursor
+                )
+            return incidents
         return self._get_incidents()
 
     @staticmethod
@@ -184,6 +184,7 @@ class DatadogProvider(BaseTopologyProvider, ProviderHealthMixin):
 
     PROVIDER_CATEGORY = ["Monitoring"]
     PROVIDER_DISPLAY_NAME = "Datadog"
+    SUPPORTS_INCREMENTAL_PULL = True
     OAUTH2_URL = os.environ.get("DATADOG_OAUTH2_URL")
     DATADOG_CLIENT_ID = os.environ.get("DATADOG_CLIENT_ID")
     DATADOG_CLIENT_SECRET = os.environ.get("DATADOG_CLIENT_SECRET")
@@ -1012,7 +1013,7 @@ class DatadogProvider(BaseTopologyProvider, ProviderHealthMixin):
 
         return all_events
 
-    def _get_alerts(self) -> list[AlertDto]:
+    def _get_alerts(self, cursor: str | None = None) -> list[AlertDto]:
         formatted_alerts = []
         with ApiClient(self.configuration) as api_client:
             # tb: when it's out of beta, we should move to api v2
@@ -1046,13 +1047,16 @@ class DatadogProvider(BaseTopologyProvider, ProviderHealthMixin):
             api = EventsApi(api_client)
             end = datetime.datetime.now()
             # tb: we can make timedelta configurable by the user if we want
-            start = datetime.datetime.now() - datetime.timedelta(days=14)
+            start = self._get_incremental_pull_start(
+                cursor, end - datetime.timedelta(days=14)
+            )
             # Convert to milliseconds and ensure they're strings
             filter_from = str(int(start.timestamp() * 1000))
             filter_to = str(int(end.timestamp() * 1000))
             events = self._get_all_events(
                 api, filter_from, filter_to, filter_query="source:alert"
             )
+            self.next_pull_cursor = str(int(end.timestamp()))
             for event in events:
                 try:
                     # Extract the event attributes from the v2 structure
@@ -70,6 +70,7 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
     PROVIDER_CATEGORY = ["Monitoring", "Developer Tools"]
     KEEP_GRAFANA_WEBHOOK_INTEGRATION_NAME = "keep-grafana-webhook-integration"
     FINGERPRINT_FIELDS = ["fingerprint"]
+    SUPPORTS_INCREMENTAL_PULL = True
 
     webhook_description = ""
     webhook_template = ""
@@ -1052,7 +1053,7 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
         )
         return formatted_alerts
 
-    def _get_alerts(self) -> list[AlertDto]:
+    def _get_alerts(self, cursor: str | None = None) -> list[AlertDto]:
         self.logger.info("Starting to fetch alerts from Grafana")
 
         # First get alerts from datasources directly
@@ -1065,21 +1066,23 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
 
         history_alerts = []
 
-        # Calculate time range (7 days ago to now)
-        week_ago = int(
-            (datetime.datetime.now() - datetime.timedelta(days=7)).timestamp()
+        # Calculate time range (7 days ago, or since the last pull, to now)
+        from_timestamp = int(
+            self._get_incremental_pull_start(
+                cursor, datetime.datetime.now() - datetime.timedelta(days=7)
+            ).timestamp()
         )
         now = int(datetime.datetime.now().timestamp())
         self.logger.info(
-            f"Using time range for alerts: from={week_ago} to={now}",
-            extra={"from_timestamp": week_ago, "to_timestamp": now},
+            f"Using time range for alerts: from={from_timestamp} to={now}",
+            extra={"from_timestamp": from_timestamp, "to_timestamp": now},
         )
 
         headers = {"Authorization": f"Bearer {self.authentication_config.token}"}
 
         # First try the general history API (works in older Grafana versions)
         try:
-            api_endpoint = f"{self.authentication_config.host}/api/v1/rules/history?from={week_ago}&to={now}&limit=0"
+            api_endpoint = f"{self.authentication_config.host}/api/v1/rules/history?from={from_timestamp}&to={now}&limit=0"
             self.logger.info(f"Querying Grafana history API endpoint: {api_endpoint}")
 
             response = requests.get(
@@ -1158,6 +1161,7 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
                 self.logger.info(
                     f"Successfully processed {len(history_alerts)} alerts from Grafana history API"
                 )
+                self.next_pull_cursor = str(now)
             else:
                 # If general API fails with 'ruleUID is required' error in newer Grafana versions
                 if "ruleUID is required" in response.text:
@@ -1189,7 +1193,7 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
 
                         # For each rule UID, get its history
                         for rule_uid in rule_uids:
-                            rule_history_url = f"{self.authentication_config.host}/api/v1/rules/history?from={week_ago}&to={now}&limit=100&ruleUID={rule_uid}"
+                            rule_history_url = f"{self.authentication_config.host}/api/v1/rules/history?from={from_timestamp}&to={now}&limit=100&ruleUID={rule_uid}"
 
                             try:
                                 rule_resp = requests.get(
@@ -1283,6 +1287,7 @@ class GrafanaProvider(BaseTopologyProvider, ProviderHealthMixin):
                                     f"Error processing history for rule {rule_uid}",
                                     extra={"error": str(e)},
                                 )
+                        self.next_pull_cursor = str(now)
                     # if response is 404, it means the API is not available
                     elif rules_response.status_code == 404:
                         # if legacy alerting is not enabled, we can assume the API is not available
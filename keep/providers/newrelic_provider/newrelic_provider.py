@@ -54,6 +54,7 @@ class NewrelicProvider(BaseProvider):
     PROVIDER_CATEGORY = ["Monitoring"]
     NEWRELIC_WEBHOOK_NAME = "keep-webhook"
     PROVIDER_DISPLAY_NAME = "New Relic"
+    SUPPORTS_INCREMENTAL_PULL = True
     PROVIDER_SCOPES = [
         ProviderScope(
             name="ai.issues:read",
@@ -316,10 +317,22 @@ class NewrelicProvider(BaseProvider):
             "Content-Type": "application/json",
         }
 
-    def get_alerts(self) -> list[AlertDto]:
+    def _get_alerts(self, cursor: str | None = None) -> list[AlertDto]:
         formatted_alerts = []
 
         headers = self.__headers
+        now = datetime.now()
+        # only the issues active since the last pull
+        issues_arguments = ""
+        updated_since = None
+        if cursor:
+            updated_since = int(
+                self._get_incremental_pull_start(
+                    cursor, datetime.fromtimestamp(0)
+                ).timestamp()
+                * 1000
+            )
+            issues_arguments = f"(timeWindow: {{startTime: {updated_since}, endTime: {int(now.timestamp() * 1000)}}})"
         # GraphQL query for listing issues
         query = {
             "query": f"""
@@ -327,7 +340,7 @@ class NewrelicProvider(BaseProvider):
                     actor {{
                         account(id: {self.newrelic_config.account_id}) {{
                         aiIssues {{
-                            issues {{
+                            issues{issues_arguments} {{
                             issues {{
                                 account {{
                                 id
@@ -388,9 +401,12 @@ class NewrelicProvider(BaseProvider):
 
         # Extract and format the issues
         issues_data = data["data"]["actor"]["account"]["aiIssues"]["issues"]["issues"]
+        self.next_pull_cursor = str(int(now.timestamp()))
         formatted_alerts = []
 
         for issue in issues_data:
+            if updated_since and (issue.get("updatedAt") or 0) < updated_since:
+                continue
             lastReceived = issue["updatedAt"] if "updatedAt" in issue else None
             # convert to date
             if lastReceived:
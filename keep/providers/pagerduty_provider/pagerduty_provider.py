@@ -101,6 +101,7 @@ class PagerdutyProvider(
             alias="Webhooks Write",
         ),
     ]
+    SUPPORTS_INCREMENTAL_PULL = True
     BASE_API_URL = "https://api.pagerduty.com"
     SUBSCRIPTION_API_URL = f"{BASE_API_URL}/webhook_subscriptions"
     PROVIDER_DISPLAY_NAME = "PagerDuty"
@@ -1067,12 +1068,29 @@ class PagerdutyProvider(
             service_topology[dependent["id"]].dependencies[supporting["id"]] = "unknown"
         return list(service_topology.values()), {}
 
-    def _get_incidents(self) -> list[IncidentDto]:
+    def _get_incidents(self, cursor: str | None = None) -> list[IncidentDto]:
         # Skipping incidents pulling when we're installed with routing_key
         if self.authentication_config.routing_key:
             return []
 
+        now = datetime.datetime.now()
         raw_incidents = self.__get_all_incidents_or_alerts()
+        self.next_pull_cursor = str(int(now.timestamp()))
+        if cursor:
+            # the incidents API can't filter by update time, but the unchanged
+            # incidents don't need their alerts fetched and processed again
+            updated_since = self._get_incremental_pull_start(
+                cursor, datetime.datetime.fromtimestamp(0)
+            ).timestamp()
+            raw_incidents = [
+                incident
+                for incident in raw_incidents
+                if not incident.get("updated_at")
+                or datetime.datetime.fromisoformat(
+                    incident["updated_at"].replace("Z", "+00:00")
+                ).timestamp()
+                >= updated_since
+            ]
         incidents = []
         for incident in raw_incidents:
             incident_dto = PagerdutyProvider._format_incident(
@@ -2,7 +2,10 @@ import copy
 import json
 import logging
 import re
+import threading
+from collections import OrderedDict
 from typing import List, Optional
+from uuid import UUID
 
 import celpy
 import celpy.c7nlib
@@ -22,6 +25,10 @@ from keep.api.core.db import (
 from keep.api.core.db import get_rules as get_rules_db
 from keep.api.core.db import is_all_alerts_in_status
 from keep.api.core.dependencies import get_pusher_client
+from keep.api.core.metrics import (
+    rules_program_cache_hits_total,
+    rules_program_cache_misses_total,
+)
 from keep.api.models.alert import AlertDto, AlertSeverity, AlertStatus
 from keep.api.models.db.alert import Incident
 from keep.api.models.db.rule import Rule
@@ -48,11 +55,195 @@ celpy.c7nlib.C7NContext.__repr__ = lambda self: ""
 celpy.celparser.Tree.__repr__ = lambda self: ""
 
 
+# fields for which the batch evaluation indexes the rules by equality literals
+INDEXED_FIELDS = ("source", "severity")
+CEL_KEYWORDS = {"true", "false", "null", "in", "has"}
+# max number of compiled filter CELs (e.g. presets) kept in memory
+FILTER_PROGRAMS_CACHE_SIZE = 1000
+CEL_STRING_LITERAL_RE = re.compile(r"\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*'")
+CEL_EQUALITY_LITERAL_RE = re.compile(
+    r"^\(?\s*(?P<field>\w+)\s*==\s*(?:\"(?P<dq>[^\"\\]*)\"|'(?P<sq>[^'\\]*)')\s*\)?$"
+)
+CEL_TOP_LEVEL_IDENT_RE = re.compile(r"(?<![\w.])([A-Za-z_]\w*)\b(?!\s*\()")
+CEL_MACRO_VARIABLE_RE = re.compile(
+    r"\.(?:all|exists|exists_one|map|filter)\(\s*([A-Za-z_]\w*)\s*,"
+)
+
+
+def _split_top_level(expression: str, operator: str) -> list[str]:
+    """
+    Split a CEL expression on an operator, ignoring operators nested in parentheses or string literals
+    """
+    parts = []
+    depth = 0
+    quote = None
+    last = 0
+    i = 0
+    while i < len(expression):
+        char = expression[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif depth == 0 and expression.startswith(operator, i):
+            parts.append(expression[last:i].strip())
+            last = i + len(operator)
+            i = last
+            continue
+        i += 1
+    parts.append(expression[last:].strip())
+    return parts
+
+
+class SubRulePrefilter:
+    """
+    Cheap, conservative check that tells whether a sub-rule can possibly match an event
+    without running the CEL program.
+
+    - equals: fields that the sub-rule requires to be equal to a literal (e.g. source == "grafana")
+    - fields: top-level fields the sub-rule references; if one of them is missing from the event,
+              the evaluation fails with "no such member" and the sub-rule is not relevant anyway
+    """
+
+    def __init__(self, sub_rule: str):
+        self.equals = {}
+        self.fields = frozenset()
+
+        # a top level || (or a ternary) may absorb errors and mismatches, so we can't prefilter
+        without_literals = CEL_STRING_LITERAL_RE.sub('""', sub_rule)
+        if len(_split_top_level(sub_rule, "||")) > 1 or "?" in without_literals:
+            return
+
+        for conjunct in _split_top_level(sub_rule, "&&"):
+            match = CEL_EQUALITY_LITERAL_RE.match(conjunct)
+            if match and match.group("field") in INDEXED_FIELDS:
+                literal = match.group("dq")
+                if literal is None:
+                    literal = match.group("sq")
+                self.equals[match.group("field")] = literal
+
+        # has() tolerates missing members, so keep evaluating those
+        if "has(" not in without_literals:
+            macro_variables = set(CEL_MACRO_VARIABLE_RE.findall(without_literals))
+            self.fields = frozenset(
+                ident
+                for ident in CEL_TOP_LEVEL_IDENT_RE.findall(without_literals)
+                if ident not in CEL_KEYWORDS and ident not in macro_variables
+            )
+
+    def may_match(self, activation) -> bool:
+        for field, literal in self.equals.items():
+            if activation.get(field) != literal:
+                return False
+        for field in self.fields:
+            if field not in activation:
+                return False
+        return True
+
+
+class RulesProgramCache:
+    """
+    Per-tenant cache of compiled CEL programs for the rules' sub-rules.
+
+    Entries are keyed by rule id and revision (the rule's update/creation time),
+    so a rule that was changed from another process is recompiled on first use.
+    """
+
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            # tenant_id -> rule_id -> (revision, [(sub_rule, program, prefilter), ...])
+            self.cache: dict[str, dict[str, tuple]] = {}
+            self.hits = 0
+            self.misses = 0
+            self._lock = threading.Lock()
+            self.__initialized = True
+
+    @staticmethod
+    def _rule_revision(rule: Rule):
+        return (rule.update_time or rule.creation_time, rule.definition_cel)
+
+    def get_programs(self, env: celpy.Environment, rule: Rule) -> list[tuple]:
+        """
+        Return the compiled (sub_rule, program, prefilter) of each sub-rule, compiling them on a miss.
+        """
+        tenant_id = rule.tenant_id
+        rule_id = str(rule.id)
+        revision = self._rule_revision(rule)
+        with self._lock:
+            entry = self.cache.get(tenant_id, {}).get(rule_id)
+            if entry and entry[0] == revision:
+                self.hits += 1
+                rules_program_cache_hits_total.inc()
+                return entry[1]
+            self.misses += 1
+            rules_program_cache_misses_total.inc()
+
+        programs = []
+        for sub_rule in RulesEngine._extract_subrules(rule.definition_cel):
+            # Shahar: rules such as "(source != null)" causing an exception:
+            #           celpy.evaluation.CELEvalError: ("found no matching overload for 'relation_ne' applied to
+            #           '(<class 'celpy.celtypes.StringType'>, <class 'NoneType'>)'", <class 'TypeError'>,
+            #            ("no such overload:  <class 'celpy.celtypes.StringType'> != None <class 'NoneType'>",))
+            #          So we need to replace "null" with ""
+            #
+            #          TODO: it works for strings now, but we need to add support on list/dict when needed
+            if "null" in sub_rule:
+                sub_rule = sub_rule.replace("null", '""')
+            ast = env.compile(sub_rule)
+            programs.append((sub_rule, env.program(ast), SubRulePrefilter(sub_rule)))
+
+        with self._lock:
+            self.cache.setdefault(tenant_id, {})[rule_id] = (revision, programs)
+        return programs
+
+    def invalidate(self, tenant_id: str, rule_id: Optional[str] = None):
+        """
+        Drop the cached programs of a single rule, or of the whole tenant if no rule id is given.
+        """
+        with self._lock:
+            if rule_id is None:
+                self.cache.pop(tenant_id, None)
+            else:
+                self.cache.get(tenant_id, {}).pop(str(rule_id), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": sum(len(rules) for rules in self.cache.values()),
+            }
+
+
+def get_rules_program_cache() -> RulesProgramCache:
+    return RulesProgramCache()
+
+
 class RulesEngine:
+    # filter CEL -> (preprocessed CEL, compiled program), shared by all the instances
+    _filter_programs: OrderedDict = OrderedDict()
+    _filter_programs_lock = threading.Lock()
+
     def __init__(self, tenant_id=None):
         self.tenant_id = tenant_id
         self.logger = logging.getLogger(__name__)
         self.env = celpy.Environment()
+        self.programs_cache = get_rules_program_cache()
 
     def run_rules(
         self, events: list[AlertDto], session: Optional[Session] = None
@@ -81,131 +272,103 @@ class RulesEngine:
         self.logger.info("Running rules")
         rules = get_rules_db(tenant_id=self.tenant_id)
 
+        # evaluate all the rules against the whole batch first
+        matches = self.evaluate_rules(rules, events)
+
         incidents_dto = {}
         for rule in rules:
-            self.logger.info(f"Evaluating rule {rule.name}")
-            for event in events:
-                self.logger.info(
-                    f"Checking if rule {rule.name} apply to event {event.id}"
-                )
-                try:
-                    matched_rules = self._check_if_rule_apply(rule, event)
-                except ValueError as e:
-                    if "Invalid name" in str(e):
-                        self.logger.warning(
-                            f"{str(e)} in the CEL expression {rule.definition_cel} for alert {event.id}. This might mean there's a blank space in the field name",
-                            extra={"alert_id": event.id, "payload": event.dict()},
-                        )
-                        continue
-                except Exception:
-                    self.logger.exception(
-                        f"Failed to evaluate rule {rule.name} on event {event.id}",
-                        extra={
-                            "rule": rule.dict(),
-                            "event": event.dict(),
-                        },
-                    )
-                    continue
-
-                if matched_rules:
-                    self.logger.info(
-                        f"Rule {rule.name} on event {event.id} is relevant"
-                    )
+            for event, matched_rules in matches.get(rule.id, []):
+                self.logger.info(f"Rule {rule.name} on event {event.id} is relevant")
 
-                    rule_fingerprints = self._calc_rule_fingerprint(event, rule)
+                rule_fingerprints = self._calc_rule_fingerprint(event, rule)
 
-                    for rule_fingerprint in rule_fingerprints:
-                        incident, send_created_event = self._get_or_create_incident(
-                            rule=rule,
-                            rule_fingerprint=",".join(rule_fingerprint),
+                for rule_fingerprint in rule_fingerprints:
+                    incident, send_created_event = self._get_or_create_incident(
+                        rule=rule,
+                        rule_fingerprint=",".join(rule_fingerprint),
+                        session=session,
+                        event=event,
+                    )
+                    if incident:
+                        incident = assign_alert_to_incident(
+                            fingerprint=event.fingerprint,
+                            incident=incident,
+                            tenant_id=self.tenant_id,
                             session=session,
-                            event=event,
                         )
-                        if incident:
-                            incident = assign_alert_to_incident(
-                                fingerprint=event.fingerprint,
-                                incident=incident,
-                                tenant_id=self.tenant_id,
-                                session=session,
+
+                        if not incident.is_visible:
+
+                            self.logger.info(
+                                f"No existing incidents for rule {rule.name}. Checking incident creation conditions"
                             )
 
-                            if not incident.is_visible:
-
-                                self.logger.info(
-                                    f"No existing incidents for rule {rule.name}. Checking incident creation conditions"
-                                )
-
-                                rule_groups = self._extract_subrules(
-                                    rule.definition_cel
-                                )
-                                firing_count = sum(
-                                    [
-                                        alert.event.get("unresolvedCounter", 1)
-                                        for alert in incident.alerts
-                                    ]
-                                )
-                                alerts_count = max(incident.alerts_count, firing_count)
-                                if alerts_count >= rule.threshold:
-                                    if not rule.require_approve:
-                                        if rule.create_on == "any" or (
-                                            rule.create_on == "all"
-                                            and len(rule_groups) == len(matched_rules)
-                                        ):
-                                            self.logger.info(
-                                                "Single event is enough, so creating incident"
-                                            )
-                                            incident.is_visible = True
-                                        elif rule.create_on == "all":
-                                            incident = self._process_event_for_history_based_rule(
+                            rule_groups = self._extract_subrules(rule.definition_cel)
+                            firing_count = sum(
+                                [
+                                    alert.event.get("unresolvedCounter", 1)
+                                    for alert in incident.alerts
+                                ]
+                            )
+                            alerts_count = max(incident.alerts_count, firing_count)
+                            if alerts_count >= rule.threshold:
+                                if not rule.require_approve:
+                                    if rule.create_on == "any" or (
+                                        rule.create_on == "all"
+                                        and len(rule_groups) == len(matched_rules)
+                                    ):
+                                        self.logger.info(
+                                            "Single event is enough, so creating incident"
+                                        )
+                                        incident.is_visible = True
+                                    elif rule.create_on == "all":
+                                        incident = (
+                                            self._process_event_for_history_based_rule(
                                                 incident, rule, session
                                             )
-
-                                send_created_event = incident.is_visible
-
-                            # If we try to access incident.id inside except block, it will try to refresh
-                            # instance and raises PendingRollback error
-                            incident_id = incident.id
-
-                            # Incident instance might change till this moment (set visible for example),
-                            # so we need to commit changes
-                            # Otherwise sqlalchemy might try to do this in unpredictable moment
-                            for attempt in range(3):
-                                try:
-                                    # Explicitly add incident, but it most likely already there, since it was loaded in
-                                    # same session
-                                    session.add(incident)
-                                    session.commit()
-                                    break
-                                except StaleDataError as ex:
-                                    if "expected to update" in ex.args[0]:
-                                        self.logger.warning(
-                                            f"Race condition met while updating incident `{incident_id}`, retry #{attempt}"
                                         )
-                                        session.rollback()
-                                        continue
-                                    else:
-                                        raise
-
-                            incident = IncidentBl(
-                                self.tenant_id, session
-                            ).resolve_incident_if_require(incident)
-
-                            incident_dto = IncidentDto.from_db_incident(incident)
-                            if send_created_event:
-                                RulesEngine.send_workflow_event(
-                                    self.tenant_id, session, incident_dto, "created"
-                                )
-                            elif incident.is_visible:
-                                RulesEngine.send_workflow_event(
-                                    self.tenant_id, session, incident_dto, "updated"
-                                )
-
-                            incidents_dto[incident.id] = incident_dto
 
-                else:
-                    self.logger.info(
-                        f"Rule {rule.name} on event {event.id} is not relevant"
-                    )
+                            send_created_event = incident.is_visible
+
+                        # If we try to access incident.id inside except block, it will try to refresh
+                        # instance and raises PendingRollback error
+                        incident_id = incident.id
+
+                        # Incident instance might change till this moment (set visible for example),
+                        # so we need to commit changes
+                        # Otherwise sqlalchemy might try to do this in unpredictable moment
+                        for attempt in range(3):
+                            try:
+                                # Explicitly add incident, but it most likely already there, since it was loaded in
+                                # same session
+                                session.add(incident)
+                                session.commit()
+                                break
+                            except StaleDataError as ex:
+                                if "expected to update" in ex.args[0]:
+                                    self.logger.warning(
+                                        f"Race condition met while updating incident `{incident_id}`, retry #{attempt}"
+                                    )
+                                    session.rollback()
+                                    continue
+                                else:
+                                    raise
+
+                        incident = IncidentBl(
+                            self.tenant_id, session
+                        ).resolve_incident_if_require(incident)
+
+                        incident_dto = IncidentDto.from_db_incident(incident)
+                        if send_created_event:
+                            RulesEngine.send_workflow_event(
+                                self.tenant_id, session, incident_dto, "created"
+                            )
+                        elif incident.is_visible:
+                            RulesEngine.send_workflow_event(
+                                self.tenant_id, session, incident_dto, "updated"
+                            )
+
+                        incidents_dto[incident.id] = incident_dto
 
         self.logger.info("Rules ran successfully")
         # if we don't have any updated groups, we don't need to create any alerts
@@ -216,6 +379,115 @@ class RulesEngine:
 
         return list(incidents_dto.values())
 
+    def _build_rules_index(self, rules: list[Rule]) -> tuple[list[Rule], dict]:
+        """
+        Index the rules by the equality literals on source/severity that all of their sub-rules require.
+
+        Returns:
+            (rules that must be checked against every event, {(field, literal): [rules]})
+        """
+        unindexed_rules = []
+        index = {}
+        for rule in rules:
+            try:
+                prefilters = [
+                    prefilter
+                    for _, _, prefilter in self.programs_cache.get_programs(
+                        self.env, rule
+                    )
+                ]
+            except Exception:
+                # let the evaluation surface (and log) the compilation error
+                unindexed_rules.append(rule)
+                continue
+            for field in INDEXED_FIELDS:
+                if prefilters and all(field in p.equals for p in prefilters):
+                    for literal in {p.equals[field] for p in prefilters}:
+                        index.setdefault((field, literal), []).append(rule)
+                    break
+            else:
+                unindexed_rules.append(rule)
+        return unindexed_rules, index
+
+    def evaluate_rules(
+        self, rules: list[Rule], events: list[AlertDto]
+    ) -> dict[UUID, list[tuple[AlertDto, list[str]]]]:
+        """
+        Evaluate all the rules against a batch of events in one pass.
+
+        Every event's activation is built once, and only the rules that can match
+        the event according to the rules index reach the CEL evaluator.
+
+        Args:
+            rules: list of rules
+            events: list of events
+
+        Returns:
+            match matrix: {rule_id: [(event, matched sub-rules), ...]} in the events order
+        """
+        unindexed_rules, index = self._build_rules_index(rules)
+        rules_order = {rule.id: i for i, rule in enumerate(rules)}
+        matches = {}
+        evaluations = 0
+        for event in events:
+            try:
+                activation = self._get_event_activation(event)
+            except Exception:
+                self.logger.exception(
+                    f"Failed to build the CEL activation for event {event.id}",
+                    extra={"event": event.dict()},
+                )
+                continue
+
+            candidates = list(unindexed_rules)
+            for field in INDEXED_FIELDS:
+                candidates.extend(index.get((field, activation.get(field)), []))
+            # a rule might be indexed under several literals, but it can't match twice
+            candidates = sorted(
+                {rule.id: rule for rule in candidates}.values(),
+                key=lambda rule: rules_order[rule.id],
+            )
+
+            for rule in candidates:
+                evaluations += 1
+                try:
+                    matched_rules = self._check_if_rule_apply(rule, event, activation)
+                except ValueError as e:
+                    if "Invalid name" in str(e):
+                        self.logger.warning(
+                            f"{str(e)} in the CEL expression {rule.definition_cel} for alert {event.id}. This might mean there's a blank space in the field name",
+                            extra={"alert_id": event.id, "payload": event.dict()},
+                        )
+                    else:
+                        self.logger.exception(
+                            f"Failed to evaluate rule {rule.name} on event {event.id}"
+                        )
+                    continue
+                except Exception:
+                    self.logger.exception(
+                        f"Failed to evaluate rule {rule.name} on event {event.id}",
+                        extra={
+                            "rule": rule.dict(),
+                            "event": event.dict(),
+                        },
+                    )
+                    continue
+
+                if matched_rules:
+                    matches.setdefault(rule.id, []).append((event, matched_rules))
+
+        self.logger.info(
+            "Rules evaluated",
+            extra={
+                "tenant_id": self.tenant_id,
+                "rules_count": len(rules),
+                "events_count": len(events),
+                "evaluations": evaluations,
+                "matches": sum(len(m) for m in matches.values()),
+            },
+        )
+        return matches
+
     def get_value_from_event(self, event: AlertDto, var: str) -> str:
         """
         Extract value from event based on template variable
@@ -442,34 +714,36 @@ class RulesEngine:
         sanitized = _sanitize_dict(payload)
         return sanitized
 
-    def _check_if_rule_apply(self, rule: Rule, event: AlertDto) -> List[str]:
+    @staticmethod
+    def _get_event_activation(event: AlertDto):
         """
-        Evaluates if a rule applies to an event using CEL. Handles type coercion for ==/!= between int and str.
+        Build the CEL activation used to evaluate the rules against an event.
         """
-        sub_rules = self._extract_subrules(rule.definition_cel)
         payload = event.dict()
         # workaround since source is a list
         # todo: fix this in the future
         payload["source"] = payload["source"][0]
         payload = RulesEngine.sanitize_cel_payload(payload)
+        return celpy.json_to_cel(json.loads(json.dumps(payload, default=str)))
+
+    def _check_if_rule_apply(
+        self, rule: Rule, event: AlertDto, activation=None
+    ) -> List[str]:
+        """
+        Evaluates if a rule applies to an event using CEL. Handles type coercion for ==/!= between int and str.
+        """
+        if activation is None:
+            activation = self._get_event_activation(event)
 
-        # what we do here is to compile the CEL rule and evaluate it
+        # what we do here is to compile the CEL rule (once per rule revision) and evaluate it
         #   https://github.com/cloud-custodian/cel-python
         #   https://github.com/google/cel-spec
         sub_rules_matched = []
-        for sub_rule in sub_rules:
-            # Shahar: rules such as "(source != null)" causing an exception:
-            #           celpy.evaluation.CELEvalError: ("found no matching overload for 'relation_ne' applied to
-            #           '(<class 'celpy.celtypes.StringType'>, <class 'NoneType'>)'", <class 'TypeError'>,
-            #            ("no such overload:  <class 'celpy.celtypes.StringType'> != None <class 'NoneType'>",))
-            #          So we need to replace "null" with ""
-            #
-            #          TODO: it works for strings now, but we need to add support on list/dict when needed
-            if "null" in sub_rule:
-                sub_rule = sub_rule.replace("null", '""')
-            ast = self.env.compile(sub_rule)
-            prgm = self.env.program(ast)
-            activation = celpy.json_to_cel(json.loads(json.dumps(payload, default=str)))
+        for sub_rule, prgm, prefilter in self.programs_cache.get_programs(
+            self.env, rule
+        ):
+            if not prefilter.may_match(activation):
+                continue
             try:
                 r = prgm.evaluate(activation)
             except celpy.evaluation.CELEvalError as e:
@@ -644,6 +918,28 @@ class RulesEngine:
                 return [[key] for key in fingerprints]
         return [["none"]]
 
+    def _get_filter_program(self, cel: str) -> tuple[str, object]:
+        """
+        Preprocess and compile a filter CEL (e.g. a preset's), filters are evaluated on
+        every ingested batch so the compiled programs are kept in a bounded cache.
+
+        Returns:
+            tuple[str, object]: the preprocessed CEL and its compiled program
+        """
+        with RulesEngine._filter_programs_lock:
+            entry = RulesEngine._filter_programs.get(cel)
+            if entry is not None:
+                RulesEngine._filter_programs.move_to_end(cel)
+                return entry
+
+        preprocessed_cel = preprocess_cel_expression(cel)
+        entry = (preprocessed_cel, self.env.program(self.env.compile(preprocessed_cel)))
+        with RulesEngine._filter_programs_lock:
+            RulesEngine._filter_programs[cel] = entry
+            while len(RulesEngine._filter_programs) > FILTER_PROGRAMS_CACHE_SIZE:
+                RulesEngine._filter_programs.popitem(last=False)
+        return entry
+
     @staticmethod
     def get_alerts_activation(alerts: list[AlertDto]):
         activations = []
@@ -682,10 +978,8 @@ class RulesEngine:
         if not cel:
             logger.debug("No CEL expression provided")
             return alerts
-        # preprocess the cel expression
-        cel = preprocess_cel_expression(cel)
-        ast = self.env.compile(cel)
-        prgm = self.env.program(ast)
+        # the preprocessed cel expression and its program are cached
+        cel, prgm = self._get_filter_program(cel)
         filtered_alerts = []
 
         for i, alert in enumerate(alerts):
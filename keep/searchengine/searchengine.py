@@ -1,15 +1,18 @@
 import enum
 import logging
+import re
 
 from keep.api.core.alerts import query_last_alerts
 from keep.api.core.db import get_last_alerts
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.core.elastic import ElasticClient
+from keep.api.core.preset_counters import PresetCounters, get_preset_counters
 from keep.api.core.tenant_configuration import TenantConfiguration
-from keep.api.models.alert import AlertDto, AlertStatus
+from keep.api.models.alert import AlertDto, AlertSeverity, AlertStatus
 from keep.api.models.db.preset import PresetDto, PresetSearchQuery
 from keep.api.models.query import QueryDto
 from keep.api.models.time_stamp import TimeStampFilter
+from keep.api.utils.cel_utils import preprocess_cel_expression
 from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
 from keep.rulesengine.rulesengine import RulesEngine
 from datetime import datetime, timedelta, timezone
@@ -181,13 +184,71 @@ class SearchEngine:
         self.logger.info("Finished searching alerts")
         return filtered_alerts
 
-    def search_preset_alerts(
+    def _filter_preset_alerts(
         self, presets: list[PresetDto], time_stamp: TimeStampFilter = None
+    ):
+        """Count the alerts of each preset by filtering the last alerts
+
+        Args:
+            presets (list[Preset]): The list of presets to count the alerts for
+        """
+        # get the alerts
+        alerts_dto = self._get_last_alerts(time_stamp=time_stamp)
+        # performance optimization: get the alerts activation once
+        alerts_activation = self.rule_engine.get_alerts_activation(alerts_dto)
+        for preset in presets:
+            filtered_alerts = self.rule_engine.filter_alerts(
+                alerts_dto, preset.cel_query, alerts_activation
+            )
+            preset.alerts_count = len(
+                [
+                    alert
+                    for alert in filtered_alerts
+                    if not preset.counter_shows_firing_only
+                    or alert.status == AlertStatus.FIRING.value
+                ]
+            )
+            # update noisy
+
+            if preset.is_noisy:
+                firing_filtered_alerts = list(
+                    filter(
+                        lambda alert: alert.status == AlertStatus.FIRING.value
+                        and not alert.deleted
+                        and not alert.dismissed,
+                        filtered_alerts,
+                    )
+                )
+                # if there are firing alerts, then do noise
+                if firing_filtered_alerts:
+                    self.logger.info("Noisy preset is noisy")
+                    preset.should_do_noise_now = True
+                else:
+                    self.logger.info("Noisy preset is not noisy")
+                    preset.should_do_noise_now = False
+            # else if one of the alerts are isNoisy
+            elif not preset.static and any(
+                alert.isNoisy
+                and alert.status == AlertStatus.FIRING.value
+                and not alert.deleted
+                and not alert.dismissed
+                for alert in filtered_alerts
+            ):
+                self.logger.info("Preset is noisy")
+                preset.should_do_noise_now = True
+
+    def search_preset_alerts(
+        self,
+        presets: list[PresetDto],
+        time_stamp: TimeStampFilter = None,
+        counters_only: bool = False,
     ) -> dict[str, list[AlertDto]]:
         """Search for alerts based on a list of queries
 
         Args:
             presets (list[Preset]): The list of presets to search for
+            counters_only (bool): In internal mode, only count the presets whose
+                counters are ready instead of filtering the last alerts for the others
 
         Returns:
             dict[str, list[AlertDto]]: The list of alerts that match each query
@@ -199,80 +260,95 @@ class SearchEngine:
 
         # if internal
         if self.search_mode == SearchMode.INTERNAL:
-            # get the alerts
-            alerts_dto = self._get_last_alerts(time_stamp=time_stamp)
-            # performance optimization: get the alerts activation once
-            alerts_activation = self.rule_engine.get_alerts_activation(alerts_dto)
-            for preset in presets:
-                filtered_alerts = self.rule_engine.filter_alerts(
-                    alerts_dto, preset.cel_query, alerts_activation
+            # the counters are kept for all the last alerts, not for a time range
+            counters = {}
+            if not time_stamp or not (
+                time_stamp.lower_timestamp or time_stamp.upper_timestamp
+            ):
+                counters = get_preset_counters().get_counters(
+                    self.tenant_id, presets, wait_for_seed=not counters_only
                 )
-                preset.alerts_count = len(filtered_alerts)
-                # update noisy
-
-                if preset.is_noisy:
-                    firing_filtered_alerts = list(
-                        filter(
-                            lambda alert: alert.status == AlertStatus.FIRING.value
-                            and not alert.deleted
-                            and not alert.dismissed,
-                            filtered_alerts,
-                        )
-                    )
-                    # if there are firing alerts, then do noise
-                    if firing_filtered_alerts:
-                        self.logger.info("Noisy preset is noisy")
-                        preset.should_do_noise_now = True
-                    else:
-                        self.logger.info("Noisy preset is not noisy")
-                        preset.should_do_noise_now = False
-                # else if one of the alerts are isNoisy
-                elif not preset.static and any(
-                    alert.isNoisy
-                    and alert.status == AlertStatus.FIRING.value
-                    and not alert.deleted
-                    and not alert.dismissed
-                    for alert in filtered_alerts
-                ):
-                    self.logger.info("Preset is noisy")
-                    preset.should_do_noise_now = True
+            for preset in presets:
+                if str(preset.id) in counters:
+                    PresetCounters.apply(preset, counters[str(preset.id)])
+            presets_to_filter = [
+                preset for preset in presets if str(preset.id) not in counters
+            ]
+            if presets_to_filter and not counters_only:
+                self._filter_preset_alerts(presets_to_filter, time_stamp)
 
         # if elastic
         elif self.search_mode == SearchMode.ELASTIC:
-            # get the alerts from elastic
+            # count the alerts of all the presets in one request
+            queries = {}
             for preset in presets:
                 try:
-                    query = self._create_raw_sql(
+                    queries[str(preset.id)] = self._create_positional_sql(
                         preset.sql_query.get("sql"), preset.sql_query.get("params")
                     )
-                    # get number of alerts and number of noisy alerts
-                    elastic_sql_query = (
-                        f"""select count(*),  MAX(CASE WHEN isNoisy = true AND dismissed = false AND deleted = false THEN 1 ELSE 0 END) from "{self.elastic_client.alerts_index}" """
-                        + (f" where {query}" if query else "")
-                    )
-                    results = self.elastic_client.run_query(elastic_sql_query)
-                    if results:
-                        preset.alerts_count = results["rows"][0][0]
-                        preset.should_do_noise_now = results["rows"][0][1] == 1
-                    else:
-                        self.logger.warning(
-                            "No results found for preset",
-                            extra={"preset_id": preset.id, "preset_name": preset.name},
-                        )
-                        preset.alerts_count = 0
-                        preset.should_do_noise_now = False
                 except Exception:
                     self.logger.exception(
-                        "Failed to search alerts for preset",
+                        "Failed to build query for preset",
                         extra={"preset_id": preset.id, "preset_name": preset.name},
                     )
-                    pass
+            try:
+                counts = self.elastic_client.count_alerts(queries)
+            except Exception:
+                self.logger.exception("Failed to search alerts for presets")
+                counts = {}
+            for preset in presets:
+                if str(preset.id) not in counts:
+                    continue
+                preset.alerts_count, preset.should_do_noise_now = counts[str(preset.id)]
         self.logger.info(
             "Finished searching alerts for presets",
             extra={"tenant_id": self.tenant_id, "search_mode": self.search_mode},
         )
         return presets
 
+    def _create_positional_sql(self, sql_template, params) -> tuple[str, list]:
+        """
+        Replace the named placeholders in the SQL template with positional (?) ones, so
+        Elastic binds the parameters.
+
+        Returns:
+            tuple[str, list]: The SQL and its parameters.
+        """
+        params = params or {}
+        positional_params = []
+
+        def replace_placeholder(match):
+            key = match.group(1)
+            if key not in params:
+                return match.group(0)
+            value = params[key]
+            # severity is indexed by its order, see preprocess_cel_expression
+            field = re.search(
+                r"(\w+)\s*(?:[=><!]=?|\bin\b)\s*\(?(?:[^()]*,\s*)?$",
+                sql_template[: match.start()],
+                flags=re.IGNORECASE,
+            )
+            if (
+                field
+                and field.group(1).lower() == "severity"
+                and isinstance(value, str)
+            ):
+                severity = next(
+                    (
+                        severity
+                        for severity in AlertSeverity
+                        if severity.value == value.lower()
+                    ),
+                    None,
+                )
+                if severity is not None:
+                    value = severity.order
+            positional_params.append(value)
+            return "?"
+
+        sql = re.sub(r":(\w+)", replace_placeholder, sql_template or "")
+        return preprocess_cel_expression(sql), positional_params
+
     def _create_raw_sql(self, sql_template, params):
         """
         Replace placeholders in the SQL template with actual values from the params dictionary.
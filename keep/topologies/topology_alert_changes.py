@@ -0,0 +1,161 @@
+"""
+The alerts that changed since the topology processor last ran, per tenant and service.
+
+With KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL=true the ingestion records the fingerprints of
+the alerts it saves under their service, and the topology processor re-evaluates only
+the applications of these services instead of all the tenant's last alerts.
+
+When Redis is enabled (REDIS=true) the changes are shared by all the processes through
+the Redis connection configured in keep/api/redis_settings.py, so the alerts ingested by
+the workers reach the processor. Otherwise they are kept in the current process, and
+the alerts ingested by other processes are only processed by the full passes (the
+processor warns about it on start).
+
+Changes can get lost (they expire in Redis after KEEP_TOPOLOGY_ALERT_CHANGES_TTL seconds,
+the local ones are capped at KEEP_TOPOLOGY_ALERT_CHANGES_MAX_PENDING per tenant), the
+processor falls back to a full pass when it knows it, and periodically anyway.
+"""
+
+import json
+import logging
+import threading
+
+from keep.api.consts import REDIS
+from keep.api.core.config import config
+from keep.api.models.alert import AlertDto
+
+KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL = config(
+    "KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL", cast=bool, default=False
+)
+KEEP_TOPOLOGY_ALERT_CHANGES_TTL = config(
+    "KEEP_TOPOLOGY_ALERT_CHANGES_TTL", cast=int, default=3600
+)
+KEEP_TOPOLOGY_ALERT_CHANGES_MAX_PENDING = config(
+    "KEEP_TOPOLOGY_ALERT_CHANGES_MAX_PENDING", cast=int, default=100000
+)
+
+REDIS_KEY_PREFIX = "keep:topology:alert_changes"
+
+
+class TopologyAlertChanges:
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL
+            self.ttl = KEEP_TOPOLOGY_ALERT_CHANGES_TTL
+            self.max_pending = KEEP_TOPOLOGY_ALERT_CHANGES_MAX_PENDING
+            # tenant_id -> service -> fingerprints
+            self.pending: dict[str, dict[str, set[str]]] = {}
+            self.pending_count: dict[str, int] = {}
+            # tenants whose changes were dropped since they were last popped
+            self.overflowed: set[str] = set()
+            self._lock = threading.Lock()
+            self.redis = None
+            if self.enabled and REDIS:
+                from keep.api.redis_settings import get_redis_client
+
+                self.redis = get_redis_client()
+            self.__initialized = True
+
+    @staticmethod
+    def _redis_key(tenant_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{tenant_id}"
+
+    def add(self, tenant_id: str, alerts: list[AlertDto]):
+        """
+        Record the alerts that were saved, the ones without a service are ignored.
+        """
+        changes = {
+            (alert.service, alert.fingerprint)
+            for alert in alerts
+            if isinstance(alert.service, str) and alert.service and alert.fingerprint
+        }
+        if not changes:
+            return
+
+        if self.redis is not None:
+            try:
+                key = self._redis_key(tenant_id)
+                pipeline = self.redis.pipeline(transaction=True)
+                pipeline.sadd(key, *(json.dumps(change) for change in changes))
+                pipeline.expire(key, self.ttl)
+                pipeline.execute()
+                return
+            except Exception:
+                self.logger.exception(
+                    "Failed to record topology alert changes in Redis, using the local cache",
+                    extra={"tenant_id": tenant_id},
+                )
+
+        with self._lock:
+            if tenant_id in self.overflowed:
+                return
+            services = self.pending.setdefault(tenant_id, {})
+            count = self.pending_count.get(tenant_id, 0)
+            for service, fingerprint in changes:
+                fingerprints = services.setdefault(service, set())
+                if fingerprint not in fingerprints:
+                    fingerprints.add(fingerprint)
+                    count += 1
+            if count > self.max_pending:
+                self.logger.warning(
+                    "Too many pending topology alert changes, dropping them",
+                    extra={"tenant_id": tenant_id, "pending": count},
+                )
+                self.pending.pop(tenant_id, None)
+                self.pending_count.pop(tenant_id, None)
+                self.overflowed.add(tenant_id)
+            else:
+                self.pending_count[tenant_id] = count
+
+    def pop(self, tenant_id: str) -> dict[str, set[str]] | None:
+        """
+        Get and clear the changes of the tenant.
+
+        Returns:
+            dict[str, set[str]] | None: the fingerprints of the changed alerts by
+                service, None if changes were dropped and all the alerts must be
+                re-evaluated
+        """
+        with self._lock:
+            overflowed = tenant_id in self.overflowed
+            self.overflowed.discard(tenant_id)
+            changes = self.pending.pop(tenant_id, {})
+            self.pending_count.pop(tenant_id, None)
+
+        if self.redis is not None:
+            try:
+                # read and clear the changes at once, so none added meanwhile is lost
+                pipeline = self.redis.pipeline(transaction=True)
+                pipeline.smembers(self._redis_key(tenant_id))
+                pipeline.delete(self._redis_key(tenant_id))
+                redis_changes, _ = pipeline.execute()
+                for change in redis_changes:
+                    service, fingerprint = json.loads(change)
+                    changes.setdefault(service, set()).add(fingerprint)
+            except Exception:
+                self.logger.exception(
+                    "Failed to get topology alert changes from Redis",
+                    extra={"tenant_id": tenant_id},
+                )
+                return None
+
+        return None if overflowed else changes
+
+    def clear(self):
+        with self._lock:
+            self.pending.clear()
+            self.pending_count.clear()
+            self.overflowed.clear()
+
+
+def get_topology_alert_changes() -> TopologyAlertChanges:
+    return TopologyAlertChanges()
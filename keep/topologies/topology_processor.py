@@ -1,15 +1,18 @@
 import logging
 import os
 import threading
+import time
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, Optional, Set
+from uuid import UUID
 
 from sqlmodel import select
 
+from keep.api.consts import REDIS
 from keep.api.core.config import config
 from keep.api.core.db import (
     add_alerts_to_incident,
-    assign_alert_to_incident,
     enrich_incidents_with_alerts,
     existed_or_new_session,
     get_last_alerts,
@@ -19,11 +22,18 @@ from keep.api.core.tenant_configuration import TenantConfiguration
 from keep.api.models.alert import AlertDto, AlertStatus
 from keep.api.models.db.alert import Incident
 from keep.api.models.db.incident import IncidentStatus
-from keep.api.models.db.topology import TopologyServiceApplication
+from keep.api.models.db.topology import (
+    TopologyApplicationDtoOut,
+    TopologyServiceApplication,
+)
 from keep.api.models.incident import IncidentDto
 from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
 from keep.rulesengine.rulesengine import RulesEngine
 from keep.topologies.topologies_service import TopologiesService
+from keep.topologies.topology_alert_changes import (
+    KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL,
+    get_topology_alert_changes,
+)
 
 
 class TopologyProcessor:
@@ -39,6 +49,7 @@ class TopologyProcessor:
         self.started = False
         self.thread = None
         self._stop_event = threading.Event()
+        # tenant_id -> (expires at, service -> applications)
         self._topology_cache = {}
         self._cache_lock = threading.Lock()
         self.enabled = (
@@ -61,6 +72,20 @@ class TopologyProcessor:
         self.look_back_window = config(
             "KEEP_TOPOLOGY_PROCESSOR_LOOK_BACK_WINDOW", cast=int, default=15
         )  # minutes
+        # re-evaluate only the applications whose services' alerts were ingested
+        self.incremental = KEEP_TOPOLOGY_PROCESSOR_INCREMENTAL
+        # in incremental mode, all the alerts are still processed every interval
+        self.full_pass_interval = config(
+            "KEEP_TOPOLOGY_PROCESSOR_FULL_PASS_INTERVAL", cast=int, default=600
+        )  # seconds
+        self.index_ttl = config(
+            "KEEP_TOPOLOGY_PROCESSOR_INDEX_TTL", cast=int, default=60
+        )  # seconds
+        # tenants are processed in parallel by this many threads
+        self.workers = config("KEEP_TOPOLOGY_PROCESSOR_WORKERS", cast=int, default=4)
+        self._executor = None
+        # tenant_id -> time of the last full pass
+        self._last_full_pass: Dict[str, float] = {}
 
     async def start(self):
         """Runs the topology processor in server mode"""
@@ -73,6 +98,13 @@ class TopologyProcessor:
             return
 
         self.logger.info("Starting topology processor")
+        if self.incremental and not REDIS:
+            # the other processes record the alerts they ingest in their own memory
+            self.logger.warning(
+                "Incremental topology processing without Redis only sees the alerts "
+                "ingested by this process, the others wait for the next full pass",
+                extra={"full_pass_interval": self.full_pass_interval},
+            )
         self._stop_event.clear()
         self.thread = threading.Thread(
             target=self._start_processing, name="topology-processing", daemon=True
@@ -115,29 +147,78 @@ class TopologyProcessor:
             if self.thread.is_alive():
                 self.logger.warning("Topology processor thread did not stop gracefully")
 
+        with self._cache_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
         self.started = False
         self.thread = None
         self.logger.info("Stopped topology processor")
 
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._cache_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="topology-tenant"
+                )
+            return self._executor
+
     def _process_all_tenants(self):
-        """Process topology for all tenants"""
-        tenants = self.enabled_tenants.keys()
-        for tenant_id in tenants:
-            try:
-                self.logger.info(f"Processing topology for tenant {tenant_id}")
-                self._process_tenant(tenant_id)
-                self.logger.info(f"Finished processing topology for tenant {tenant_id}")
-            except Exception as e:
-                self.logger.exception(f"Error processing tenant {tenant_id}: {str(e)}")
+        """Process topology for all tenants, in parallel across the worker pool"""
+        tenants = list(self.enabled_tenants.keys())
+        if self.workers <= 1 or len(tenants) <= 1:
+            for tenant_id in tenants:
+                self._process_tenant_safely(tenant_id)
+            return
+
+        # wait for all the tenants, so a tenant is never processed twice at once
+        executor = self._get_executor()
+        wait([executor.submit(self._process_tenant_safely, t) for t in tenants])
+
+    def _process_tenant_safely(self, tenant_id: str):
+        try:
+            self.logger.info(f"Processing topology for tenant {tenant_id}")
+            self._process_tenant(tenant_id)
+            self.logger.info(f"Finished processing topology for tenant {tenant_id}")
+        except Exception as e:
+            self.logger.exception(f"Error processing tenant {tenant_id}: {str(e)}")
 
     def _process_tenant(self, tenant_id: str):
         """Process topology for a single tenant"""
+        if not self.incremental:
+            self._process_tenant_full(tenant_id)
+            return
+
+        last_full_pass = self._last_full_pass.get(tenant_id)
+        if (
+            last_full_pass is None
+            or time.monotonic() - last_full_pass >= self.full_pass_interval
+        ):
+            # the changes until now are covered by the full pass
+            get_topology_alert_changes().pop(tenant_id)
+            self._process_tenant_full(tenant_id)
+            self._last_full_pass[tenant_id] = time.monotonic()
+            return
+
+        changes = get_topology_alert_changes().pop(tenant_id)
+        if changes is None:
+            self.logger.info(
+                f"Topology alert changes were dropped for tenant {tenant_id}, processing all alerts"
+            )
+            self._process_tenant_full(tenant_id)
+            self._last_full_pass[tenant_id] = time.monotonic()
+            return
+        self._process_tenant_changes(tenant_id, changes)
+
+    def _process_tenant_full(self, tenant_id: str):
+        """Process the last alerts of all the services of a tenant"""
         self.logger.info(f"Processing topology for tenant {tenant_id}")
 
         # 1. Get last alerts for the tenant
         topology_data = self._get_topology_data(tenant_id)
         applications = self._get_applications_data(tenant_id)
-        services = [t.service for t in topology_data]
+        services = {t.service for t in topology_data}
         if not topology_data:
             self.logger.info(f"No topology data found for tenant {tenant_id}")
             return
@@ -148,14 +229,75 @@ class TopologyProcessor:
         if not applications:
             self.logger.info(f"No applications found for tenant {tenant_id}")
             return
+        self._set_service_index(tenant_id, services, applications)
 
         # TODO: get only alerts with service ( if lot of alerts it will be hidden)
         db_last_alerts = get_last_alerts(tenant_id, with_incidents=True)
         last_alerts = convert_db_alerts_to_dto_alerts(db_last_alerts)
+        services_to_alerts = self._group_alerts_by_service(last_alerts, services)
 
+        incidents = self._get_application_based_incidents(
+            tenant_id, [application.id for application in applications]
+        )
+        for application in applications:
+            self._process_application(
+                tenant_id,
+                application,
+                incidents.get(application.id),
+                services_to_alerts,
+            )
+
+    def _process_tenant_changes(self, tenant_id: str, changes: Dict[str, Set[str]]):
+        """Re-evaluate only the applications of the services whose alerts changed"""
+        if not changes:
+            return
+
+        service_index = self._get_service_index(tenant_id)
+        applications = {}
+        fingerprints = set()
+        for service, service_fingerprints in changes.items():
+            service_applications = service_index.get(service)
+            if not service_applications:
+                continue
+            fingerprints.update(service_fingerprints)
+            for application in service_applications:
+                applications[application.id] = application
+        if not applications:
+            self.logger.debug(
+                f"No application depends on the changed services of tenant {tenant_id}"
+            )
+            return
+
+        self.logger.info(
+            f"Processing {len(applications)} applications with alert changes for tenant {tenant_id}"
+        )
+        db_alerts = get_last_alerts(
+            tenant_id,
+            limit=len(fingerprints),
+            with_incidents=True,
+            fingerprints=list(fingerprints),
+        )
+        alerts = convert_db_alerts_to_dto_alerts(db_alerts)
+        # the alerts are grouped by their current service, which may have changed since
+        services_to_alerts = self._group_alerts_by_service(alerts, service_index)
+
+        incidents = self._get_application_based_incidents(
+            tenant_id, list(applications.keys())
+        )
+        for application in applications.values():
+            self._process_application(
+                tenant_id,
+                application,
+                incidents.get(application.id),
+                services_to_alerts,
+            )
+
+    def _group_alerts_by_service(
+        self, alerts: list[AlertDto], services
+    ) -> Dict[str, list[AlertDto]]:
         services_to_alerts = defaultdict(list)
         # group by service
-        for alert in last_alerts:
+        for alert in alerts:
             if alert.service:
                 if alert.service not in services:
                     # ignore alerts for services not in topology data
@@ -164,45 +306,86 @@ class TopologyProcessor:
                     )
                     continue
                 services_to_alerts[alert.service].append(alert)
+        return services_to_alerts
 
-        for application in applications:
-            # check if there is an incident for the application
-            incident = self._get_application_based_incident(tenant_id, application)
-            application_services = [t.service for t in application.services]
-            services_with_alerts = [
-                service
-                for service in application_services
-                if service in services_to_alerts
-            ]
-            # if none of the services in the application have alerts, we don't need to create an incident
-            if not services_with_alerts:
-                self.logger.info(
-                    f"No alerts found for application {application.name}, skipping"
-                )
-                continue
+    def _process_application(
+        self,
+        tenant_id: str,
+        application: TopologyApplicationDtoOut,
+        incident: Optional[Incident],
+        services_to_alerts: Dict[str, list[AlertDto]],
+    ):
+        """Create or update the incident of an application with its services' alerts"""
+        application_services = [t.service for t in application.services]
+        services_with_alerts = {
+            service: services_to_alerts[service]
+            for service in application_services
+            if service in services_to_alerts
+        }
+        # if none of the services in the application have alerts, we don't need to create an incident
+        if not services_with_alerts:
+            self.logger.info(
+                f"No alerts found for application {application.name}, skipping"
+            )
+            return
 
-            # if we are here - we have alerts for the application, we need to create/update an incident
+        # if we are here - we have alerts for the application, we need to create/update an incident
+        self.logger.info(
+            f"Found alerts for application {application.name}, creating/updating incident"
+        )
+        # if an incident exists, we will update it
+        # NOTE: we support only one incident per application for now
+        if incident:
             self.logger.info(
-                f"Found alerts for application {application.name}, creating/updating incident"
+                f"Found existing incident for application {application.name}"
+            )
+            # update the incident with new alerts / status / severity
+            self._update_application_based_incident(
+                tenant_id, application, incident, services_with_alerts
+            )
+        else:
+            self.logger.info(
+                f"No existing incident found for application {application.name}"
+            )
+            # create a new incident with the alerts
+            self._create_application_based_incident(
+                tenant_id, application, services_with_alerts
             )
-            # if an incident exists, we will update it
-            # NOTE: we support only one incident per application for now
-            if incident:
-                self.logger.info(
-                    f"Found existing incident for application {application.name}"
-                )
-                # update the incident with new alerts / status / severity
-                self._update_application_based_incident(
-                    tenant_id, application, incident, services_to_alerts
-                )
-            else:
-                self.logger.info(
-                    f"No existing incident found for application {application.name}"
-                )
-                # create a new incident with the alerts
-                self._create_application_based_incident(
-                    tenant_id, application, services_to_alerts
-                )
+
+    def _set_service_index(
+        self,
+        tenant_id: str,
+        services: Set[str],
+        applications: list[TopologyApplicationDtoOut],
+    ) -> Dict[str, list[TopologyApplicationDtoOut]]:
+        # service -> the applications it belongs to
+        service_index = defaultdict(list)
+        for application in applications:
+            for application_service in application.services:
+                if application_service.service in services:
+                    service_index[application_service.service].append(application)
+        service_index = dict(service_index)
+        with self._cache_lock:
+            self._topology_cache[tenant_id] = (
+                time.monotonic() + self.index_ttl,
+                service_index,
+            )
+        return service_index
+
+    def _get_service_index(
+        self, tenant_id: str
+    ) -> Dict[str, list[TopologyApplicationDtoOut]]:
+        """Get the service -> applications index of a tenant, rebuilt every index TTL"""
+        with self._cache_lock:
+            cached = self._topology_cache.get(tenant_id)
+        if cached is not None and cached[0] >= time.monotonic():
+            return cached[1]
+
+        topology_data = self._get_topology_data(tenant_id)
+        applications = self._get_applications_data(tenant_id)
+        return self._set_service_index(
+            tenant_id, {t.service for t in topology_data}, applications
+        )
 
     def _get_topology_based_incidents(self, tenant_id: str) -> Dict[str, Incident]:
         """Get all topology-based incidents for a tenant"""
@@ -227,15 +410,23 @@ class TopologyProcessor:
         # get all alerts within services that have dependencies:
         return incidents
 
-    def _get_application_based_incident(
-        self, tenant_id, application: TopologyServiceApplication
-    ) -> Optional[Incident]:
-        """Get the incident for an application"""
+    def _get_application_based_incidents(
+        self, tenant_id: str, application_ids: list[UUID]
+    ) -> Dict[UUID, Incident]:
+        """Get the incidents of the applications, by application id"""
+        if not application_ids:
+            return {}
         with existed_or_new_session() as session:
-            incident = session.exec(
-                select(Incident).where(Incident.incident_application == application.id)
-            ).first()
-            return incident
+            incidents = session.exec(
+                select(Incident).where(
+                    Incident.tenant_id == tenant_id,
+                    Incident.incident_application.in_(application_ids),
+                )
+            ).all()
+        application_incidents = {}
+        for incident in incidents:
+            application_incidents.setdefault(incident.incident_application, incident)
+        return application_incidents
 
     def _get_topology_data(self, tenant_id: str):
         """Get topology data for a tenant"""
@@ -359,18 +550,21 @@ class TopologyProcessor:
                 is_visible=True,  # Topology-based incidents are always confirmed
             )
 
-            # Get all alerts for the services and find max severity
-            for service in services_with_alerts:
-                service_alerts = services_with_alerts[service]
+            # the incident must exist before alerts are assigned to it
+            session.add(incident)
+            session.commit()
+            session.refresh(incident)
 
-                # Assign alerts to incident
-                for alert in service_alerts:
-                    incident = assign_alert_to_incident(
-                        fingerprint=alert.fingerprint,
-                        incident=incident,
-                        tenant_id=tenant_id,
-                        session=session,
-                    )
+            # Assign the alerts of all the services at once
+            alerts = []
+            for service in services_with_alerts:
+                alerts.extend(services_with_alerts[service])
+            incident = add_alerts_to_incident(
+                tenant_id=tenant_id,
+                incident=incident,
+                fingerprints=[alert.fingerprint for alert in alerts],
+                session=session,
+            )
 
             # Send notification about new incident
             incident_dto = IncidentDto.from_db_incident(incident)
@@ -0,0 +1,188 @@
+"""
+Bounded in-process cache of the parsed workflows served by WorkflowStore.get_workflow.
+
+Parsing a workflow loads the yaml, resolves the providers configuration (through the
+secret manager) and instantiates the providers of every step and action, which is
+much more expensive than copying an already parsed workflow.
+"""
+
+import copy
+import logging
+import threading
+import time
+import typing
+from collections import OrderedDict
+
+from keep.api.core.config import config
+from keep.api.core.metrics import (
+    workflow_cache_hits_total,
+    workflow_cache_misses_total,
+    workflow_cache_parse_seconds_saved_total,
+    workflow_cache_size,
+)
+from keep.api.models.db.workflow import Workflow as WorkflowModel
+from keep.workflowmanager.workflow import Workflow
+
+KEEP_WORKFLOW_CACHE_ENABLED = config(
+    "KEEP_WORKFLOW_CACHE_ENABLED", cast=bool, default=True
+)
+# max number of parsed workflows kept in the cache
+KEEP_WORKFLOW_CACHE_SIZE = config("KEEP_WORKFLOW_CACHE_SIZE", cast=int, default=1000)
+# parsed workflows hold the providers configuration and secrets resolved at parse time,
+# so they are re-parsed after this many seconds to pick up rotated credentials
+KEEP_WORKFLOW_CACHE_TTL = config("KEEP_WORKFLOW_CACHE_TTL", cast=int, default=60)
+
+# workflows using these are loaded with the last execution results at parse time
+UNCACHEABLE_WORKFLOW_KEYWORDS = ("last_workflow_results", "last_workflow_run_time")
+
+
+class CachedWorkflow(typing.NamedTuple):
+    revision: tuple
+    # never run, only copied
+    workflow: Workflow
+    parse_time: float
+    expires_at: float
+
+
+class WorkflowCache:
+    """
+    Parsed workflows keyed by tenant, workflow id and revision.
+
+    A workflow holds the state of its execution (context, providers results),
+    so the cached workflow is never handed out: every get returns a deep copy of it.
+    """
+
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            self.enabled = KEEP_WORKFLOW_CACHE_ENABLED
+            self.max_size = KEEP_WORKFLOW_CACHE_SIZE
+            self.ttl = KEEP_WORKFLOW_CACHE_TTL
+            # (tenant_id, workflow_id) -> CachedWorkflow of the latest parsed revision
+            self.cache: OrderedDict[tuple[str, str], CachedWorkflow] = OrderedDict()
+            # (tenant_id, workflow_id) -> the revision that failed to be copied,
+            # it's parsed on every get without trying to copy it again
+            self.uncopyable: OrderedDict[tuple[str, str], tuple] = OrderedDict()
+            self._lock = threading.Lock()
+            self.__initialized = True
+
+    @staticmethod
+    def _workflow_revision(workflow_model: WorkflowModel) -> tuple:
+        return (workflow_model.revision, workflow_model.last_updated)
+
+    @staticmethod
+    def is_cacheable(workflow_model: WorkflowModel) -> bool:
+        return not any(
+            keyword in (workflow_model.workflow_raw or "")
+            for keyword in UNCACHEABLE_WORKFLOW_KEYWORDS
+        )
+
+    def get_workflow(
+        self,
+        tenant_id: str,
+        workflow_model: WorkflowModel,
+        parse_workflow: typing.Callable[[], Workflow],
+    ) -> Workflow:
+        """
+        Get a fresh copy of the parsed workflow, parsing it only if its revision
+        isn't cached or its cache entry expired.
+
+        Args:
+            tenant_id (str): the tenant id
+            workflow_model (WorkflowModel): the workflow row
+            parse_workflow (Callable): parses the workflow row
+
+        Returns:
+            Workflow: a workflow that can be run
+        """
+        if not self.enabled or not self.is_cacheable(workflow_model):
+            return parse_workflow()
+
+        key = (tenant_id, workflow_model.id)
+        revision = self._workflow_revision(workflow_model)
+        with self._lock:
+            if self.uncopyable.get(key) == revision:
+                return parse_workflow()
+            entry = self.cache.get(key)
+            if entry is not None and (
+                entry.revision != revision or entry.expires_at < time.monotonic()
+            ):
+                del self.cache[key]
+                entry = None
+            if entry is not None:
+                self.cache.move_to_end(key)
+
+        if entry is not None:
+            try:
+                workflow = copy.deepcopy(entry.workflow)
+                workflow_cache_hits_total.inc()
+                workflow_cache_parse_seconds_saved_total.inc(entry.parse_time)
+                return workflow
+            except Exception:
+                self.logger.exception(
+                    "Failed to copy cached workflow, parsing it",
+                    extra={"tenant_id": tenant_id, "workflow_id": workflow_model.id},
+                )
+                self.invalidate(tenant_id, workflow_model.id)
+                self._set_uncopyable(key, revision)
+                return parse_workflow()
+
+        workflow_cache_misses_total.inc()
+        start = time.perf_counter()
+        workflow = parse_workflow()
+        parse_time = time.perf_counter() - start
+        try:
+            workflow_copy = copy.deepcopy(workflow)
+        except Exception:
+            # e.g. a provider holding a client that can't be copied
+            self.logger.warning(
+                "Workflow can't be copied, it will not be cached",
+                exc_info=True,
+                extra={"tenant_id": tenant_id, "workflow_id": workflow_model.id},
+            )
+            self._set_uncopyable(key, revision)
+            return workflow
+
+        with self._lock:
+            self.cache[key] = CachedWorkflow(
+                revision, workflow, parse_time, time.monotonic() + self.ttl
+            )
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.max_size:
+                self.cache.popitem(last=False)
+            workflow_cache_size.set(len(self.cache))
+        return workflow_copy
+
+    def _set_uncopyable(self, key: tuple[str, str], revision: tuple):
+        with self._lock:
+            self.uncopyable[key] = revision
+            self.uncopyable.move_to_end(key)
+            while len(self.uncopyable) > self.max_size:
+                self.uncopyable.popitem(last=False)
+
+    def invalidate(self, tenant_id: str, workflow_id: str | None = None):
+        """
+        Drop a single workflow, or all the workflows of the tenant if no workflow id is given.
+        """
+        with self._lock:
+            if workflow_id is None:
+                for key in [key for key in self.cache if key[0] == tenant_id]:
+                    del self.cache[key]
+                for key in [key for key in self.uncopyable if key[0] == tenant_id]:
+                    del self.uncopyable[key]
+            else:
+                self.cache.pop((tenant_id, workflow_id), None)
+                self.uncopyable.pop((tenant_id, workflow_id), None)
+            workflow_cache_size.set(len(self.cache))
+
+
+def get_workflow_cache() -> WorkflowCache:
+    return WorkflowCache()
@@ -21,6 +21,11 @@ from keep.providers.providers_factory import ProviderConfigurationException
 from keep.workflowmanager.workflow import Workflow
 from keep.workflowmanager.workflowscheduler import WorkflowScheduler, timing_histogram
 from keep.workflowmanager.workflowstore import WorkflowStore
+from keep.workflowmanager.workflowtriggerindex import (
+    CompiledTrigger,
+    WorkflowTriggerIndex,
+    get_workflow_trigger_index,
+)
 from keep.api.utils.cel_utils import preprocess_cel_expression
 
 
@@ -50,6 +55,7 @@ class WorkflowManager:
         self.workflow_store = WorkflowStore()
         self.started = False
         self.cel_environment = celpy.Environment()
+        self.trigger_index = get_workflow_trigger_index()
         # this is to enqueue the workflows in the REDIS queue
         # SHAHAR: todo - finish the REDIS implementation
         # self.loop = None
@@ -163,16 +169,15 @@ class WorkflowManager:
                     setattr(incident, k, v)
 
             self.logger.info("Adding workflow to run")
-            with self.scheduler.lock:
-                self.scheduler.workflows_to_run.append(
-                    {
-                        "workflow": workflow,
-                        "workflow_id": workflow_model.id,
-                        "tenant_id": tenant_id,
-                        "triggered_by": "incident:{}".format(trigger),
-                        "event": incident,
-                    }
-                )
+            self.scheduler.add_workflow_to_run(
+                {
+                    "workflow": workflow,
+                    "workflow_id": workflow_model.id,
+                    "tenant_id": tenant_id,
+                    "triggered_by": "incident:{}".format(trigger),
+                    "event": incident,
+                }
+            )
             self.logger.info("Workflow added to run")
 
     # @tb: should I move it to cel_utils.py?
@@ -284,152 +289,126 @@ class WorkflowManager:
             )
             raise
 
-    def insert_events(self, tenant_id, events: typing.List[AlertDto | IncidentDto]):
-        for event in events:
-            self.logger.info("Getting all workflows", extra={"tenant_id": tenant_id})
-            all_workflow_models = self.workflow_store.get_all_workflows(
-                tenant_id, exclude_disabled=True
-            )
-            self.logger.info(
-                "Got all workflows",
-                extra={
-                    "num_of_workflows": len(all_workflow_models),
-                    "tenant_id": tenant_id,
-                },
-            )
-            for workflow_model in all_workflow_models:
-                workflow = self._get_workflow_from_store(tenant_id, workflow_model)
+    def _compile_alert_triggers(self, workflow_model) -> list[CompiledTrigger]:
+        """
+        Compile the CEL of the workflow's alert triggers, skipping the invalid ones.
+        """
+        compiled_triggers = []
+        for trigger in WorkflowTriggerIndex.get_alert_triggers(
+            workflow_model.workflow_raw
+        ):
+            if "filters" not in trigger and "cel" not in trigger:
+                self.logger.warning(
+                    "Trigger is missing filters or cel",
+                    extra={
+                        "trigger": trigger,
+                        "workflow_id": workflow_model.id,
+                        "tenant_id": workflow_model.tenant_id,
+                    },
+                )
+                compiled_triggers.append(CompiledTrigger(trigger, None, None))
+                continue
 
-                if workflow is None:
-                    # Exception is thrown in _get_workflow_from_store, we don't need to log it here, just continue.
+            # backward compatibility for filter. should be removed in the future
+            # if triggers and cel are set, we override the cel with filters.
+            if "filters" in trigger:
+                try:
+                    # this is old format, so let's convert it to CEL
+                    trigger["cel"] = self._convert_filters_to_cel(trigger["filters"])
+                except Exception:
+                    self.logger.exception(
+                        "Failed to convert filters to CEL, workflow will not run",
+                        extra={
+                            "trigger": trigger,
+                            "workflow_id": workflow_model.id,
+                            "tenant_id": workflow_model.tenant_id,
+                        },
+                    )
                     continue
 
-                for trigger in workflow.workflow_triggers:
-                    # If the trigger is not an alert, it's not relevant for this event.
-                    if not trigger.get("type") == "alert":
-                        self.logger.debug(
-                            "Trigger type is not alert, skipping",
-                            extra={
-                                "trigger": trigger,
-                                "workflow_id": workflow_model.id,
-                                "tenant_id": tenant_id,
-                            },
-                        )
-                        continue
-
-                    if "filters" not in trigger and "cel" not in trigger:
-                        self.logger.warning(
-                            "Trigger is missing filters or cel",
-                            extra={
-                                "trigger": trigger,
-                                "workflow_id": workflow_model.id,
-                                "tenant_id": tenant_id,
-                            },
-                        )
-                        should_run = True
-                    else:
+            cel = trigger.get("cel", "")
+            if not cel:
+                self.logger.warning(
+                    "Trigger is missing cel",
+                    extra={
+                        "trigger": trigger,
+                        "workflow_id": workflow_model.id,
+                        "tenant_id": workflow_model.tenant_id,
+                    },
+                )
+                continue
 
-                        # By default, the workflow should not run. Only if the CEL evaluates to true, the workflow will run.
-                        should_run = False
+            # source is a special case which can be used as string comparison although it is a list
+            if "source" in cel:
+                pattern = r'source\s*==\s*[\'"]([^\'"]+)[\'"]'
+                replacement = r'source.contains("\1")'
+                cel = re.sub(pattern, replacement, cel)
 
-                        # backward compatibility for filter. should be removed in the future
-                        # if triggers and cel are set, we override the cel with filters.
-                        if "filters" in trigger:
-                            try:
-                                # this is old format, so let's convert it to CEL
-                                trigger["cel"] = self._convert_filters_to_cel(
-                                    trigger["filters"]
-                                )
-                            except Exception:
-                                self.logger.exception(
-                                    "Failed to convert filters to CEL, workflow will not run",
-                                    extra={
-                                        "trigger": trigger,
-                                        "workflow_id": workflow_model.id,
-                                        "tenant_id": tenant_id,
-                                    },
-                                )
-                                continue
-
-                        cel = trigger.get("cel", "")
-                        if not cel:
-                            self.logger.warning(
-                                "Trigger is missing cel",
-                                extra={
-                                    "trigger": trigger,
-                                    "workflow_id": workflow_model.id,
-                                    "tenant_id": tenant_id,
-                                },
-                            )
-                            continue
+            # Preprocess the CEL expression to handle severity comparisons properly
+            try:
+                cel = preprocess_cel_expression(cel)
+                compiled_ast = self.cel_environment.compile(cel)
+                program = self.cel_environment.program(compiled_ast)
+            except Exception:
+                self.logger.exception(
+                    "Error compiling CEL expression, workflow will not run",
+                    extra={
+                        "cel": cel,
+                        "trigger": trigger,
+                        "workflow_id": workflow_model.id,
+                        "tenant_id": workflow_model.tenant_id,
+                    },
+                )
+                continue
+            compiled_triggers.append(CompiledTrigger(trigger, cel, program))
+        return compiled_triggers
 
-                        # source is a special case which can be used as string comparison although it is a list
-                        if "source" in cel:
-                            try:
-                                self.logger.info(
-                                    "Checking if source needs to be replaced",
-                                    extra={
-                                        "cel": cel,
-                                        "trigger": trigger,
-                                        "workflow_id": workflow_model.id,
-                                        "tenant_id": tenant_id,
-                                    },
-                                )
-                                pattern = r'source\s*==\s*[\'"]([^\'"]+)[\'"]'
-                                replacement = r'source.contains("\1")'
-                                cel = re.sub(pattern, replacement, cel)
-                            except Exception:
-                                self.logger.exception(
-                                    "Error replacing source in CEL",
-                                    extra={
-                                        "cel": cel,
-                                        "trigger": trigger,
-                                        "workflow_id": workflow_model.id,
-                                        "tenant_id": tenant_id,
-                                    },
-                                )
-                                continue
+    @staticmethod
+    def _get_event_activation(event: AlertDto | IncidentDto):
+        # Convert event to dict and normalize severity for CEL evaluation
+        event_payload = event.dict()
+        # Convert severity string to numeric order for proper comparison with preprocessed CEL
+        if isinstance(event_payload.get("severity"), str):
+            try:
+                event_payload["severity"] = AlertSeverity(
+                    event_payload["severity"].lower()
+                ).order
+            except (ValueError, AttributeError):
+                # If severity conversion fails, keep original value
+                pass
+        return celpy.json_to_cel(event_payload)
 
-                        # Preprocess the CEL expression to handle severity comparisons properly
-                        try:
-                            cel = preprocess_cel_expression(cel)
-                            self.logger.debug(
-                                "Preprocessed CEL expression",
-                                extra={
-                                    "original_cel": trigger.get("cel", ""),
-                                    "preprocessed_cel": cel,
-                                    "workflow_id": workflow_model.id,
-                                    "tenant_id": tenant_id,
-                                },
-                            )
-                        except Exception:
-                            self.logger.exception(
-                                "Error preprocessing CEL expression",
-                                extra={
-                                    "cel": cel,
-                                    "trigger": trigger,
-                                    "workflow_id": workflow_model.id,
-                                    "tenant_id": tenant_id,
-                                },
-                            )
-                            continue
+    def insert_events(self, tenant_id, events: typing.List[AlertDto | IncidentDto]):
+        self.logger.info("Getting all workflows", extra={"tenant_id": tenant_id})
+        all_workflow_models = self.workflow_store.get_all_workflows(
+            tenant_id, exclude_disabled=True
+        )
+        self.logger.info(
+            "Got all workflows",
+            extra={
+                "num_of_workflows": len(all_workflow_models),
+                "tenant_id": tenant_id,
+            },
+        )
+        # compiled alert triggers, only recompiled when a workflow changes
+        workflows_triggers = self.trigger_index.get_triggers(
+            tenant_id, all_workflow_models, self._compile_alert_triggers
+        )
 
-                        compiled_ast = self.cel_environment.compile(cel)
-                        program = self.cel_environment.program(compiled_ast)
-
-                        # Convert event to dict and normalize severity for CEL evaluation
-                        event_payload = event.dict()
-                        # Convert severity string to numeric order for proper comparison with preprocessed CEL
-                        if isinstance(event_payload.get("severity"), str):
-                            try:
-                                event_payload["severity"] = AlertSeverity(
-                                    event_payload["severity"].lower()
-                                ).order
-                            except (ValueError, AttributeError):
-                                # If severity conversion fails, keep original value
-                                pass
-
-                        activation = celpy.json_to_cel(event_payload)
+        for event in events:
+            # the activation is built once per event, and rebuilt only if the event gets enriched
+            activation = None
+            for workflow_model in all_workflow_models:
+                # the workflow is parsed only if one of its triggers matched the event
+                workflow = None
+                for trigger, cel, program in workflows_triggers.get(
+                    workflow_model.id, []
+                ):
+                    if program is None:
+                        should_run = True
+                    else:
+                        if activation is None:
+                            activation = self._get_event_activation(event)
                         try:
                             should_run = program.evaluate(activation)
                         except celpy.evaluation.CELEvalError as e:
@@ -441,7 +420,7 @@ class WorkflowManager:
                                     "trigger": trigger,
                                     "workflow_id": workflow_model.id,
                                     "tenant_id": tenant_id,
-                                    "cel": trigger["cel"],
+                                    "cel": cel,
                                     "deprecated_filters": trigger.get("filters"),
                                 },
                             )
@@ -451,15 +430,22 @@ class WorkflowManager:
                         self.logger.debug(
                             "Workflow should not run, skipping",
                             extra={
-                                "triggers": workflow.workflow_triggers,
+                                "trigger": trigger,
                                 "workflow_id": workflow_model.id,
                                 "tenant_id": tenant_id,
-                                "cel": trigger["cel"],
+                                "cel": cel,
                                 "deprecated_filters": trigger.get("filters"),
                             },
                         )
                         continue
 
+                    if workflow is None:
+                        workflow = self._get_workflow_from_store(
+                            tenant_id, workflow_model
+                        )
+                        if workflow is None:
+                            break
+
                     # enrich the alert with more data
                     self.logger.info("Found a workflow to run")
                     event.trigger = "alert"
@@ -469,9 +455,13 @@ class WorkflowManager:
                     if alert_enrichment:
                         for k, v in alert_enrichment.enrichments.items():
                             setattr(event, k, v)
+                    # the event changed, the next triggers need a fresh activation
+                    activation = None
                     self.logger.info("Alert enriched")
                     # apply only_on_change (https://github.com/keephq/keep/issues/801)
-                    fields_that_needs_to_be_change = trigger.get("only_on_change", [])
+                    fields_that_needs_to_be_change = list(
+                        trigger.get("only_on_change", [])
+                    )
                     severity_changed = trigger.get("severity_changed", False)
                     # if there are fields that needs to be changed, get the previous alert
                     if fields_that_needs_to_be_change or severity_changed:
@@ -566,16 +556,15 @@ class WorkflowManager:
                                 },
                             )
                     """
-                    with self.scheduler.lock:
-                        self.scheduler.workflows_to_run.append(
-                            {
-                                "workflow": workflow,
-                                "workflow_id": workflow_model.id,
-                                "tenant_id": tenant_id,
-                                "triggered_by": "alert",
-                                "event": event,
-                            }
-                        )
+                    self.scheduler.add_workflow_to_run(
+                        {
+                            "workflow": workflow,
+                            "workflow_id": workflow_model.id,
+                            "tenant_id": tenant_id,
+                            "triggered_by": "alert",
+                            "event": event,
+                        }
+                    )
                     self.logger.info("Workflow added to run")
             self.logger.info("All workflows added to run")
 
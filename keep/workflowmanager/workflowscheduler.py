@@ -1,25 +1,34 @@
 import enum
 import hashlib
+import json
 import logging
 import time
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
-from threading import Lock
+from threading import Condition, Lock
 
 from sqlalchemy.exc import IntegrityError
 
 from keep.api.consts import RUNNING_IN_CLOUD_RUN
 from keep.api.core.config import config
-from keep.api.core.db import create_workflow_execution
+from keep.api.core.db import (
+    create_workflow_execution,
+    delete_queued_workflow_execution,
+    enqueue_workflow_execution,
+)
 from keep.api.core.db import finish_workflow_execution as finish_workflow_execution_db
 from keep.api.core.db import (
     get_enrichment,
+    get_interval_workflows_to_run,
     get_previous_execution_id,
     get_timeouted_workflow_exections,
 )
 from keep.api.core.db import get_workflow_by_id as get_workflow_db
-from keep.api.core.db import get_workflows_that_should_run
+from keep.api.core.db import (
+    lease_queued_workflow_executions,
+    release_queued_workflow_execution,
+)
 from keep.api.core.metrics import (
     workflow_execution_errors_total,
     workflow_execution_status,
@@ -75,6 +84,22 @@ def timing_histogram(histogram):
 class WorkflowScheduler:
     MAX_SIZE_SIGNED_INT = 2147483647
     MAX_WORKERS = config("KEEP_MAX_WORKFLOW_WORKERS", default="20", cast=int)
+    # the scheduler sleeps until it is woken up or the next interval workflow is due,
+    # but at most this long so interval workflows created by other processes get picked up
+    MAX_SLEEP_SECONDS = config(
+        "KEEP_WORKFLOW_SCHEDULER_MAX_SLEEP_SECONDS", default="5", cast=float
+    )
+    # how long to wait before retrying workflows that collided with a running execution
+    RETRY_SLEEP_SECONDS = 1
+    TIMEOUT_CHECKS_EVERY_SECONDS = 100
+    # leased queued workflows are hidden from the other schedulers for this long
+    QUEUE_VISIBILITY_TIMEOUT = config(
+        "KEEP_WORKFLOWS_QUEUE_VISIBILITY_TIMEOUT", default="300", cast=int
+    )
+    # queued workflows leased this many times without being handled are dropped
+    QUEUE_MAX_ATTEMPTS = config(
+        "KEEP_WORKFLOWS_QUEUE_MAX_ATTEMPTS", default="5", cast=int
+    )
 
     def __init__(self, workflow_manager):
         self.logger = logging.getLogger(__name__)
@@ -84,9 +109,20 @@ class WorkflowScheduler:
         self.workflows_to_run = []
         self._stop = False
         self.lock = Lock()
+        # notified when workflows are added to run, so they don't wait for the next iteration
+        self.wakeup = Condition(self.lock)
+        self._wakeup_pending = False
+        # when the interval workflows are checked next (time.monotonic()), the next
+        # interval workflow due time but at most MAX_SLEEP_SECONDS ahead, None to check
+        # on the next iteration
+        self._next_interval_due_at = None
         self.interval_enabled = (
             config("WORKFLOWS_INTERVAL_ENABLED", default="true") == "true"
         )
+        # event workflows are queued in the database, so any scheduler can run them
+        self.queue_enabled = config(
+            "KEEP_WORKFLOWS_QUEUE_ENABLED", default="false", cast=bool
+        )
         self.executor = ThreadPoolExecutor(
             max_workers=self.MAX_WORKERS,
             thread_name_prefix="WorkflowScheduler",
@@ -119,15 +155,31 @@ class WorkflowScheduler:
             self.logger.debug("Interval workflows are disabled")
             return
 
+        # woken up for event workflows before any interval workflow is due
+        if (
+            self._next_interval_due_at is not None
+            and time.monotonic() < self._next_interval_due_at
+        ):
+            return
+
         try:
-            # get all workflows that should run due to interval
-            workflows = get_workflows_that_should_run()
+            # get all workflows that should run due to interval, and when the next is due
+            workflows, next_due_in = get_interval_workflows_to_run(
+                look_ahead_seconds=self.MAX_SLEEP_SECONDS
+            )
+            # check again at most MAX_SLEEP_SECONDS from now, so interval workflows
+            # created or updated meanwhile get picked up
+            if next_due_in is None:
+                next_due_in = self.MAX_SLEEP_SECONDS
+            self._next_interval_due_at = time.monotonic() + min(
+                next_due_in, self.MAX_SLEEP_SECONDS
+            )
         except Exception as ex:
             self.logger.warning(
                 "Error getting workflows that should run",
                 exc_info=ex,
             )
-            pass
+            self._next_interval_due_at = time.monotonic() + self.RETRY_SLEEP_SECONDS
         for workflow in workflows:
             workflow_execution_id = workflow.get("workflow_execution_id")
             tenant_id = workflow.get("tenant_id")
@@ -180,6 +232,8 @@ class WorkflowScheduler:
             )
             self.futures.add(future)
             future.add_done_callback(lambda f: self.futures.remove(f))
+            # the workflow's next run is scheduled from this execution, once it's finished
+            future.add_done_callback(lambda f: self._refresh_interval_workflows())
 
     def _run_workflow(
         self,
@@ -334,22 +388,21 @@ class WorkflowScheduler:
                 "triggered_by_user": triggered_by_user,
             },
         )
-        with self.lock:
-            event.trigger = "manual"
-            self.workflows_to_run.append(
-                {
-                    "workflow_id": workflow_id,
-                    "workflow": workflow,
-                    "workflow_execution_id": workflow_execution_id,
-                    "tenant_id": tenant_id,
-                    "triggered_by": "manual",
-                    "triggered_by_user": triggered_by_user,
-                    "event": event,
-                    "retry": True,
-                    "test_run": test_run,
-                    "inputs": inputs,
-                }
-            )
+        event.trigger = "manual"
+        self.add_workflow_to_run(
+            {
+                "workflow_id": workflow_id,
+                "workflow": workflow,
+                "workflow_execution_id": workflow_execution_id,
+                "tenant_id": tenant_id,
+                "triggered_by": "manual",
+                "triggered_by_user": triggered_by_user,
+                "event": event,
+                "retry": True,
+                "test_run": test_run,
+                "inputs": inputs,
+            }
+        )
         return workflow_execution_id
 
     def _get_unique_execution_number(self, fingerprint=None, workflow_id=None):
@@ -405,217 +458,305 @@ class WorkflowScheduler:
                 error=timeout_message,
             )
 
-    def _handle_event_workflows(self):
-        # TODO - event workflows should be in DB too, to avoid any state problems.
+    @staticmethod
+    def _serialize_workflow_to_run(workflow_to_run: dict) -> dict:
+        payload = {
+            key: value
+            for key, value in workflow_to_run.items()
+            if key not in ("workflow", "event", "queued_execution", "requeued")
+        }
+        event = workflow_to_run.get("event")
+        if event is not None:
+            payload["event_type"] = (
+                "incident" if isinstance(event, IncidentDto) else "alert"
+            )
+            payload["event"] = json.loads(event.json())
+        return payload
+
+    @staticmethod
+    def _deserialize_workflow_to_run(queued_execution) -> dict:
+        workflow_to_run = dict(queued_execution.payload)
+        event = workflow_to_run.pop("event", None)
+        event_type = workflow_to_run.pop("event_type", "alert")
+        if event is not None:
+            if event_type == "incident":
+                workflow_to_run["event"] = IncidentDto(
+                    **{**event, "tenant_id": queued_execution.tenant_id}
+                )
+            else:
+                workflow_to_run["event"] = AlertDto(**event)
+        workflow_to_run["queued_execution"] = (
+            queued_execution.id,
+            queued_execution.lease_id,
+        )
+        return workflow_to_run
+
+    def add_workflow_to_run(self, workflow_to_run: dict):
+        """
+        Add an event workflow to run, to the shared queue when enabled.
+
+        Workflows given by definition (e.g. test runs) can't be queued, they always
+        run on this scheduler.
+        """
+        if self.queue_enabled and workflow_to_run.get("workflow") is None:
+            try:
+                enqueue_workflow_execution(
+                    tenant_id=workflow_to_run.get("tenant_id"),
+                    workflow_id=workflow_to_run.get("workflow_id"),
+                    payload=self._serialize_workflow_to_run(workflow_to_run),
+                )
+                self.wake_up()
+                return
+            except Exception:
+                self.logger.exception(
+                    "Failed to queue workflow, running it on this scheduler",
+                    extra={
+                        "workflow_id": workflow_to_run.get("workflow_id"),
+                        "tenant_id": workflow_to_run.get("tenant_id"),
+                    },
+                )
+        with self.lock:
+            self.workflows_to_run.append(workflow_to_run)
+        self.wake_up()
+
+    def _lease_queued_workflows(self) -> list[dict]:
+        if not self.queue_enabled:
+            return []
+
+        # don't lease more than this scheduler can run, the other schedulers will get the rest
+        capacity = self.MAX_WORKERS - len(self.futures)
+        if capacity <= 0:
+            return []
+        try:
+            queued_executions = lease_queued_workflow_executions(
+                limit=capacity, visibility_timeout=self.QUEUE_VISIBILITY_TIMEOUT
+            )
+        except Exception:
+            self.logger.exception("Failed to lease queued workflows")
+            return []
+
+        workflows_to_run = []
+        for queued_execution in queued_executions:
+            extra = {
+                "queued_execution_id": queued_execution.id,
+                "workflow_id": queued_execution.workflow_id,
+                "tenant_id": queued_execution.tenant_id,
+                "attempts": queued_execution.attempts,
+            }
+            if queued_execution.attempts > self.QUEUE_MAX_ATTEMPTS:
+                self.logger.error(
+                    "Queued workflow exceeded max attempts, dropping it", extra=extra
+                )
+                delete_queued_workflow_execution(
+                    queued_execution.id, queued_execution.lease_id
+                )
+                continue
+            try:
+                workflows_to_run.append(
+                    self._deserialize_workflow_to_run(queued_execution)
+                )
+            except Exception:
+                self.logger.exception(
+                    "Failed to load queued workflow, dropping it", extra=extra
+                )
+                delete_queued_workflow_execution(
+                    queued_execution.id, queued_execution.lease_id
+                )
+        return workflows_to_run
 
+    def _delete_queued_workflow(self, workflow_to_run: dict):
+        queued_execution = workflow_to_run.get("queued_execution")
+        if not queued_execution or workflow_to_run.get("requeued"):
+            return
+        try:
+            if not delete_queued_workflow_execution(*queued_execution):
+                self.logger.warning(
+                    "Queued workflow lease expired before it was handled",
+                    extra={
+                        "queued_execution_id": queued_execution[0],
+                        "workflow_id": workflow_to_run.get("workflow_id"),
+                        "tenant_id": workflow_to_run.get("tenant_id"),
+                    },
+                )
+        except Exception:
+            self.logger.exception(
+                "Failed to delete queued workflow",
+                extra={"queued_execution_id": queued_execution[0]},
+            )
+
+    def _retry_workflow_to_run(self, workflow_to_run: dict, retry_workflow_to_run):
+        queued_execution = workflow_to_run.get("queued_execution")
+        if queued_execution:
+            try:
+                release_queued_workflow_execution(
+                    *queued_execution,
+                    payload=self._serialize_workflow_to_run(retry_workflow_to_run),
+                    delay_seconds=self.RETRY_SLEEP_SECONDS,
+                )
+                workflow_to_run["requeued"] = True
+                return
+            except Exception:
+                self.logger.exception(
+                    "Failed to release queued workflow, retrying it on this scheduler",
+                    extra={"queued_execution_id": queued_execution[0]},
+                )
+        with self.lock:
+            self.workflows_to_run.append(retry_workflow_to_run)
+
+    def _handle_event_workflows(self):
         # take out all items from the workflows to run and run them, also, clean the self.workflows_to_run list
         with self.lock:
             workflows_to_run, self.workflows_to_run = self.workflows_to_run, []
+        # and the ones leased from the shared queue, when enabled
+        workflows_to_run.extend(self._lease_queued_workflows())
         for workflow_to_run in workflows_to_run:
-            self.logger.info(
-                "Running event workflow on background",
-                extra={
-                    "workflow_id": workflow_to_run.get("workflow_id"),
-                    "workflow_execution_id": workflow_to_run.get(
-                        "workflow_execution_id"
-                    ),
-                    "tenant_id": workflow_to_run.get("tenant_id"),
-                },
-            )
-            workflow = workflow_to_run.get("workflow")
-            workflow_id = workflow_to_run.get("workflow_id")
-            tenant_id = workflow_to_run.get("tenant_id")
-            # Update queue size metrics
-            workflow_queue_size.labels(tenant_id=tenant_id).set(
-                len(self.workflows_to_run)
-            )
-            workflow_execution_id = workflow_to_run.get("workflow_execution_id")
-            if not workflow:
-                self.logger.info("Loading workflow")
-                try:
-                    workflow = self.workflow_store.get_workflow(
-                        workflow_id=workflow_id, tenant_id=tenant_id
-                    )
-                # In case the provider are not configured properly
-                except ProviderConfigurationException as e:
-                    self.logger.warning(
-                        f"Error getting workflow: {e}",
-                        exc_info=e,
-                        extra={
-                            "workflow_id": workflow_id,
-                            "workflow_execution_id": workflow_execution_id,
-                            "tenant_id": tenant_id,
-                        },
-                    )
-                    self._finish_workflow_execution(
-                        tenant_id=tenant_id,
-                        workflow_id=workflow_id,
-                        workflow_execution_id=workflow_execution_id,
-                        status=WorkflowStatus.PROVIDERS_NOT_CONFIGURED,
-                        error=f"Providers are not configured for workflow {workflow_id}, please configure it so Keep will be able to run it",
-                    )
-                    continue
-                except Exception as e:
-                    self.logger.warning(
-                        f"Error getting workflow: {e}",
-                        exc_info=e,
-                        extra={
-                            "workflow_id": workflow_id,
-                            "workflow_execution_id": workflow_execution_id,
-                            "tenant_id": tenant_id,
-                        },
-                    )
-                    self._finish_workflow_execution(
-                        tenant_id=tenant_id,
-                        workflow_id=workflow_id,
-                        workflow_execution_id=workflow_execution_id,
-                        status=WorkflowStatus.ERROR,
-                        error=f"Error getting workflow: {e}",
-                    )
-                    continue
+            try:
+                self._handle_event_workflow(workflow_to_run)
+            finally:
+                self._delete_queued_workflow(workflow_to_run)
 
-            event = workflow_to_run.get("event")
+        self.logger.debug(
+            "Event workflows handled",
+            extra={"current_number_of_workflows": len(self.futures)},
+        )
 
-            triggered_by = workflow_to_run.get("triggered_by")
-            if triggered_by == "manual":
-                triggered_by_user = workflow_to_run.get("triggered_by_user")
-                triggered_by = f"manually by {triggered_by_user}"
-            elif triggered_by.startswith("incident:"):
-                triggered_by = f"type:{triggered_by} name:{event.name} id:{event.id}"
-            else:
-                triggered_by = f"type:alert name:{event.name} id:{event.id}"
+    def _handle_event_workflow(self, workflow_to_run: dict):
+        self.logger.info(
+            "Running event workflow on background",
+            extra={
+                "workflow_id": workflow_to_run.get("workflow_id"),
+                "workflow_execution_id": workflow_to_run.get("workflow_execution_id"),
+                "tenant_id": workflow_to_run.get("tenant_id"),
+            },
+        )
+        workflow = workflow_to_run.get("workflow")
+        workflow_id = workflow_to_run.get("workflow_id")
+        tenant_id = workflow_to_run.get("tenant_id")
+        # Update queue size metrics
+        workflow_queue_size.labels(tenant_id=tenant_id).set(len(self.workflows_to_run))
+        workflow_execution_id = workflow_to_run.get("workflow_execution_id")
+        if not workflow:
+            self.logger.info("Loading workflow")
+            try:
+                workflow = self.workflow_store.get_workflow(
+                    workflow_id=workflow_id, tenant_id=tenant_id
+                )
+            # In case the provider are not configured properly
+            except ProviderConfigurationException as e:
+                self.logger.warning(
+                    f"Error getting workflow: {e}",
+                    exc_info=e,
+                    extra={
+                        "workflow_id": workflow_id,
+                        "workflow_execution_id": workflow_execution_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
+                self._finish_workflow_execution(
+                    tenant_id=tenant_id,
+                    workflow_id=workflow_id,
+                    workflow_execution_id=workflow_execution_id,
+                    status=WorkflowStatus.PROVIDERS_NOT_CONFIGURED,
+                    error=f"Providers are not configured for workflow {workflow_id}, please configure it so Keep will be able to run it",
+                )
+                return
+            except Exception as e:
+                self.logger.warning(
+                    f"Error getting workflow: {e}",
+                    exc_info=e,
+                    extra={
+                        "workflow_id": workflow_id,
+                        "workflow_execution_id": workflow_execution_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
+                self._finish_workflow_execution(
+                    tenant_id=tenant_id,
+                    workflow_id=workflow_id,
+                    workflow_execution_id=workflow_execution_id,
+                    status=WorkflowStatus.ERROR,
+                    error=f"Error getting workflow: {e}",
+                )
+                return
 
-            if isinstance(event, IncidentDto):
-                event_id = str(event.id)
-                event_type = "incident"
-                fingerprint = event_id
-            else:
-                event_id = event.event_id
-                event_type = "alert"
-                fingerprint = event.fingerprint
+        event = workflow_to_run.get("event")
 
-            # In manual, we create the workflow execution id sync so it could be tracked by the caller (UI)
-            # In event (e.g. alarm), we will create it here
-            if not workflow_execution_id:
-                # creating the execution id here to be able to trace it in logs even in case of IntegrityError
-                # eventually, workflow_execution_id == execution_id
-                execution_id = str(uuid.uuid4())
-                try:
-                    # if the workflow can run in parallel, we just to create a some random execution number
-                    if workflow.workflow_strategy == WorkflowStrategy.PARALLEL.value:
-                        workflow_execution_number = self._get_unique_execution_number()
-                    # else, we want to enforce that no workflow already run with the same fingerprint
-                    else:
-                        workflow_execution_number = self._get_unique_execution_number(
-                            fingerprint, workflow_id
-                        )
-                    workflow_execution_id = create_workflow_execution(
-                        workflow_id=workflow_id,
-                        workflow_revision=workflow.workflow_revision,
-                        tenant_id=tenant_id,
-                        triggered_by=triggered_by,
-                        execution_number=workflow_execution_number,
-                        fingerprint=fingerprint,
-                        event_id=event_id,
-                        execution_id=execution_id,
-                        event_type=event_type,
+        triggered_by = workflow_to_run.get("triggered_by")
+        if triggered_by == "manual":
+            triggered_by_user = workflow_to_run.get("triggered_by_user")
+            triggered_by = f"manually by {triggered_by_user}"
+        elif triggered_by.startswith("incident:"):
+            triggered_by = f"type:{triggered_by} name:{event.name} id:{event.id}"
+        else:
+            triggered_by = f"type:alert name:{event.name} id:{event.id}"
+
+        if isinstance(event, IncidentDto):
+            event_id = str(event.id)
+            event_type = "incident"
+            fingerprint = event_id
+        else:
+            event_id = event.event_id
+            event_type = "alert"
+            fingerprint = event.fingerprint
+
+        # In manual, we create the workflow execution id sync so it could be tracked by the caller (UI)
+        # In event (e.g. alarm), we will create it here
+        if not workflow_execution_id:
+            # creating the execution id here to be able to trace it in logs even in case of IntegrityError
+            # eventually, workflow_execution_id == execution_id
+            execution_id = str(uuid.uuid4())
+            try:
+                # if the workflow can run in parallel, we just to create a some random execution number
+                if workflow.workflow_strategy == WorkflowStrategy.PARALLEL.value:
+                    workflow_execution_number = self._get_unique_execution_number()
+                # else, we want to enforce that no workflow already run with the same fingerprint
+                else:
+                    workflow_execution_number = self._get_unique_execution_number(
+                        fingerprint, workflow_id
                     )
-                # If there is already running workflow from the same event
-                except IntegrityError:
-                    # if the strategy is with RETRY, just put a warning and add it back to the queue
-                    if (
-                        workflow.workflow_strategy
-                        == WorkflowStrategy.NONPARALLEL_WITH_RETRY.value
-                    ):
-                        self.logger.info(
-                            "Collision with workflow execution! will retry next time",
-                            extra={
-                                "workflow_id": workflow_id,
-                                "tenant_id": tenant_id,
-                            },
-                        )
-                        with self.lock:
-                            self.workflows_to_run.append(
-                                {
-                                    "workflow_id": workflow_id,
-                                    "workflow_execution_id": workflow_execution_id,
-                                    "tenant_id": tenant_id,
-                                    "triggered_by": triggered_by,
-                                    "event": event,
-                                    "retry": True,
-                                }
-                            )
-                        continue
-                    # else if NONPARALLEL, just finish the execution
-                    elif (
-                        workflow.workflow_strategy == WorkflowStrategy.NONPARALLEL.value
-                    ):
-                        self.logger.error(
-                            "Collision with workflow execution! will not retry",
-                            extra={
-                                "workflow_id": workflow_id,
-                                "tenant_id": tenant_id,
-                            },
-                        )
-                        self._finish_workflow_execution(
-                            tenant_id=tenant_id,
-                            workflow_id=workflow_id,
-                            workflow_execution_id=workflow_execution_id,
-                            status=WorkflowStatus.ERROR,
-                            error="Workflow already running with the same fingerprint",
-                        )
-                        continue
-                    # else, just raise the exception (that should not happen)
-                    else:
-                        self.logger.exception("Collision with workflow execution!")
-                        continue
-                except Exception as e:
-                    self.logger.error(f"Error creating workflow execution: {e}")
-                    continue
-
-            # if thats a retry, we need to re-pull the alert/incident to update the enrichments
-            # for example: 2 alerts arrived within a 0.1 seconds the first one is "firing" and the second one is "resolved"
-            #               - the first alert will trigger a workflow that will create a ticket with "firing"
-            #                    and enrich the alert with the ticket_url
-            #               - the second one will wait for the next iteration
-            #               - on the next iteratino, the second alert enriched with the ticket_url
-            #                    and will trigger a workflow that will update the ticket with "resolved"
-            if workflow_to_run.get("retry", False):
-                try:
+                workflow_execution_id = create_workflow_execution(
+                    workflow_id=workflow_id,
+                    workflow_revision=workflow.workflow_revision,
+                    tenant_id=tenant_id,
+                    triggered_by=triggered_by,
+                    execution_number=workflow_execution_number,
+                    fingerprint=fingerprint,
+                    event_id=event_id,
+                    execution_id=execution_id,
+                    event_type=event_type,
+                )
+            # If there is already running workflow from the same event
+            except IntegrityError:
+                # if the strategy is with RETRY, just put a warning and add it back to the queue
+                if (
+                    workflow.workflow_strategy
+                    == WorkflowStrategy.NONPARALLEL_WITH_RETRY.value
+                ):
                     self.logger.info(
-                        "Updating enrichments for workflow after retry",
+                        "Collision with workflow execution! will retry next time",
                         extra={
                             "workflow_id": workflow_id,
-                            "workflow_execution_id": workflow_execution_id,
                             "tenant_id": tenant_id,
                         },
                     )
-                    new_enrichment = get_enrichment(
-                        tenant_id, fingerprint, refresh=True
-                    )
-                    # merge the new enrichment with the original event
-                    if new_enrichment:
-                        new_event = event.dict()
-                        new_event.update(new_enrichment.enrichments)
-                        if isinstance(event, IncidentDto):
-                            event = IncidentDto(**new_event)
-                        else:
-                            event = AlertDto(**new_event)
-                    self.logger.info(
-                        "Enrichments updated for workflow after retry",
-                        extra={
+                    self._retry_workflow_to_run(
+                        workflow_to_run,
+                        {
                             "workflow_id": workflow_id,
                             "workflow_execution_id": workflow_execution_id,
                             "tenant_id": tenant_id,
-                            "new_enrichment": new_enrichment,
+                            "triggered_by": triggered_by,
+                            "event": event,
+                            "retry": True,
                         },
                     )
-                except Exception as e:
+                    return
+                # else if NONPARALLEL, just finish the execution
+                elif workflow.workflow_strategy == WorkflowStrategy.NONPARALLEL.value:
                     self.logger.error(
-                        f"Failed to get enrichment: {e}",
+                        "Collision with workflow execution! will not retry",
                         extra={
                             "workflow_id": workflow_id,
-                            "workflow_execution_id": workflow_execution_id,
                             "tenant_id": tenant_id,
                         },
                     )
@@ -624,34 +765,127 @@ class WorkflowScheduler:
                         workflow_id=workflow_id,
                         workflow_execution_id=workflow_execution_id,
                         status=WorkflowStatus.ERROR,
-                        error=f"Error getting alert by id: {e}",
+                        error="Workflow already running with the same fingerprint",
                     )
-                    continue
-            # Last, run the workflow
-            inputs = workflow_to_run.get("inputs", {})
-            future = self.executor.submit(
-                self._run_workflow,
-                tenant_id,
-                workflow_id,
-                workflow,
-                workflow_execution_id,
-                event,
-                inputs,
-            )
-            self.futures.add(future)
-            future.add_done_callback(lambda f: self.futures.remove(f))
+                    return
+                # else, just raise the exception (that should not happen)
+                else:
+                    self.logger.exception("Collision with workflow execution!")
+                    return
+            except Exception as e:
+                self.logger.error(f"Error creating workflow execution: {e}")
+                return
+
+        # if thats a retry, we need to re-pull the alert/incident to update the enrichments
+        # for example: 2 alerts arrived within a 0.1 seconds the first one is "firing" and the second one is "resolved"
+        #               - the first alert will trigger a workflow that will create a ticket with "firing"
+        #                    and enrich the alert with the ticket_url
+        #               - the second one will wait for the next iteration
+        #               - on the next iteratino, the second alert enriched with the ticket_url
+        #                    and will trigger a workflow that will update the ticket with "resolved"
+        if workflow_to_run.get("retry", False):
+            try:
+                self.logger.info(
+                    "Updating enrichments for workflow after retry",
+                    extra={
+                        "workflow_id": workflow_id,
+                        "workflow_execution_id": workflow_execution_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
+                new_enrichment = get_enrichment(tenant_id, fingerprint, refresh=True)
+                # merge the new enrichment with the original event
+                if new_enrichment:
+                    new_event = event.dict()
+                    new_event.update(new_enrichment.enrichments)
+                    if isinstance(event, IncidentDto):
+                        event = IncidentDto(**new_event)
+                    else:
+                        event = AlertDto(**new_event)
+                self.logger.info(
+                    "Enrichments updated for workflow after retry",
+                    extra={
+                        "workflow_id": workflow_id,
+                        "workflow_execution_id": workflow_execution_id,
+                        "tenant_id": tenant_id,
+                        "new_enrichment": new_enrichment,
+                    },
+                )
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to get enrichment: {e}",
+                    extra={
+                        "workflow_id": workflow_id,
+                        "workflow_execution_id": workflow_execution_id,
+                        "tenant_id": tenant_id,
+                    },
+                )
+                self._finish_workflow_execution(
+                    tenant_id=tenant_id,
+                    workflow_id=workflow_id,
+                    workflow_execution_id=workflow_execution_id,
+                    status=WorkflowStatus.ERROR,
+                    error=f"Error getting alert by id: {e}",
+                )
+                return
+        # Last, run the workflow
+        inputs = workflow_to_run.get("inputs", {})
+        future = self.executor.submit(
+            self._run_workflow,
+            tenant_id,
+            workflow_id,
+            workflow,
+            workflow_execution_id,
+            event,
+            inputs,
+        )
+        self.futures.add(future)
+        future.add_done_callback(lambda f: self.futures.remove(f))
 
+    def wake_up(self):
+        """
+        Wake up the scheduler so workflows added to run are handled right away.
+        Must not be called while holding self.lock.
+        """
+        with self.wakeup:
+            self._wakeup_pending = True
+            self.wakeup.notify()
+
+    def _refresh_interval_workflows(self):
+        """
+        Check the interval workflows on the next iteration, even if none is due yet.
+        """
+        self._next_interval_due_at = None
+        self.wake_up()
+
+    def _get_sleep_time(self) -> float:
+        with self.lock:
+            # workflows waiting for a retry after a collision
+            if self.workflows_to_run:
+                return self.RETRY_SLEEP_SECONDS
+        # other processes queue workflows without waking this scheduler up
+        if self.queue_enabled:
+            return self.RETRY_SLEEP_SECONDS
+
+        if not self.interval_enabled or self._next_interval_due_at is None:
+            return self.MAX_SLEEP_SECONDS
+        due_in = max(self._next_interval_due_at - time.monotonic(), 0)
+        return min(due_in, self.MAX_SLEEP_SECONDS)
+
+    def _sleep(self):
+        sleep_time = self._get_sleep_time()
         self.logger.debug(
-            "Event workflows handled",
-            extra={"current_number_of_workflows": len(self.futures)},
+            "Sleeping until next iteration", extra={"sleep_time": sleep_time}
         )
+        with self.wakeup:
+            if not self._wakeup_pending and not self._stop:
+                self.wakeup.wait(timeout=sleep_time)
+            self._wakeup_pending = False
 
     def _start(self):
-        RUN_TIMEOUT_CHECKS_EVERY = 100
         self.logger.info("Starting workflows scheduler")
-        runs = 0
+        next_timeout_check = time.monotonic() + self.TIMEOUT_CHECKS_EVERY_SECONDS
         while not self._stop:
-            runs += 1
             # get all workflows that should run now
             self.logger.debug(
                 "Starting workflow scheduler iteration",
@@ -660,20 +894,23 @@ class WorkflowScheduler:
             try:
                 self._handle_interval_workflows()
                 self._handle_event_workflows()
-                if runs % RUN_TIMEOUT_CHECKS_EVERY == 0:
+                if time.monotonic() >= next_timeout_check:
+                    next_timeout_check = (
+                        time.monotonic() + self.TIMEOUT_CHECKS_EVERY_SECONDS
+                    )
                     self._timeout_workflows()
             except Exception:
                 # This is the "mainloop" of the scheduler, we don't want to crash it
                 # But any exception here should be investigated
                 self.logger.error("Error getting workflows that should run")
                 pass
-            self.logger.debug("Sleeping until next iteration")
-            time.sleep(1)
+            self._sleep()
         self.logger.info("Workflows scheduler stopped")
 
     def stop(self):
         self.logger.info("Stopping scheduled workflows")
         self._stop = True
+        self.wake_up()
 
         # Wait for scheduler to stop first
         if self.scheduler_future:
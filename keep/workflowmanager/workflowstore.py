@@ -29,6 +29,8 @@ from keep.functions import cyaml
 from keep.parser.parser import Parser
 from keep.providers.providers_factory import ProvidersFactory
 from keep.workflowmanager.workflow import Workflow
+from keep.workflowmanager.workflowcache import get_workflow_cache
+from keep.workflowmanager.workflowtriggerindex import get_workflow_trigger_index
 from sqlalchemy.exc import NoResultFound
 
 
@@ -98,6 +100,9 @@ class WorkflowStore:
             force_update=force_update,
             lookup_by_name=lookup_by_name,
         )
+        # the triggers are re-indexed anyway once the revision changes, this just drops them early
+        get_workflow_trigger_index().invalidate(tenant_id, workflow_db.id)
+        get_workflow_cache().invalidate(tenant_id, workflow_db.id)
         self.logger.info(
             f"Workflow {workflow_db.id}, {workflow_db.revision} created successfully"
         )
@@ -114,6 +119,8 @@ class WorkflowStore:
             raise HTTPException(403, detail="Cannot delete a provisioned workflow")
         try:
             delete_workflow(tenant_id, workflow_id)
+            get_workflow_trigger_index().invalidate(tenant_id, workflow_id)
+            get_workflow_cache().invalidate(tenant_id, workflow_id)
         except Exception as e:
             self.logger.exception(f"Error deleting workflow {workflow_id}: {str(e)}")
             raise HTTPException(
@@ -156,13 +163,23 @@ class WorkflowStore:
                 status_code=404,
                 detail=f"Workflow {workflow_id} not found",
             )
-        workflow_yaml = cyaml.safe_load(workflow.workflow_raw)
+        return get_workflow_cache().get_workflow(
+            tenant_id,
+            workflow,
+            lambda: self._parse_workflow_model(tenant_id, workflow),
+        )
+
+    def _parse_workflow_model(
+        self, tenant_id: str, workflow_model: WorkflowModel
+    ) -> Workflow:
+        workflow_id = workflow_model.id
+        workflow_yaml = cyaml.safe_load(workflow_model.workflow_raw)
         workflow = self.parser.parse(
             tenant_id,
             workflow_yaml,
-            workflow_db_id=workflow.id,
-            workflow_revision=workflow.revision,
-            is_test=workflow.is_test,
+            workflow_db_id=workflow_model.id,
+            workflow_revision=workflow_model.revision,
+            is_test=workflow_model.is_test,
         )
         if len(workflow) > 1:
             raise HTTPException(
@@ -0,0 +1,134 @@
+import logging
+import threading
+import typing
+
+from keep.api.models.db.workflow import Workflow as WorkflowModel
+from keep.functions import cyaml
+
+
+class CompiledTrigger(typing.NamedTuple):
+    # the trigger as defined in the workflow yaml
+    trigger: dict
+    # the CEL expression after filters conversion and preprocessing
+    cel: str | None
+    # the compiled CEL program, None means the workflow always runs on this trigger
+    program: typing.Any
+
+
+class WorkflowTriggerIndex:
+    """
+    Per-tenant index of the workflows' alert triggers with their compiled CEL programs,
+    keyed by workflow id and revision.
+
+    The index is rebuilt for a workflow only when its revision changes (or it is
+    invalidated when the workflow is created, updated or deleted through the WorkflowStore),
+    so that insert_events doesn't re-parse the workflows and recompile their CEL per event.
+    """
+
+    _instance = None
+    __initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self.__initialized:
+            self.logger = logging.getLogger(__name__)
+            # tenant_id -> workflow_id -> (revision, [CompiledTrigger, ...])
+            self.index: dict[str, dict[str, tuple]] = {}
+            self._lock = threading.Lock()
+            self.__initialized = True
+
+    @staticmethod
+    def _workflow_revision(workflow_model: WorkflowModel):
+        return (workflow_model.revision, workflow_model.last_updated)
+
+    @staticmethod
+    def get_alert_triggers(workflow_raw: str) -> list[dict]:
+        """
+        Extract the alert triggers from the workflow yaml, without parsing the whole workflow.
+        """
+        workflow_yaml = cyaml.safe_load(workflow_raw) or {}
+        raw_workflows = workflow_yaml.get("workflows") or workflow_yaml.get("alerts")
+        if raw_workflows:
+            workflow = raw_workflows[0]
+        else:
+            workflow = (
+                workflow_yaml.get("workflow")
+                or workflow_yaml.get("alert")
+                or workflow_yaml
+            )
+        return [
+            trigger
+            for trigger in workflow.get("triggers", []) or []
+            if trigger.get("type") == "alert"
+        ]
+
+    def get_triggers(
+        self,
+        tenant_id: str,
+        workflow_models: list[WorkflowModel],
+        compile_triggers: typing.Callable[[WorkflowModel], list[CompiledTrigger]],
+    ) -> dict[str, list[CompiledTrigger]]:
+        """
+        Get the compiled alert triggers of the workflows, compiling the ones that changed.
+
+        Args:
+            tenant_id (str): the tenant id
+            workflow_models (list[WorkflowModel]): the workflows to get the triggers for
+            compile_triggers (Callable): compiles the alert triggers of a workflow
+
+        Returns:
+            dict: workflow id -> compiled alert triggers
+        """
+        with self._lock:
+            tenant_index = dict(self.index.get(tenant_id, {}))
+
+        triggers = {}
+        updated = {}
+        for workflow_model in workflow_models:
+            revision = self._workflow_revision(workflow_model)
+            entry = tenant_index.get(workflow_model.id)
+            if entry and entry[0] == revision:
+                triggers[workflow_model.id] = entry[1]
+                continue
+
+            self.logger.info(
+                "Indexing workflow triggers",
+                extra={
+                    "tenant_id": tenant_id,
+                    "workflow_id": workflow_model.id,
+                    "workflow_revision": workflow_model.revision,
+                },
+            )
+            try:
+                compiled_triggers = compile_triggers(workflow_model)
+            except Exception:
+                self.logger.exception(
+                    "Failed to index workflow triggers, workflow will not run",
+                    extra={"tenant_id": tenant_id, "workflow_id": workflow_model.id},
+                )
+                compiled_triggers = []
+            triggers[workflow_model.id] = compiled_triggers
+            updated[workflow_model.id] = (revision, compiled_triggers)
+
+        if updated:
+            with self._lock:
+                self.index.setdefault(tenant_id, {}).update(updated)
+        return triggers
+
+    def invalidate(self, tenant_id: str, workflow_id: str | None = None):
+        """
+        Drop the triggers of a single workflow, or of the whole tenant if no workflow id is given.
+        """
+        with self._lock:
+            if workflow_id is None:
+                self.index.pop(tenant_id, None)
+            else:
+                self.index.get(tenant_id, {}).pop(workflow_id, None)
+
+
+def get_workflow_trigger_index() -> WorkflowTriggerIndex:
+    return WorkflowTriggerIndex()
@@ -20,9 +20,15 @@ from sqlmodel import Session, SQLModel, create_engine
 from starlette_context import context, request_cycle_context
 from playwright.sync_api import Page
 
+from keep.api.bl.enrichment_rules_cache import get_enrichment_rules_cache
+from keep.api.core.db_utils import get_last_alert_properties
+
 # This import is required to create the tables
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.core.elastic import ElasticClient
+from keep.api.core.facet_options_cache import get_facet_options_cache
+from keep.api.core.last_alert_hash_cache import get_last_alert_hash_cache
+from keep.api.core.preset_counters import get_preset_counters
 from keep.api.models.db.alert import *
 from keep.api.models.db.provider import *
 from keep.api.models.db.rule import *
@@ -32,6 +38,8 @@ from keep.api.models.db.workflow import *
 from keep.api.tasks.process_event_task import process_event
 from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
 from keep.contextmanager.contextmanager import ContextManager
+from keep.workflowmanager.workflowcache import get_workflow_cache
+from keep.workflowmanager.workflowtriggerindex import get_workflow_trigger_index
 
 original_request = requests.Session.request  # noqa
 load_dotenv(find_dotenv())
@@ -73,6 +81,34 @@ class ElasticClientMock:
         self.alerts.append((self.tenant_id, alerts))
 
 
+def wait_for(condition, timeout=5):
+    """
+    Wait for a condition met by a background thread, returns whether it was met.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+@pytest.fixture
+def reset_singleton():
+    """
+    Fixture to get a fresh instance of a singleton (a class keeping its instance in
+    _instance), the instance is dropped again after the test.
+    """
+    singleton_classes = []
+
+    def _reset_singleton(singleton_class):
+        singleton_class._instance = None
+        singleton_classes.append(singleton_class)
+        return singleton_class()
+
+    yield _reset_singleton
+    for singleton_class in singleton_classes:
+        singleton_class._instance = None
+
+
 @pytest.fixture
 def ctx_store() -> dict:
     """
@@ -305,10 +341,19 @@ actions:
     session.add_all(workflow_data)
     session.commit()
 
+    # in-process caches must not outlive the database they were filled from
+    get_last_alert_hash_cache().clear()
+    get_facet_options_cache().clear()
+    get_enrichment_rules_cache().clear()
+    get_workflow_trigger_index().invalidate(SINGLE_TENANT_UUID)
+    get_workflow_cache().invalidate(SINGLE_TENANT_UUID)
+    get_preset_counters().invalidate(SINGLE_TENANT_UUID)
+
     with patch("keep.api.core.db.engine", mock_engine):
         with patch("keep.api.core.db_utils.create_db_engine", return_value=mock_engine):
             with patch("keep.api.core.alerts.engine", mock_engine):
-                yield session
+                with patch("keep.api.core.facets.engine", mock_engine):
+                    yield session
 
     import logging
 
@@ -623,6 +668,8 @@ def setup_alerts(elastic_client, db_session, request):
             last_alert = existed_last_alerts_dict[alert.fingerprint]
             last_alert.alert_id = alert.id
             last_alert.timestamp = alert.timestamp
+            for column, value in get_last_alert_properties(alert.event).items():
+                setattr(last_alert, column, value)
             last_alerts.append(last_alert)
         else:
             last_alerts.append(
@@ -632,6 +679,7 @@ def setup_alerts(elastic_client, db_session, request):
                     timestamp=alert.timestamp,
                     first_timestamp=alert.timestamp,
                     alert_id=alert.id,
+                    **get_last_alert_properties(alert.event),
                 )
             )
     db_session.add_all(last_alerts)
@@ -689,6 +737,8 @@ def setup_stress_alerts_no_elastic(db_session):
                 last_alert = existed_last_alerts_dict[alert.fingerprint]
                 last_alert.alert_id = alert.id
                 last_alert.timestamp = alert.timestamp
+                for column, value in get_last_alert_properties(alert.event).items():
+                    setattr(last_alert, column, value)
                 last_alerts.append(last_alert)
             else:
                 last_alerts.append(
@@ -698,6 +748,7 @@ def setup_stress_alerts_no_elastic(db_session):
                         timestamp=alert.timestamp,
                         first_timestamp=alert.timestamp,
                         alert_id=alert.id,
+                        **get_last_alert_properties(alert.event),
                     )
                 )
         db_session.add_all(last_alerts)
@@ -770,6 +821,9 @@ def pytest_addoption(parser):
         const=True,
         dest="run_non_integration",
     )
+    parser.addoption(
+        "--benchmark", action="store_true", default=False, dest="run_benchmark"
+    )
 
 
 def pytest_configure(config):
@@ -779,13 +833,20 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "integration: mark test to run only if integrations tests enabled"
     )
+    config.addinivalue_line(
+        "markers", "benchmark: mark test to run only if --benchmark is given"
+    )
 
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_runtest_setup(item):
     """
-    Checks whether tests should be skipped based on integration settings
+    Checks whether tests should be skipped based on integration and benchmark settings
     """
+    if item.get_closest_marker("benchmark") and not item.config.getoption(
+        "run_benchmark"
+    ):
+        pytest.skip("Benchmark tests skipped, run with --benchmark")
 
     run_integration = item.config.getoption("run_integration")
     run_non_integration = item.config.getoption("run_non_integration")
@@ -1018,3 +1018,87 @@ def test_sort_keys_deduplication_fix(db_session, client, test_app):
     assert prometheus_rule is not None
     assert prometheus_rule.get("ingested") == 2
     assert prometheus_rule.get("dedup_ratio") == 50.0  # 1 out of 2 was deduplicated
+
+
+def test_calculate_alert_hash_matches_json_hash():
+    """
+    The streaming hash must stay identical to the sha256 of the sorted JSON of the alert
+    without the ignored fields, since hashes are persisted in LastAlert.alert_hash.
+    """
+    import copy
+    import hashlib
+    import json
+
+    from keep.api.alert_deduplicator.alert_deduplicator import calculate_alert_hash
+    from keep.api.models.alert import AlertDto
+
+    alert = AlertDto(
+        id="1234",
+        name="test-alert",
+        status=AlertStatus.FIRING,
+        severity="critical",
+        lastReceived=datetime.utcnow().isoformat(),
+        source=["prometheus"],
+        url="https://example.com/alert",
+        labels={"b": {"d": 1, "c": [1.5, None, True]}, "a": "ünicode"},
+        customField={"nested": {"x": "y", "z": datetime(2024, 1, 1)}},
+    )
+    ignore_fields = ["lastReceived", "labels.b.d", "customField.nested.x", "missing"]
+
+    expected = copy.deepcopy(alert.dict())
+    del expected["lastReceived"]
+    del expected["labels"]["b"]["d"]
+    del expected["customField"]["nested"]["x"]
+    expected_hash = hashlib.sha256(
+        json.dumps(expected, default=str, sort_keys=True).encode()
+    ).hexdigest()
+
+    assert calculate_alert_hash(alert, ignore_fields) == expected_hash
+    # the alert itself is left untouched
+    assert alert.labels["b"]["d"] == 1
+    assert alert.lastReceived
+
+
+def test_last_alert_hash_cache(db_session, monkeypatch):
+    from keep.api.core.db import get_last_alert_hashes_by_fingerprints, set_last_alert
+    from keep.api.core.last_alert_hash_cache import get_last_alert_hash_cache
+
+    cache = get_last_alert_hash_cache()
+    # disabled by default without Redis
+    assert not cache.enabled
+    monkeypatch.setattr(cache, "enabled", True)
+    alert = Alert(
+        tenant_id=SINGLE_TENANT_UUID,
+        provider_type="test",
+        provider_id="test",
+        event={"name": "test"},
+        fingerprint="fp-1",
+        alert_hash="hash-1",
+    )
+    db_session.add(alert)
+    db_session.commit()
+
+    # write-through on set_last_alert
+    set_last_alert(SINGLE_TENANT_UUID, alert, db_session)
+    assert cache.get_many(SINGLE_TENANT_UUID, ["fp-1"]) == {"fp-1": "hash-1"}
+
+    # served from the cache, even if the row is gone
+    db_session.exec(text("DELETE FROM lastalert"))
+    db_session.commit()
+    assert get_last_alert_hashes_by_fingerprints(SINGLE_TENANT_UUID, ["fp-1"]) == {
+        "fp-1": "hash-1"
+    }
+
+    # bounded LRU eviction
+    max_size = cache.max_size
+    cache.max_size = 2
+    try:
+        cache.set(SINGLE_TENANT_UUID, "fp-2", "hash-2")
+        cache.get_many(SINGLE_TENANT_UUID, ["fp-1"])
+        cache.set(SINGLE_TENANT_UUID, "fp-3", "hash-3")
+        assert cache.get_many(SINGLE_TENANT_UUID, ["fp-1", "fp-2", "fp-3"]) == {
+            "fp-1": "hash-1",
+            "fp-3": "hash-3",
+        }
+    finally:
+        cache.max_size = max_size
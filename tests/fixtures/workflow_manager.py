@@ -1,8 +1,10 @@
 import pytest
 import asyncio
 import time
+from datetime import datetime
 
 from keep.api.core.db import get_last_workflow_execution_by_workflow_id
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.workflowmanager.workflowscheduler import WorkflowScheduler
 from keep.workflowmanager.workflowmanager import WorkflowManager
 
@@ -32,6 +34,27 @@ def workflow_manager():
             print(f"Error stopping workflow manager: {e}")
 
 
+@pytest.fixture
+def workflows_added_to_run(workflow_manager, monkeypatch):
+    """
+    Fixture to record the workflows added to run by the workflow manager.
+
+    The scheduler is woken up when a workflow is added to run and takes it out of
+    scheduler.workflows_to_run right away, so the queue itself can't be inspected.
+    """
+    workflows_added = []
+    add_workflow_to_run = workflow_manager.scheduler.add_workflow_to_run
+
+    def _add_workflow_to_run(workflow_to_run: dict):
+        workflows_added.append(workflow_to_run)
+        add_workflow_to_run(workflow_to_run)
+
+    monkeypatch.setattr(
+        workflow_manager.scheduler, "add_workflow_to_run", _add_workflow_to_run
+    )
+    return workflows_added
+
+
 def wait_for_workflow_execution(
     tenant_id, workflow_id, max_wait_count=30, exclude_ids=None
 ):
@@ -70,27 +93,48 @@ def _get_workflow_ids_in_run_queue(workflow_manager: WorkflowManager):
     ]
 
 
-def wait_for_workflow_in_run_queue(workflow_id, max_wait_count=30):
+def wait_for_workflow_in_run_queue(
+    workflow_id,
+    triggered_after: datetime,
+    max_wait_count=30,
+    tenant_id=SINGLE_TENANT_UUID,
+):
     """
     Wait for the workflow to be in the run queue.
 
+    The scheduler is woken up when a workflow is queued, so the workflow may be
+    taken out of the queue before it is seen, an execution of the workflow started
+    after it was triggered is checked too.
+
     Args:
         workflow_id: The ID of the workflow to wait for
+        triggered_after: When the workflow was triggered (UTC)
         max_wait_count: Maximum number of seconds to wait (default: 30)
+        tenant_id: The tenant of the workflow
 
     Returns:
         bool: True if workflow is found in run queue, False if timeout reached
     """
     workflow_manager = WorkflowManager.get_instance()
+    # some databases store the execution start time without microseconds
+    triggered_after = triggered_after.replace(microsecond=0)
 
-    for _ in range(max_wait_count):
-        workflow_ids_in_queue = _get_workflow_ids_in_run_queue(workflow_manager)
+    def _is_queued():
+        if workflow_id in _get_workflow_ids_in_run_queue(workflow_manager):
+            return True
+        workflow_execution = get_last_workflow_execution_by_workflow_id(
+            tenant_id, workflow_id
+        )
+        return (
+            workflow_execution is not None
+            and workflow_execution.started >= triggered_after
+        )
 
-        if workflow_id in workflow_ids_in_queue:
+    for _ in range(max_wait_count):
+        if _is_queued():
             return True
 
         time.sleep(1)
 
     # Final check after timeout
-    workflow_ids_in_queue = _get_workflow_ids_in_run_queue(workflow_manager)
-    return workflow_id in workflow_ids_in_queue
+    return _is_queued()
@@ -0,0 +1,77 @@
+import os
+import queue
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from keep.api.core.elastic_indexer import ElasticIndexer
+from keep.api.models.alert import AlertDto
+from tests.conftest import wait_for
+
+
+def _alert(fingerprint: str) -> AlertDto:
+    return AlertDto(
+        id=fingerprint,
+        name=fingerprint,
+        status="firing",
+        severity="critical",
+        lastReceived="2025-01-01T00:00:00.000Z",
+        source=["test"],
+        fingerprint=fingerprint,
+    )
+
+
+def _build_index_actions(alerts: list[AlertDto]) -> list[dict]:
+    return [
+        {"_index": "keep-alerts-test", "_id": alert.fingerprint, "_source": {}}
+        for alert in alerts
+    ]
+
+
+@pytest.fixture
+def elastic_indexer(tmp_path, reset_singleton):
+    indexer = reset_singleton(ElasticIndexer)
+    indexer.spool_dir = str(tmp_path)
+    indexer.flush_interval = 0.1
+    elastic_client = MagicMock()
+    elastic_client.build_index_actions.side_effect = _build_index_actions
+    with patch.object(indexer, "_get_client", return_value=elastic_client):
+        yield indexer
+    indexer.stop()
+
+
+def test_elastic_indexer_batches_alerts(elastic_indexer):
+    elastic_client = elastic_indexer._get_client("test")
+    elastic_indexer.enqueue("test", [_alert("fp-1"), _alert("fp-2")])
+    elastic_indexer.enqueue("test", [_alert("fp-3")])
+
+    assert wait_for(lambda: elastic_client.bulk_index.called)
+    # one bulk request for both enqueues, versioned by the enqueue time
+    actions = elastic_client.bulk_index.call_args.args[0]
+    assert [action["_id"] for action in actions] == ["fp-1", "fp-2", "fp-3"]
+    assert all(action["_version_type"] == "external_gte" for action in actions)
+    assert actions[0]["_version"] <= actions[2]["_version"]
+
+
+def test_elastic_indexer_spools_failed_batches(elastic_indexer):
+    elastic_client = elastic_indexer._get_client("test")
+    elastic_client.bulk_index.side_effect = [Exception("elastic is down"), None]
+
+    elastic_indexer.enqueue("test", [_alert("fp-1")])
+
+    # the failed batch is spooled and retried
+    assert wait_for(lambda: elastic_client.bulk_index.call_count == 2)
+    retried_actions = elastic_client.bulk_index.call_args.args[0]
+    assert [action["_id"] for action in retried_actions] == ["fp-1"]
+    assert wait_for(lambda: not os.listdir(elastic_indexer.spool_dir))
+
+
+def test_elastic_indexer_spools_when_queue_is_full(elastic_indexer):
+    elastic_indexer.queue = queue.Queue(maxsize=1)
+    elastic_indexer.enqueue_timeout = 0.01
+
+    with patch.object(elastic_indexer, "start"):
+        elastic_indexer.enqueue("test", [_alert("fp-1"), _alert("fp-2")])
+
+    assert elastic_indexer.queue.qsize() == 1
+    assert len(elastic_indexer._list_spool_files()) == 1
@@ -0,0 +1,74 @@
+import logging
+import uuid
+
+import pytest
+from sqlmodel import select
+
+from keep.api.bl.enrichments_bl import EnrichmentsBl
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.core.enrichment_audit_writer import EnrichmentAuditWriter
+from keep.api.core.metrics import enrichment_audit_skipped_events_aggregated_total
+from keep.api.models.db.enrichment_event import (
+    EnrichmentEvent,
+    EnrichmentLog,
+    EnrichmentStatus,
+    EnrichmentType,
+)
+from tests.conftest import wait_for
+
+
+@pytest.fixture
+def audit_writer(reset_singleton):
+    writer = reset_singleton(EnrichmentAuditWriter)
+    writer.flush_interval = 0.1
+    yield writer
+    writer.stop()
+
+
+def _track(enrichments_bl: EnrichmentsBl, status: EnrichmentStatus, message: str):
+    enrichments_bl._add_enrichment_log(message, "info")
+    enrichments_bl._track_enrichment_event(
+        uuid.uuid4(), status, EnrichmentType.EXTRACTION, 1, {}
+    )
+
+
+def test_audit_writer_writes_events_in_batches(db_session, audit_writer):
+    audit_writer.enabled = True
+    enrichments_bl = EnrichmentsBl(tenant_id=SINGLE_TENANT_UUID, db=db_session)
+
+    for i in range(3):
+        _track(enrichments_bl, EnrichmentStatus.SUCCESS, f"event {i}")
+    # nothing was written by the enrichment itself
+    assert db_session.exec(select(EnrichmentEvent)).all() == []
+
+    assert wait_for(lambda: len(db_session.exec(select(EnrichmentLog)).all()) == 3)
+    assert len(db_session.exec(select(EnrichmentEvent)).all()) == 3
+    logs = db_session.exec(select(EnrichmentLog)).all()
+    assert sorted(log.message for log in logs) == ["event 0", "event 1", "event 2"]
+    event = db_session.exec(
+        select(EnrichmentEvent).where(
+            EnrichmentEvent.id == enrichments_bl.enrichment_event_id
+        )
+    ).one()
+    assert [log.message for log in logs if log.enrichment_event_id == event.id] == [
+        "event 2"
+    ]
+
+
+def test_audit_writer_aggregates_skipped_events(db_session, audit_writer):
+    audit_writer.skipped_sample_rate = 0
+    audit_writer.log_level = logging.WARNING
+    enrichments_bl = EnrichmentsBl(tenant_id=SINGLE_TENANT_UUID, db=db_session)
+    skipped_counter = enrichment_audit_skipped_events_aggregated_total.labels(
+        tenant_id=SINGLE_TENANT_UUID, enrichment_type=EnrichmentType.EXTRACTION.value
+    )
+    skipped_before = skipped_counter._value.get()
+
+    _track(enrichments_bl, EnrichmentStatus.SKIPPED, "skipped")
+    _track(enrichments_bl, EnrichmentStatus.SUCCESS, "success")
+
+    events = db_session.exec(select(EnrichmentEvent)).all()
+    assert [event.status for event in events] == [EnrichmentStatus.SUCCESS.value]
+    # the info logs are below the audit log level
+    assert db_session.exec(select(EnrichmentLog)).all() == []
+    assert skipped_counter._value.get() == skipped_before + 1
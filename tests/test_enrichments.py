@@ -8,6 +8,7 @@ import pytest
 from sqlalchemy import text
 from tenacity import sleep
 
+from keep.api.bl.enrichment_rules_cache import get_enrichment_rules_cache
 from keep.api.bl.enrichments_bl import EnrichmentsBl
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.models.action_type import ActionType
@@ -44,6 +45,8 @@ def mock_session():
     query_mock.filter.return_value = query_mock
     query_mock.order_by.return_value = query_mock
     query_mock.all.return_value = []  # Default to no rules, override in specific tests
+    # the rules are cached per tenant, each test sets its own
+    get_enrichment_rules_cache().clear()
     # Patch the get_tenants_configurations function
     return session
 
@@ -318,6 +321,34 @@ def test_run_mapping_rules_no_match(mock_session, mock_alert_dto):
     ), "Service should not match any entry"
 
 
+def test_run_mapping_rules_cached_per_tenant(mock_session, mock_alert_dto):
+    rule = MappingRule(
+        id=1,
+        tenant_id="test_tenant",
+        priority=1,
+        matchers=[["name"]],
+        rows=[{"name": "Test Alert", "service": "new_service"}],
+        disabled=False,
+        type="csv",
+    )
+    mock_session.query.return_value.filter.return_value.filter.return_value.order_by.return_value.all.return_value = [
+        rule
+    ]
+    enrichment_bl = EnrichmentsBl(tenant_id="test_tenant", db=mock_session)
+
+    for _ in range(3):
+        enrichment_bl.run_mapping_rules(mock_alert_dto)
+        assert mock_alert_dto.service == "new_service"
+    # the rules are queried once, not per alert
+    assert mock_session.query.call_count == 1
+
+    rule.rows = [{"name": "Test Alert", "service": "other_service"}]
+    get_enrichment_rules_cache().invalidate("test_tenant")
+    enrichment_bl.run_mapping_rules(mock_alert_dto)
+    assert mock_alert_dto.service == "other_service"
+    assert mock_session.query.call_count == 2
+
+
 def test_check_matcher_with_and_condition(mock_session, mock_alert_dto):
     # Setup a mapping rule with && condition in matchers
     rule = MappingRule(
@@ -1011,6 +1042,7 @@ def test_incident_workflow_enrichment_integration(db_session, client, test_app):
         "status": "firing",
     }
 
+    triggered_at = datetime.utcnow()
     response = client.post(
         "/incidents",
         headers={"x-api-key": "some-key"},
@@ -1021,7 +1053,9 @@ def test_incident_workflow_enrichment_integration(db_session, client, test_app):
     incident_id = incident_data["id"]
 
     # wait a bit, to be sure workflow is added to the queue
-    assert wait_for_workflow_in_run_queue("incident-jira-enricher-test")
+    assert wait_for_workflow_in_run_queue(
+        "incident-jira-enricher-test", triggered_after=triggered_at
+    )
 
     # Wait for workflow execution to complete
     workflow_execution = wait_for_workflow_execution(
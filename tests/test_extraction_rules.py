@@ -3,6 +3,8 @@ from time import sleep
 import pytest
 from isodate import parse_datetime
 
+from keep.api.bl.enrichments_bl import EnrichmentsBl
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from tests.fixtures.client import client, setup_api_key, test_app  # noqa
 
 VALID_API_KEY = "valid_api_key"
@@ -72,3 +74,39 @@ def test_extraction_rule_updated_at(db_session, client, test_app):
     new_updated_at = parse_datetime(updated_response_data["updated_at"])
 
     assert new_updated_at > updated_at
+
+
+@pytest.mark.parametrize("test_app", ["NO_AUTH"], indirect=True)
+def test_extraction_rules_cache_invalidated_by_routes(db_session, client, test_app):
+    setup_api_key(db_session, VALID_API_KEY, role="webhook")
+    enrichments_bl = EnrichmentsBl(tenant_id=SINGLE_TENANT_UUID, db=db_session)
+    event = {"name": "cpu high on host-1", "fingerprint": "fp-1"}
+
+    assert enrichments_bl.run_extraction_rules(dict(event)) == event
+
+    rule_dict = {
+        "name": "rule",
+        "attribute": "name",
+        "regex": "on (?P<host>[a-z0-9-]+)",
+    }
+    response = client.post(
+        "/extraction", json=rule_dict, headers={"x-api-key": VALID_API_KEY}
+    )
+    assert response.status_code == 200
+    rule_id = response.json()["id"]
+    assert enrichments_bl.run_extraction_rules(dict(event))["host"] == "host-1"
+
+    rule_dict["regex"] = "(?P<metric>[a-z]+) high"
+    response = client.put(
+        f"/extraction/{rule_id}", json=rule_dict, headers={"x-api-key": VALID_API_KEY}
+    )
+    assert response.status_code == 200
+    extracted_event = enrichments_bl.run_extraction_rules(dict(event))
+    assert extracted_event["metric"] == "cpu"
+    assert "host" not in extracted_event
+
+    response = client.delete(
+        f"/extraction/{rule_id}", headers={"x-api-key": VALID_API_KEY}
+    )
+    assert response.status_code == 200
+    assert enrichments_bl.run_extraction_rules(dict(event)) == event
@@ -0,0 +1,65 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from keep.api.core import alerts
+from keep.api.core.alerts import get_alert_facets_data
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertDto
+from keep.api.models.facet import FacetOptionsQueryDto
+from keep.api.tasks.process_event_task import process_event
+
+SEVERITY_FACET_ID = "f8a91ac7-4916-4ad0-9b46-a5ddb85bfbb8"
+
+
+def _process_alerts(alerts: list[AlertDto]):
+    process_event(
+        ctx={"job_try": 1},
+        trace_id="test",
+        tenant_id=SINGLE_TENANT_UUID,
+        provider_id="test",
+        provider_type=None,
+        fingerprint=None,
+        api_key_name="test",
+        event=alerts,
+        notify_client=False,
+    )
+
+
+def _alert(fingerprint: str, severity: str) -> AlertDto:
+    return AlertDto(
+        id=fingerprint,
+        name=fingerprint,
+        status="firing",
+        severity=severity,
+        lastReceived=datetime.utcnow().isoformat(),
+        source=["test"],
+        fingerprint=fingerprint,
+    )
+
+
+def _get_severity_counts() -> dict[str, int]:
+    facet_options = get_alert_facets_data(
+        SINGLE_TENANT_UUID,
+        FacetOptionsQueryDto(cel="", facet_queries={SEVERITY_FACET_ID: ""}),
+    )
+    return {
+        option.value: option.matches_count
+        for option in facet_options[SEVERITY_FACET_ID]
+        if option.matches_count
+    }
+
+
+def test_facet_options_are_cached_until_ingestion(db_session):
+    _process_alerts([_alert("fp-1", "critical"), _alert("fp-2", "info")])
+
+    with patch.object(
+        alerts, "get_facet_options", wraps=alerts.get_facet_options
+    ) as get_facet_options:
+        assert _get_severity_counts() == {"critical": 1, "info": 1}
+        assert _get_severity_counts() == {"critical": 1, "info": 1}
+        assert get_facet_options.call_count == 1
+
+        # the ingestion makes the cached facet options stale
+        _process_alerts([_alert("fp-3", "critical")])
+        assert _get_severity_counts() == {"critical": 2, "info": 1}
+        assert get_facet_options.call_count == 2
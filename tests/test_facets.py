@@ -0,0 +1,149 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from unittest.mock import patch
+
+from sqlalchemy.exc import ProgrammingError
+
+from keep.api.core import facets
+from keep.api.core.alerts import get_alert_facets_data
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.core.facet_options_cache import get_facet_options_cache
+from keep.api.models.alert import AlertStatus
+from keep.api.models.facet import FacetOptionsQueryDto
+
+SEVERITY_FACET_ID = "f8a91ac7-4916-4ad0-9b46-a5ddb85bfbb8"
+STATUS_FACET_ID = "5dd1519c-6277-4109-ad95-c19d2f4f15e3"
+
+
+def _get_facet_options():
+    return get_alert_facets_data(
+        SINGLE_TENANT_UUID,
+        FacetOptionsQueryDto(
+            cel="",
+            facet_queries={SEVERITY_FACET_ID: "", STATUS_FACET_ID: ""},
+        ),
+    )
+
+
+def _create_alerts(create_alert):
+    now = datetime.utcnow()
+    create_alert("fp-1", AlertStatus.FIRING, now, {"severity": "critical"})
+    create_alert("fp-2", AlertStatus.RESOLVED, now, {"severity": "critical"})
+    create_alert("fp-3", AlertStatus.FIRING, now, {"severity": "info"})
+
+
+def test_parallel_facet_queries(db_session, create_alert):
+    _create_alerts(create_alert)
+    facet_options = _get_facet_options()
+
+    get_facet_options_cache().clear()
+    with patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True):
+        parallel_facet_options = _get_facet_options()
+
+    assert parallel_facet_options == facet_options
+    assert parallel_facet_options.partial_facet_ids == set()
+
+
+def test_parallel_facet_queries_timeout(db_session, create_alert):
+    _create_alerts(create_alert)
+    query_facet_data = facets._query_facet_data
+    release_slow_facet = threading.Event()
+    slow_facet_done = threading.Event()
+
+    def slow_status_facet(db_query, timeout_seconds):
+        if "lastalert.status" not in str(db_query):
+            return query_facet_data(db_query, timeout_seconds)
+        try:
+            release_slow_facet.wait(timeout=5)
+            return query_facet_data(db_query, timeout_seconds)
+        finally:
+            slow_facet_done.set()
+
+    try:
+        with (
+            patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True),
+            patch.object(facets, "KEEP_FACET_QUERY_TIMEOUT_SECONDS", 0.5),
+            patch.object(facets, "_query_facet_data", slow_status_facet),
+        ):
+            facet_options = _get_facet_options()
+    finally:
+        # don't leave the slow query running after the test
+        release_slow_facet.set()
+        slow_facet_done.wait(timeout=5)
+
+    # the facets that finished are returned, the slow one is flagged
+    assert facet_options.partial_facet_ids == {STATUS_FACET_ID}
+    assert facet_options[STATUS_FACET_ID] == []
+    assert {
+        option.value: option.matches_count
+        for option in facet_options[SEVERITY_FACET_ID]
+        if option.matches_count
+    } == {"critical": 2, "info": 1}
+
+    # partial facet options are not cached
+    with patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True):
+        assert _get_facet_options().partial_facet_ids == set()
+
+
+def test_parallel_facet_queries_budget_starts_with_query(db_session, create_alert):
+    _create_alerts(create_alert)
+    query_facet_data = facets._query_facet_data
+
+    def slow_facet(db_query, timeout_seconds):
+        time.sleep(0.3)
+        return query_facet_data(db_query, timeout_seconds)
+
+    # the facets are queried one after the other, longer than a single budget in total
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        with (
+            patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True),
+            patch.object(facets, "KEEP_FACET_QUERY_TIMEOUT_SECONDS", 0.5),
+            patch.object(facets, "facets_query_executor", executor),
+            patch.object(facets, "_query_facet_data", slow_facet),
+        ):
+            facet_options = _get_facet_options()
+    finally:
+        executor.shutdown(wait=True)
+
+    assert facet_options.partial_facet_ids == set()
+
+
+def test_parallel_facet_queries_keep_most_frequent_options(db_session, create_alert):
+    _create_alerts(create_alert)
+    now = datetime.utcnow()
+    create_alert("fp-4", AlertStatus.FIRING, now, {"severity": "info"})
+    create_alert("fp-5", AlertStatus.FIRING, now, {"severity": "info"})
+
+    with (
+        patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True),
+        patch.object(facets, "OPTIONS_PER_FACET", 1),
+    ):
+        facet_options = _get_facet_options()
+
+    assert {
+        option.value: option.matches_count
+        for option in facet_options[SEVERITY_FACET_ID]
+        if option.matches_count
+    } == {"info": 3}
+
+
+def test_parallel_facet_queries_database_error(db_session, create_alert):
+    _create_alerts(create_alert)
+    query_facet_data = facets._query_facet_data
+
+    def failing_status_facet(db_query, timeout_seconds):
+        if "lastalert.status" in str(db_query):
+            raise ProgrammingError("SELECT", {}, Exception("syntax error"))
+        return query_facet_data(db_query, timeout_seconds)
+
+    with (
+        patch.object(facets, "KEEP_FACETS_PARALLEL_QUERIES_ENABLED", True),
+        patch.object(facets, "_query_facet_data", failing_status_facet),
+    ):
+        facet_options = _get_facet_options()
+
+    assert facet_options.partial_facet_ids == {STATUS_FACET_ID}
+    assert facet_options[SEVERITY_FACET_ID]
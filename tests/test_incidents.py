@@ -5,7 +5,7 @@ from uuid import uuid4
 
 import pytest
 from fastapi import HTTPException
-from sqlalchemy import and_, desc, distinct, func
+from sqlalchemy import and_, desc, distinct, func, update
 
 from keep.api.bl.incidents_bl import IncidentBl
 from keep.api.core.db import (
@@ -18,6 +18,7 @@ from keep.api.core.db import (
     get_incident_by_id,
     get_last_incidents,
     merge_incidents_to_id,
+    reconcile_incident_aggregates,
     remove_alerts_to_incident_by_incident_id,
 )
 from keep.api.core.db_utils import get_json_extract_field
@@ -659,6 +660,46 @@ def test_add_alerts_with_same_fingerprint_to_incident(db_session, create_alert):
     assert total_incident_alerts == 0
 
 
+def test_add_alerts_to_incident_maintains_aggregates(db_session, create_alert):
+    now = datetime.utcnow().replace(microsecond=0)
+    for i, fingerprint in enumerate(["fp1", "fp2", "fp3"]):
+        create_alert(
+            fingerprint,
+            AlertStatus.FIRING,
+            now - timedelta(hours=3 - i),
+            {"severity": AlertSeverity.CRITICAL.value},
+        )
+
+    incident = create_incident_from_dict(
+        SINGLE_TENANT_UUID, {"user_generated_name": "test", "user_summary": "test"}
+    )
+    add_alerts_to_incident(SINGLE_TENANT_UUID, incident, ["fp2"])
+    incident = get_incident_by_id(SINGLE_TENANT_UUID, incident.id)
+    assert incident.alerts_count == 1
+    assert incident.start_time == incident.last_seen_time == now - timedelta(hours=2)
+
+    # the aggregates are updated from the new alerts only
+    add_alerts_to_incident(SINGLE_TENANT_UUID, incident, ["fp1", "fp2", "fp3"])
+    incident = get_incident_by_id(SINGLE_TENANT_UUID, incident.id)
+    assert incident.alerts_count == 3
+    assert incident.start_time == now - timedelta(hours=3)
+    assert incident.last_seen_time == now - timedelta(hours=1)
+    assert reconcile_incident_aggregates(SINGLE_TENANT_UUID, [incident.id]) == []
+
+    # a newer alert of an already linked fingerprint isn't seen by the increments
+    create_alert("fp1", AlertStatus.FIRING, now, {})
+    db_session.exec(
+        update(Incident).where(Incident.id == incident.id).values(alerts_count=7)
+    )
+    db_session.commit()
+
+    assert reconcile_incident_aggregates(SINGLE_TENANT_UUID) == [incident.id]
+    incident = get_incident_by_id(SINGLE_TENANT_UUID, incident.id)
+    assert incident.alerts_count == 3
+    assert incident.start_time == now - timedelta(hours=3)
+    assert incident.last_seen_time == now
+
+
 def test_merge_incidents(db_session, create_alert, setup_stress_alerts_no_elastic):
     incident_1 = create_incident_from_dict(
         SINGLE_TENANT_UUID,
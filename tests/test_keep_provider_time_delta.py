@@ -10,6 +10,7 @@ import uuid
 from datetime import timezone, timedelta
 from freezegun import freeze_time
 
+from keep.api.core.db_utils import get_last_alert_properties
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.models.db.alert import Alert, LastAlert
 from keep.api.models.alert import AlertStatus
@@ -109,6 +110,7 @@ def test_keep_provider_time_delta_filtering_bug(db_session):
             timestamp=alert.timestamp,
             first_timestamp=alert.timestamp,
             alert_id=alert.id,
+            **get_last_alert_properties(alert.event),
         )
         last_alerts.append(last_alert)
     
@@ -195,6 +197,7 @@ def test_keep_provider_time_delta_filtering_version_1(db_session):
             timestamp=alert.timestamp,
             first_timestamp=alert.timestamp,
             alert_id=alert.id,
+            **get_last_alert_properties(alert.event),
         )
         last_alerts.append(last_alert)
     
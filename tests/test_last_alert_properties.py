@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from keep.api.core.alerts import build_total_alerts_query, query_last_alerts
+from keep.api.core.db import enrich_entity
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.action_type import ActionType
+from keep.api.models.alert import AlertStatus
+from keep.api.models.db.alert import LastAlert
+from keep.api.models.query import QueryDto
+
+
+def _get_last_alert(db_session, fingerprint: str) -> LastAlert:
+    db_session.expire_all()
+    return db_session.exec(
+        select(LastAlert).where(LastAlert.fingerprint == fingerprint)
+    ).one()
+
+
+def test_last_alert_properties_are_materialized(db_session, create_alert):
+    last_received = datetime.utcnow().replace(microsecond=0)
+    create_alert(
+        "fp-1",
+        AlertStatus.FIRING,
+        last_received,
+        {"severity": "critical"},
+    )
+
+    last_alert = _get_last_alert(db_session, "fp-1")
+    assert last_alert.status == AlertStatus.FIRING.value
+    assert last_alert.severity == "critical"
+    assert last_alert.last_received == last_received
+
+    # the enrichments override the event
+    enrich_entity(
+        SINGLE_TENANT_UUID,
+        "fp-1",
+        {"status": AlertStatus.ACKNOWLEDGED.value},
+        action_type=ActionType.GENERIC_ENRICH,
+        action_callee="test",
+        action_description="test",
+    )
+    last_alert = _get_last_alert(db_session, "fp-1")
+    assert last_alert.status == AlertStatus.ACKNOWLEDGED.value
+
+    # and a newer alert doesn't drop them
+    create_alert(
+        "fp-1",
+        AlertStatus.FIRING,
+        last_received + timedelta(minutes=1),
+        {"severity": "info"},
+    )
+    last_alert = _get_last_alert(db_session, "fp-1")
+    assert last_alert.status == AlertStatus.ACKNOWLEDGED.value
+    assert last_alert.severity == "info"
+    assert last_alert.last_received == last_received + timedelta(minutes=1)
+
+
+def test_query_last_alerts_by_materialized_properties(db_session, create_alert):
+    now = datetime.utcnow()
+    create_alert("fp-1", AlertStatus.FIRING, now, {"severity": "critical"})
+    create_alert("fp-2", AlertStatus.RESOLVED, now, {"severity": "critical"})
+    create_alert("fp-3", AlertStatus.FIRING, now, {"severity": "info"})
+
+    alerts, total_count = query_last_alerts(
+        SINGLE_TENANT_UUID,
+        QueryDto(cel="status == 'firing' && severity > 'warning'"),
+    )
+    assert total_count == 1
+    assert [alert.fingerprint for alert in alerts] == ["fp-1"]
+
+    # the count doesn't join the alerts for the materialized properties
+    count_query = str(
+        build_total_alerts_query(SINGLE_TENANT_UUID, QueryDto(cel="status == 'firing'"))
+    )
+    assert "JOIN alert " not in count_query
+    assert "lastalert.status" in count_query
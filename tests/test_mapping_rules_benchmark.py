@@ -0,0 +1,159 @@
+"""
+Benchmark of the CSV mapping rules matching, indexed vs. scanning the rows.
+
+Records alerts/sec for a rule of N rows x M alerts as test properties (e.g. in the
+--junitxml report). The benchmark only runs with --benchmark, the sizes can be changed
+with the MAPPING_BENCHMARK_ROWS and MAPPING_BENCHMARK_ALERTS environment variables, e.g.:
+
+    MAPPING_BENCHMARK_ROWS=40000 MAPPING_BENCHMARK_ALERTS=1000 pytest --benchmark \
+        --junitxml=benchmark.xml tests/test_mapping_rules_benchmark.py
+"""
+
+import datetime
+import os
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from keep.api.bl.enrichments_bl import EnrichmentsBl
+from keep.api.bl.mapping_rule_index import MappingRuleIndex
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertDto, AlertStatus
+from keep.api.models.db.mapping import MappingRule
+
+ROWS_COUNT = int(os.environ.get("MAPPING_BENCHMARK_ROWS", "1000"))
+ALERTS_COUNT = int(os.environ.get("MAPPING_BENCHMARK_ALERTS", "100"))
+
+REGIONS = ["us-east-1", "eu-west-1", "ap-south-1"]
+
+
+def _build_rule(rows_count: int) -> MappingRule:
+    rows = []
+    for i in range(rows_count):
+        if i % 100 == 0:
+            # a regex, checked against every alert
+            host = f"^db-{i}-[0-9]+$"
+        else:
+            host = f"host-{i}"
+        rows.append(
+            {
+                "service": f"service-{i % 500}",
+                "region": REGIONS[i % len(REGIONS)] if i % 7 else None,
+                "host": host,
+                "owner": f"team-{i % 13}",
+            }
+        )
+    return MappingRule(
+        id=1,
+        tenant_id=SINGLE_TENANT_UUID,
+        priority=1,
+        name="cmdb",
+        matchers=[["service", "region"], ["host"]],
+        rows=rows,
+        type="csv",
+        last_updated_at=datetime.datetime.utcnow(),
+    )
+
+
+def _build_alerts(count: int, rows_count: int) -> list[AlertDto]:
+    alerts = []
+    for i in range(count):
+        row = (i * 7919) % rows_count
+        alerts.append(
+            AlertDto(
+                id=f"alert-{i}",
+                name=f"alert-{i}",
+                status=AlertStatus.FIRING,
+                lastReceived=datetime.datetime.utcnow().isoformat(),
+                source=["prometheus"],
+                # every few alerts only match by a regex, a substring or nothing
+                host=[
+                    f"host-{row}",
+                    f"db-{row - row % 100}-1",
+                    f"host-{row}.example.com",
+                    "unknown",
+                ][i % 4],
+                service=f"service-{row % 500}" if i % 3 else None,
+                region=REGIONS[i % len(REGIONS)] if i % 5 else None,
+            )
+        )
+    return alerts
+
+
+def _scan_rows(enrichments_bl: EnrichmentsBl, rule: MappingRule, alert: AlertDto):
+    return next(
+        (
+            row
+            for row in rule.rows
+            if any(
+                enrichments_bl._check_matcher(alert, row, matcher)
+                for matcher in rule.matchers
+            )
+        ),
+        None,
+    )
+
+
+def test_mapping_rule_index_matches_scanning_the_rows():
+    enrichments_bl = EnrichmentsBl(tenant_id=SINGLE_TENANT_UUID, db=MagicMock())
+    rule = _build_rule(1000)
+    index = MappingRuleIndex(rule)
+
+    for alert in _build_alerts(300, 1000):
+        assert index.find_row(alert) is _scan_rows(enrichments_bl, rule, alert)
+
+
+def test_mapping_rule_index_wildcard_and_multi_level():
+    rule = _build_rule(10)
+    rule.rows.insert(5, {"service": "*", "region": "eu-west-1", "host": None})
+    index = MappingRuleIndex(rule)
+    alert = _build_alerts(1, 10)[0]
+    alert.service, alert.region, alert.host = "anything", "eu-west-1", None
+    assert index.find_row(alert) is rule.rows[5]
+
+    rule = MappingRule(
+        id=2,
+        tenant_id=SINGLE_TENANT_UUID,
+        name="customers",
+        matchers=[["customer"]],
+        rows=[
+            {"customer": "acme", "tier": "gold"},
+            {"customer": "globex", "tier": "silver"},
+            {"customer": "acme", "tier": "bronze"},
+        ],
+        type="csv",
+        is_multi_level=True,
+        new_property_name="customers",
+    )
+    index = MappingRuleIndex(rule)
+    assert index.find_explicit_row(" acme ") is rule.rows[0]
+    assert index.find_explicit_row("initech") is None
+
+
+@pytest.mark.benchmark
+def test_mapping_rule_index_benchmark(record_property):
+    enrichments_bl = EnrichmentsBl(tenant_id=SINGLE_TENANT_UUID, db=MagicMock())
+    rule = _build_rule(ROWS_COUNT)
+    alerts = _build_alerts(ALERTS_COUNT, ROWS_COUNT)
+
+    start = time.perf_counter()
+    index = MappingRuleIndex(rule)
+    build_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed_rows = [index.find_row(alert) for alert in alerts]
+    indexed_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scanned_rows = [_scan_rows(enrichments_bl, rule, alert) for alert in alerts]
+    scan_elapsed = time.perf_counter() - start
+
+    assert indexed_rows == scanned_rows
+    # the rows are not scanned
+    assert indexed_elapsed < scan_elapsed
+    record_property("rows", ROWS_COUNT)
+    record_property("alerts", ALERTS_COUNT)
+    record_property("index_build_seconds", round(build_elapsed, 3))
+    record_property("indexed_alerts_per_second", round(ALERTS_COUNT / indexed_elapsed))
+    record_property("scanned_alerts_per_second", round(ALERTS_COUNT / scan_elapsed))
@@ -0,0 +1,35 @@
+from unittest.mock import patch
+
+import pytest
+
+from keep.api.tasks import notification_cache
+from keep.api.tasks.notification_cache import NotificationCache
+
+
+@pytest.fixture
+def pusher_cache(reset_singleton):
+    return reset_singleton(NotificationCache)
+
+
+def test_should_notify_debounces_per_tenant_and_event_type(pusher_cache):
+    assert pusher_cache.should_notify("tenant-1", "poll-alerts")
+    assert not pusher_cache.should_notify("tenant-1", "poll-alerts")
+    assert pusher_cache.should_notify("tenant-1", "incident-change")
+    assert pusher_cache.should_notify("tenant-2", "poll-alerts")
+
+    with patch.object(notification_cache, "POLLING_INTERVAL", 0):
+        assert pusher_cache.should_notify("tenant-1", "poll-alerts")
+
+
+def test_coalesce_merges_suppressed_payloads(pusher_cache):
+    assert pusher_cache.coalesce("tenant-1", "poll-presets", ["feed"]) == ["feed"]
+    assert pusher_cache.coalesce("tenant-1", "poll-presets", ["critical"]) is None
+    assert pusher_cache.coalesce("tenant-1", "poll-presets", ["mine", "feed"]) is None
+
+    with patch.object(notification_cache, "POLLING_INTERVAL", 0):
+        assert pusher_cache.coalesce("tenant-1", "poll-presets", []) == [
+            "critical",
+            "feed",
+            "mine",
+        ]
+        assert pusher_cache.coalesce("tenant-1", "poll-presets", []) == []
@@ -1,8 +1,12 @@
+import datetime
 import json
 import os
 import unittest
+from unittest.mock import patch
 
 from keep.api.models.db.incident import IncidentSeverity, IncidentStatus
+from keep.contextmanager.contextmanager import ContextManager
+from keep.providers.models.provider_config import ProviderConfig
 from keep.providers.pagerduty_provider.pagerduty_provider import PagerdutyProvider
 
 
@@ -18,6 +22,34 @@ class TestPagerdutyProvider(unittest.TestCase):
         self.assertEqual(formatted_alert.status, IncidentStatus.FIRING)
         self.assertEqual(formatted_alert.alert_sources, ["pagerduty"])
 
+    def test_incremental_pull_skips_unchanged_incidents(self):
+        with open(os.path.join(os.path.dirname(__file__), "test.json"), "r") as f:
+            data = json.load(f)
+        unchanged = {**data, "id": "unchanged", "updated_at": "2024-07-07T12:32:37Z"}
+        updated = {**data, "id": "updated", "updated_at": "2024-07-08T12:32:37Z"}
+        cursor = str(
+            int(datetime.datetime(2024, 7, 8, tzinfo=datetime.timezone.utc).timestamp())
+        )
+
+        provider = PagerdutyProvider(
+            ContextManager(tenant_id="test", workflow_id="test"),
+            "pagerduty",
+            ProviderConfig(authentication={"api_key": "test"}),
+        )
+        with patch.object(
+            provider,
+            "_PagerdutyProvider__get_all_incidents_or_alerts",
+            side_effect=lambda incident_id=None: (
+                [] if incident_id else [unchanged, updated]
+            ),
+        ) as get_all_incidents_or_alerts:
+            incidents = provider.get_incidents(cursor=cursor)
+
+        # only the updated incident has its alerts fetched
+        self.assertEqual(len(incidents), 1)
+        self.assertEqual(get_all_incidents_or_alerts.call_count, 2)
+        self.assertGreater(int(provider.next_pull_cursors["incidents"]), int(cursor))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,175 @@
+import uuid
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.core.preset_counters import PresetCounter, get_preset_counters
+from keep.api.models.alert import AlertDto
+from keep.api.models.db.preset import Preset, PresetDto
+from keep.api.tasks.process_event_task import process_event
+from keep.searchengine.searchengine import SearchEngine
+from tests.conftest import wait_for
+
+
+@pytest.fixture(autouse=True)
+def preset_counters():
+    preset_counters = get_preset_counters()
+    with patch.object(preset_counters, "enabled", True):
+        yield preset_counters
+
+
+def _process_alerts(alerts: list[AlertDto]):
+    process_event(
+        ctx={"job_try": 1},
+        trace_id="test",
+        tenant_id=SINGLE_TENANT_UUID,
+        provider_id="test",
+        provider_type=None,
+        fingerprint=None,
+        api_key_name="test",
+        event=alerts,
+        notify_client=False,
+    )
+
+
+def _alert(fingerprint: str, status: str, severity: str = "critical") -> AlertDto:
+    last_received = datetime.utcnow()
+    return AlertDto(
+        id=f"{fingerprint}-{status}-{last_received.timestamp()}",
+        name=fingerprint,
+        status=status,
+        severity=severity,
+        lastReceived=last_received.isoformat(),
+        source=["test"],
+        fingerprint=fingerprint,
+    )
+
+
+def _create_preset(db_session, cel: str, **kwargs) -> PresetDto:
+    preset = Preset(
+        tenant_id=SINGLE_TENANT_UUID,
+        created_by="test@keephq.dev",
+        name="critical",
+        options=[{"label": "CEL", "value": cel}],
+        **kwargs,
+    )
+    db_session.add(preset)
+    db_session.commit()
+    db_session.refresh(preset)
+    return PresetDto(**preset.to_dict())
+
+
+def test_preset_counters_are_updated_by_ingestion(db_session, preset_counters):
+    preset = _create_preset(db_session, "severity == 'critical'")
+    _process_alerts(
+        [
+            _alert("fp-1", "firing"),
+            _alert("fp-2", "resolved"),
+            _alert("fp-3", "firing", severity="info"),
+        ]
+    )
+
+    assert preset_counters.get_counters(SINGLE_TENANT_UUID, [preset]) == {
+        str(preset.id): PresetCounter(2, 1, 1, 0)
+    }
+
+    # seeded already, the new alerts are counted without going through the last alerts
+    with patch.object(preset_counters, "_seed") as seed:
+        _process_alerts([_alert("fp-2", "firing"), _alert("fp-4", "firing")])
+        assert preset_counters.get_counters(SINGLE_TENANT_UUID, [preset]) == {
+            str(preset.id): PresetCounter(3, 3, 3, 0)
+        }
+        # an alert that doesn't match the preset anymore is not counted
+        _process_alerts([_alert("fp-1", "firing", severity="info")])
+        assert preset_counters.get_counters(SINGLE_TENANT_UUID, [preset]) == {
+            str(preset.id): PresetCounter(2, 2, 2, 0)
+        }
+        seed.assert_not_called()
+
+
+def test_preset_counters_are_seeded_again_when_cel_changes(db_session, preset_counters):
+    preset = _create_preset(db_session, "severity == 'critical'")
+    _process_alerts([_alert("fp-1", "firing"), _alert("fp-2", "firing", "info")])
+
+    assert preset_counters.get_counters(SINGLE_TENANT_UUID, [preset]) == {
+        str(preset.id): PresetCounter(1, 1, 1, 0)
+    }
+
+    preset.options = [{"label": "CEL", "value": "severity == 'info'"}]
+    with patch.object(preset_counters, "_seed", wraps=preset_counters._seed) as seed:
+        assert preset_counters.get_counters(SINGLE_TENANT_UUID, [preset]) == {
+            str(preset.id): PresetCounter(1, 1, 1, 0)
+        }
+        seed.assert_called_once()
+
+
+def test_search_preset_alerts_uses_counters(db_session):
+    preset = _create_preset(
+        db_session, "severity == 'critical'", counter_shows_firing_only=True
+    )
+    _process_alerts([_alert("fp-1", "firing"), _alert("fp-2", "resolved")])
+
+    with patch.object(SearchEngine, "_filter_preset_alerts") as filter_preset_alerts:
+        SearchEngine(tenant_id=SINGLE_TENANT_UUID).search_preset_alerts([preset])
+        filter_preset_alerts.assert_not_called()
+    assert preset.alerts_count == 1
+    assert preset.should_do_noise_now is False
+
+
+def test_preset_counters_are_seeded_in_background(db_session, preset_counters):
+    preset = _create_preset(db_session, "severity == 'critical'")
+    _process_alerts([_alert("fp-1", "firing"), _alert("fp-2", "firing", "info")])
+
+    # not seeded yet, the preset is left out until the background seed is done
+    assert (
+        preset_counters.get_counters(SINGLE_TENANT_UUID, [preset], wait_for_seed=False)
+        == {}
+    )
+    assert wait_for(
+        lambda: preset_counters.get_counters(
+            SINGLE_TENANT_UUID, [preset], wait_for_seed=False
+        )
+    )
+    assert preset_counters.get_counters(
+        SINGLE_TENANT_UUID, [preset], wait_for_seed=False
+    ) == {str(preset.id): PresetCounter(1, 1, 1, 0)}
+
+
+def test_preset_counters_are_updated_in_one_redis_pipeline(preset_counters):
+    presets = [
+        PresetDto(
+            id=str(uuid.uuid4()),
+            name=f"preset-{i}",
+            options=[{"label": "CEL", "value": "severity == 'critical'"}],
+        )
+        for i in range(3)
+    ]
+    alerts = [_alert("fp-1", "firing"), _alert("fp-2", "firing", "info")]
+    redis = MagicMock()
+    pipeline = redis.pipeline.return_value
+
+    def preset_results(seeded: int, writes: list[int]) -> list[int]:
+        # exists, the writes of the 2 fingerprints to the 4 sets, the 4 sets expiry
+        return [seeded] + writes + [1] * 4
+
+    pipeline.execute.return_value = (
+        # not seeded
+        preset_results(0, [1] * 8)
+        # seeded, unchanged
+        + preset_results(1, [0] * 8)
+        # seeded, changed
+        + preset_results(1, [0] * 7 + [1])
+    )
+
+    with patch.object(preset_counters, "redis", redis):
+        changed = preset_counters.update(
+            SINGLE_TENANT_UUID,
+            alerts,
+            [(preset, alerts[:1]) for preset in presets],
+        )
+
+    assert changed == {str(presets[2].id)}
+    redis.exists.assert_not_called()
+    pipeline.execute.assert_called_once()
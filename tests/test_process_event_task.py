@@ -0,0 +1,121 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from sqlmodel import select
+
+from keep.api.core.db import get_last_alert_hashes_by_fingerprints
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertDto
+from keep.api.models.db.alert import Alert, AlertAudit, AlertEnrichment, LastAlert
+from keep.api.tasks import notification_cache, process_event_task
+from keep.api.tasks.notification_cache import NotificationCache
+from keep.api.tasks.process_event_task import process_event
+from tests.conftest import PusherMock
+
+
+def _process_alerts(alerts: list[AlertDto], notify_client: bool = False):
+    process_event(
+        ctx={"job_try": 1},
+        trace_id="test",
+        tenant_id=SINGLE_TENANT_UUID,
+        provider_id="test",
+        provider_type=None,
+        fingerprint=None,
+        api_key_name="test",
+        event=alerts,
+        notify_client=notify_client,
+    )
+
+
+def _alert(fingerprint: str, status: str, last_received: datetime) -> AlertDto:
+    return AlertDto(
+        id=f"{fingerprint}-{status}-{last_received.timestamp()}",
+        name=fingerprint,
+        status=status,
+        severity="critical",
+        lastReceived=last_received.isoformat(),
+        source=["test"],
+        fingerprint=fingerprint,
+    )
+
+
+def test_bulk_save_to_db(db_session):
+    now = datetime.utcnow()
+    with patch("keep.api.tasks.process_event_task.KEEP_BULK_SAVE_TO_DB_ENABLED", True):
+        _process_alerts([_alert("fp-1", "firing", now - timedelta(minutes=5))])
+        _process_alerts(
+            [
+                _alert("fp-1", "acknowledged", now - timedelta(minutes=1)),
+                _alert("fp-1", "firing", now),
+                _alert("fp-2", "firing", now),
+            ]
+        )
+
+    alerts = sorted(
+        db_session.exec(select(Alert)).all(),
+        key=lambda alert: alert.event["lastReceived"],
+    )
+    assert len(alerts) == 4
+    assert len(db_session.exec(select(AlertAudit)).all()) == 4
+
+    last_alerts = {
+        last_alert.fingerprint: last_alert
+        for last_alert in db_session.exec(select(LastAlert)).all()
+    }
+    assert set(last_alerts) == {"fp-1", "fp-2"}
+    # the last alert of the batch, even if they were saved in the same millisecond
+    latest = {alert.fingerprint: alert for alert in alerts}
+    for fingerprint, last_alert in last_alerts.items():
+        assert last_alert.alert_id == latest[fingerprint].id
+        assert last_alert.alert_hash == latest[fingerprint].alert_hash
+    assert get_last_alert_hashes_by_fingerprints(
+        SINGLE_TENANT_UUID, ["fp-1", "fp-2"]
+    ) == {"fp-1": latest["fp-1"].alert_hash, "fp-2": latest["fp-2"].alert_hash}
+
+    # counted from the previous alerts, including the ones of the same batch
+    fp_1_events = [alert.event for alert in alerts if alert.fingerprint == "fp-1"]
+    assert [event["firingCounter"] for event in fp_1_events] == [1, 0, 1]
+    assert [event["unresolvedCounter"] for event in fp_1_events] == [1, 2, 3]
+    assert latest["fp-2"].event["firingCounter"] == 1
+
+
+def test_bulk_save_to_db_applies_enrichments(db_session):
+    db_session.add(
+        AlertEnrichment(
+            tenant_id=SINGLE_TENANT_UUID,
+            alert_fingerprint="fp-1",
+            enrichments={"note": " enriched "},
+        )
+    )
+    db_session.commit()
+
+    with patch(
+        "keep.api.tasks.process_event_task.KEEP_BULK_SAVE_TO_DB_ENABLED", True
+    ), patch("keep.api.tasks.process_event_task.RulesEngine") as rules_engine:
+        rules_engine.return_value.run_rules.return_value = []
+        _process_alerts([_alert("fp-1", "firing", datetime.utcnow())])
+
+    formatted_events = rules_engine.return_value.run_rules.call_args.args[0]
+    assert formatted_events[0].note == "enriched"
+
+
+def test_alerts_delta_is_coalesced(db_session, reset_singleton):
+    now = datetime.utcnow()
+    pusher = PusherMock()
+    reset_singleton(NotificationCache)
+    with (
+        patch.object(process_event_task, "KEEP_PUSHER_DELTA_EVENTS_ENABLED", True),
+        patch.object(process_event_task, "get_pusher_client", return_value=pusher),
+    ):
+        _process_alerts([_alert("fp-1", "firing", now)], notify_client=True)
+        # suppressed, sent with the next delta
+        _process_alerts([_alert("fp-2", "firing", now)], notify_client=True)
+        with patch.object(notification_cache, "POLLING_INTERVAL", 0):
+            _process_alerts([_alert("fp-3", "firing", now)], notify_client=True)
+
+    assert [
+        json.loads(data)["fingerprints"]
+        for _, event_name, data in pusher.triggers
+        if event_name == "alerts-delta"
+    ] == [["fp-1"], ["fp-2", "fp-3"]]
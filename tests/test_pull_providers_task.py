@@ -0,0 +1,189 @@
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.tasks import pull_providers_task
+from keep.api.tasks.pull_providers_task import ProvidersPullScheduler
+from keep.providers.base.base_provider import BaseIncidentProvider
+
+
+def _installed_provider(provider_id: str, last_pull_time=None, pull_cursors=None):
+    return SimpleNamespace(
+        id=provider_id,
+        type="test",
+        pulling_enabled=True,
+        last_pull_time=last_pull_time,
+        pull_cursors=pull_cursors or {},
+    )
+
+
+def _provider_class(
+    alerts_by_fingerprint: dict, delay: float = 0, next_pull_cursors=None
+):
+    def get_alerts_by_fingerprint(tenant_id, cursor=None):
+        time.sleep(delay)
+        return alerts_by_fingerprint
+
+    return MagicMock(
+        spec=["get_alerts_by_fingerprint", "next_pull_cursors"],
+        get_alerts_by_fingerprint=MagicMock(side_effect=get_alerts_by_fingerprint),
+        next_pull_cursors=next_pull_cursors or {},
+    )
+
+
+@pytest.fixture
+def scheduler(reset_singleton):
+    scheduler = reset_singleton(ProvidersPullScheduler)
+    with (
+        patch.object(pull_providers_task, "update_provider_last_pull_time"),
+        patch.object(
+            pull_providers_task, "update_provider_pull_cursors"
+        ) as update_provider_pull_cursors,
+        patch.object(pull_providers_task, "process_event") as process_event,
+    ):
+        scheduler.process_event = process_event
+        scheduler.update_provider_pull_cursors = update_provider_pull_cursors
+        yield scheduler
+    scheduler.executor.shutdown(wait=True)
+
+
+def test_pull_processes_each_provider_as_one_batch(scheduler):
+    provider_classes = {
+        "fast": _provider_class({"fp-1": ["a1", "a2"], "fp-2": ["a3"]}),
+        "slow": _provider_class({"fp-3": ["a4"]}, delay=0.5),
+    }
+    with patch.object(
+        pull_providers_task.ProvidersFactory,
+        "get_installed_provider",
+        side_effect=lambda tenant_id, provider_id, provider_type: provider_classes[
+            provider_id
+        ],
+    ):
+        scheduler.pull(
+            SINGLE_TENANT_UUID,
+            "trace",
+            [_installed_provider("slow"), _installed_provider("fast")],
+        )
+
+    batches = {
+        call.args[3]: call.args[7] for call in scheduler.process_event.call_args_list
+    }
+    assert batches == {"fast": ["a1", "a2", "a3"], "slow": ["a4"]}
+
+
+def test_pull_drops_providers_that_time_out(scheduler):
+    scheduler.timeout = 0.5
+    provider_classes = {
+        "fast": _provider_class({"fp-1": ["a1"]}),
+        "slow": _provider_class({"fp-2": ["a2"]}, delay=2),
+    }
+    with patch.object(
+        pull_providers_task.ProvidersFactory,
+        "get_installed_provider",
+        side_effect=lambda tenant_id, provider_id, provider_type: provider_classes[
+            provider_id
+        ],
+    ):
+        started = time.monotonic()
+        scheduler.pull(
+            SINGLE_TENANT_UUID,
+            "trace",
+            [_installed_provider("slow"), _installed_provider("fast")],
+        )
+        assert time.monotonic() - started < 2
+        # the slow provider is still being pulled, it isn't pulled twice
+        assert (SINGLE_TENANT_UUID, "slow") in scheduler._in_flight
+        scheduler.executor.shutdown(wait=True)
+
+    assert [call.args[3] for call in scheduler.process_event.call_args_list] == ["fast"]
+
+
+def test_pull_saves_the_cursor_once_processed(scheduler):
+    provider_class = _provider_class(
+        {"fp-1": ["a1"]}, next_pull_cursors={"alerts": "200"}
+    )
+    installed_provider = _installed_provider(
+        "p", pull_cursors={"alerts": "100", "incidents": "150"}
+    )
+    with patch.object(
+        pull_providers_task.ProvidersFactory,
+        "get_installed_provider",
+        return_value=provider_class,
+    ):
+        scheduler.pull(SINGLE_TENANT_UUID, "trace", [installed_provider])
+        provider_class.get_alerts_by_fingerprint.assert_called_once_with(
+            tenant_id=SINGLE_TENANT_UUID, cursor="100"
+        )
+        # only the alerts cursor moves
+        scheduler.update_provider_pull_cursors.assert_called_once_with(
+            tenant_id=SINGLE_TENANT_UUID,
+            provider_id="p",
+            pull_cursors={"alerts": "200"},
+        )
+
+        # the cursor stays put when the pulled alerts fail to process
+        scheduler.update_provider_pull_cursors.reset_mock()
+        scheduler.process_event.side_effect = Exception("processing failed")
+        scheduler.pull(SINGLE_TENANT_UUID, "trace", [installed_provider])
+        assert not scheduler.update_provider_pull_cursors.called
+
+
+def test_pull_keeps_alerts_and_incidents_cursors_apart(scheduler):
+    provider_class = MagicMock(spec=BaseIncidentProvider)
+    provider_class.get_alerts_by_fingerprint.return_value = {"fp-1": ["a1"]}
+    provider_class.get_incidents.return_value = ["i1"]
+    provider_class.next_pull_cursors = {"incidents": "250"}
+    installed_provider = _installed_provider(
+        "p", pull_cursors={"alerts": "100", "incidents": "150"}
+    )
+    with (
+        patch.object(
+            pull_providers_task.ProvidersFactory,
+            "get_installed_provider",
+            return_value=provider_class,
+        ),
+        patch.object(pull_providers_task, "process_incident") as process_incident,
+    ):
+        scheduler.pull(SINGLE_TENANT_UUID, "trace", [installed_provider])
+        provider_class.get_incidents.assert_called_once_with(cursor="150")
+        # an incidents pull doesn't move the alerts cursor
+        scheduler.update_provider_pull_cursors.assert_called_once_with(
+            tenant_id=SINGLE_TENANT_UUID,
+            provider_id="p",
+            pull_cursors={"incidents": "250"},
+        )
+
+        # nor does it move its own when the incidents fail to process
+        scheduler.update_provider_pull_cursors.reset_mock()
+        process_incident.side_effect = Exception("processing failed")
+        scheduler.pull(SINGLE_TENANT_UUID, "trace", [installed_provider])
+        assert not scheduler.update_provider_pull_cursors.called
+
+
+def test_pull_interval_is_jittered_per_provider():
+    with (
+        patch.object(pull_providers_task, "PROVIDER_PULL_INTERVAL_MINUTE", 100),
+        patch.object(pull_providers_task, "KEEP_PROVIDER_PULL_JITTER", 0.1),
+    ):
+        intervals = {
+            ProvidersPullScheduler.get_pull_interval_minutes(f"provider-{i}")
+            for i in range(10)
+        }
+        assert len(intervals) > 1
+        assert all(100 <= interval <= 110 for interval in intervals)
+        # stable for a provider
+        assert ProvidersPullScheduler.get_pull_interval_minutes(
+            "provider-1"
+        ) == ProvidersPullScheduler.get_pull_interval_minutes("provider-1")
+
+        scheduler = ProvidersPullScheduler()
+        assert not scheduler.is_due(
+            _installed_provider("provider-1", datetime.now() - timedelta(minutes=99))
+        )
+        assert scheduler.is_due(
+            _installed_provider("provider-1", datetime.now() - timedelta(minutes=111))
+        )
@@ -0,0 +1,38 @@
+import json
+from unittest.mock import MagicMock
+
+from keep.api.utils.pusher_utils import chunk_payload, trigger_in_chunks
+
+
+def test_chunk_payload_stays_under_the_limit():
+    fingerprints = [f"fingerprint-{i:04}" for i in range(1000)]
+
+    payloads = chunk_payload("fingerprints", fingerprints, max_bytes=1000)
+
+    assert len(payloads) > 1
+    assert all(len(payload) <= 1000 for payload in payloads)
+    # nothing is lost or reordered
+    assert [
+        fingerprint
+        for payload in payloads
+        for fingerprint in json.loads(payload)["fingerprints"]
+    ] == fingerprints
+
+
+def test_chunk_payload_fits_small_payloads_in_one_event():
+    assert chunk_payload("presets", [{"name": "feed", "alerts_count": 3}]) == [
+        json.dumps({"presets": [{"name": "feed", "alerts_count": 3}]})
+    ]
+    assert chunk_payload("presets", []) == []
+
+
+def test_trigger_in_chunks():
+    pusher_client = MagicMock()
+
+    trigger_in_chunks(
+        pusher_client, "private-tenant", "alerts-delta", "fingerprints", ["a", "b"]
+    )
+
+    pusher_client.trigger.assert_called_once_with(
+        "private-tenant", "alerts-delta", json.dumps({"fingerprints": ["a", "b"]})
+    )
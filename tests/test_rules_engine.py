@@ -14,13 +14,14 @@ from keep.api.core.db import (
 )
 from keep.api.core.db import get_rules as get_rules_db
 from keep.api.core.db import set_last_alert
+from keep.api.core.db import update_rule as update_rule_db
 from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.models.alert import AlertDto, AlertSeverity, AlertStatus
 from keep.api.models.db.alert import Alert, Incident
 from keep.api.models.db.incident import IncidentSeverity, IncidentStatus
 from keep.api.models.db.rule import CreateIncidentOn, ResolveOn
 from keep.api.utils.enrichment_helpers import convert_db_alerts_to_dto_alerts
-from keep.rulesengine.rulesengine import RulesEngine
+from keep.rulesengine.rulesengine import RulesEngine, get_rules_program_cache
 from tests.fixtures.client import client, test_app  # noqa
 
 
@@ -2458,3 +2459,62 @@ def test_rule_alerts_threshold_same_fingerprint(db_session, create_alert):
         [last_alert],
     )
     assert last_alert_dto[0].unresolvedCounter == 2
+
+
+def test_rules_program_cache(db_session):
+    alert = AlertDto(
+        id="grafana-1",
+        source=["grafana"],
+        name="grafana-test-alert",
+        status=AlertStatus.FIRING,
+        severity=AlertSeverity.CRITICAL,
+        lastReceived="2021-08-01T00:00:00Z",
+    )
+    rule = create_rule_db(
+        tenant_id=SINGLE_TENANT_UUID,
+        name="test-rule",
+        definition={
+            "sql": "N/A",  # we don't use it anymore
+            "params": {},
+        },
+        timeframe=600,
+        timeunit="seconds",
+        definition_cel='(source == "sentry") || (source == "grafana" && severity == "critical")',
+        created_by="test@keephq.dev",
+    )
+    cache = get_rules_program_cache()
+    cache.invalidate(SINGLE_TENANT_UUID)
+    rules_engine = RulesEngine(tenant_id=SINGLE_TENANT_UUID)
+
+    before = cache.stats()
+    assert rules_engine._check_if_rule_apply(rule, alert) == [
+        'source == "grafana" && severity == "critical"'
+    ]
+    assert rules_engine._check_if_rule_apply(rule, alert)
+    after = cache.stats()
+    # compiled once, served from cache the second time
+    assert after["misses"] - before["misses"] == 1
+    assert after["hits"] - before["hits"] == 1
+
+    # a new revision of the rule is recompiled
+    rule = update_rule_db(
+        tenant_id=SINGLE_TENANT_UUID,
+        rule_id=str(rule.id),
+        name="test-rule",
+        definition={"sql": "N/A", "params": {}},
+        timeframe=600,
+        timeunit="seconds",
+        definition_cel='(source == "sentry")',
+        updated_by="test@keephq.dev",
+        grouping_criteria=[],
+        require_approve=False,
+        resolve_on=ResolveOn.NEVER.value,
+        create_on=CreateIncidentOn.ANY.value,
+        incident_name_template=None,
+        incident_prefix=None,
+        multi_level=False,
+        multi_level_property_name=None,
+        threshold=1,
+    )
+    assert rules_engine._check_if_rule_apply(rule, alert) == []
+    assert cache.stats()["misses"] - after["misses"] == 1
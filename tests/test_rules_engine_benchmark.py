@@ -0,0 +1,128 @@
+"""
+Benchmark of the batch rules evaluation.
+
+Records events/sec for N rules x M events as test properties (e.g. in the --junitxml
+report). The benchmark only runs with --benchmark, the sizes can be changed with the
+RULES_BENCHMARK_RULES and RULES_BENCHMARK_EVENTS environment variables, e.g.:
+
+    RULES_BENCHMARK_RULES=300 RULES_BENCHMARK_EVENTS=5000 pytest --benchmark \
+        --junitxml=benchmark.xml tests/test_rules_engine_benchmark.py
+"""
+
+import datetime
+import json
+import os
+import time
+import uuid
+
+import celpy
+import pytest
+
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertDto, AlertStatus
+from keep.api.models.db.rule import Rule
+from keep.rulesengine.rulesengine import RulesEngine
+
+RULES_COUNT = int(os.environ.get("RULES_BENCHMARK_RULES", "50"))
+EVENTS_COUNT = int(os.environ.get("RULES_BENCHMARK_EVENTS", "500"))
+
+SOURCES = ["grafana", "prometheus", "datadog", "sentry", "zabbix"]
+SEVERITIES = ["critical", "high", "warning", "info", "low"]
+
+
+def _build_rules(count: int) -> list[Rule]:
+    rules = []
+    for i in range(count):
+        source = SOURCES[i % len(SOURCES)]
+        severity = SEVERITIES[(i // len(SOURCES)) % len(SEVERITIES)]
+        if i % 10 == 0:
+            # not indexed, checked against every event
+            definition_cel = f'(labels.service == "service-{i}")'
+        else:
+            definition_cel = f'(source == "{source}" && severity == "{severity}") || (source == "{source}" && name == "alert-{i}")'
+        rules.append(
+            Rule(
+                id=uuid.uuid4(),
+                tenant_id=SINGLE_TENANT_UUID,
+                name=f"rule-{i}",
+                definition={"sql": "N/A", "params": {}},
+                definition_cel=definition_cel,
+                timeframe=600,
+                created_by="test@keephq.dev",
+                creation_time=datetime.datetime.utcnow(),
+            )
+        )
+    return rules
+
+
+def _build_events(count: int) -> list[AlertDto]:
+    return [
+        AlertDto(
+            id=f"alert-{i}",
+            source=[SOURCES[i % len(SOURCES)]],
+            name=f"alert-{i % 97}",
+            status=AlertStatus.FIRING,
+            severity=SEVERITIES[(i // 3) % len(SEVERITIES)],
+            lastReceived=datetime.datetime.utcnow().isoformat(),
+            labels={"service": f"service-{i % 50}"},
+        )
+        for i in range(count)
+    ]
+
+
+def _naive_matched_sub_rules(rule: Rule, event: AlertDto) -> list[str]:
+    """
+    Evaluate every sub-rule of the rule with plain celpy, no index, prefilter or cache.
+    """
+    env = celpy.Environment()
+    payload = event.dict()
+    payload["source"] = payload["source"][0]
+    activation = celpy.json_to_cel(json.loads(json.dumps(payload, default=str)))
+    matched_sub_rules = []
+    for sub_rule in RulesEngine._extract_subrules(rule.definition_cel):
+        try:
+            matched = env.program(env.compile(sub_rule)).evaluate(activation)
+        except celpy.evaluation.CELEvalError as e:
+            if "no such member" in str(e):
+                continue
+            raise
+        if matched:
+            matched_sub_rules.append(sub_rule)
+    return matched_sub_rules
+
+
+def test_rules_batch_evaluation_matches_naive_evaluation():
+    rules_engine = RulesEngine(tenant_id=SINGLE_TENANT_UUID)
+    rules = _build_rules(30)
+    events = _build_events(60)
+
+    matches = rules_engine.evaluate_rules(rules, events)
+
+    for rule in rules:
+        expected = []
+        for event in events:
+            matched_rules = _naive_matched_sub_rules(rule, event)
+            if matched_rules:
+                expected.append((event.id, matched_rules))
+        actual = [(event.id, matched) for event, matched in matches.get(rule.id, [])]
+        assert actual == expected
+
+
+@pytest.mark.benchmark
+def test_rules_batch_evaluation_benchmark(record_property):
+    rules_engine = RulesEngine(tenant_id=SINGLE_TENANT_UUID)
+    rules = _build_rules(RULES_COUNT)
+    events = _build_events(EVENTS_COUNT)
+
+    # warm up the compiled programs cache
+    rules_engine.evaluate_rules(rules, events[:1])
+
+    start = time.perf_counter()
+    matches = rules_engine.evaluate_rules(rules, events)
+    elapsed = time.perf_counter() - start
+
+    assert matches
+    record_property("rules", RULES_COUNT)
+    record_property("events", EVENTS_COUNT)
+    record_property("elapsed_seconds", round(elapsed, 3))
+    record_property("events_per_sec", round(EVENTS_COUNT / elapsed))
@@ -0,0 +1,84 @@
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+from keep.api.core.elastic import ElasticClient
+from keep.api.models.db.preset import PresetDto
+from keep.searchengine.searchengine import SearchEngine, SearchMode
+
+TENANT_ID = "elastic-tenant"
+
+
+def _preset(name: str, sql: str, params: dict) -> PresetDto:
+    return PresetDto(
+        id=uuid4(),
+        name=name,
+        options=[
+            {"label": "CEL", "value": "true"},
+            {"label": "SQL", "value": {"sql": sql, "params": params}},
+        ],
+        created_by="test@keephq.dev",
+        is_private=False,
+        is_noisy=False,
+        should_do_noise_now=False,
+        alerts_count=0,
+        static=False,
+        tags=[],
+    )
+
+
+def _search_engine() -> SearchEngine:
+    search_engine = SearchEngine(tenant_id=TENANT_ID)
+    search_engine.search_mode = SearchMode.ELASTIC
+    search_engine.elastic_client = ElasticClient(tenant_id=TENANT_ID)
+    search_engine.elastic_client.enabled = True
+    search_engine.elastic_client._client = MagicMock()
+    ElasticClient._translated_queries.clear()
+    return search_engine
+
+
+def test_create_positional_sql():
+    search_engine = SearchEngine(tenant_id=TENANT_ID)
+
+    sql, params = search_engine._create_positional_sql(
+        "(name = :param_1 and severity in (:param_2, :param_10))",
+        {"param_1": "it's", "param_2": "critical", "param_10": "high"},
+    )
+    assert sql == "(name = ? and severity in (?, ?))"
+    # severity is indexed by its order, the other values are bound as is
+    assert params == ["it's", 5, 4]
+
+
+def test_search_preset_alerts_counts_presets_in_one_request():
+    search_engine = _search_engine()
+    client = search_engine.elastic_client._client
+    client.sql.translate.side_effect = lambda body: {
+        "query": {"term": {"params": body["params"]}}
+    }
+    critical = _preset("critical", "severity = :param_1", {"param_1": "critical"})
+    mine = _preset("mine", "assignee = :param_1", {"param_1": "me"})
+    client.search.return_value = {
+        "aggregations": {
+            "queries": {
+                "buckets": {
+                    str(critical.id): {"doc_count": 3, "noisy": {"doc_count": 1}},
+                    str(mine.id): {"doc_count": 2, "noisy": {"doc_count": 0}},
+                }
+            }
+        }
+    }
+
+    search_engine.search_preset_alerts([critical, mine])
+
+    assert client.search.call_count == 1
+    filters = client.search.call_args.kwargs["aggs"]["queries"]["filters"]["filters"]
+    assert filters == {
+        str(critical.id): {"term": {"params": [5]}},
+        str(mine.id): {"term": {"params": ["me"]}},
+    }
+    assert (critical.alerts_count, critical.should_do_noise_now) == (3, True)
+    assert (mine.alerts_count, mine.should_do_noise_now) == (2, False)
+
+    # the translations are cached
+    search_engine.search_preset_alerts([critical, mine])
+    assert client.sql.translate.call_count == 2
+    assert client.search.call_count == 2
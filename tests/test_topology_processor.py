@@ -0,0 +1,181 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import select
+
+from keep.api.core.db import get_last_alerts
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertStatus
+from keep.api.models.db.alert import Incident, LastAlertToIncident
+from keep.api.models.db.topology import (
+    TopologyApplication,
+    TopologyService,
+    TopologyServiceDependency,
+)
+from keep.topologies.topology_alert_changes import TopologyAlertChanges
+from keep.topologies.topology_processor import TopologyProcessor
+
+
+@pytest.fixture
+def topology_alert_changes():
+    TopologyAlertChanges._instance = None
+    alert_changes = TopologyAlertChanges()
+    alert_changes.enabled = True
+    yield alert_changes
+    TopologyAlertChanges._instance = None
+
+
+@pytest.fixture
+def topology_processor(db_session):
+    # the tenants configuration is shared by the other tests
+    with patch("keep.topologies.topology_processor.TenantConfiguration"):
+        processor = TopologyProcessor()
+    processor.enabled_tenants = {SINGLE_TENANT_UUID: True}
+    yield processor
+    processor.stop()
+
+
+@pytest.fixture
+def applications(db_session):
+    services = {}
+    for name in ["api", "db", "queue"]:
+        services[name] = TopologyService(
+            tenant_id=SINGLE_TENANT_UUID,
+            service=name,
+            display_name=name,
+            updated_at=datetime.now(),
+        )
+        db_session.add(services[name])
+    db_session.commit()
+    # services without dependencies are not part of the topology
+    for service, depends_on in [("api", "db"), ("db", "queue"), ("queue", "api")]:
+        db_session.add(
+            TopologyServiceDependency(
+                service_id=services[service].id,
+                depends_on_service_id=services[depends_on].id,
+                updated_at=datetime.now(),
+            )
+        )
+    backend = TopologyApplication(
+        tenant_id=SINGLE_TENANT_UUID,
+        name="backend",
+        services=[services["api"], services["db"]],
+    )
+    messaging = TopologyApplication(
+        tenant_id=SINGLE_TENANT_UUID,
+        name="messaging",
+        services=[services["queue"]],
+    )
+    db_session.add(backend)
+    db_session.add(messaging)
+    db_session.commit()
+    return {"backend": backend.id, "messaging": messaging.id}
+
+
+def _incident_fingerprints(db_session, application_id) -> set[str]:
+    incident = db_session.exec(
+        select(Incident).where(Incident.incident_application == application_id)
+    ).first()
+    if incident is None:
+        return set()
+    return set(
+        db_session.exec(
+            select(LastAlertToIncident.fingerprint).where(
+                LastAlertToIncident.incident_id == incident.id
+            )
+        ).all()
+    )
+
+
+def test_full_pass_incidents_get_their_application_alerts(
+    db_session, create_alert, applications, topology_processor
+):
+    create_alert("api-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "api"})
+    create_alert("queue-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "queue"})
+    create_alert("other", AlertStatus.FIRING, datetime.utcnow(), {"service": "other"})
+
+    topology_processor._process_all_tenants()
+
+    assert _incident_fingerprints(db_session, applications["backend"]) == {"api-1"}
+    assert _incident_fingerprints(db_session, applications["messaging"]) == {"queue-1"}
+
+
+def test_incremental_pass_processes_changed_applications_only(
+    db_session, create_alert, applications, topology_processor, topology_alert_changes
+):
+    topology_processor.incremental = True
+    create_alert("api-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "api"})
+    # the first pass processes all the alerts
+    topology_processor._process_all_tenants()
+    assert _incident_fingerprints(db_session, applications["backend"]) == {"api-1"}
+    assert topology_alert_changes.pop(SINGLE_TENANT_UUID) == {}
+
+    with patch.object(
+        topology_processor,
+        "_process_application",
+        wraps=topology_processor._process_application,
+    ) as process_application, patch(
+        "keep.topologies.topology_processor.get_last_alerts", wraps=get_last_alerts
+    ) as last_alerts:
+        # nothing changed, nothing is queried
+        topology_processor._process_all_tenants()
+        assert last_alerts.call_count == 0
+
+        create_alert("db-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "db"})
+        create_alert("other", AlertStatus.FIRING, datetime.utcnow(), {"service": "x"})
+        topology_processor._process_all_tenants()
+
+    assert [call.args[1].name for call in process_application.call_args_list] == [
+        "backend"
+    ]
+    assert last_alerts.call_args.kwargs["fingerprints"] == ["db-1"]
+    assert _incident_fingerprints(db_session, applications["backend"]) == {
+        "api-1",
+        "db-1",
+    }
+    assert _incident_fingerprints(db_session, applications["messaging"]) == set()
+
+
+def test_incremental_pass_falls_back_to_full_pass_on_dropped_changes(
+    db_session, create_alert, applications, topology_processor, topology_alert_changes
+):
+    topology_processor.incremental = True
+    topology_processor._process_all_tenants()
+
+    topology_alert_changes.max_pending = 1
+    create_alert("api-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "api"})
+    create_alert("queue-1", AlertStatus.FIRING, datetime.utcnow(), {"service": "queue"})
+    assert SINGLE_TENANT_UUID in topology_alert_changes.overflowed
+
+    topology_processor._process_all_tenants()
+
+    assert _incident_fingerprints(db_session, applications["backend"]) == {"api-1"}
+    assert _incident_fingerprints(db_session, applications["messaging"]) == {"queue-1"}
+    assert topology_alert_changes.pop(SINGLE_TENANT_UUID) == {}
+
+
+def test_tenants_processed_in_parallel(topology_processor):
+    tenants = [f"tenant-{i}" for i in range(8)]
+    topology_processor.enabled_tenants = {tenant_id: True for tenant_id in tenants}
+    topology_processor.workers = 4
+    with patch.object(topology_processor, "_process_tenant") as process_tenant:
+        process_tenant.side_effect = [None] * 7 + [Exception("failed")]
+        topology_processor._process_all_tenants()
+
+    assert sorted(call.args[0] for call in process_tenant.call_args_list) == tenants
+    assert topology_processor._executor is not None
+
+
+@pytest.mark.parametrize("redis", [True, False])
+def test_incremental_without_redis_warns_on_start(topology_processor, caplog, redis):
+    topology_processor.enabled = True
+    topology_processor.incremental = True
+    with (
+        patch("keep.topologies.topology_processor.REDIS", redis),
+        patch.object(topology_processor, "_start_processing"),
+    ):
+        asyncio.run(topology_processor.start())
+
+    assert ("Incremental topology processing without Redis" in caplog.text) != redis
@@ -7,7 +7,10 @@ from keep.api.models.alert import AlertDto, AlertSeverity, AlertStatus
 from keep.api.models.db.workflow import Workflow
 
 # from keep.workflowmanager.workflowmanager import WorkflowManager
-from tests.fixtures.workflow_manager import workflow_manager  # noqa
+from tests.fixtures.workflow_manager import (  # noqa
+    workflow_manager,
+    workflows_added_to_run,
+)
 
 
 @pytest.fixture
@@ -65,7 +68,7 @@ def create_alert():
 
 
 def test_simple_equality_expression(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test simple equality expression in CEL"""
     # Create a workflow with a simple equality expression
@@ -75,28 +78,26 @@ def test_simple_equality_expression(
     alert = create_alert(name="test-alert")
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(name="different-alert")
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_simple_source_equality_expression(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test simple equality expression in CEL"""
     # Create a workflow with a simple equality expression
@@ -106,28 +107,26 @@ def test_simple_source_equality_expression(
     alert = create_alert(name="test-alert", source=["datadog"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(name="different-alert", source=["sentry"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_source_contains_expression(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test source.contains() expression in CEL"""
     # Create a workflow with a source.contains expression
@@ -137,28 +136,26 @@ def test_source_contains_expression(
     alert = create_alert(source=["grafana", "prometheus"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(source=["sentry", "datadog"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_nested_property_access(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test accessing nested properties in CEL"""
     # Create a workflow that checks a nested property
@@ -170,14 +167,12 @@ def test_nested_property_access(
     alert = create_alert(labels={"environment": "production", "service": "api"})
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(
@@ -185,15 +180,15 @@ def test_nested_property_access(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_deeply_nested_property_access(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test accessing deeply nested properties in CEL"""
     # Create a workflow that checks a deeply nested property
@@ -210,14 +205,12 @@ def test_deeply_nested_property_access(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(
@@ -228,15 +221,15 @@ def test_deeply_nested_property_access(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_complex_boolean_expression(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test complex boolean expressions in CEL"""
     # Create a workflow with a complex boolean expression
@@ -265,24 +258,22 @@ def test_complex_boolean_expression(
     )
 
     # Insert alerts and verify matching
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert1])
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
 
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert2])
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
 
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
-def test_list_operations(db_session, workflow_manager, create_workflow, create_alert):
+def test_list_operations(
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
+):
     """Test list operations in CEL"""
     # Create a workflow that checks if a tag is in a list
     workflow = create_workflow("test-list-operations", 'tags.contains("database")')
@@ -291,27 +282,27 @@ def test_list_operations(db_session, workflow_manager, create_workflow, create_a
     alert = create_alert(tags=["database", "mysql", "production"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(tags=["api", "web", "production"])
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
-def test_string_operations(db_session, workflow_manager, create_workflow, create_alert):
+def test_string_operations(
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
+):
     """Test string operations in CEL"""
     # Create a workflow that checks string operations
     workflow = create_workflow(
@@ -325,14 +316,12 @@ def test_string_operations(db_session, workflow_manager, create_workflow, create
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create alerts that should not match
     alert_not_matching1 = create_alert(
@@ -344,17 +333,17 @@ def test_string_operations(db_session, workflow_manager, create_workflow, create
     )
 
     # Insert the alerts into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching1])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching2])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_numeric_comparisons(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test numeric comparisons in CEL"""
     # Create a workflow with numeric comparisons
@@ -369,14 +358,12 @@ def test_numeric_comparisons(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create alerts that should not match
     alert_not_matching1 = create_alert(
@@ -388,17 +375,17 @@ def test_numeric_comparisons(
     )
 
     # Insert the alerts into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching1])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching2])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_handling_missing_fields(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test how CEL handles missing fields"""
     # Create a workflow that checks for an optional field
@@ -410,28 +397,26 @@ def test_handling_missing_fields(
     alert = create_alert(labels={"priority": "high", "service": "api"})
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert without the optional field
     alert_missing_field = create_alert(labels={"service": "api"})
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_missing_field])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_multiple_workflows_matching(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test that multiple workflows can match the same alert"""
     # Create two workflows with different expressions
@@ -444,23 +429,21 @@ def test_multiple_workflows_matching(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if both workflows were scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 2
-    )
+    assert len(workflows_added_to_run) == workflows_to_run_before + 2
 
     # Verify both workflow IDs are in the list
-    workflow_ids = [
-        item["workflow_id"] for item in workflow_manager.scheduler.workflows_to_run[-2:]
-    ]
+    workflow_ids = [item["workflow_id"] for item in workflows_added_to_run[-2:]]
     assert workflow1.id in workflow_ids
     assert workflow2.id in workflow_ids
 
 
-def test_regex_in_cel(db_session, workflow_manager, create_workflow, create_alert):
+def test_regex_in_cel(
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
+):
     """Test regex-like matching in CEL"""
     # Create a workflow with string matching that simulates regex
     workflow = create_workflow("test-regex-like", 'name.matches("error-[0-9]+")')
@@ -469,28 +452,26 @@ def test_regex_in_cel(db_session, workflow_manager, create_workflow, create_aler
     alert = create_alert(name="error-123")
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
 
     # Check if the workflow was scheduled to run
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    )
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Create an alert that should not match
     alert_not_matching = create_alert(name="warning-123")
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_not_matching])
 
     # Check if no new workflow was scheduled to run
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_multiple_alerts_batch(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test processing multiple alerts in a batch"""
     # Create a workflow that should match some alerts
@@ -502,18 +483,15 @@ def test_multiple_alerts_batch(
     alert3 = create_alert(severity=AlertSeverity.CRITICAL, fingerprint="fp3")
 
     # Insert all alerts in a batch
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert1, alert2, alert3])
 
     # Check if the workflow was scheduled to run for the critical alerts only
-    assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 2
-    )
+    assert len(workflows_added_to_run) == workflows_to_run_before + 2
 
     # Verify the workflow was scheduled for the correct alerts
     workflow_alerts = [
-        item["event"].fingerprint
-        for item in workflow_manager.scheduler.workflows_to_run[-2:]
+        item["event"].fingerprint for item in workflows_added_to_run[-2:]
     ]
     assert "fp1" in workflow_alerts
     assert "fp3" in workflow_alerts
@@ -521,7 +499,7 @@ def test_multiple_alerts_batch(
 
 
 def test_cel_expression_with_null_field_bug(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session, workflow_manager, workflows_added_to_run, create_workflow, create_alert
 ):
     """Test bug where CEL expressions with null field checks don't trigger workflows"""
     # Create a workflow that mimics the user's issue:
@@ -546,16 +524,16 @@ def test_cel_expression_with_null_field_bug(
     )
 
     # Insert the alert into the workflow manager
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_matching])
 
     # Check if the workflow was scheduled to run
     # This assertion should pass if the bug is fixed
     assert (
-        len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    ), f"Expected workflow to be triggered, but got {len(workflow_manager.scheduler.workflows_to_run) - workflows_to_run_before} new workflows"
+        len(workflows_added_to_run) == workflows_to_run_before + 1
+    ), f"Expected workflow to be triggered, but got {len(workflows_added_to_run) - workflows_to_run_before} new workflows"
 
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Test case where slackTimestamp is not null - should NOT match
     alert_with_timestamp = create_alert(
@@ -566,11 +544,11 @@ def test_cel_expression_with_null_field_bug(
     )
 
     # Insert the alert with timestamp
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_with_timestamp])
 
     # Should not trigger workflow since slackTimestamp is not null
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
     # Test case where source doesn't match - should NOT match
     alert_wrong_source = create_alert(
@@ -581,11 +559,11 @@ def test_cel_expression_with_null_field_bug(
     )
 
     # Insert the alert with wrong source
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_wrong_source])
 
     # Should not trigger workflow since source doesn't match
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
     # Test case where status is not firing - should NOT match
     alert_wrong_status = create_alert(
@@ -596,8 +574,8 @@ def test_cel_expression_with_null_field_bug(
     )
 
     # Insert the alert with wrong status
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert_wrong_status])
 
     # Should not trigger workflow since status is not firing
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
@@ -28,6 +28,7 @@ from tests.fixtures.client import client, test_app  # noqa
 from keep.workflowmanager.workflowstore import WorkflowStore
 from tests.fixtures.workflow_manager import (
     workflow_manager,
+    workflows_added_to_run,
     wait_for_workflow_execution,
 )
 
@@ -421,6 +422,7 @@ def test_workflow_execution_2(
     test_app,
     create_alert,
     workflow_manager,
+    workflows_added_to_run,
     workflow_id,
     test_case,
     alert_statuses,
@@ -479,7 +481,7 @@ def test_workflow_execution_2(
 
     # Insert the current alert into the workflow manager
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [current_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 1
 
     # Wait for the workflow execution to complete
     workflow_execution = wait_for_workflow_execution(SINGLE_TENANT_UUID, workflow_id)
@@ -779,6 +781,7 @@ def test_workflow_incident_triggers(
     db_session,
     test_app,
     workflow_manager,
+    workflows_added_to_run,
 ):
     workflow_created = Workflow(
         id="incident-triggers-test-created-updated",
@@ -807,7 +810,7 @@ def test_workflow_incident_triggers(
     # Insert the current alert into the workflow manager
 
     workflow_manager.insert_incident(SINGLE_TENANT_UUID, incident, "created")
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 1
 
     workflow_execution_created = wait_for_workflow_execution(
         SINGLE_TENANT_UUID, "incident-triggers-test-created-updated"
@@ -820,7 +823,7 @@ def test_workflow_incident_triggers(
     assert len(workflow_manager.scheduler.workflows_to_run) == 0
 
     workflow_manager.insert_incident(SINGLE_TENANT_UUID, incident, "updated")
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 2
     workflow_execution_updated = wait_for_workflow_execution(
         SINGLE_TENANT_UUID, "incident-triggers-test-created-updated"
     )
@@ -832,7 +835,7 @@ def test_workflow_incident_triggers(
 
     # incident-triggers-test-created-updated should not be triggered
     workflow_manager.insert_incident(SINGLE_TENANT_UUID, incident, "deleted")
-    assert len(workflow_manager.scheduler.workflows_to_run) == 0
+    assert len(workflows_added_to_run) == 2
 
     workflow_deleted = Workflow(
         id="incident-triggers-test-deleted",
@@ -847,7 +850,7 @@ def test_workflow_incident_triggers(
     db_session.commit()
 
     workflow_manager.insert_incident(SINGLE_TENANT_UUID, incident, "deleted")
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 3
 
     # incident-triggers-test-deleted should be triggered now
     workflow_execution_deleted = wait_for_workflow_execution(
@@ -1150,3 +1150,69 @@ triggers:
     assert all(a.severity == "critical" for a in triggered_alerts)
     assert not any(a.id == "alert-3" for a in triggered_alerts)
     assert not any(a.id == "alert-4" for a in triggered_alerts)
+
+
+def test_workflow_triggers_index(db_session):
+    """Test the compiled triggers are reused across batches and recompiled on update"""
+    workflow_manager = WorkflowManager()
+    workflow = WorkflowDB(
+        id="indexed-workflow",
+        name="indexed-workflow",
+        tenant_id=SINGLE_TENANT_UUID,
+        description="Handle critical alerts",
+        created_by="test@keephq.dev",
+        interval=0,
+        workflow_raw="""workflow:
+id: indexed-workflow
+triggers:
+- type: alert
+  cel: severity == "critical"
+""",
+    )
+    db_session.add(workflow)
+    db_session.commit()
+
+    critical_alert = AlertDto(
+        id="alert-1",
+        source=["grafana"],
+        name="error-alert",
+        status="firing",
+        severity="critical",
+        fingerprint="fp1",
+        lastReceived="2025-01-30T09:19:02.519Z",
+    )
+    warning_alert = AlertDto(
+        id="alert-2",
+        source=["grafana"],
+        name="error-alert",
+        status="firing",
+        severity="warning",
+        fingerprint="fp2",
+        lastReceived="2025-01-30T09:19:02.519Z",
+    )
+
+    workflow_manager.insert_events(SINGLE_TENANT_UUID, [critical_alert, warning_alert])
+    assert [w["event"].id for w in workflow_manager.scheduler.workflows_to_run] == [
+        "alert-1"
+    ]
+    (compiled_trigger,) = workflow_manager.trigger_index.index[SINGLE_TENANT_UUID][
+        "indexed-workflow"
+    ][1]
+
+    # same revision, the compiled trigger is reused
+    workflow_manager.scheduler.workflows_to_run.clear()
+    workflow_manager.insert_events(SINGLE_TENANT_UUID, [critical_alert, warning_alert])
+    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert workflow_manager.trigger_index.index[SINGLE_TENANT_UUID]["indexed-workflow"][
+        1
+    ] == [compiled_trigger]
+
+    # a new revision is recompiled
+    workflow.workflow_raw = workflow.workflow_raw.replace("critical", "warning")
+    workflow.revision += 1
+    db_session.commit()
+    workflow_manager.scheduler.workflows_to_run.clear()
+    workflow_manager.insert_events(SINGLE_TENANT_UUID, [critical_alert, warning_alert])
+    assert [w["event"].id for w in workflow_manager.scheduler.workflows_to_run] == [
+        "alert-2"
+    ]
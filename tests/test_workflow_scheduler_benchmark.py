@@ -0,0 +1,124 @@
+"""
+Benchmark of a scheduler tick over the interval workflows.
+
+Records the time spent in get_workflows_that_should_run for N interval workflows as
+test properties (e.g. in the --junitxml report). The benchmark only runs with
+--benchmark, the size can be changed with the SCHEDULER_BENCHMARK_WORKFLOWS
+environment variable, e.g.:
+
+    SCHEDULER_BENCHMARK_WORKFLOWS=50000 pytest --benchmark --junitxml=benchmark.xml \
+        tests/test_workflow_scheduler_benchmark.py
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from keep.api.core.db import get_workflows_that_should_run
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.db.workflow import Workflow, WorkflowExecution
+
+WORKFLOWS_COUNT = int(os.environ.get("SCHEDULER_BENCHMARK_WORKFLOWS", "1000"))
+
+WORKFLOW_RAW = """workflow:
+id: interval-workflow
+triggers:
+- type: interval
+  value: 60
+"""
+
+
+def _seed_interval_workflows(db_session, count: int, now: datetime):
+    """
+    Seed interval workflows, every third one is due.
+    """
+    workflows = []
+    executions = []
+    for i in range(count):
+        workflow_id = f"interval-workflow-{i}"
+        workflows.append(
+            Workflow(
+                id=workflow_id,
+                name=workflow_id,
+                tenant_id=SINGLE_TENANT_UUID,
+                description="Interval workflow",
+                created_by="test@keephq.dev",
+                interval=60,
+                workflow_raw=WORKFLOW_RAW,
+            )
+        )
+        started = now - timedelta(seconds=120 if i % 3 == 0 else 10)
+        executions.append(
+            WorkflowExecution(
+                id=f"{workflow_id}-1",
+                workflow_id=workflow_id,
+                tenant_id=SINGLE_TENANT_UUID,
+                started=started,
+                triggered_by="scheduler",
+                execution_number=1,
+                status="success",
+            )
+        )
+    db_session.add_all(workflows)
+    db_session.commit()
+    db_session.add_all(executions)
+    db_session.commit()
+
+
+def test_get_workflows_that_should_run(db_session):
+    now = datetime.utcnow()
+    _seed_interval_workflows(db_session, 9, now)
+    db_session.add(
+        Workflow(
+            id="interval-workflow-never-ran",
+            name="interval-workflow-never-ran",
+            tenant_id=SINGLE_TENANT_UUID,
+            description="Interval workflow",
+            created_by="test@keephq.dev",
+            interval=60,
+            workflow_raw=WORKFLOW_RAW,
+        )
+    )
+    db_session.commit()
+
+    workflows_to_run = get_workflows_that_should_run()
+    assert sorted(w["workflow_id"] for w in workflows_to_run) == [
+        "interval-workflow-0",
+        "interval-workflow-3",
+        "interval-workflow-6",
+        "interval-workflow-never-ran",
+    ]
+    executions = {
+        execution.workflow_id: execution
+        for execution in db_session.query(WorkflowExecution)
+        .filter(WorkflowExecution.status == "in_progress")
+        .all()
+    }
+    assert executions["interval-workflow-0"].execution_number == 2
+    assert executions["interval-workflow-never-ran"].execution_number == 1
+
+    # the due workflows are locked by their in progress execution
+    assert get_workflows_that_should_run() == []
+
+
+@pytest.mark.benchmark
+def test_get_workflows_that_should_run_benchmark(db_session, record_property):
+    now = datetime.utcnow()
+    _seed_interval_workflows(db_session, WORKFLOWS_COUNT, now)
+
+    start = time.perf_counter()
+    workflows_to_run = get_workflows_that_should_run()
+    elapsed = time.perf_counter() - start
+    assert len(workflows_to_run) == (WORKFLOWS_COUNT + 2) // 3
+
+    # the next tick, the due workflows are locked by their in progress execution
+    start = time.perf_counter()
+    assert get_workflows_that_should_run() == []
+    locked_elapsed = time.perf_counter() - start
+
+    record_property("interval_workflows", WORKFLOWS_COUNT)
+    record_property("due_workflows", len(workflows_to_run))
+    record_property("tick_seconds", round(elapsed, 3))
+    record_property("next_tick_seconds", round(locked_elapsed, 3))
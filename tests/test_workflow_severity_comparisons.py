@@ -5,7 +5,10 @@ from keep.api.core.dependencies import SINGLE_TENANT_UUID
 from keep.api.models.alert import AlertDto, AlertSeverity, AlertStatus
 from keep.api.models.db.workflow import Workflow
 
-from tests.fixtures.workflow_manager import workflow_manager  # noqa
+from tests.fixtures.workflow_manager import (  # noqa
+    workflow_manager,
+    workflows_added_to_run,
+)
 
 
 @pytest.fixture
@@ -63,7 +66,11 @@ def create_alert():
 
 
 def test_severity_greater_than_info_bug_fix(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """
     Test the specific bug case from GitHub issue #5086:
@@ -103,36 +110,40 @@ def test_severity_greater_than_info_bug_fix(
     )
 
     # Test high severity alert (should match)
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [high_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Test critical severity alert (should match)
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [critical_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Test warning severity alert (should match)
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [warning_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
 
     # Test info severity alert (should NOT match)
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [info_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
     # Test low severity alert (should NOT match)
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [low_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+    assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_severity_greater_than_or_equal_warning(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """Test severity >= 'warning' comparisons work correctly with numeric conversion"""
     workflow = create_workflow("test-severity-gte-warning", "severity >= 'warning'")
@@ -148,19 +159,23 @@ def test_severity_greater_than_or_equal_warning(
 
     # Test matching severities
     for alert in [critical_alert, high_alert, warning_alert]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
+        assert len(workflows_added_to_run) == workflows_to_run_before + 1
 
     # Test non-matching severities
     for alert in [info_alert, low_alert]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+        assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_severity_less_than_high(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """Test severity < 'high' comparisons work correctly with numeric conversion"""
     workflow = create_workflow("test-severity-lt-high", "severity < 'high'")
@@ -176,19 +191,23 @@ def test_severity_less_than_high(
 
     # Test matching severities
     for alert in [info_alert, low_alert, warning_alert]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
+        assert len(workflows_added_to_run) == workflows_to_run_before + 1
 
     # Test non-matching severities  
     for alert in [high_alert, critical_alert]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+        assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_complex_severity_expressions(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """Test complex CEL expressions involving severity comparisons"""
     workflow = create_workflow(
@@ -220,19 +239,23 @@ def test_complex_severity_expressions(
 
     # Test matching alerts
     for alert in [prometheus_critical, prometheus_high, prometheus_warning, grafana_critical]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
+        assert len(workflows_added_to_run) == workflows_to_run_before + 1
 
     # Test non-matching alerts
     for alert in [prometheus_info, grafana_high]:
-        workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+        workflows_to_run_before = len(workflows_added_to_run)
         workflow_manager.insert_events(SINGLE_TENANT_UUID, [alert])
-        assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before
+        assert len(workflows_added_to_run) == workflows_to_run_before
 
 
 def test_case_insensitive_severity_comparisons(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """Test that severity comparisons are case-insensitive after preprocessing"""
     workflow = create_workflow("test-severity-case", "severity > 'INFO'")
@@ -240,13 +263,17 @@ def test_case_insensitive_severity_comparisons(
     # Should match despite case difference in CEL expression
     high_alert = create_alert(severity=AlertSeverity.HIGH, fingerprint="fp-high")
     
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [high_alert])
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1
     
 
 def test_severity_preprocessing_cel_utils_integration(
-    db_session, workflow_manager, create_workflow, create_alert
+    db_session,
+    workflow_manager,
+    workflows_added_to_run,
+    create_workflow,
+    create_alert,
 ):
     """
     Test that the cel_utils.preprocess_cel_expression function is properly integrated
@@ -270,10 +297,10 @@ def test_severity_preprocessing_cel_utils_integration(
         fingerprint="fp-high-severity"
     )
 
-    workflows_to_run_before = len(workflow_manager.scheduler.workflows_to_run)
+    workflows_to_run_before = len(workflows_added_to_run)
     workflow_manager.insert_events(SINGLE_TENANT_UUID, [high_alert])
     
     # This assertion would fail before the fix, but should pass after
-    assert len(workflow_manager.scheduler.workflows_to_run) == workflows_to_run_before + 1, \
+    assert len(workflows_added_to_run) == workflows_to_run_before + 1, \
         "HIGH severity alert should match 'severity > info' expression after preprocessing fix"
-    assert workflow_manager.scheduler.workflows_to_run[-1]["workflow_id"] == workflow.id
\ No newline at end of file
+    assert workflows_added_to_run[-1]["workflow_id"] == workflow.id
\ No newline at end of file
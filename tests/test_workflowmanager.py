@@ -1,9 +1,24 @@
+import threading
+from datetime import datetime, timedelta
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 from fastapi import HTTPException
-
+from sqlmodel import select, update
+
+from keep.api.core.db import (
+    delete_queued_workflow_execution,
+    enqueue_workflow_execution,
+    get_interval_workflows_to_run,
+    lease_queued_workflow_executions,
+    release_queued_workflow_execution,
+)
+from keep.api.core.dependencies import SINGLE_TENANT_UUID
+from keep.api.models.alert import AlertDto
+from keep.api.models.db.workflow import QueuedWorkflowExecution
+from keep.api.models.db.workflow import Workflow as WorkflowDB
+from keep.api.models.db.workflow import WorkflowExecution
 from keep.api.routes.workflows import get_event_from_body
 from keep.parser.parser import Parser
 
@@ -182,3 +197,181 @@ def test_handle_manual_event_workflow_test_run():
         )
         assert workflow_scheduler.workflows_to_run[0]["test_run"] == True
         assert workflow_scheduler.workflows_to_run[0]["workflow"] == mock_workflow
+
+
+def test_scheduler_wakes_up_when_workflows_are_added():
+    workflow_scheduler = WorkflowScheduler(workflow_manager=Mock())
+    workflow_scheduler.MAX_SLEEP_SECONDS = 60
+    workflow_scheduler._handle_interval_workflows = Mock()
+    handled = threading.Event()
+    workflow_scheduler._handle_event_workflows = Mock(side_effect=lambda: handled.set())
+    workflow_scheduler._get_sleep_time = Mock(return_value=60)
+
+    scheduler_thread = threading.Thread(target=workflow_scheduler._start)
+    scheduler_thread.start()
+    try:
+        assert handled.wait(timeout=5)
+        handled.clear()
+        # the scheduler sleeps for a minute unless it is woken up
+        workflow_scheduler.wake_up()
+        assert handled.wait(timeout=5)
+    finally:
+        workflow_scheduler._stop = True
+        workflow_scheduler.wake_up()
+        scheduler_thread.join(timeout=5)
+    assert not scheduler_thread.is_alive()
+    assert workflow_scheduler._handle_event_workflows.call_count == 2
+
+
+def test_scheduler_event_wake_ups_skip_interval_workflows():
+    workflow_scheduler = WorkflowScheduler(workflow_manager=Mock())
+    workflow_scheduler.MAX_SLEEP_SECONDS = 60
+    workflow_scheduler.interval_enabled = True
+    workflow_scheduler.queue_enabled = False
+    handled = threading.Event()
+    workflow_scheduler._handle_event_workflows = Mock(side_effect=lambda: handled.set())
+
+    with patch(
+        "keep.workflowmanager.workflowscheduler.get_interval_workflows_to_run",
+        return_value=([], None),
+    ) as get_interval_workflows_to_run_mock:
+        scheduler_thread = threading.Thread(target=workflow_scheduler._start)
+        scheduler_thread.start()
+        try:
+            assert handled.wait(timeout=5)
+            for i in range(10):
+                handled.clear()
+                workflow_scheduler.add_workflow_to_run(
+                    {"workflow_id": f"workflow-{i}", "tenant_id": SINGLE_TENANT_UUID}
+                )
+                assert handled.wait(timeout=5)
+            # no interval workflow is due, so the event wake-ups don't query them
+            assert get_interval_workflows_to_run_mock.call_count == 1
+
+            # checked again once an interval workflow execution finished
+            handled.clear()
+            workflow_scheduler._refresh_interval_workflows()
+            assert handled.wait(timeout=5)
+            assert get_interval_workflows_to_run_mock.call_count == 2
+        finally:
+            workflow_scheduler._stop = True
+            workflow_scheduler.wake_up()
+            scheduler_thread.join(timeout=5)
+    assert not scheduler_thread.is_alive()
+    assert workflow_scheduler._handle_event_workflows.call_count >= 12
+
+
+def test_get_interval_workflows_to_run_next_due_in(db_session):
+    now = datetime.utcnow()
+    assert get_interval_workflows_to_run(60, now) == ([], None)
+
+    db_session.add(
+        WorkflowDB(
+            id="interval-workflow",
+            name="interval-workflow",
+            tenant_id=SINGLE_TENANT_UUID,
+            description="Interval workflow",
+            created_by="test@keephq.dev",
+            interval=60,
+            workflow_raw="workflow:\n  id: interval-workflow\n",
+        )
+    )
+    db_session.add(
+        WorkflowExecution(
+            id="interval-workflow-1",
+            workflow_id="interval-workflow",
+            tenant_id=SINGLE_TENANT_UUID,
+            started=now - timedelta(seconds=20),
+            triggered_by="scheduler",
+            execution_number=1,
+            status="success",
+        )
+    )
+    db_session.commit()
+    # not due yet, only in the look ahead window
+    assert get_interval_workflows_to_run(0, now) == ([], None)
+    workflows_to_run, next_due_in = get_interval_workflows_to_run(60, now)
+    assert workflows_to_run == []
+    assert next_due_in == pytest.approx(40, abs=1)
+
+    workflows_to_run, next_due_in = get_interval_workflows_to_run(
+        60, now + timedelta(seconds=90)
+    )
+    assert [w["workflow_id"] for w in workflows_to_run] == ["interval-workflow"]
+    assert next_due_in is None
+
+
+def test_queued_workflow_executions_leases(db_session):
+    queued_execution_id = enqueue_workflow_execution(
+        SINGLE_TENANT_UUID, "workflow-1", {"workflow_id": "workflow-1"}
+    )
+
+    leased = lease_queued_workflow_executions(limit=10, visibility_timeout=60)
+    assert [queued.id for queued in leased] == [queued_execution_id]
+    assert leased[0].attempts == 1
+    lease_id = leased[0].lease_id
+    # hidden from the other schedulers while leased
+    assert lease_queued_workflow_executions(limit=10, visibility_timeout=60) == []
+
+    # put back with a delay, the old lease can't delete it anymore
+    assert release_queued_workflow_execution(
+        queued_execution_id, lease_id, {"workflow_id": "workflow-1", "retry": True}, 60
+    )
+    assert lease_queued_workflow_executions(limit=10, visibility_timeout=60) == []
+    assert not delete_queued_workflow_execution(queued_execution_id, lease_id)
+
+    # available again once the lease expired
+    db_session.exec(
+        update(QueuedWorkflowExecution).values(
+            available_at=datetime.utcnow() - timedelta(seconds=1)
+        )
+    )
+    db_session.commit()
+    leased = lease_queued_workflow_executions(limit=10, visibility_timeout=0)
+    assert leased[0].payload == {"workflow_id": "workflow-1", "retry": True}
+    expired_lease_id = leased[0].lease_id
+    leased = lease_queued_workflow_executions(limit=10, visibility_timeout=60)
+    assert leased[0].attempts == 2
+    assert not delete_queued_workflow_execution(queued_execution_id, expired_lease_id)
+    assert delete_queued_workflow_execution(queued_execution_id, leased[0].lease_id)
+    assert lease_queued_workflow_executions(limit=10, visibility_timeout=0) == []
+
+
+def test_scheduler_runs_queued_workflows(db_session):
+    workflow_scheduler = WorkflowScheduler(workflow_manager=Mock())
+    workflow_scheduler.queue_enabled = True
+    event = AlertDto(
+        id="alert-1",
+        name="alert-1",
+        status="firing",
+        severity="critical",
+        lastReceived=datetime.utcnow().isoformat(),
+        source=["test"],
+        fingerprint="fp-1",
+        custom_field="custom",
+    )
+
+    workflow_scheduler.add_workflow_to_run(
+        {
+            "workflow_id": "workflow-1",
+            "tenant_id": SINGLE_TENANT_UUID,
+            "triggered_by": "alert",
+            "event": event,
+        }
+    )
+    # queued in the database, so any scheduler can run it
+    assert workflow_scheduler.workflows_to_run == []
+
+    other_scheduler = WorkflowScheduler(workflow_manager=Mock())
+    other_scheduler.queue_enabled = True
+    handled = []
+    other_scheduler._handle_event_workflow = handled.append
+    other_scheduler._handle_event_workflows()
+
+    assert len(handled) == 1
+    assert handled[0]["workflow_id"] == "workflow-1"
+    assert handled[0]["triggered_by"] == "alert"
+    assert handled[0]["event"] == event
+    assert handled[0]["event"].custom_field == "custom"
+    # handled, so it's deleted from the queue
+    assert db_session.exec(select(QueuedWorkflowExecution)).all() == []
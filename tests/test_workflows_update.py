@@ -10,6 +10,7 @@ from keep.api.models.db.workflow import Workflow
 from keep.functions import cyaml
 from tests.fixtures.workflow_manager import (
     workflow_manager,
+    workflows_added_to_run,
     wait_for_workflow_execution,
 )
 
@@ -120,7 +121,9 @@ def get_manual_run_event(name: str):
     return manual_run_event
 
 
-def test_s3_workflow_sync_manual_trigger(db_session, workflow_manager, mocker):
+def test_s3_workflow_sync_manual_trigger(
+    db_session, workflow_manager, workflows_added_to_run, mocker
+):
     """Test the S3 workflow sync functionality using manual trigger."""
     # Create the sync workflow
     sync_workflow = Workflow(
@@ -150,7 +153,7 @@ def test_s3_workflow_sync_manual_trigger(db_session, workflow_manager, mocker):
     workflow_manager.insert_events(
         SINGLE_TENANT_UUID, [get_manual_run_event("sync-workflows-from-s3")]
     )
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 1
 
     # Wait for workflow execution to complete
     workflow_execution = wait_for_workflow_execution(
@@ -177,7 +180,7 @@ def test_s3_workflow_sync_manual_trigger(db_session, workflow_manager, mocker):
     workflow_manager.insert_events(
         SINGLE_TENANT_UUID, [get_manual_run_event("sync-workflows-from-s3")]
     )
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 2
 
     workflow_execution_2 = wait_for_workflow_execution(
         SINGLE_TENANT_UUID, "s3-workflow-sync", exclude_ids=[workflow_execution.id]
@@ -205,7 +208,7 @@ def test_s3_workflow_sync_manual_trigger(db_session, workflow_manager, mocker):
     workflow_manager.insert_events(
         SINGLE_TENANT_UUID, [get_manual_run_event("sync-workflows-from-s3")]
     )
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 3
     workflow_execution_3 = wait_for_workflow_execution(
         SINGLE_TENANT_UUID,
         "s3-workflow-sync",
@@ -236,7 +239,9 @@ def test_s3_workflow_sync_manual_trigger(db_session, workflow_manager, mocker):
             assert_workflow_yaml(workflow_db.workflow_raw, workflow_yaml)
 
 
-def test_workflow_update_from_workflow(db_session, workflow_manager, mocker):
+def test_workflow_update_from_workflow(
+    db_session, workflow_manager, workflows_added_to_run, mocker
+):
     """Test that workflow revision is incremented when content changes."""
     # Create initial workflow
     initial_workflow_yaml = """
@@ -301,7 +306,7 @@ def test_workflow_update_from_workflow(db_session, workflow_manager, mocker):
     workflow_manager.insert_events(
         SINGLE_TENANT_UUID, [get_manual_run_event("sync-workflows-from-s3")]
     )
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 1
 
     # Wait for workflow execution to complete
     workflow_execution = wait_for_workflow_execution(
@@ -319,7 +324,7 @@ def test_workflow_update_from_workflow(db_session, workflow_manager, mocker):
     workflow_manager.insert_events(
         SINGLE_TENANT_UUID, [get_manual_run_event("sync-workflows-from-s3")]
     )
-    assert len(workflow_manager.scheduler.workflows_to_run) == 1
+    assert len(workflows_added_to_run) == 2
 
     # Wait for workflow execution to complete
     workflow_execution = wait_for_workflow_execution(
@@ -9,8 +9,10 @@ from keep.workflowmanager.workflowstore import WorkflowStore
 from keep.api.core.db import get_all_provisioned_workflows
 from tests.fixtures.client import test_app  # noqa
 import pytest
+import threading
 import time
 from uuid import uuid4
+from unittest.mock import patch
 
 VALID_WORKFLOW = """
 workflow:
@@ -585,3 +587,113 @@ def test_get_workflow_run_logs_sorted_by_timestamp(db_session):
     for i, log in enumerate(logs):
         if i < len(logs) - 1:
             assert log.timestamp < logs[i + 1].timestamp
+
+
+CONSOLE_WORKFLOW = """
+workflow:
+  id: console-workflow
+  name: Console Workflow
+  description: Print to the console
+  triggers:
+    - type: manual
+  actions:
+    - name: print
+      provider:
+        type: console
+        with:
+          message: "{{ alert.name }}"
+"""
+
+
+def test_get_workflow_cache(db_session):
+    """
+    Test that get_workflow parses a workflow revision once and returns fresh copies of it.
+    """
+    workflowstore = WorkflowStore()
+    workflow = Workflow(
+        id="console-workflow",
+        name="Console Workflow",
+        tenant_id=SINGLE_TENANT_UUID,
+        description="Print to the console",
+        created_by="test@keephq.dev",
+        interval=0,
+        workflow_raw=CONSOLE_WORKFLOW,
+        last_updated=datetime.now(tz=timezone.utc),
+    )
+    db_session.add(workflow)
+    db_session.commit()
+
+    with patch.object(
+        workflowstore.parser, "parse", wraps=workflowstore.parser.parse
+    ) as parse:
+        first = workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        second = workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        assert parse.call_count == 1
+        # the copies don't share their execution state
+        assert first is not second
+        assert first.context_manager is not second.context_manager
+        assert (
+            second.workflow_actions[0].provider.context_manager
+            is second.context_manager
+        )
+        assert second.workflow_id == "console-workflow"
+        assert second.workflow_actions[0].name == "print"
+
+        # a new revision is parsed again
+        workflow.workflow_raw = CONSOLE_WORKFLOW.replace("alert.name", "alert.id")
+        workflow.revision += 1
+        db_session.commit()
+        third = workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        assert parse.call_count == 2
+        assert third.workflow_revision == workflow.revision
+
+        # workflows loading the last execution results at parse time are not cached
+        workflow.workflow_raw = CONSOLE_WORKFLOW.replace(
+            "alert.name", "last_workflow_results"
+        )
+        workflow.revision += 1
+        db_session.commit()
+        workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        assert parse.call_count == 4
+
+
+def test_get_workflow_cache_uncopyable_workflow(db_session, caplog):
+    """
+    Test that a workflow revision that can't be copied is only tried to be copied once.
+    """
+    workflowstore = WorkflowStore()
+    workflow = Workflow(
+        id="console-workflow",
+        name="Console Workflow",
+        tenant_id=SINGLE_TENANT_UUID,
+        description="Print to the console",
+        created_by="test@keephq.dev",
+        interval=0,
+        workflow_raw=CONSOLE_WORKFLOW,
+        last_updated=datetime.now(tz=timezone.utc),
+    )
+    db_session.add(workflow)
+    db_session.commit()
+
+    parse_workflow_model = workflowstore._parse_workflow_model
+
+    def _parse_uncopyable_workflow(tenant_id, workflow_model):
+        parsed_workflow = parse_workflow_model(tenant_id, workflow_model)
+        # e.g. a provider holding a client with a lock
+        parsed_workflow.client_lock = threading.Lock()
+        return parsed_workflow
+
+    with patch.object(
+        workflowstore, "_parse_workflow_model", side_effect=_parse_uncopyable_workflow
+    ) as parse:
+        for _ in range(3):
+            workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        assert parse.call_count == 3
+        assert caplog.text.count("Workflow can't be copied") == 1
+
+        # a new revision is tried again
+        workflow.revision += 1
+        db_session.commit()
+        workflowstore.get_workflow(SINGLE_TENANT_UUID, "console-workflow")
+        assert caplog.text.count("Workflow can't be copied") == 2